@@ -39,6 +39,10 @@ def create_app(config_name='development'):
     CORS(app, origins=app.config['CORS_ALLOWED_ORIGINS'])
     socketio.init_app(app, async_mode='threading')
 
+    # Forward live source processing progress to per-project SocketIO rooms
+    from app.api.sources.progress_events import register_progress_events
+    register_progress_events(socketio)
+
     # Register blueprints (modular route handlers)
     from app.api import api_bp
     app.register_blueprint(api_bp, url_prefix=app.config['API_PREFIX'])
@@ -9,12 +9,13 @@ Routes:
 - GET    /projects/<id>/chats          - List all chats
 - POST   /projects/<id>/chats          - Create new chat
 - GET    /projects/<id>/chats/<id>     - Get chat with messages
-- PUT    /projects/<id>/chats/<id>     - Update chat (rename)
+- PUT    /projects/<id>/chats/<id>     - Update chat (rename, context token budget)
 - DELETE /projects/<id>/chats/<id>     - Delete chat
 """
 from flask import jsonify, request, current_app
 from app.api.chats import chats_bp
 from app.services.data_services import chat_service
+from app.services.chat_services import context_window_service
 
 
 @chats_bp.route('/projects/<project_id>/chats', methods=['GET'])
@@ -101,20 +102,44 @@ def get_chat(project_id, chat_id):
 @chats_bp.route('/projects/<project_id>/chats/<chat_id>', methods=['PUT'])
 def update_chat(project_id, chat_id):
     """
-    Update chat metadata (currently only title).
+    Update chat metadata (title and/or context token budget).
 
-    Educational Note: Allows users to rename chats for better organization.
+    Educational Note: Allows users to rename chats for better organization,
+    and to tune how much message history is sent to Claude per call.
+
+    Request Body:
+        {
+            "title": "New Title",               // optional
+            "context_token_budget": 40000       // optional, null resets to default
+        }
     """
     try:
         data = request.get_json()
 
-        if not data or 'title' not in data:
+        if not data or not ('title' in data or 'context_token_budget' in data):
             return jsonify({
                 'success': False,
-                'error': 'Title is required'
+                'error': 'Title or context_token_budget is required'
             }), 400
 
-        chat = chat_service.update_chat(project_id, chat_id, {"title": data['title']})
+        updates = {}
+        if 'title' in data:
+            updates['title'] = data['title']
+
+        if 'context_token_budget' in data:
+            budget = data['context_token_budget']
+            if budget is not None and (
+                not isinstance(budget, int)
+                or isinstance(budget, bool)  # bool is a subclass of int
+                or budget < context_window_service.MIN_TOKEN_BUDGET
+            ):
+                return jsonify({
+                    'success': False,
+                    'error': f'context_token_budget must be an integer >= {context_window_service.MIN_TOKEN_BUDGET}'
+                }), 400
+            updates['context_token_budget'] = budget
+
+        chat = chat_service.update_chat(project_id, chat_id, updates)
 
         if not chat:
             return jsonify({
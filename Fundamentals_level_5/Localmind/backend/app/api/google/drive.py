@@ -15,15 +15,28 @@ Google Workspace File Exports:
 
 Regular files (PDF, images, etc.) are downloaded directly.
 
+Batch imports (several files or a whole folder) download in a bounded
+pool and start processing each file as soon as it lands - see
+source_upload/drive_import.py.
+
 Routes:
-- GET  /google/files                              - List files from Drive
-- POST /projects/<id>/sources/google-import       - Import file to project
+- GET  /google/files                                          - List files from Drive
+- POST /projects/<id>/sources/google-import                   - Import file to project
+- POST /projects/<id>/sources/google-import/batch             - Import many files / a folder
+- GET  /projects/<id>/sources/google-import/batch/<batch_id>  - Batch progress
+- POST /projects/<id>/sources/google-import/batch/<batch_id>/retry - Retry failed files
 """
 import uuid
 from flask import jsonify, request, current_app
 from app.api.google import google_bp
 from app.services.integrations.google import google_drive_service
 from app.services.source_services import source_service
+from app.services.source_services.source_upload.drive_import import (
+    drive_import_service,
+    build_file_name,
+    get_category_from_mime_type,
+    map_google_mime_type
+)
 from app.utils.path_utils import get_raw_dir
 
 
@@ -43,6 +56,7 @@ def google_list_files():
         folder_id: Optional folder ID to list (root if not specified)
         page_size: Number of files per page (default 50)
         page_token: Token for next page (from previous response)
+        refresh: "true" to bypass the short-lived listing cache
 
     Returns:
         {
@@ -55,11 +69,13 @@ def google_list_files():
         folder_id = request.args.get('folder_id')
         page_size = int(request.args.get('page_size', 50))
         page_token = request.args.get('page_token')
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
 
         result = google_drive_service.list_files(
             folder_id=folder_id,
             page_size=page_size,
-            page_token=page_token
+            page_token=page_token,
+            use_cache=not refresh
         )
 
         if result['success']:
@@ -132,15 +148,13 @@ def google_import_file(project_id):
             }), 400
 
         # Ensure file name has correct extension
-        if not file_name.lower().endswith(extension):
-            base_name = file_name.rsplit('.', 1)[0] if '.' in file_name else file_name
-            file_name = base_name + extension
+        file_name = build_file_name(file_name, extension)
 
         # Generate source ID for file naming
         source_id = str(uuid.uuid4())
 
         # Determine category based on MIME type
-        category = _get_category_from_mime_type(mime_type, extension)
+        category = get_category_from_mime_type(mime_type, extension)
 
         # Build destination path
         # Note: get_raw_dir auto-creates directories if they don't exist
@@ -149,7 +163,9 @@ def google_import_file(project_id):
         destination_path = raw_dir / stored_filename
 
         # Download/export file from Drive
-        success, message = google_drive_service.download_file(file_id, destination_path)
+        success, message = google_drive_service.download_file(
+            file_id, destination_path, file_info=file
+        )
         if not success:
             return jsonify({
                 'success': False,
@@ -157,7 +173,7 @@ def google_import_file(project_id):
             }), 500
 
         # Map Google MIME types to standard types
-        actual_mime_type = _map_google_mime_type(mime_type)
+        actual_mime_type = map_google_mime_type(mime_type)
 
         # Create source entry (also triggers background processing)
         created_source = source_service.create_source_from_file(
@@ -169,6 +185,7 @@ def google_import_file(project_id):
             mime_type=actual_mime_type,
             description='Imported from Google Drive'
         )
+        drive_import_service.record_import(project_id, file_id, created_source['id'], file)
 
         return jsonify({
             'success': True,
@@ -184,36 +201,118 @@ def google_import_file(project_id):
         }), 500
 
 
-def _get_category_from_mime_type(mime_type: str, extension: str) -> str:
+
+@google_bp.route('/projects/<project_id>/sources/google-import/batch', methods=['POST'])
+def google_import_batch(project_id):
+    """
+    Import several Drive files, or a whole folder, in one batch.
+
+    Educational Note: Files download in parallel and each one becomes a
+    source (and starts processing) as soon as it lands. The response
+    returns immediately with a batch ID to poll. Files already imported
+    into this project (same Drive version) are skipped.
+
+    Request Body:
+        {
+            "file_ids": ["abc123...", ...],   # Drive file IDs, and/or
+            "folder_id": "xyz789...",         # a folder to import
+            "recursive": false                # include subfolders
+        }
+
+    Returns:
+        202 { "success": true, "batch": { "id", "status", "total", "files": {...} } }
+    """
+    try:
+        data = request.get_json() or {}
+        file_ids = data.get('file_ids') or []
+        folder_id = data.get('folder_id')
+
+        if not isinstance(file_ids, list):
+            return jsonify({
+                'success': False,
+                'error': 'file_ids must be a list'
+            }), 400
+
+        if not google_drive_service.is_connected():
+            return jsonify({
+                'success': False,
+                'error': 'Google Drive not connected'
+            }), 400
+
+        batch = drive_import_service.submit_batch(
+            project_id,
+            file_ids=file_ids,
+            folder_id=folder_id,
+            recursive=bool(data.get('recursive', False))
+        )
+
+        return jsonify({
+            'success': True,
+            'batch': batch,
+            'message': f"Importing {batch['total']} files from Google Drive"
+        }), 202
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        current_app.logger.error(f"Error starting Google Drive batch import: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@google_bp.route('/projects/<project_id>/sources/google-import/batch/<batch_id>', methods=['GET'])
+def google_import_batch_status(project_id, batch_id):
     """
-    Determine source category from MIME type.
+    Get the progress of a Drive batch import.
 
-    Educational Note: Categories help the UI display appropriate icons
-    and help the processing pipeline choose the right extractor.
+    Returns:
+        { "success": true, "batch": { "status", "completed", "failed", "skipped", "files": {...} } }
     """
-    if mime_type.startswith('image/'):
-        return 'image'
-    elif mime_type.startswith('audio/'):
-        return 'audio'
-    elif extension == '.csv':
-        return 'data'
-    else:
-        return 'document'
+    batch = drive_import_service.get_batch(batch_id, project_id)
+    if not batch:
+        return jsonify({
+            'success': False,
+            'error': 'Batch not found'
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'batch': batch
+    }), 200
 
 
-def _map_google_mime_type(mime_type: str) -> str:
+@google_bp.route('/projects/<project_id>/sources/google-import/batch/<batch_id>/retry', methods=['POST'])
+def google_import_batch_retry(project_id, batch_id):
     """
-    Map Google Workspace MIME types to standard MIME types.
+    Retry the files of a batch that failed.
 
-    Educational Note: Google Workspace files (Docs, Sheets, Slides)
-    have special MIME types that we need to map to their exported formats.
+    Educational Note: Interrupted downloads resume from the bytes already
+    on disk, so a retry only transfers what is missing.
+
+    Returns:
+        { "success": true, "batch": { ... } }
     """
-    mime_type_mapping = {
-        'application/vnd.google-apps.document':
-            'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        'application/vnd.google-apps.spreadsheet':
-            'text/csv',
-        'application/vnd.google-apps.presentation':
-            'application/vnd.openxmlformats-officedocument.presentationml.presentation'
-    }
-    return mime_type_mapping.get(mime_type, mime_type)
+    try:
+        batch = drive_import_service.retry_batch(batch_id, project_id)
+        if not batch:
+            return jsonify({
+                'success': False,
+                'error': 'Batch not found'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'batch': batch
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error retrying Google Drive batch import: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
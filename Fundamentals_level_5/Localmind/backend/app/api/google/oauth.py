@@ -26,7 +26,7 @@ Routes:
 """
 from flask import jsonify, request, redirect, current_app
 from app.api.google import google_bp
-from app.services.integrations.google import google_auth_service
+from app.services.integrations.google import google_auth_service, google_drive_service
 
 
 @google_bp.route('/google/status', methods=['GET'])
@@ -177,6 +177,9 @@ def google_disconnect():
     try:
         success, message = google_auth_service.disconnect()
 
+        # Listings belong to the disconnected account
+        google_drive_service.clear_listing_cache()
+
         return jsonify({
             'success': success,
             'message': message
@@ -24,10 +24,97 @@ the main_chat_service orchestrates:
 
 Routes:
 - POST /projects/<id>/chats/<id>/messages - Send message, get AI response
+- GET  /projects/<id>/chats/<id>/messages - Paginated message history
+
+When served by asgi.py, this POST route is answered by an async twin
+(main_chat_service.send_message_async) with the same request/response shape.
 """
 from flask import jsonify, request, current_app
 from app.api.messages import messages_bp
 from app.services.chat_services import main_chat_service
+from app.services.data_services import message_service
+
+
+@messages_bp.route('/projects/<project_id>/chats/<chat_id>/messages', methods=['GET'])
+def list_messages(project_id, chat_id):
+    """
+    Get a page of a chat's message history.
+
+    Educational Note: GET /chats/<id> returns every message, which for long
+    chats is megabytes of JSON on every open. This endpoint returns one page
+    at a time using message IDs as cursors, served from the message offsets
+    index (only the page's messages are read from disk).
+
+    Query Parameters:
+        limit: Messages per page (default 50, max 200)
+        before: Message ID - page of older messages (scroll up)
+        after: Message ID - newer messages, oldest first (incremental refresh)
+        since: ISO timestamp - messages stored after this time
+        include_tools: "true" to include tool_use/tool_result messages
+
+    Response:
+        {
+            "success": true,
+            "messages": [ ... oldest first ... ],
+            "has_more": true,
+            "total": 312
+        }
+    """
+    try:
+        before = request.args.get('before')
+        after = request.args.get('after')
+        since = request.args.get('since')
+
+        if before and (after or since):
+            return jsonify({
+                'success': False,
+                'error': 'before cannot be combined with after or since'
+            }), 400
+
+        try:
+            limit = int(request.args.get('limit', message_service.DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'limit must be an integer'
+            }), 400
+
+        include_tools = request.args.get('include_tools', 'false').lower() == 'true'
+
+        try:
+            page = message_service.get_message_page(
+                project_id,
+                chat_id,
+                before=before,
+                after=after,
+                since=since,
+                limit=limit,
+                include_tool_messages=include_tools
+            )
+        except ValueError as e:
+            # Unknown cursor message ID
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        if page is None:
+            return jsonify({
+                'success': False,
+                'error': 'Chat not found'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            **page
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error listing messages for chat {chat_id}: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
 
 @messages_bp.route('/projects/<project_id>/chats/<chat_id>/messages', methods=['POST'])
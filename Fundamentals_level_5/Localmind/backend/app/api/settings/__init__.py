@@ -13,6 +13,9 @@ Educational Note: This blueprint manages application settings including:
    - Anthropic tier configuration (rate limits)
    - Controls parallel processing (PDF extraction, etc.)
 
+3. Runtime Metrics (metrics.py):
+   - In-process cache hit/miss counters
+
 Security Considerations:
 - API keys are stored in .env file (not in database)
 - Keys are masked when returned to frontend (show only first/last chars)
@@ -37,3 +40,4 @@ settings_bp = Blueprint('settings', __name__)
 # Import routes to register them with the blueprint
 from app.api.settings import api_keys  # noqa: F401
 from app.api.settings import processing  # noqa: F401
+from app.api.settings import metrics  # noqa: F401
@@ -0,0 +1,145 @@
+"""
+Runtime metrics endpoint - in-process cache and performance counters.
+
+Educational Note: Caches are only worth having if they actually hit.
+This endpoint exposes the counters each in-process cache keeps, so you
+can see whether an optimization is paying off without attaching a
+profiler. Counters live in memory and reset when the server restarts.
+
+Metrics:
+- context_cache: Per-project system-prompt context cache (context_loader)
+  - hits / misses: Lookups served from cache vs rebuilt from disk
+  - invalidations: Explicit cache drops
+  - hit_rate: hits / (hits + misses)
+  - cached_projects: Projects with a cached context
+- chat_sessions: In-memory chat session LRU (message_service)
+  - hits / misses / reloads: Served from memory, parsed from disk, reparsed after outside change
+  - evictions: Sessions dropped to stay under max_sessions
+- rate_limits: Shared token-bucket limiters, keyed by "provider/model"
+  - requests / throttled / wait_seconds: Calls made, calls that had to wait, total wait
+  - available_*: Current bucket levels (RPM, input TPM, output TPM)
+  - *_reconciled: Sum of (actual - estimated) tokens
+- concurrency: Adaptive (AIMD) in-flight windows, keyed by "provider/model"
+  - window / in_flight / max_window: Current limit, calls running, upper bound
+  - throttle_events / window_decreases: 429/529 responses and resulting shrinks
+  - headroom: Lowest remaining/limit ratio from the last rate-limit headers
+  - background_in_flight / background_limit / interactive_calls: Background
+    calls and their cap (window minus the slots reserved for chat)
+- claude_calls: Per-call-site counters from claude_service ("module.function")
+  - calls / successes / failures / retries
+  - avg_latency / max_latency: Seconds per call, all attempts included
+  - errors: Count per error type
+- response_cache: On-disk cache of extraction responses (claude_service)
+  - hits / misses / hit_rate: Calls answered from disk vs sent to the API
+  - stores / evictions: Entries written, entries dropped to stay under max_bytes
+  - entries / size_bytes / max_bytes: Current contents and limit
+- bulk_jobs: Bulk mode queue (claude_batch_service)
+  - mode: off / anthropic (Message Batches API) / local (stand-in)
+  - requests / succeeded / failed / resubmitted: Request counters
+  - queued / queued_bytes / batches_in_flight / requests_in_flight: Current backlog
+- progress_events: Live progress bus (progress_service)
+  - published / delivered / coalesced: Events in, events sent, events merged
+  - subscribers / in_progress: Bridges attached, sources with live progress
+- libreoffice_pool: Warm PPTX -> PDF workers (libreoffice_pool_utils)
+  - mode: uno (long-lived workers) / subprocess (one-shot, isolated profiles)
+  - conversions / failures / starts / recycled / queue_timeouts: Counters
+  - idle / running / avg_wait_seconds: Pool state and queueing delay
+- image_prep: Image normalization before vision calls (image_prep_utils)
+  - images / resized / reencoded / duplicates / cache_hits / failures: Counters
+  - original_bytes / prepared_bytes / bytes_saved / saved_ratio: Upload savings
+- tts_cache: On-disk cache of synthesized audio segments (tts_service)
+  - hits / misses / hit_rate: Segments reused vs sent to ElevenLabs
+  - characters_saved: Text not re-synthesized thanks to hits
+  - stores / evictions / entries / size_bytes / max_bytes: Contents and limit
+- fetch_cache: Shared cache of extracted web pages and YouTube transcripts (fetch_cache_utils)
+  - hits / revalidated / unchanged / stale_served: Served without re-extracting
+    (fresh, 304 Not Modified, same body hash, stale after a network error)
+  - changed / misses / fetch_errors: Extracted again, and failed revalidations
+  - stores / evictions / entries / size_bytes / max_bytes: Contents and limit
+- bulk_links: Bulk URL import pipeline (bulk_link_service)
+  - batches / links / failed / skipped: Counters
+  - static / cached / agent / youtube: How links were extracted
+  - workers / per_domain / running_batches: Pool limits and current load
+- drive_import: Google Drive batch imports (drive_import_service) and
+  downloads (google_drive_service)
+  - batches / files / imported / failed / skipped / retried: Batch counters
+  - downloads / exports / retries / bytes_downloaded / bytes_resumed:
+    Transfers, and bytes not fetched again thanks to resumed downloads
+  - list_cache_hits / list_cache_misses / cached_listings: Folder listing cache
+
+Routes:
+- GET /settings/metrics - Get runtime metrics
+"""
+from flask import jsonify, current_app
+from app.api.settings import settings_bp
+from app.config import context_loader
+from app.services.data_services import message_service
+from app.utils.rate_limit_utils import rate_limiter_registry
+from app.utils.concurrency_utils import concurrency_registry
+from app.services.integrations.claude import claude_service, claude_batch_service
+from app.services.background_services import progress_service
+from app.utils.libreoffice_pool_utils import libreoffice_pool
+from app.utils.image_prep_utils import image_preprocessor
+from app.services.integrations.elevenlabs import tts_service
+from app.utils.fetch_cache_utils import fetch_cache
+from app.services.source_services.source_processing.bulk_link_service import bulk_link_service
+from app.services.source_services.source_upload.drive_import import drive_import_service
+from app.services.integrations.google import google_drive_service
+
+
+@settings_bp.route('/settings/metrics', methods=['GET'])
+def get_runtime_metrics():
+    """
+    Get runtime metrics for in-process caches.
+
+    Returns:
+        {
+            "success": true,
+            "metrics": {
+                "context_cache": {"hits": 120, "misses": 4, ...},
+                "chat_sessions": {"hits": 310, "misses": 12, ...},
+                "rate_limits": {"anthropic/claude-haiku-4-5-20251001": {...}},
+                "concurrency": {"anthropic/claude-haiku-4-5-20251001": {"window": 6.5, ...}},
+                "claude_calls": {"pdf_service._extract_batch_with_tools": {"calls": 40, ...}},
+                "response_cache": {"hits": 38, "misses": 40, "entries": 40, ...},
+                "bulk_jobs": {"mode": "anthropic", "queued": 0, "batches_in_flight": 1, ...},
+                "progress_events": {"published": 420, "delivered": 61, "coalesced": 359, ...},
+                "libreoffice_pool": {"mode": "uno", "size": 2, "idle": 2, "conversions": 14, ...},
+                "image_prep": {"images": 25, "bytes_saved": 48211000, "saved_ratio": 0.91, ...},
+                "tts_cache": {"hits": 18, "misses": 3, "characters_saved": 14200, ...},
+                "fetch_cache": {"hits": 9, "revalidated": 4, "changed": 1, "misses": 12, ...},
+                "bulk_links": {"links": 200, "static": 171, "agent": 24, "failed": 5, ...},
+                "drive_import": {"files": 40, "imported": 39, "bytes_resumed": 52428800, ...}
+            }
+        }
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'metrics': {
+                'context_cache': context_loader.get_cache_stats(),
+                'chat_sessions': message_service.get_session_stats(),
+                'rate_limits': rate_limiter_registry.get_stats(),
+                'concurrency': concurrency_registry.get_stats(),
+                'claude_calls': claude_service.call_metrics.get_stats(),
+                'response_cache': claude_service.response_cache.get_stats(),
+                'bulk_jobs': claude_batch_service.get_stats(),
+                'progress_events': progress_service.get_stats(),
+                'libreoffice_pool': libreoffice_pool.get_stats(),
+                'image_prep': image_preprocessor.get_stats(),
+                'tts_cache': tts_service.segment_cache.get_stats(),
+                'fetch_cache': fetch_cache.get_stats(),
+                'bulk_links': bulk_link_service.get_stats(),
+                'drive_import': {
+                    **drive_import_service.get_stats(),
+                    **google_drive_service.get_stats(),
+                },
+            }
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error getting runtime metrics: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -16,6 +16,7 @@ Source Types Supported:
 2. URLs (uploads.py):
    - Websites: Fetched via web agent with web_fetch tool
    - YouTube: Transcripts fetched via youtube-transcript-api
+   - Bulk lists/sitemaps: Static pages extracted locally, agent as fallback
 
 3. Text (uploads.py):
    - Pasted text: Saved directly as .txt file
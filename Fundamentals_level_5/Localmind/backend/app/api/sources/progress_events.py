@@ -0,0 +1,68 @@
+"""
+Source progress events - SocketIO bridge for live processing updates.
+
+Educational Note: Instead of polling GET /projects/<id>/sources every few
+seconds, the frontend opens one Socket.IO connection and joins a room per
+open project. Services publish to progress_service (an in-process event
+bus); this module forwards every delivered event to the project's room.
+
+Why rooms?
+- A client only cares about the project it has open
+- socketio.emit(..., to=room) sends to exactly those clients, so two
+  browser tabs on different projects don't see each other's traffic
+
+Client -> server:
+- join_project  {"project_id": "..."}  - start receiving a project's events;
+                                          the current progress of every
+                                          source still processing is sent back
+- leave_project {"project_id": "..."}
+
+Server -> client:
+- source_progress: {source_id, stage, done, total, unit, batches_done,
+                    batches_total, batches_in_flight, input_tokens,
+                    output_tokens, eta_seconds, final, ...}
+                   (coalesced - at most one per source per interval)
+- source_updated:  {source_id, status, source} on every status change
+"""
+from flask_socketio import SocketIO, join_room, leave_room, emit
+
+from app.services.background_services.progress_service import progress_service
+
+
+def get_project_room(project_id: str) -> str:
+    """SocketIO room name for a project."""
+    return f"project:{project_id}"
+
+
+def register_progress_events(socketio: SocketIO) -> None:
+    """
+    Register the room handlers and bridge progress_service to SocketIO.
+
+    Educational Note: Called once from create_app() after socketio.init_app().
+    socketio.emit() is safe to call from the background threads that
+    publish events (async_mode='threading').
+    """
+
+    @socketio.on('join_project')
+    def on_join_project(data):
+        project_id = (data or {}).get('project_id')
+        if not project_id:
+            return {'success': False, 'error': 'project_id is required'}
+
+        join_room(get_project_room(project_id))
+        # Late joiners get the current state instead of waiting for the next event
+        for event in progress_service.get_snapshot(project_id):
+            emit(event['type'], event)
+        return {'success': True}
+
+    @socketio.on('leave_project')
+    def on_leave_project(data):
+        project_id = (data or {}).get('project_id')
+        if project_id:
+            leave_room(get_project_room(project_id))
+        return {'success': True}
+
+    def forward_event(event):
+        socketio.emit(event['type'], event, to=get_project_room(event['project_id']))
+
+    progress_service.subscribe(forward_event)
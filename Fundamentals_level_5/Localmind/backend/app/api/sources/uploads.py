@@ -29,12 +29,15 @@ extract -> chunk -> embed -> ready for RAG
 
 Routes:
 - POST /projects/<id>/sources/url      - Add website/YouTube source
+- POST /projects/<id>/sources/urls/bulk            - Add many URLs (list or sitemap)
+- GET  /projects/<id>/sources/urls/bulk/<batch_id> - Bulk import progress
 - POST /projects/<id>/sources/text     - Add pasted text source
 - POST /projects/<id>/sources/research - Add AI research source
 """
 from flask import jsonify, request, current_app
 from app.api.sources import sources_bp
 from app.services.source_services import SourceService
+from app.services.source_services.source_processing.bulk_link_service import bulk_link_service
 
 # Initialize service
 source_service = SourceService()
@@ -114,6 +117,114 @@ def add_url_source(project_id: str):
         }), 500
 
 
+@sources_bp.route('/projects/<project_id>/sources/urls/bulk', methods=['POST'])
+def add_url_sources_bulk(project_id: str):
+    """
+    Add many URL sources at once from a list and/or a sitemap.
+
+    Educational Note: Bulk imports run in their own pipeline
+    (bulk_link_service) instead of one task per link:
+    - URLs are deduped by canonical form, also against existing links
+    - A dedicated pool fetches them, at most a few per domain at a time
+    - Static pages are extracted locally; the web agent is the fallback
+    - A sitemap is downloaded and expanded in that pool, not in this
+      request - its pages join the batch as they are found
+
+    Request Body:
+        {
+            "urls": ["https://example.com/a", ...],        # list, or one URL per line
+            "sitemap_url": "https://example.com/sitemap.xml"  # optional
+        }
+
+    Returns:
+        {
+            "success": true,
+            "batch": {"id": "...", "status": "running", "total": 42,
+                      "expansion": {"status": "running"} | null, ...},
+            "sources": [ ... created sources for listed URLs (status: "uploaded") ... ],
+            "duplicates": ["https://example.com/already-added"],
+            "rejected": [{"url": "not a url", "error": "Invalid URL format..."}],
+            "truncated": false
+        }
+    """
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'No data provided'
+            }), 400
+
+        urls = data.get('urls') or []
+        if isinstance(urls, str):
+            urls = urls.splitlines()
+        sitemap_url = data.get('sitemap_url')
+
+        if not urls and not sitemap_url:
+            return jsonify({
+                'success': False,
+                'error': 'urls or sitemap_url is required'
+            }), 400
+
+        result = source_service.add_url_sources(
+            project_id=project_id,
+            urls=urls,
+            sitemap_url=sitemap_url
+        )
+
+        return jsonify({
+            'success': True,
+            **result,
+            'message': f"{len(result['sources'])} URL sources added"
+                       + (", sitemap is being expanded" if result['batch'].get('expansion') else "")
+        }), 202
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    except Exception as e:
+        current_app.logger.error(f"Error adding bulk URL sources: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@sources_bp.route('/projects/<project_id>/sources/urls/bulk/<batch_id>', methods=['GET'])
+def get_bulk_url_batch(project_id: str, batch_id: str):
+    """
+    Get progress of a bulk URL import.
+
+    Returns:
+        {
+            "success": true,
+            "batch": {
+                "status": "running" | "completed",
+                "total": 42, "completed": 30, "failed": 2, "skipped": 0,
+                "methods": {"static": 25, "cached": 3, "agent": 2, "youtube": 0},
+                "sources": {"<source_id>": {"url": "...", "status": "ready", "method": "static"}},
+                "expansion": {"status": "completed", "added": 40, "pages": 45,
+                              "duplicates": 5, "rejected": 0, ...} | null
+            }
+        }
+    """
+    batch = bulk_link_service.get_batch(batch_id, project_id)
+    if not batch:
+        return jsonify({
+            'success': False,
+            'error': 'Batch not found'
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'batch': batch
+    }), 200
+
+
 @sources_bp.route('/projects/<project_id>/sources/text', methods=['POST'])
 def add_text_source(project_id: str):
     """
@@ -28,10 +28,12 @@ from app.config.tier_loader import (
     get_anthropic_config,
     get_openai_config,
     get_pinecone_config,
+    get_elevenlabs_config,
     APIProvider,
     ANTHROPIC_TIERS,
     OPENAI_TIERS,
     PINECONE_TIERS,
+    ELEVENLABS_TIERS,
 )
 
 __all__ = [
@@ -45,8 +47,10 @@ __all__ = [
     "get_anthropic_config",
     "get_openai_config",
     "get_pinecone_config",
+    "get_elevenlabs_config",
     "APIProvider",
     "ANTHROPIC_TIERS",
     "OPENAI_TIERS",
     "PINECONE_TIERS",
+    "ELEVENLABS_TIERS",
 ]
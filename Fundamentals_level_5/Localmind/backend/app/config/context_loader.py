@@ -6,13 +6,23 @@ Educational Note: This module creates formatted context blocks for the system pr
 1. Source Context - List of available sources with IDs, types, and summaries
 2. Memory Context - User and project memory for personalization
 
-The context is rebuilt on every message to reflect the current state
-(active/inactive sources, new uploads, updated memories).
+The rendered context is cached per project and keyed by a version derived
+from the files it is built from (sources_index.json, user memory, project
+memory). Any source update or memory merge rewrites one of those files,
+which changes the version and triggers a rebuild - unchanged context costs
+a few stat() calls instead of reading and formatting everything again.
+
+Because the cached string is byte-identical between rebuilds, the system
+prompt prefix stays stable across messages and tool-loop iterations, which
+is what provider-side prompt caching needs to get cache hits.
 """
-from typing import Dict, Any, List
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
 
 from app.services.source_services import source_service
 from app.services.ai_services.memory_service import memory_service
+from app.utils.path_utils import get_sources_index_path
 
 
 class ContextLoader:
@@ -26,6 +36,103 @@ class ContextLoader:
     - Project memory (specific to current project)
     """
 
+    def __init__(self):
+        """Initialize the loader with an empty per-project context cache."""
+        # project_id -> {"version": tuple, "active_sources": [...], "full_context": str}
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    # =========================================================================
+    # Cache
+    # =========================================================================
+
+    def _get_file_version(self, path: Path) -> Tuple[int, int]:
+        """Get (mtime_ns, size) for a file, or (0, 0) if it doesn't exist."""
+        try:
+            stat = path.stat()
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return (0, 0)
+
+    def get_context_version(self, project_id: str) -> Tuple[Tuple[int, int], ...]:
+        """
+        Get the current context version for a project.
+
+        Educational Note: The version is the (mtime, size) of every file the
+        context is rendered from. Writers don't need to know about the cache -
+        saving the sources index or a memory file is enough to invalidate it.
+
+        Args:
+            project_id: The project UUID
+
+        Returns:
+            Tuple of (mtime_ns, size) pairs
+        """
+        paths = [get_sources_index_path(project_id)] + memory_service.get_memory_file_paths(project_id)
+        return tuple(self._get_file_version(path) for path in paths)
+
+    def _get_cache_entry(self, project_id: str) -> Dict[str, Any]:
+        """
+        Get the cache entry for a project, rebuilding it if the version changed.
+
+        Educational Note: The rebuild happens outside the lock so one slow
+        project doesn't block context lookups for the others.
+        """
+        version = self.get_context_version(project_id)
+
+        with self._lock:
+            entry = self._cache.get(project_id)
+            if entry and entry["version"] == version:
+                self._stats["hits"] += 1
+                return entry
+            self._stats["misses"] += 1
+
+        active_sources = self._load_active_sources(project_id)
+        entry = {
+            "version": version,
+            "active_sources": active_sources,
+            "full_context": self._render_full_context(project_id, active_sources),
+        }
+
+        with self._lock:
+            self._cache[project_id] = entry
+
+        return entry
+
+    def invalidate(self, project_id: str = None) -> None:
+        """
+        Drop cached context for one project (or all projects).
+
+        Educational Note: Normally not needed - versioning picks up file
+        changes. Useful after bulk edits or when a project is deleted.
+        """
+        with self._lock:
+            if project_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(project_id, None)
+            self._stats["invalidations"] += 1
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get context cache statistics.
+
+        Returns:
+            Dict with hits, misses, invalidations, hit_rate and cached_projects
+        """
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+                "cached_projects": len(self._cache),
+            }
+
+    # =========================================================================
+    # Context Building
+    # =========================================================================
+
     def get_active_sources(self, project_id: str) -> List[Dict[str, Any]]:
         """
         Get list of active and ready sources for a project.
@@ -40,6 +147,10 @@ class ContextLoader:
         Returns:
             List of source metadata dicts for active/ready sources
         """
+        return list(self._get_cache_entry(project_id)["active_sources"])
+
+    def _load_active_sources(self, project_id: str) -> List[Dict[str, Any]]:
+        """Read the sources index and filter to active/ready sources."""
         all_sources = source_service.list_sources(project_id)
 
         active_sources = [
@@ -63,8 +174,10 @@ class ContextLoader:
         Returns:
             Formatted string to append to system prompt, or empty string if no sources
         """
-        active_sources = self.get_active_sources(project_id)
+        return self._render_source_context(self.get_active_sources(project_id))
 
+    def _render_source_context(self, active_sources: List[Dict[str, Any]]) -> str:
+        """Format the source context block for a list of active sources."""
         if not active_sources:
             return ""
 
@@ -196,8 +309,8 @@ class ContextLoader:
         """
         Build complete context including sources and memory.
 
-        Educational Note: Combines all context types for the system prompt.
-        Order: Memory context first (general context), then source context (specific tools).
+        Educational Note: Served from the per-project cache when neither the
+        sources index nor the memory files changed since the last build.
 
         Args:
             project_id: The project UUID
@@ -205,18 +318,29 @@ class ContextLoader:
         Returns:
             Complete context string to append to system prompt
         """
-        parts = []
+        return self._get_cache_entry(project_id)["full_context"]
 
-        # Add memory context first (general personalization)
-        memory_context = self.build_memory_context(project_id)
-        if memory_context:
-            parts.append(memory_context)
+    def _render_full_context(self, project_id: str, active_sources: List[Dict[str, Any]]) -> str:
+        """
+        Render the full context string from disk.
+
+        Educational Note: Order: source context first, then memory context.
+        Sources change rarely, while memory is merged in the background
+        after many chats - putting the more stable block first keeps a
+        longer identical prefix when only memory changes.
+        """
+        parts = []
 
         # Add source context (available tools)
-        source_context = self.build_source_context(project_id)
+        source_context = self._render_source_context(active_sources)
         if source_context:
             parts.append(source_context)
 
+        # Add memory context (general personalization)
+        memory_context = self.build_memory_context(project_id)
+        if memory_context:
+            parts.append(memory_context)
+
         return "\n".join(parts)
 
 
@@ -5,6 +5,7 @@ Educational Note: This module manages rate limit tiers for various APIs:
 - Anthropic (Claude) - PDF processing, chat
 - OpenAI - Embeddings
 - Pinecone - Vector database operations
+- ElevenLabs - Transcription and text-to-speech
 - Future APIs...
 
 Each API has different rate limits based on usage tier (free, paid, enterprise).
@@ -20,6 +21,7 @@ class APIProvider(Enum):
     ANTHROPIC = "anthropic"
     OPENAI = "openai"
     PINECONE = "pinecone"
+    ELEVENLABS = "elevenlabs"
 
 
 # Anthropic (Claude) tier configuration
@@ -133,11 +135,39 @@ PINECONE_TIERS: Dict[int, Dict[str, Any]] = {
 }
 
 
+# ElevenLabs plan configuration (transcription and TTS)
+# Educational Note: ElevenLabs limits concurrent requests per plan rather
+# than tokens per minute; requests over the limit are rejected with 429
+ELEVENLABS_TIERS: Dict[int, Dict[str, Any]] = {
+    1: {
+        "name": "Free",
+        "description": "2 concurrent requests",
+        "max_workers": 2,
+    },
+    2: {
+        "name": "Starter",
+        "description": "3 concurrent requests",
+        "max_workers": 3,
+    },
+    3: {
+        "name": "Creator",
+        "description": "5 concurrent requests",
+        "max_workers": 5,
+    },
+    4: {
+        "name": "Pro+",
+        "description": "10 concurrent requests",
+        "max_workers": 10,
+    },
+}
+
+
 # Map provider to tier configs
 TIER_CONFIGS: Dict[str, Dict[int, Dict[str, Any]]] = {
     APIProvider.ANTHROPIC.value: ANTHROPIC_TIERS,
     APIProvider.OPENAI.value: OPENAI_TIERS,
     APIProvider.PINECONE.value: PINECONE_TIERS,
+    APIProvider.ELEVENLABS.value: ELEVENLABS_TIERS,
 }
 
 # Environment variable names for each provider's tier
@@ -145,6 +175,7 @@ TIER_ENV_VARS: Dict[str, str] = {
     APIProvider.ANTHROPIC.value: "ANTHROPIC_TIER",
     APIProvider.OPENAI.value: "OPENAI_TIER",
     APIProvider.PINECONE.value: "PINECONE_TIER",
+    APIProvider.ELEVENLABS.value: "ELEVENLABS_TIER",
 }
 
 
@@ -240,3 +271,8 @@ def get_openai_config(tier: Optional[int] = None) -> Dict[str, Any]:
 def get_pinecone_config(tier: Optional[int] = None) -> Dict[str, Any]:
     """Get Pinecone tier configuration."""
     return get_tier_config(APIProvider.PINECONE.value, tier)
+
+
+def get_elevenlabs_config(tier: Optional[int] = None) -> Dict[str, Any]:
+    """Get ElevenLabs tier configuration."""
+    return get_tier_config(APIProvider.ELEVENLABS.value, tier)
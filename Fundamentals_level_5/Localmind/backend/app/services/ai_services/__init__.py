@@ -7,6 +7,7 @@ are simple request/response AI utilities.
 
 Services:
 - chat_naming_service: Generate concise chat titles (1-5 words)
+- chat_summary_service: Fold older chat turns into a running summary
 - summary_service: Generate source document summaries (150-200 tokens)
 - memory_service: AI-powered memory merging (max 150 tokens per memory)
 - image_service: Extract content from images using Claude vision
@@ -29,6 +30,7 @@ Import directly from the specific module:
 
 __all__ = [
     "chat_naming_service",
+    "chat_summary_service",
     "summary_service",
     "memory_service",
     "image_service",
@@ -0,0 +1,136 @@
+"""
+Chat Summary Service - Fold older chat turns into a running summary.
+
+Educational Note: Long chats eventually outgrow the model's context window.
+Instead of sending every old turn on every call, the context window manager
+(chat_services/context_window_service.py) replaces the oldest turns with a
+short running summary. This service produces that summary.
+
+Summary Strategy:
+- Incremental: existing summary + newly folded turns -> updated summary
+- Old turns are flattened to a compact transcript (tool results truncated)
+- Output: <600 tokens, so the summary itself never blows the budget
+
+Prompt config is loaded from data/prompts/chat_summary_prompt.json.
+"""
+import json
+from typing import Optional, Dict, Any, List
+
+from app.services.integrations.claude import claude_service
+from app.config import prompt_loader
+from app.utils import claude_parsing_utils
+
+
+class ChatSummaryService:
+    """
+    Service for generating running chat summaries.
+
+    Educational Note: Uses Haiku model - summarization runs in the background
+    and is latency-insensitive, so the cheapest model is the right choice.
+    """
+
+    # Max characters kept from each tool_result when building the transcript
+    TOOL_RESULT_PREVIEW_CHARS = 300
+
+    def __init__(self):
+        """Initialize the service with cached prompt config."""
+        self._prompt_config: Optional[Dict[str, Any]] = None
+
+    def _get_prompt_config(self) -> Dict[str, Any]:
+        """Load and cache the prompt config."""
+        if self._prompt_config is None:
+            self._prompt_config = prompt_loader.get_prompt_config("chat_summary")
+            if self._prompt_config is None:
+                raise ValueError("chat_summary_prompt.json not found in data/prompts/")
+        return self._prompt_config
+
+    def build_transcript(self, messages: List[Dict[str, Any]]) -> str:
+        """
+        Flatten stored chat messages into a plain-text transcript.
+
+        Educational Note: The summarizer doesn't need tool mechanics, only
+        what was asked, what was looked up and what was answered. Tool
+        results are cut to a short preview to keep the input small.
+
+        Args:
+            messages: Stored chat messages (role + content)
+
+        Returns:
+            Transcript text, one line per message part
+        """
+        lines = []
+
+        for msg in messages:
+            role = "User" if msg.get("role") == "user" else "Assistant"
+            content = msg.get("content")
+
+            if isinstance(content, str):
+                lines.append(f"{role}: {content}")
+                continue
+
+            for block in content or []:
+                block_type = block.get("type")
+
+                if block_type == "text" and block.get("text", "").strip():
+                    lines.append(f"{role}: {block['text']}")
+                elif block_type == "tool_use":
+                    tool_input = json.dumps(block.get("input", {}), ensure_ascii=False)
+                    lines.append(f"Assistant called {block.get('name')}: {tool_input}")
+                elif block_type == "tool_result":
+                    result = block.get("content", "")
+                    if not isinstance(result, str):
+                        result = json.dumps(result, ensure_ascii=False)
+                    preview = result[:self.TOOL_RESULT_PREVIEW_CHARS]
+                    if len(result) > self.TOOL_RESULT_PREVIEW_CHARS:
+                        preview += "..."
+                    lines.append(f"Tool result: {preview}")
+
+        return "\n".join(lines)
+
+    def generate_summary(
+        self,
+        messages: List[Dict[str, Any]],
+        existing_summary: Optional[str] = None,
+        project_id: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Fold a range of chat messages into the existing running summary.
+
+        Args:
+            messages: Stored chat messages to fold in (oldest first)
+            existing_summary: Current running summary, if any
+            project_id: Optional project ID for cost tracking
+
+        Returns:
+            Updated summary text, or None if generation fails
+        """
+        if not messages:
+            return existing_summary
+
+        try:
+            config = self._get_prompt_config()
+
+            user_message = config.get("user_message", "").format(
+                existing_summary=existing_summary or "(none yet)",
+                transcript=self.build_transcript(messages)
+            )
+
+            response = claude_service.send_message(
+                messages=[{"role": "user", "content": user_message}],
+                system_prompt=config.get("system_prompt", ""),
+                model=config.get("model"),
+                max_tokens=config.get("max_tokens"),
+                temperature=config.get("temperature"),
+                project_id=project_id
+            )
+
+            summary = claude_parsing_utils.extract_text(response).strip()
+            return summary or None
+
+        except Exception as e:
+            print(f"Error generating chat summary: {e}")
+            return None
+
+
+# Singleton instance
+chat_summary_service = ChatSummaryService()
@@ -15,6 +15,8 @@ Flow:
     Source processed → embedding_service.process_embeddings() →
     → Check tokens → Chunk text → Save chunks → Create embeddings → Upsert to Pinecone
     → Return embedding_info for source metadata
+
+Each step is published as a live "embedding" progress event (progress_service).
 """
 from pathlib import Path
 from datetime import datetime
@@ -30,6 +32,7 @@ from app.utils.text import (
 )
 from app.services.integrations.openai import openai_service
 from app.services.integrations.pinecone import pinecone_service
+from app.services.background_services import ProgressTracker
 
 
 class EmbeddingService:
@@ -103,6 +106,7 @@ class EmbeddingService:
                 "reason": "Pinecone not configured - embedding skipped"
             }
 
+        progress = None
         try:
             # Step 3: Parse text into chunks
             chunks = parse_extracted_text(
@@ -121,6 +125,10 @@ class EmbeddingService:
                 }
 
             print(f"Created {len(chunks)} chunks for {source_name}")
+            progress = ProgressTracker(
+                project_id, source_id, "embedding",
+                total=len(chunks), unit="chunks", batches_total=1
+            )
 
             # Step 4: Save chunks to files
             saved_paths = save_chunks_to_files(
@@ -132,7 +140,9 @@ class EmbeddingService:
             # Step 5: Create embeddings for all chunks
             # Educational Note: chunk.text is already cleaned by chunking_service
             chunk_texts = [chunk.text for chunk in chunks]
+            progress.batch_started()
             embeddings = openai_service.create_embeddings_batch(chunk_texts)
+            progress.batch_finished(units=len(embeddings))
             print(f"Created {len(embeddings)} embeddings")
 
             # Step 6: Convert to Pinecone format and upsert
@@ -142,6 +152,7 @@ class EmbeddingService:
                 namespace=project_id  # Use project_id as namespace
             )
             print(f"Upserted {upsert_result.get('upserted_count', 0)} vectors to Pinecone")
+            progress.finish()
 
             return {
                 "is_embedded": True,
@@ -153,6 +164,8 @@ class EmbeddingService:
 
         except Exception as e:
             print(f"Embedding workflow error: {e}")
+            if progress:
+                progress.finish(success=False, error=str(e))
             return {
                 "is_embedded": False,
                 "embedded_at": None,
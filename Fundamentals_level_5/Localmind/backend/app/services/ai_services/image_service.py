@@ -9,22 +9,35 @@ vision capabilities. It uses a tool-based approach similar to PDF extraction:
 - Results are saved as text files for use in chat context
 
 Supported formats: JPEG, PNG, GIF, WebP (max 5MB each per API constraint)
+
+Images are normalized first (image_prep_utils): downscaled to the model's
+effective resolution, re-encoded without metadata, and hashed so repeated
+images are extracted once.
+
+Progress (images done, tokens) is published live through progress_service.
+Multi-image sources are extracted concurrently, one API call per image.
 """
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 from typing import Dict, Any, List
 from datetime import datetime
 
 from app.services.integrations.claude import claude_service
-from app.services.background_services import task_service
+from app.services.background_services import task_service, ProgressTracker
 from app.config import tool_loader, prompt_loader, get_anthropic_config
 from app.utils import claude_parsing_utils
-from app.utils.encoding_utils import encode_file_to_base64, get_media_type
+from app.utils.encoding_utils import encode_bytes_to_base64
+from app.utils.image_prep_utils import image_preprocessor, summarize_savings
 from app.utils.path_utils import get_processed_dir
-from app.utils.rate_limit_utils import RateLimiter
-from app.utils.text import build_processed_output
+from app.utils.text import build_processed_output, StreamingProcessedOutput
 from app.utils.embedding_utils import count_tokens
 
 
+class CancelledException(Exception):
+    """Raised when processing is cancelled by user."""
+    pass
+
+
 class ImageService:
     """
     Service class for extracting content from images using Claude's vision.
@@ -36,6 +49,12 @@ class ImageService:
     4. Saves combined content as text file for chat context
     """
 
+    # Attempts per image when Claude answers without calling the tool
+    MAX_IMAGE_ATTEMPTS = 3
+
+    # How often the batch loop checks for cancellation while waiting
+    CANCEL_POLL_SECONDS = 1.0
+
     def __init__(self):
         """Initialize the image service."""
         self._tool_definition = None
@@ -132,12 +151,12 @@ class ImageService:
         # Get output path using path_utils
         processed_dir = get_processed_dir(project_id)
         output_path = processed_dir / f"{source_id}.txt"
+        progress = ProgressTracker(project_id, source_id, "extracting", total=1, unit="images", batches_total=1)
 
         try:
             # Load configurations using centralized loaders
             prompt_config = prompt_loader.get_prompt_config("image_extraction")
             tool_def = self._load_tool_definition()
-            tier_config = get_anthropic_config()
 
             model = prompt_config.get("model", "claude-haiku-4-5-20251001")
             system_prompt = prompt_config.get("system_prompt", "")
@@ -145,16 +164,18 @@ class ImageService:
             max_tokens = prompt_config.get("max_tokens", 4000)
             temperature = prompt_config.get("temperature", 0.2)
 
-            # Create rate limiter for this extraction
-            requests_per_minute = tier_config.get("pages_per_minute", 100)
-            rate_limiter = RateLimiter(requests_per_minute)
-
             print(f"Using model: {model}")
 
-            image_base64 = encode_file_to_base64(image_path)
-            media_type = get_media_type(image_path)
+            # Downscale/re-encode in the prep pool before upload
+            prepared = image_preprocessor.prepare_one(image_path)
+            image_base64 = encode_bytes_to_base64(prepared["data"])
+            media_type = prepared["media_type"]
+            image_bytes = summarize_savings([prepared])
 
-            print(f"Image encoded: {image_path.name} ({media_type})")
+            print(
+                f"Image encoded: {image_path.name} ({media_type}, "
+                f"{prepared['original_bytes']} -> {prepared['bytes']} bytes)"
+            )
 
             content_blocks = [
                 {
@@ -173,9 +194,8 @@ class ImageService:
 
             messages = [{"role": "user", "content": content_blocks}]
 
-            # Apply rate limiting before API call
-            rate_limiter.wait_if_needed()
-
+            # Rate limiting happens inside claude_service (shared budget)
+            progress.batch_started()
             response = claude_service.send_message(
                 messages=messages,
                 system_prompt=system_prompt,
@@ -184,10 +204,16 @@ class ImageService:
                 temperature=temperature,
                 tools=[tool_def],
                 tool_choice={"type": "tool", "name": "submit_image_extraction"},
-                project_id=project_id
+                project_id=project_id,
+                use_response_cache=True
             )
 
             extraction = self._parse_tool_response(response)
+            progress.batch_finished(
+                units=1 if extraction.get("success") else 0,
+                input_tokens=response.get("usage", {}).get("input_tokens", 0),
+                output_tokens=response.get("usage", {}).get("output_tokens", 0)
+            )
 
             if not extraction.get("success"):
                 raise Exception(extraction.get("error", "Extraction failed"))
@@ -221,6 +247,7 @@ class ImageService:
                 f.write(processed_content)
 
             print(f"Image extraction complete: {image_path.name}")
+            progress.finish()
 
             return {
                 "success": True,
@@ -230,12 +257,14 @@ class ImageService:
                 "content_type": content_type,
                 "summary": extraction.get("summary"),
                 "token_usage": response.get("usage", {}),
+                "image_bytes": image_bytes,
                 "model_used": model,
                 "extracted_at": datetime.now().isoformat()
             }
 
         except Exception as e:
             print(f"Image extraction failed: {e}")
+            progress.finish(success=False, error=str(e))
             if output_path.exists():
                 output_path.unlink()
             return {
@@ -244,6 +273,100 @@ class ImageService:
                 "error": str(e)
             }
 
+    def _extract_single_image(
+        self,
+        index: int,
+        image_path: Path,
+        prepared: Dict[str, Any],
+        prompt_config: Dict[str, Any],
+        tool_def: Dict[str, Any],
+        project_id: str,
+        source_id: str,
+        progress: ProgressTracker
+    ) -> Dict[str, Any]:
+        """
+        Extract one image of a batch (runs on a worker thread).
+
+        Progress counts every image that shares this one's content, since
+        repeats aren't extracted separately.
+
+        Educational Note: claude_service already retries transient API
+        errors; this retries the image when Claude answers without calling
+        the tool. Retries skip the response cache, otherwise the same bad
+        answer would come back.
+
+        Returns:
+            Dict with index, image_name, success, extraction/error, usage
+        """
+        if task_service.is_target_cancelled(source_id):
+            raise CancelledException("Processing cancelled by user")
+
+        image_base64 = encode_bytes_to_base64(prepared["data"])
+        content_blocks = [
+            {
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": prepared["media_type"],
+                    "data": image_base64
+                }
+            },
+            {
+                "type": "text",
+                "text": prompt_config.get("user_message", "")
+            }
+        ]
+        messages = [{"role": "user", "content": content_blocks}]
+
+        input_tokens = 0
+        output_tokens = 0
+        error = None
+        units = prepared.get("copies", 1)
+        progress.batch_started()
+        try:
+            for attempt in range(1, self.MAX_IMAGE_ATTEMPTS + 1):
+                # Rate limiting happens inside claude_service (shared budget)
+                response = claude_service.send_message(
+                    messages=messages,
+                    system_prompt=prompt_config.get("system_prompt", ""),
+                    model=prompt_config.get("model", "claude-haiku-4-5-20251001"),
+                    max_tokens=prompt_config.get("max_tokens", 4000),
+                    temperature=prompt_config.get("temperature", 0.2),
+                    tools=[tool_def],
+                    tool_choice={"type": "tool", "name": "submit_image_extraction"},
+                    project_id=project_id,
+                    use_response_cache=(attempt == 1)
+                )
+                input_tokens += response.get("usage", {}).get("input_tokens", 0)
+                output_tokens += response.get("usage", {}).get("output_tokens", 0)
+
+                extraction = self._parse_tool_response(response)
+                if extraction.get("success"):
+                    progress.batch_finished(units=units, input_tokens=input_tokens, output_tokens=output_tokens)
+                    return {
+                        "index": index,
+                        "image_name": image_path.name,
+                        "success": True,
+                        "extraction": extraction,
+                        "input_tokens": input_tokens,
+                        "output_tokens": output_tokens
+                    }
+
+                error = extraction.get("error", "Extraction failed")
+                print(f"Image {image_path.name} attempt {attempt}/{self.MAX_IMAGE_ATTEMPTS} failed: {error}")
+        except Exception as e:
+            error = str(e)
+
+        progress.batch_finished(units=0, input_tokens=input_tokens, output_tokens=output_tokens)
+        return {
+            "index": index,
+            "image_name": image_path.name,
+            "success": False,
+            "error": error,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens
+        }
+
     def extract_content_from_images_batch(
         self,
         project_id: str,
@@ -253,8 +376,20 @@ class ImageService:
         """
         Extract content from multiple images in a single source.
 
-        Educational Note: When multiple images are uploaded together,
-        we process each one and combine results into a single output file.
+        Educational Note: Images are independent, so they are extracted
+        concurrently on the tier-sized worker pool (same as PDF batches),
+        one API call per distinct image - images are normalized first, and
+        repeats (same pixels) reuse the first one's extraction. Results
+        come back in any order; each one is
+        handed to StreamingProcessedOutput, which spools pages to disk in
+        image order as soon as the images before them are done, so only
+        out-of-order results are held in memory. The header (with the final
+        counts) is added and the file moved into place at the end.
+
+        Cancellation is checked every CANCEL_POLL_SECONDS even while all
+        workers are waiting on the API, and again by each worker before it
+        starts an image. The first failed image fails the source, so the
+        images still queued are cancelled instead of extracted.
 
         Args:
             project_id: The project UUID
@@ -269,129 +404,150 @@ class ImageService:
         # Get output path using path_utils
         processed_dir = get_processed_dir(project_id)
         output_path = processed_dir / f"{source_id}.txt"
+        progress = None
+        writer = None
 
         try:
             # Load configurations using centralized loaders
             prompt_config = prompt_loader.get_prompt_config("image_extraction")
             tool_def = self._load_tool_definition()
-            tier_config = get_anthropic_config()
-
             model = prompt_config.get("model", "claude-haiku-4-5-20251001")
-            system_prompt = prompt_config.get("system_prompt", "")
-            max_tokens = prompt_config.get("max_tokens", 4000)
-            temperature = prompt_config.get("temperature", 0.2)
-
-            # Create rate limiter for batch processing
-            requests_per_minute = tier_config.get("pages_per_minute", 100)
-            rate_limiter = RateLimiter(requests_per_minute)
-
-            all_extractions = []
-            total_input_tokens = 0
-            total_output_tokens = 0
-
-            for idx, image_path in enumerate(image_paths, 1):
-                if task_service.is_target_cancelled(source_id):
-                    print(f"Processing cancelled for source {source_id}")
-                    raise Exception("Processing cancelled by user")
-
-                print(f"Processing image {idx}/{len(image_paths)}: {image_path.name}")
-
-                image_base64 = encode_file_to_base64(image_path)
-                media_type = get_media_type(image_path)
-
-                user_message = prompt_config.get("user_message", "")
-
-                content_blocks = [
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": media_type,
-                            "data": image_base64
-                        }
-                    },
-                    {
-                        "type": "text",
-                        "text": user_message
-                    }
-                ]
-
-                messages = [{"role": "user", "content": content_blocks}]
 
-                # Apply rate limiting before each API call
-                rate_limiter.wait_if_needed()
-
-                response = claude_service.send_message(
-                    messages=messages,
-                    system_prompt=system_prompt,
-                    model=model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    tools=[tool_def],
-                    tool_choice={"type": "tool", "name": "submit_image_extraction"},
-                    project_id=project_id
-                )
-
-                extraction = self._parse_tool_response(response)
-                extraction["image_name"] = image_path.name
+            # Downscale/re-encode all images in the prep pool, then group repeats
+            prepared_images = image_preprocessor.prepare(image_paths)
+            image_bytes = summarize_savings(prepared_images)
+            copies_of: Dict[int, List[int]] = {}
+            for index, prepared in enumerate(prepared_images, 1):
+                first = prepared["duplicate_of"]
+                copies_of.setdefault(index if first is None else first + 1, []).append(index)
+            print(
+                f"Images prepared: {image_bytes['original_bytes']} -> {image_bytes['sent_bytes']} bytes, "
+                f"{image_bytes['duplicates']} duplicate(s)"
+            )
 
-                all_extractions.append(extraction)
+            progress = ProgressTracker(
+                project_id, source_id, "extracting",
+                total=len(image_paths), unit="images", batches_total=len(copies_of)
+            )
 
-                total_input_tokens += response.get("usage", {}).get("input_tokens", 0)
-                total_output_tokens += response.get("usage", {}).get("output_tokens", 0)
+            max_workers = max(1, min(get_anthropic_config()["max_workers"], len(copies_of)))
+            print(f"Processing {len(copies_of)} distinct images with {max_workers} workers...")
 
-            # Build pages list (one page per image)
-            pages = []
-            for extraction in all_extractions:
-                page_content = self._format_extraction_content(extraction)
-                # Add image name at the top of each page for context
-                image_name = extraction.get("image_name", "unknown")
-                full_page = f"# {image_name}\n\n{page_content}"
-                pages.append(full_page)
+            writer = StreamingProcessedOutput(project_id, source_id, "IMAGE", total_pages=len(image_paths))
+            failed_images = []
+            skipped_images = 0
+            character_count = 0
+            token_count = 0
+            total_input_tokens = 0
+            total_output_tokens = 0
 
-            # Calculate character and token counts
-            full_text = "\n".join(pages)
-            character_count = len(full_text)
-            token_count = count_tokens(full_text)
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            try:
+                pending = {
+                    executor.submit(
+                        self._extract_single_image,
+                        index, image_paths[index - 1],
+                        {**prepared_images[index - 1], "copies": len(copies)},
+                        prompt_config, tool_def, project_id, source_id, progress
+                    )
+                    for index, copies in copies_of.items()
+                }
 
-            # Build metadata for IMAGE type (batch)
+                while pending:
+                    done, pending = wait(pending, timeout=self.CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+
+                    if task_service.is_target_cancelled(source_id):
+                        print(f"Processing cancelled for source {source_id}")
+                        raise CancelledException("Processing cancelled by user")
+
+                    for future in done:
+                        result = future.result()
+                        total_input_tokens += result["input_tokens"]
+                        total_output_tokens += result["output_tokens"]
+
+                        if not result["success"]:
+                            print(f"Image {result['index']}/{len(image_paths)} FAILED: {result['error']}")
+                            failed_images.append(result)
+                            continue
+                        if failed_images:
+                            # Output will be discarded - don't spool more pages
+                            continue
+
+                        page_content = self._format_extraction_content(result["extraction"])
+                        for index in copies_of[result["index"]]:
+                            # Add image name at the top of each page for context
+                            full_page = f"# {image_paths[index - 1].name}\n\n{page_content}"
+                            writer.add_page(index, full_page)
+                            character_count += len(full_page)
+                            token_count += count_tokens(full_page)
+                        print(f"Image {result['index']}/{len(image_paths)} complete: {result['image_name']}")
+
+                    if failed_images:
+                        # The source fails as a whole - stop spending calls on the rest
+                        skipped_images = len(pending)
+                        break
+            finally:
+                # Don't wait for (or start) work nobody will use
+                executor.shutdown(wait=False, cancel_futures=True)
+
+            if failed_images:
+                names = [r["image_name"] for r in sorted(failed_images, key=lambda r: r["index"])]
+                error_message = f"Failed to extract {len(names)} image(s): {names[:5]}"
+                if len(names) > 5:
+                    error_message += f" (and {len(names) - 5} more)"
+                if skipped_images:
+                    error_message += f"; {skipped_images} remaining image(s) cancelled"
+                raise Exception(error_message)
+
+            # Build metadata for IMAGE type (batch); pages are joined by
+            # newlines in the count, as before
             metadata = {
                 "model_used": model,
                 "content_type": "batch",
-                "character_count": character_count,
+                "character_count": character_count + len(image_paths) - 1,
                 "token_count": token_count
             }
 
-            # Use centralized build_processed_output for consistent format
             # Source name indicates this is a batch
-            processed_content = build_processed_output(
-                pages=pages,
-                source_type="IMAGE",
-                source_name=f"{len(image_paths)} images",
-                metadata=metadata
-            )
-
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(processed_content)
+            writer.finish(source_name=f"{len(image_paths)} images", metadata=metadata)
 
             print(f"Batch extraction complete: {len(image_paths)} images processed")
+            progress.finish()
 
             return {
                 "success": True,
                 "status": "ready",
                 "extracted_text_path": str(output_path),
                 "images_processed": len(image_paths),
-                "character_count": character_count,
+                "character_count": metadata["character_count"],
                 "token_usage": {
                     "input_tokens": total_input_tokens,
                     "output_tokens": total_output_tokens
                 },
+                "image_bytes": image_bytes,
+                "parallel_workers": max_workers,
                 "model_used": model,
                 "extracted_at": datetime.now().isoformat()
             }
 
+        except CancelledException as e:
+            print(f"Batch image extraction cancelled: {e}")
+            if progress:
+                progress.finish(success=False, error="Processing cancelled by user")
+            if writer:
+                writer.abort()
+            return {
+                "success": False,
+                "status": "cancelled",
+                "error": "Processing cancelled by user"
+            }
+
         except Exception as e:
             print(f"Batch image extraction failed: {e}")
+            if progress:
+                progress.finish(success=False, error=str(e))
+            if writer:
+                writer.abort()
             if output_path.exists():
                 output_path.unlink()
             return {
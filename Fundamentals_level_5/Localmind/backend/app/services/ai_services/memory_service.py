@@ -7,12 +7,16 @@ Memory is stored in two types:
 - Project memory: Project-specific context that is deleted when the project is deleted
 
 The service uses Haiku AI to intelligently merge new memory with existing memory,
-keeping the content concise (max 150 tokens per memory type).
+keeping the content concise (max 150 tokens per memory type). Merges are
+normal calls, not bulk batches: a merge reads the current memory and
+writes the merged result, so it has to finish quickly, and one merge per
+memory file runs at a time so overlapping merges can't drop an update.
 """
 import json
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 from app.services.integrations.claude import claude_service
 from app.config import tool_loader, prompt_loader
@@ -36,6 +40,17 @@ class MemoryService:
         """Initialize the memory service."""
         self._prompt_config: Optional[Dict[str, Any]] = None
         self._tool_def: Optional[Dict[str, Any]] = None
+        # One lock per memory file: ("user", None) or ("project", project_id)
+        self._merge_locks: Dict[tuple, threading.Lock] = {}
+        self._merge_locks_guard = threading.Lock()
+
+    def _get_merge_lock(self, memory_type: str, project_id: Optional[str]) -> threading.Lock:
+        """Lock serializing read-merge-write of one memory file."""
+        key = (memory_type, project_id if memory_type == "project" else None)
+        with self._merge_locks_guard:
+            if key not in self._merge_locks:
+                self._merge_locks[key] = threading.Lock()
+            return self._merge_locks[key]
 
     def _get_prompt_config(self) -> Dict[str, Any]:
         """
@@ -65,6 +80,21 @@ class MemoryService:
         """Get the path to a project's memory file."""
         return get_project_dir(project_id) / "memory.json"
 
+    def get_memory_file_paths(self, project_id: str) -> List[Path]:
+        """
+        Get the files that back the memory context for a project.
+
+        Educational Note: Used by context_loader to detect memory updates
+        (via file mtime) without reading and parsing the memory files.
+
+        Args:
+            project_id: The project UUID
+
+        Returns:
+            [user memory path, project memory path] (files may not exist yet)
+        """
+        return [self._get_user_memory_path(), self._get_project_memory_path(project_id)]
+
     def get_user_memory(self) -> Optional[str]:
         """
         Get the current user memory content.
@@ -227,6 +257,19 @@ class MemoryService:
         if memory_type == "project" and not project_id:
             return {"success": False, "error": "project_id required for project memory"}
 
+        # Read, merge and save under the memory's lock - an overlapping merge
+        # would otherwise start from the same old memory and drop this one
+        with self._get_merge_lock(memory_type, project_id):
+            return self._merge_memory(memory_type, new_memory, reason, project_id)
+
+    def _merge_memory(
+        self,
+        memory_type: str,
+        new_memory: str,
+        reason: str,
+        project_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Merge new memory into the current one and save it. Caller holds the merge lock."""
         # Get current memory
         if memory_type == "user":
             current_memory = self.get_user_memory() or ""
@@ -8,8 +8,28 @@ Educational Note: This service uses a TOOL-BASED extraction approach where:
 - This solves the "page boundary" problem (headings on page 1, content on page 2)
 
 Batching Strategy:
-- PDFs ≤ 5 pages: Single API call with all pages
-- PDFs > 5 pages: Split into batches of 5, process batches in parallel
+- Pages are packed into batches by estimated cost (batching_utils.
+  plan_page_batches): page bytes, input tokens and expected output tokens
+  must stay under the request size and max_tokens limits
+- Sparse text pages share big batches; image-heavy pages get small ones
+- "adaptive_batching": false in pdf_extraction_prompt.json falls back to
+  fixed batches of 5
+- One batch: single API call; more: process batches in parallel
+- Each batch is ONE multi-page PDF document block, cut from a single parse
+  of the file (pdf_utils.iterate_planned_batches); batches are split lazily,
+  only a couple of batches ahead of the workers
+
+Text-Layer Fast Path:
+- Born-digital pages whose text layer pypdf reads cleanly are extracted
+  locally (pdf_text_layer_utils); only scanned, image/table-heavy or
+  low-confidence pages are batched for vision
+- Disable with "text_layer_fast_path": false in pdf_extraction_prompt.json
+
+Resumable Extraction:
+- Each successful batch is checkpointed to {source_id}.checkpoint.jsonl in
+  the processed folder (extraction_checkpoint_utils)
+- A retry (or a re-run after a server restart) only sends the pages that
+  are missing or failed; the final file is assembled from the checkpoint
 
 Why Tools?
 - Sending multiple pages and getting a single response loses page boundaries
@@ -20,22 +40,31 @@ Parallel Processing:
 - Uses ThreadPoolExecutor for concurrent batch processing
 - Number of workers determined by Anthropic tier setting
 - Rate limiting prevents hitting API limits
+- In bulk mode (claude_batch_service) page batches are queued as Futures
+  (no thread each), at most PDF_BULK_QUEUE_DEPTH at a time
+
+Live Progress:
+- A ProgressTracker publishes pages done, batches in flight, tokens and
+  ETA to progress_service, which pushes them to the project's SocketIO room
 """
-import time
+import os
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
 
-from app.services.integrations.claude import claude_service
-from app.services.background_services import task_service
+from app.services.integrations.claude import claude_batch_service
+from app.services.background_services import task_service, ProgressTracker
 from app.config import tool_loader, prompt_loader, get_anthropic_config
 from app.utils import claude_parsing_utils
-from app.utils.batching_utils import create_batches, DEFAULT_BATCH_SIZE
+from app.utils.batching_utils import (
+    DEFAULT_BATCH_SIZE, create_batches, estimate_page_cost, plan_page_batches, get_batch_plan_stats
+)
 from app.utils.encoding_utils import encode_bytes_to_base64
-from app.utils.pdf_utils import get_page_count, get_all_page_bytes
+from app.utils.pdf_utils import get_page_count, iterate_planned_batches, estimate_page_sizes
+from app.utils.pdf_text_layer_utils import analyze_pdf_text_layer
+from app.utils.extraction_checkpoint_utils import ExtractionCheckpoint
 from app.utils.path_utils import get_processed_dir
-from app.utils.rate_limit_utils import RateLimiter
 from app.utils.text import build_processed_output
 from app.utils.embedding_utils import count_tokens
 
@@ -50,7 +79,7 @@ class PDFService:
     Service class for managing PDF text extraction using tool-based approach.
 
     Educational Note: This service orchestrates PDF processing:
-    1. Splits PDF into batches of pages (max 5 per batch)
+    1. Splits PDF into batch PDFs of pages (sized by page weight)
     2. Sends each batch to Claude API with all pages visible
     3. Claude uses submit_page_extraction tool for each page (with context!)
     4. Collects results, writes to file in page order
@@ -74,43 +103,77 @@ class PDFService:
             self._tool_definition = tool_loader.load_tool("pdf_tools", "pdf_extraction")
         return self._tool_definition
 
+    # Batches split ahead of the workers (x max_workers) - bounds memory
+    # for huge PDFs while keeping every worker busy
+    SPLIT_AHEAD_FACTOR = 2
+
+    # Bulk mode: page batches queued in claude_batch_service at once. Each
+    # holds its base64 PDF until the batch is submitted, so this bounds memory
+    BULK_QUEUE_DEPTH = int(os.getenv("PDF_BULK_QUEUE_DEPTH", "20"))
+
     def _extract_batch_with_tools(
         self,
-        batch: List[Tuple[int, bytes]],
+        page_numbers: List[int],
+        batch_bytes: bytes,
         total_pages: int,
         pdf_name: str,
         prompt_config: Dict[str, Any],
         tool_def: Dict[str, Any],
-        rate_limiter: RateLimiter,
         project_id: str,
-        max_retries: int = 3
+        max_retries: int = 3,
+        progress: Optional[ProgressTracker] = None
     ) -> Tuple[int, Dict[str, Any]]:
         """
-        Extract text from a batch of PDF pages using tool-based approach.
+        Extract text from a batch of PDF pages and wait for the result.
+
+        Returns:
+            Tuple of (first_page_in_batch, results_dict)
+        """
+        future = self._submit_batch(
+            page_numbers, batch_bytes, total_pages, pdf_name,
+            prompt_config, tool_def, project_id, max_retries, progress
+        )
+        return self._finish_batch(page_numbers, future, progress)
+
+    def _submit_batch(
+        self,
+        page_numbers: List[int],
+        batch_bytes: bytes,
+        total_pages: int,
+        pdf_name: str,
+        prompt_config: Dict[str, Any],
+        tool_def: Dict[str, Any],
+        project_id: str,
+        max_retries: int = 3,
+        progress: Optional[ProgressTracker] = None
+    ) -> Future:
+        """
+        Send a batch of PDF pages for tool-based extraction.
 
         Educational Note: This is the core of the new extraction approach:
-        1. Build a message with ALL pages in the batch as document blocks
-        2. Each document has a title like "filename.pdf - Page 7" for identification
+        1. Build a message with the batch as ONE multi-page document block
+        2. The document title ("filename.pdf - Pages 6-10") and the user
+           message list the original page numbers, in order
         3. Claude can see all pages → understands cross-page context
         4. Force tool use with tool_choice={"type": "tool", "name": "..."}
         5. Claude calls submit_page_extraction once per page
         6. We parse tool calls to get per-page extracted text
 
         Args:
-            batch: List of (page_number, page_bytes) tuples
+            page_numbers: 1-indexed page numbers contained in batch_bytes
+            batch_bytes: PDF bytes containing just this batch's pages
             total_pages: Total pages in the entire PDF (for context)
             pdf_name: Original PDF filename (e.g., "8page.pdf") for document titles
             prompt_config: Prompt configuration dict
             tool_def: Tool definition for submit_page_extraction
-            rate_limiter: RateLimiter instance for API rate limiting
             project_id: Project ID for cost tracking
-            max_retries: Maximum retry attempts for failed requests
+            max_retries: Maximum attempts for transient API errors
+            progress: Tracker to report the batch to (live progress events)
 
         Returns:
-            Tuple of (first_page_in_batch, results_dict)
+            Future resolving to the Claude response (see _finish_batch)
         """
-        batch_start_page = batch[0][0]
-        batch_page_numbers = [p[0] for p in batch]
+        batch_page_numbers = page_numbers
 
         model = prompt_config.get("model", "claude-haiku-4-5-20251001")
         system_prompt = prompt_config.get("system_prompt", "")
@@ -118,37 +181,33 @@ class PDFService:
         max_tokens = prompt_config.get("max_tokens", 16000)
         temperature = prompt_config.get("temperature", 0)
 
-        # Build content blocks: one document block per page in batch
-        # Each document has a title field to identify which page it is
-        # This follows Anthropic's recommended pattern for multi-document messages
-        content_blocks = []
-        for page_num, page_bytes in batch:
-            page_base64 = encode_bytes_to_base64(page_bytes)
-            content_blocks.append({
-                "type": "document",
-                "source": {
-                    "type": "base64",
-                    "media_type": "application/pdf",
-                    "data": page_base64
-                },
-                # Title identifies which page this document represents
-                # Claude uses this to know which page_number to use in tool calls
-                "title": f"{pdf_name} - Page {page_num}",
-            })
-
         # Build user message describing what to extract
         # IMPORTANT: Explicitly list the page numbers so Claude uses correct numbering
-        if len(batch) == 1:
-            extraction_desc = f"page {batch[0][0]}"
-            page_list = str(batch[0][0])
+        page_list = ", ".join(str(p) for p in batch_page_numbers)
+        if len(page_numbers) == 1:
+            extraction_desc = f"page {page_numbers[0]}"
+        elif page_numbers[-1] - page_numbers[0] == len(page_numbers) - 1:
+            extraction_desc = f"pages {page_numbers[0]} to {page_numbers[-1]}"
         else:
-            extraction_desc = f"pages {batch[0][0]} to {batch[-1][0]}"
-            page_list = ", ".join(str(p) for p in batch_page_numbers)
+            # Not contiguous - text-layer pages in between were extracted locally
+            extraction_desc = f"pages {page_list}"
+
+        # Build content blocks: the whole batch as one document block
+        # The title tells Claude which original pages the document holds
+        content_blocks = [{
+            "type": "document",
+            "source": {
+                "type": "base64",
+                "media_type": "application/pdf",
+                "data": encode_bytes_to_base64(batch_bytes)
+            },
+            "title": f"{pdf_name} - {extraction_desc[0].upper()}{extraction_desc[1:]}",
+        }]
 
         user_message = user_message_template.format(
             total_pages=total_pages,
             extraction_description=extraction_desc,
-            expected_tool_calls=len(batch),
+            expected_tool_calls=len(page_numbers),
             page_numbers=page_list
         )
 
@@ -159,56 +218,77 @@ class PDFService:
 
         messages = [{"role": "user", "content": content_blocks}]
 
-        # Retry loop with rate limiting
-        last_error = None
-        for attempt in range(max_retries):
-            try:
-                # Apply rate limiting before each API call
-                rate_limiter.wait_if_needed()
-
-                # Call Claude API with tool and forced tool use
-                response = claude_service.send_message(
-                    messages=messages,
-                    system_prompt=system_prompt,
-                    model=model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    tools=[tool_def],
-                    # Force Claude to use this specific tool (not just "any" tool)
-                    tool_choice={"type": "tool", "name": "submit_page_extraction"},
-                    project_id=project_id
+        if progress:
+            progress.batch_started()
+
+        # Retries, backoff, rate limiting and concurrency are handled by
+        # claude_service's call policy (or batched in bulk mode) - one call
+        # here. In bulk mode it returns right away; the Future resolves when
+        # the batch result arrives
+        return claude_batch_service.submit_message(
+            messages=messages,
+            system_prompt=system_prompt,
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            tools=[tool_def],
+            # Force Claude to use this specific tool (not just "any" tool)
+            tool_choice={"type": "tool", "name": "submit_page_extraction"},
+            project_id=project_id,
+            max_attempts=max_retries,
+            # Re-processing the same PDF reuses earlier page extractions
+            use_response_cache=True
+        )
+
+    def _finish_batch(
+        self,
+        page_numbers: List[int],
+        response_future: Future,
+        progress: Optional[ProgressTracker] = None
+    ) -> Tuple[int, Dict[str, Any]]:
+        """
+        Parse a batch's response into per-page results.
+
+        Args:
+            page_numbers: 1-indexed page numbers the batch contained
+            response_future: Future from _submit_batch()
+            progress: Tracker to report the finished batch to
+
+        Returns:
+            Tuple of (first_page_in_batch, results_dict)
+        """
+        batch_start_page = page_numbers[0]
+        batch_page_numbers = page_numbers
+
+        try:
+            response = response_future.result()
+
+            # Parse tool calls from response
+            page_results = self._parse_tool_calls(response, batch_page_numbers)
+
+            if progress:
+                progress.batch_finished(
+                    units=sum(1 for result in page_results.values() if not result.get("error")),
+                    input_tokens=response["usage"].get("input_tokens", 0),
+                    output_tokens=response["usage"].get("output_tokens", 0)
                 )
 
-                # Parse tool calls from response
-                page_results = self._parse_tool_calls(response, batch_page_numbers)
-
-                return (batch_start_page, {
-                    "success": True,
-                    "page_results": page_results,
-                    "token_usage": response["usage"],
-                    "model": response["model"]
-                })
-
-            except Exception as e:
-                last_error = e
-                error_str = str(e).lower()
-
-                # Check if it's a rate limit error (429)
-                if "rate" in error_str or "429" in error_str or "overloaded" in error_str:
-                    wait_time = (attempt + 1) * 30
-                    print(f"Batch starting page {batch_start_page}: Rate limit hit, waiting {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(wait_time)
-                elif attempt < max_retries - 1:
-                    wait_time = (2 ** attempt) * 2
-                    print(f"Batch starting page {batch_start_page}: Error, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(wait_time)
-
-        # All retries exhausted
-        return (batch_start_page, {
-            "success": False,
-            "error": str(last_error),
-            "failed_pages": batch_page_numbers
-        })
+            return (batch_start_page, {
+                "success": True,
+                "page_results": page_results,
+                "token_usage": response["usage"],
+                "model": response["model"]
+            })
+
+        except Exception as e:
+            print(f"Batch starting page {batch_start_page}: Failed - {e}")
+            if progress:
+                progress.batch_finished()
+            return (batch_start_page, {
+                "success": False,
+                "error": str(e),
+                "failed_pages": batch_page_numbers
+            })
 
     def _parse_tool_calls(
         self,
@@ -239,7 +319,9 @@ class PDFService:
             page_num = inputs.get("page_number")
             extracted_text = inputs.get("extracted_text", "")
 
-            if page_num is not None:
+            # Keep only pages this batch sent - a wrong page number would
+            # otherwise overwrite another batch's page in the merged results
+            if page_num in expected_pages:
                 page_results[page_num] = {
                     "text": extracted_text
                 }
@@ -257,6 +339,51 @@ class PDFService:
 
         return page_results
 
+    def _plan_batches(
+        self,
+        pdf_path: Path,
+        vision_pages: List[int],
+        page_text_chars: Dict[int, int],
+        prompt_config: Dict[str, Any]
+    ) -> List[List[int]]:
+        """
+        Decide which vision pages go together in each API call.
+
+        Educational Note: Page sizes come from pdf_utils.estimate_page_sizes()
+        (no splitting needed). A page's text length is only trusted when its
+        text layer is readable (image/table pages); scanned pages use the
+        planner's defaults.
+
+        Args:
+            pdf_path: Path to the PDF file
+            vision_pages: Pages to send to Claude, in order
+            page_text_chars: Text-layer length for pages whose text is usable
+            prompt_config: Prompt configuration (max_tokens, adaptive_batching)
+
+        Returns:
+            List of batches, each a list of page numbers
+        """
+        if not vision_pages:
+            return []
+        if not prompt_config.get("adaptive_batching", True):
+            return create_batches(vision_pages, DEFAULT_BATCH_SIZE)
+
+        page_sizes = estimate_page_sizes(pdf_path, vision_pages)
+        page_costs = [
+            (page_num, estimate_page_cost(page_sizes[page_num], page_text_chars.get(page_num)))
+            for page_num in vision_pages
+        ]
+        return plan_page_batches(page_costs, prompt_config.get("max_tokens", 16000))
+
+    @staticmethod
+    def _get_extraction_method(text_layer_pages: int, vision_pages: int) -> str:
+        """Describe how the pages were extracted (stored in processing_info)."""
+        if not vision_pages:
+            return "text_layer"
+        if text_layer_pages:
+            return "text_layer+batched_tool_based"
+        return "batched_tool_based"
+
     def extract_text_from_pdf(
         self,
         project_id: str,
@@ -269,7 +396,7 @@ class PDFService:
         Educational Note: This method implements the new extraction approach:
         1. Gets total page count and tier configuration
         2. Extracts page bytes for all pages
-        3. Splits into batches (max 5 pages per batch)
+        3. Plans batches by page weight (bytes, input and output tokens)
         4. For each batch: sends all pages, Claude uses tools for per-page extraction
         5. For large PDFs: processes batches in parallel
         6. Collects all results, writes to file in page order
@@ -292,6 +419,7 @@ class PDFService:
         # Get output path early for cleanup on failure
         processed_dir = get_processed_dir(project_id)
         output_path = processed_dir / f"{source_id}.txt"
+        progress = None
 
         try:
             # Step 1: Load configurations using centralized loaders
@@ -300,31 +428,68 @@ class PDFService:
             model = prompt_config.get("model", "claude-haiku-4-5-20251001")
             tier_config = get_anthropic_config()
             max_workers = tier_config["max_workers"]
-            # For batched approach, rate limit is per batch (API call), not per page
-            # Divide pages_per_minute by batch size to get batches_per_minute
-            pages_per_minute = tier_config["pages_per_minute"]
-            batches_per_minute = max(1, pages_per_minute // DEFAULT_BATCH_SIZE)
-
-            # Create rate limiter for this extraction session
-            rate_limiter = RateLimiter(batches_per_minute)
+            # Rate limits (RPM/TPM) are enforced process-wide by claude_service,
+            # so concurrent extractions share one budget
 
             print(f"Using model: {model}")
-            print(f"Tier config: {max_workers} workers, ~{batches_per_minute} batches/min")
+            print(f"Tier config: {max_workers} workers")
 
-            # Step 2: Get page count and extract all page bytes
+            # Step 2: Get page count
             total_pages = get_page_count(pdf_path)
             print(f"PDF has {total_pages} pages")
 
-            print("Extracting page bytes...")
-            page_bytes_list = get_all_page_bytes(pdf_path)
+            # Step 3: Text-layer fast path - extract good pages locally
+            all_page_results: Dict[int, Dict[str, Any]] = {}
+            page_text_chars: Dict[int, int] = {}
+            if prompt_config.get("text_layer_fast_path", True):
+                vision_pages = []
+                for page in analyze_pdf_text_layer(pdf_path):
+                    if page["needs_vision"]:
+                        vision_pages.append(page["page_number"])
+                        # Readable text that needs vision for layout - its
+                        # length predicts the extraction's output size
+                        if page["reason"] in ("image", "table"):
+                            page_text_chars[page["page_number"]] = len(page["text"])
+                    else:
+                        all_page_results[page["page_number"]] = {"text": page["text"]}
+                print(f"Text layer: {len(all_page_results)} page(s) extracted locally, {len(vision_pages)} need vision")
+            else:
+                vision_pages = list(range(1, total_pages + 1))
+            text_layer_pages = len(all_page_results)
+
+            # Resume: pages completed by an earlier attempt come from the checkpoint
+            checkpoint = ExtractionCheckpoint(processed_dir, source_id, pdf_path, prompt_config)
+            checkpointed_results = checkpoint.load()
+            if checkpointed_results:
+                all_page_results.update(checkpointed_results)
+                vision_pages = [p for p in vision_pages if p not in checkpointed_results]
+                print(f"Resuming from checkpoint: {len(checkpointed_results)} page(s) already extracted")
+
+            # Step 4: Plan batches by page weight, then split them lazily
+            # (one parse, one PDF per batch)
+            batch_plan = self._plan_batches(pdf_path, vision_pages, page_text_chars, prompt_config)
+            plan_stats = get_batch_plan_stats(batch_plan)
+            batch_iter = iterate_planned_batches(pdf_path, batch_plan)
+            total_batches = plan_stats["total_batches"]
+            print(
+                f"Splitting into {total_batches} batch(es) of {plan_stats['min_batch_size']}-"
+                f"{plan_stats['max_batch_size']} pages ({plan_stats['pages_per_request']} pages/request)"
+            )
 
-            # Step 3: Create batches using utility
-            batches = create_batches(page_bytes_list, DEFAULT_BATCH_SIZE)
-            total_batches = len(batches)
-            print(f"Split into {total_batches} batch(es) of up to {DEFAULT_BATCH_SIZE} pages each")
+            # Bulk mode: page batches are queued without a thread each, up
+            # to BULK_QUEUE_DEPTH at a time; the worker count stays the tier's
+            bulk_mode = claude_batch_service.enabled
+
+            # Live progress: text-layer and checkpointed pages count as done
+            progress = ProgressTracker(
+                project_id, source_id, "extracting",
+                total=total_pages,
+                unit="pages",
+                batches_total=total_batches,
+                done=total_pages - len(vision_pages)
+            )
 
-            # Step 4: Process batches
-            all_page_results: Dict[int, Dict[str, Any]] = {}
+            # Step 5: Process batches
             total_input_tokens = 0
             total_output_tokens = 0
             batches_completed = 0
@@ -332,23 +497,29 @@ class PDFService:
             # Get PDF filename for document titles
             pdf_name = pdf_path.name
 
-            if total_batches == 1:
+            if total_batches == 0:
+                print("All pages extracted from the text layer - no vision calls needed")
+
+            elif total_batches == 1:
                 # Single batch - no need for parallel processing
                 print("Processing single batch...")
+                page_numbers, batch_bytes = next(batch_iter)
                 _, batch_result = self._extract_batch_with_tools(
-                    batches[0],
+                    page_numbers,
+                    batch_bytes,
                     total_pages,
                     pdf_name,
                     prompt_config,
                     tool_def,
-                    rate_limiter,
-                    project_id
+                    project_id,
+                    progress=progress
                 )
 
                 if not batch_result.get("success"):
                     raise Exception(batch_result.get("error", "Batch extraction failed"))
 
                 all_page_results.update(batch_result.get("page_results", {}))
+                checkpoint.save_pages(batch_result.get("page_results", {}))
                 total_input_tokens += batch_result.get("token_usage", {}).get("input_tokens", 0)
                 total_output_tokens += batch_result.get("token_usage", {}).get("output_tokens", 0)
 
@@ -357,33 +528,67 @@ class PDFService:
                 print(f"Processing {total_batches} batches in parallel with {max_workers} workers...")
 
                 with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                    future_to_batch = {
-                        executor.submit(
+                    # Future -> page numbers (bulk: response still to parse)
+                    # or None (worker: already a (start, result) tuple)
+                    in_flight: Dict[Future, Optional[List[int]]] = {}
+
+                    def submit_next_batch() -> bool:
+                        # Split the next batch only when a slot frees up
+                        batch = next(batch_iter, None)
+                        if batch is None:
+                            return False
+                        if bulk_mode:
+                            in_flight[self._submit_batch(
+                                batch[0],
+                                batch[1],
+                                total_pages,
+                                pdf_name,
+                                prompt_config,
+                                tool_def,
+                                project_id,
+                                progress=progress
+                            )] = batch[0]
+                            return True
+                        in_flight[executor.submit(
                             self._extract_batch_with_tools,
-                            batch,
+                            batch[0],
+                            batch[1],
                             total_pages,
                             pdf_name,
                             prompt_config,
                             tool_def,
-                            rate_limiter,
-                            project_id
-                        ): batch[0][0]  # Track by first page number
-                        for batch in batches
-                    }
+                            project_id,
+                            progress=progress
+                        )] = None
+                        return True
+
+                    queue_depth = self.BULK_QUEUE_DEPTH if bulk_mode else max_workers * self.SPLIT_AHEAD_FACTOR
+                    for _ in range(queue_depth):
+                        if not submit_next_batch():
+                            break
+
+                    while in_flight:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        future = done.pop()
+                        page_numbers = in_flight.pop(future)
 
-                    for future in as_completed(future_to_batch):
                         # Check for cancellation
                         if task_service.is_target_cancelled(source_id):
                             print(f"Processing cancelled for source {source_id}")
-                            for f in future_to_batch:
+                            for f in in_flight:
                                 f.cancel()
                             raise CancelledException("Processing cancelled by user")
 
-                        batch_start, batch_result = future.result()
+                        submit_next_batch()
+                        if page_numbers is None:
+                            batch_start, batch_result = future.result()
+                        else:
+                            batch_start, batch_result = self._finish_batch(page_numbers, future, progress)
                         batches_completed += 1
 
                         if batch_result.get("success"):
                             all_page_results.update(batch_result.get("page_results", {}))
+                            checkpoint.save_pages(batch_result.get("page_results", {}))
                             total_input_tokens += batch_result.get("token_usage", {}).get("input_tokens", 0)
                             total_output_tokens += batch_result.get("token_usage", {}).get("output_tokens", 0)
                             print(f"Batch {batches_completed}/{total_batches} complete (pages starting at {batch_start})")
@@ -405,12 +610,14 @@ class PDFService:
             ]
 
             if failed_pages:
-                # Don't save partial results - let user retry
+                # Don't save partial results - let user retry (the
+                # checkpoint keeps the good pages, so only these are redone)
                 error_message = f"Failed to extract {len(failed_pages)} page(s): {sorted(failed_pages)[:5]}"
                 if len(failed_pages) > 5:
                     error_message += f" (and {len(failed_pages) - 5} more)"
 
                 print(f"Extraction FAILED: {error_message}")
+                progress.finish(success=False, error=error_message)
 
                 return {
                     "success": False,
@@ -455,6 +662,10 @@ class PDFService:
             with open(output_path, "w", encoding="utf-8") as f:
                 f.write(processed_content)
 
+            # Final file is written - the checkpoint is no longer needed
+            checkpoint.delete()
+            progress.finish()
+
             print(f"Extraction complete. {total_pages}/{total_pages} pages processed.")
             print(f"Total tokens: {total_input_tokens} input, {total_output_tokens} output")
 
@@ -471,8 +682,14 @@ class PDFService:
                 },
                 "model_used": model,
                 "extracted_at": datetime.now().isoformat(),
-                "extraction_method": "batched_tool_based",
-                "batch_size": DEFAULT_BATCH_SIZE,
+                "extraction_method": self._get_extraction_method(
+                    text_layer_pages, len(vision_pages) + len(checkpointed_results)
+                ),
+                "text_layer_pages": text_layer_pages,
+                "vision_pages": len(vision_pages) + len(checkpointed_results),
+                "resumed_pages": len(checkpointed_results),
+                "batch_size": plan_stats["max_batch_size"],
+                "pages_per_request": plan_stats["pages_per_request"],
                 "total_batches": total_batches,
                 "parallel_workers": max_workers,
                 "errors": None
@@ -480,6 +697,8 @@ class PDFService:
 
         except CancelledException as e:
             print(f"PDF extraction cancelled: {e}")
+            if progress:
+                progress.finish(success=False, error="Processing cancelled by user")
             if output_path.exists():
                 output_path.unlink()
                 print(f"Deleted partial output file: {output_path}")
@@ -491,6 +710,8 @@ class PDFService:
 
         except FileNotFoundError as e:
             print(f"File not found: {e}")
+            if progress:
+                progress.finish(success=False, error=str(e))
             if output_path.exists():
                 output_path.unlink()
             return {
@@ -501,6 +722,8 @@ class PDFService:
 
         except Exception as e:
             print(f"PDF extraction failed: {e}")
+            if progress:
+                progress.finish(success=False, error=str(e))
             if output_path.exists():
                 output_path.unlink()
                 print(f"Deleted partial output file: {output_path}")
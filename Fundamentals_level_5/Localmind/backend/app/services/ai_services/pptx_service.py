@@ -11,24 +11,38 @@ while providing presentation-specific prompts that understand slides, not docume
 
 Processing Flow:
     PPTX → PDF (LibreOffice) → base64 pages → Claude vision → extracted content
+
+Native Text Path:
+- Slides are first read with python-pptx (pptx_text_utils): title, text,
+  tables and speaker notes, plus a visual complexity score (pictures,
+  charts, SmartArt, drawn diagrams)
+- Only visually complex slides are converted and sent to vision; a deck
+  of text-only slides never starts LibreOffice or calls Claude
+- Output keeps the same === PPTX PAGE n === format either way
+- Disable with "native_text_path": false in pptx_extraction_prompt.json
+
+Each completed batch is checkpointed (extraction_checkpoint_utils), so a
+retry after a failure or server restart only re-sends the missing slides.
+Progress (slides done, batches in flight, tokens, ETA) is published live
+through progress_service.
 """
 import tempfile
-import time
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from app.services.integrations.claude import claude_service
-from app.services.background_services import task_service
+from app.services.background_services import task_service, ProgressTracker
 from app.config import tool_loader, prompt_loader, get_anthropic_config
 from app.utils import claude_parsing_utils
-from app.utils.batching_utils import create_batches, DEFAULT_BATCH_SIZE
+from app.utils.batching_utils import estimate_page_cost, plan_page_batches, get_batch_plan_stats
 from app.utils.encoding_utils import encode_bytes_to_base64
-from app.utils.pdf_utils import get_page_count, get_all_page_bytes
+from app.utils.pdf_utils import get_page_count, iterate_pages
+from app.utils import pptx_text_utils
+from app.utils.extraction_checkpoint_utils import ExtractionCheckpoint
 from app.utils.path_utils import get_processed_dir
 from app.utils.pptx_utils import convert_pptx_to_pdf
-from app.utils.rate_limit_utils import RateLimiter
 from app.utils.text import build_processed_output
 from app.utils.embedding_utils import count_tokens
 
@@ -43,13 +57,18 @@ class PPTXService:
     Service class for processing PowerPoint presentations.
 
     Educational Note: This service orchestrates PPTX processing:
-    1. Converts PPTX to PDF using LibreOffice headless (via pptx_utils)
-    2. Splits PDF into batches of slides (max 5 per batch)
+    1. Reads text-only slides natively; converts the deck to PDF with
+       LibreOffice headless (via pptx_utils) only if some slides need vision
+    2. Packs the vision slides into batches by size and token estimates
     3. Sends each batch to Claude API for visual analysis
     4. Claude uses submit_slide_extraction tool for each slide
     5. Collects results, writes to file in slide order
     """
 
+    # Expected output per slide (title, text, visuals, layout) - slides carry
+    # less text than document pages, so more of them fit in one call
+    SLIDE_OUTPUT_TOKENS = 800
+
     def __init__(self):
         """Initialize the PPTX service."""
         self._tool_definition = None
@@ -71,10 +90,10 @@ class PPTXService:
 
         Educational Note: This is the main entry point for PPTX processing.
         It orchestrates the full pipeline:
-        1. Convert PPTX to PDF (via pptx_utils)
-        2. Extract slides in batches
-        3. Process with Claude vision
-        4. Save extracted content
+        1. Read slides natively, flag visually complex ones
+        2. Convert PPTX to PDF (via pptx_utils) if any slide needs vision
+        3. Process those slides in batches with Claude vision
+        4. Save extracted content (native + vision, in slide order)
 
         Args:
             project_id: The project UUID
@@ -87,43 +106,101 @@ class PPTXService:
         # Create a temporary directory for the PDF
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
+            progress = None
 
             try:
-                # Step 1: Convert PPTX to PDF (using utility function)
-                pdf_path = convert_pptx_to_pdf(pptx_path, temp_path)
+                # Step 1: Load configurations using centralized loaders
+                prompt_config = prompt_loader.get_prompt_config("pptx_extraction")
+                tool_def = self._load_tool_definition()
+                tier_config = get_anthropic_config()
+                max_workers = tier_config["max_workers"]
+                # Rate limits (RPM/TPM) are enforced process-wide by claude_service
 
-                # Step 2: Get slide count
-                total_slides = get_page_count(pdf_path)
-                print(f"Presentation has {total_slides} slides")
+                # Resume: slides completed by an earlier attempt come from the
+                # checkpoint (fingerprinted on the original PPTX, not the temp PDF)
+                processed_dir = get_processed_dir(project_id)
+                checkpoint = ExtractionCheckpoint(processed_dir, source_id, pptx_path, prompt_config)
+                all_results = checkpoint.load()
+                if all_results:
+                    print(f"Resuming from checkpoint: {len(all_results)} slide(s) already extracted")
+
+                # Step 2: Native path - read text-only slides with python-pptx
+                native_slides = self._analyze_slides_natively(pptx_path, prompt_config)
+                native_count = 0
+                if native_slides is not None:
+                    total_slides = len(native_slides)
+                    for slide in native_slides:
+                        if not slide["needs_vision"] and slide["slide_number"] not in all_results:
+                            all_results[slide["slide_number"]] = slide["extraction"]
+                            native_count += 1
+                    vision_numbers = [
+                        slide["slide_number"] for slide in native_slides
+                        if slide["needs_vision"] and slide["slide_number"] not in all_results
+                    ]
+                    print(f"Native text: {native_count} slide(s) read directly, {len(vision_numbers)} need vision")
+
+                # Step 3: Convert to PDF only if some slides need vision
+                slide_bytes_list = []
+                if native_slides is None or vision_numbers:
+                    pdf_path = convert_pptx_to_pdf(pptx_path, temp_path)
+                    pdf_slides = get_page_count(pdf_path)
+
+                    if native_slides is not None and pdf_slides != total_slides:
+                        # Slide numbering doesn't line up with the PDF - trust the PDF
+                        print(f"PDF has {pdf_slides} pages but {total_slides} visible slides - using vision for all")
+                        native_slides = None
+                        native_count = 0
+                        all_results = checkpoint.load()
+
+                    if native_slides is None:
+                        total_slides = pdf_slides
+                        vision_numbers = [n for n in range(1, total_slides + 1) if n not in all_results]
+
+                    print("Extracting slide bytes...")
+                    wanted = set(vision_numbers)
+                    slide_bytes_list = [
+                        (slide_num, slide_bytes)
+                        for slide_num, slide_bytes in iterate_pages(pdf_path)
+                        if slide_num in wanted
+                    ]
 
+                print(f"Presentation has {total_slides} slides")
                 if total_slides == 0:
                     return {
                         "success": False,
                         "error": "Presentation has no slides"
                     }
 
-                # Step 3: Load configurations using centralized loaders
-                prompt_config = prompt_loader.get_prompt_config("pptx_extraction")
-                tool_def = self._load_tool_definition()
-                tier_config = get_anthropic_config()
-                max_workers = tier_config["max_workers"]
-
-                # Calculate batches per minute for rate limiting
-                pages_per_minute = tier_config["pages_per_minute"]
-                batches_per_minute = max(1, pages_per_minute // DEFAULT_BATCH_SIZE)
-                rate_limiter = RateLimiter(batches_per_minute)
-
-                # Step 4: Extract all slide bytes and create batches
-                print("Extracting slide bytes...")
-                slide_bytes_list = get_all_page_bytes(pdf_path)
-                batches = create_batches(slide_bytes_list, DEFAULT_BATCH_SIZE)
-                print(f"Created {len(batches)} batches for processing")
+                # Step 4: Create batches for the vision slides
+                # Pack slides by their real byte size and estimated tokens
+                slide_costs = [
+                    (slide_num, estimate_page_cost(len(slide_bytes), default_output_tokens=self.SLIDE_OUTPUT_TOKENS))
+                    for slide_num, slide_bytes in slide_bytes_list
+                ]
+                batch_plan = plan_page_batches(slide_costs, prompt_config.get("max_tokens", 16000))
+                plan_stats = get_batch_plan_stats(batch_plan)
+                slide_bytes_by_num = dict(slide_bytes_list)
+                batches = [
+                    [(slide_num, slide_bytes_by_num[slide_num]) for slide_num in batch_numbers]
+                    for batch_numbers in batch_plan
+                ]
+                print(f"Created {len(batches)} batches for processing ({plan_stats['pages_per_request']} slides/request)")
+
+                # Live progress: native and checkpointed slides count as done
+                progress = ProgressTracker(
+                    project_id, source_id, "extracting",
+                    total=total_slides,
+                    unit="slides",
+                    batches_total=len(batches),
+                    done=total_slides - len(slide_bytes_list)
+                )
 
                 # Step 5: Process batches (parallel for large presentations)
-                all_results = {}
                 total_tokens = {"input_tokens": 0, "output_tokens": 0}
 
-                if len(batches) == 1:
+                if not batches:
+                    print("No slides need vision - skipping Claude calls")
+                elif len(batches) == 1:
                     # Single batch - process directly
                     _, result = self._process_batch(
                         batch=batches[0],
@@ -131,15 +208,17 @@ class PPTXService:
                         pptx_name=pptx_path.name,
                         prompt_config=prompt_config,
                         tool_def=tool_def,
-                        rate_limiter=rate_limiter,
                         source_id=source_id,
-                        project_id=project_id
+                        project_id=project_id,
+                        progress=progress
                     )
                     if result.get("success"):
                         all_results.update(result["slide_results"])
+                        checkpoint.save_pages(result["slide_results"])
                         total_tokens["input_tokens"] += result["token_usage"].get("input_tokens", 0)
                         total_tokens["output_tokens"] += result["token_usage"].get("output_tokens", 0)
                     else:
+                        progress.finish(success=False, error=result.get("error", "Unknown error"))
                         return {"success": False, "error": result.get("error", "Unknown error")}
                 else:
                     # Multiple batches - process in parallel
@@ -152,30 +231,62 @@ class PPTXService:
                                 pptx_name=pptx_path.name,
                                 prompt_config=prompt_config,
                                 tool_def=tool_def,
-                                rate_limiter=rate_limiter,
                                 source_id=source_id,
-                                project_id=project_id
+                                project_id=project_id,
+                                progress=progress
                             ): batch[0][0]
                             for batch in batches
                         }
 
+                        # Keep collecting after a failed batch so every batch
+                        # that did succeed is checkpointed for the retry
+                        batch_error = None
                         for future in as_completed(futures):
                             batch_start = futures[future]
                             try:
                                 _, result = future.result()
                                 if result.get("success"):
                                     all_results.update(result["slide_results"])
+                                    checkpoint.save_pages(result["slide_results"])
                                     total_tokens["input_tokens"] += result["token_usage"].get("input_tokens", 0)
                                     total_tokens["output_tokens"] += result["token_usage"].get("output_tokens", 0)
-                                else:
-                                    return {"success": False, "error": result.get("error")}
+                                elif batch_error is None:
+                                    batch_error = result.get("error")
                             except CancelledException:
+                                for f in futures:
+                                    f.cancel()
+                                progress.finish(success=False, error="Processing cancelled")
                                 return {"success": False, "status": "cancelled", "error": "Processing cancelled"}
                             except Exception as e:
-                                return {"success": False, "error": f"Batch {batch_start} failed: {str(e)}"}
+                                if batch_error is None:
+                                    batch_error = f"Batch {batch_start} failed: {str(e)}"
+
+                        if batch_error is not None:
+                            progress.finish(success=False, error=batch_error)
+                            return {"success": False, "error": batch_error}
+
+                # Every slide needs a result - a batch where Claude skipped
+                # slides still "succeeds", so check slide by slide. Don't save
+                # partial results: the checkpoint keeps the good slides, so a
+                # retry only resends these
+                failed_slides = [
+                    slide_num for slide_num in range(1, total_slides + 1)
+                    if slide_num not in all_results or all_results[slide_num].get("error")
+                ]
+                if failed_slides:
+                    error_message = f"Failed to extract {len(failed_slides)} slide(s): {failed_slides[:5]}"
+                    if len(failed_slides) > 5:
+                        error_message += f" (and {len(failed_slides) - 5} more)"
+                    print(f"Extraction FAILED: {error_message}")
+                    progress.finish(success=False, error=error_message)
+                    return {
+                        "success": False,
+                        "error": error_message,
+                        "failed_slides": failed_slides
+                    }
 
                 # Step 6: Build slide pages and use centralized output format
-                pages = self._build_slide_pages(all_results)
+                pages = self._build_slide_pages(all_results, total_slides)
 
                 # Calculate character and token counts
                 full_text = "\n".join(pages)
@@ -186,7 +297,7 @@ class PPTXService:
                 model = prompt_config.get("model")
                 metadata = {
                     "model_used": model,
-                    "slides_processed": len(all_results),
+                    "slides_processed": total_slides,
                     "character_count": character_count,
                     "token_count": token_count
                 }
@@ -200,31 +311,62 @@ class PPTXService:
                 )
 
                 # Save to processed directory using path_utils
-                processed_dir = get_processed_dir(project_id)
                 output_path = processed_dir / f"{source_id}.txt"
 
                 with open(output_path, 'w', encoding='utf-8') as f:
                     f.write(output_content)
 
+                # Final file is written - the checkpoint is no longer needed
+                checkpoint.delete()
+                progress.finish()
+
                 print(f"Saved extracted content to: {output_path}")
 
                 return {
                     "success": True,
                     "total_slides": total_slides,
-                    "slides_processed": len(all_results),
+                    "slides_processed": total_slides,
+                    "native_slides": native_count,
+                    "vision_slides": len(slide_bytes_list),
+                    "extraction_method": "native+vision" if native_slides is not None else "vision",
                     "character_count": character_count,
                     "token_usage": total_tokens,
+                    "total_batches": plan_stats["total_batches"],
+                    "slides_per_request": plan_stats["pages_per_request"],
                     "model_used": model,
                     "extracted_at": datetime.now().isoformat()
                 }
 
             except Exception as e:
                 print(f"Error processing PPTX: {e}")
+                if progress:
+                    progress.finish(success=False, error=str(e))
                 return {
                     "success": False,
                     "error": str(e)
                 }
 
+    def _analyze_slides_natively(
+        self,
+        pptx_path: Path,
+        prompt_config: Dict[str, Any]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Read slides with python-pptx and flag the visually complex ones.
+
+        Educational Note: Returns None when the native path is off
+        ("native_text_path": false in pptx_extraction_prompt.json), python-pptx
+        is missing, or the file can't be parsed - the caller then sends every
+        slide to vision, as before.
+        """
+        if not prompt_config.get("native_text_path", True) or not pptx_text_utils.is_available():
+            return None
+        try:
+            return pptx_text_utils.analyze_pptx_slides(pptx_path)
+        except Exception as e:
+            print(f"Native PPTX read failed, using vision for all slides: {e}")
+            return None
+
     def _process_batch(
         self,
         batch: List[Tuple[int, bytes]],
@@ -232,10 +374,10 @@ class PPTXService:
         pptx_name: str,
         prompt_config: Dict[str, Any],
         tool_def: Dict[str, Any],
-        rate_limiter: RateLimiter,
         source_id: str,
         project_id: str,
-        max_retries: int = 3
+        max_retries: int = 3,
+        progress: Optional[ProgressTracker] = None
     ) -> Tuple[int, Dict[str, Any]]:
         """
         Process a batch of slides with Claude vision.
@@ -246,10 +388,10 @@ class PPTXService:
             pptx_name: Original PPTX filename
             prompt_config: Prompt configuration
             tool_def: Tool definition
-            rate_limiter: RateLimiter instance for API rate limiting
             source_id: Source UUID for cancellation check
             project_id: Project ID for cost tracking
-            max_retries: Maximum retry attempts
+            max_retries: Maximum attempts for transient API errors
+            progress: Tracker to report the batch to (live progress events)
 
         Returns:
             Tuple of (first_slide_in_batch, results_dict)
@@ -282,12 +424,14 @@ class PPTXService:
             })
 
         # Build user message
+        slide_list = ", ".join(str(s) for s in batch_slide_numbers)
         if len(batch) == 1:
             extraction_desc = f"slide {batch[0][0]}"
-        else:
+        elif batch[-1][0] - batch[0][0] == len(batch) - 1:
             extraction_desc = f"slides {batch[0][0]} to {batch[-1][0]}"
-
-        slide_list = ", ".join(str(s) for s in batch_slide_numbers)
+        else:
+            # Not contiguous - slides in between were read natively
+            extraction_desc = f"slides {slide_list}"
 
         user_message = user_message_template.format(
             total_pages=total_slides,
@@ -303,50 +447,49 @@ class PPTXService:
 
         messages = [{"role": "user", "content": content_blocks}]
 
-        # Retry loop with rate limiting
-        last_error = None
-        for attempt in range(max_retries):
-            try:
-                # Apply rate limiting before each API call
-                rate_limiter.wait_if_needed()
-
-                response = claude_service.send_message(
-                    messages=messages,
-                    system_prompt=system_prompt,
-                    model=model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    tools=[tool_def],
-                    tool_choice={"type": "tool", "name": "submit_slide_extraction"},
-                    project_id=project_id
+        if progress:
+            progress.batch_started()
+
+        # Retries, backoff, rate limiting and concurrency are handled by
+        # claude_service's call policy - one call here
+        try:
+            response = claude_service.send_message(
+                messages=messages,
+                system_prompt=system_prompt,
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                tools=[tool_def],
+                tool_choice={"type": "tool", "name": "submit_slide_extraction"},
+                project_id=project_id,
+                max_attempts=max_retries,
+                use_response_cache=True
+            )
+
+            slide_results = self._parse_tool_calls(response, batch_slide_numbers)
+
+            if progress:
+                progress.batch_finished(
+                    units=sum(1 for result in slide_results.values() if not result.get("error")),
+                    input_tokens=response["usage"].get("input_tokens", 0),
+                    output_tokens=response["usage"].get("output_tokens", 0)
                 )
 
-                slide_results = self._parse_tool_calls(response, batch_slide_numbers)
-
-                return (batch_start_slide, {
-                    "success": True,
-                    "slide_results": slide_results,
-                    "token_usage": response["usage"],
-                    "model": response["model"]
-                })
-
-            except Exception as e:
-                last_error = e
-                error_str = str(e).lower()
-
-                if "rate" in error_str or "429" in error_str or "overloaded" in error_str:
-                    wait_time = (attempt + 1) * 30
-                    print(f"Batch starting slide {batch_start_slide}: Rate limit hit, waiting {wait_time}s")
-                    time.sleep(wait_time)
-                else:
-                    print(f"Batch starting slide {batch_start_slide}: Error - {e}")
-                    if attempt < max_retries - 1:
-                        time.sleep(5)
+            return (batch_start_slide, {
+                "success": True,
+                "slide_results": slide_results,
+                "token_usage": response["usage"],
+                "model": response["model"]
+            })
 
-        return (batch_start_slide, {
-            "success": False,
-            "error": str(last_error)
-        })
+        except Exception as e:
+            print(f"Batch starting slide {batch_start_slide}: Error - {e}")
+            if progress:
+                progress.batch_finished()
+            return (batch_start_slide, {
+                "success": False,
+                "error": str(e)
+            })
 
     def _parse_tool_calls(
         self,
@@ -384,28 +527,43 @@ class PPTXService:
                     "layout_notes": input_data.get("layout_notes", "")
                 }
 
+        # Mark slides Claude didn't call the tool for, so the extraction
+        # fails and the checkpointed retry resends only those
+        missing_slides = set(expected_slide_numbers) - set(results.keys())
+        if missing_slides:
+            print(f"WARNING: Missing extractions for slides: {sorted(missing_slides)}")
+            for slide_num in missing_slides:
+                results[slide_num] = {
+                    "slide_title": "[EXTRACTION FAILED - No tool call received]",
+                    "error": "No tool call received for this slide"
+                }
+
         return results
 
     def _build_slide_pages(
         self,
-        all_results: Dict[int, Dict[str, Any]]
+        all_results: Dict[int, Dict[str, Any]],
+        total_slides: int
     ) -> List[str]:
         """
         Build a list of slide content strings (one per slide).
 
         Educational Note: This returns just the page content for each slide.
-        The page markers and header are added by build_processed_output.
+        The page markers and header are added by build_processed_output,
+        which numbers pages by list position - so the list has one entry per
+        slide number, 1 to total_slides, and === PPTX PAGE n === is slide n.
 
         Args:
             all_results: Dict mapping slide numbers to extraction results
+            total_slides: Number of slides in the presentation
 
         Returns:
-            List of formatted slide content strings
+            List of formatted slide content strings (index 0 = slide 1)
         """
         pages = []
 
-        for slide_num in sorted(all_results.keys()):
-            result = all_results[slide_num]
+        for slide_num in range(1, total_slides + 1):
+            result = all_results.get(slide_num, {})
             slide_lines = []
 
             # Slide title
@@ -435,6 +593,13 @@ class PPTXService:
                 slide_lines.append(layout_notes)
                 slide_lines.append("")
 
+            # Speaker notes (native extraction only)
+            speaker_notes = result.get("speaker_notes", "")
+            if speaker_notes:
+                slide_lines.append("## Speaker Notes")
+                slide_lines.append(speaker_notes)
+                slide_lines.append("")
+
             pages.append("\n".join(slide_lines))
 
         return pages
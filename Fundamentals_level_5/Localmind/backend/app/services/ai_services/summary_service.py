@@ -12,6 +12,9 @@ Summary Strategy:
 - Output: 150-200 tokens summary
 
 The summary is stored in the source index under the 'summary' field.
+Summaries are generated inside the source's processing task, so they are
+normal calls - waiting on a Message Batch would hold a task worker and
+leave the source "processing" for as long as the batch takes.
 """
 from typing import Optional, Dict, Any, List
 from datetime import datetime
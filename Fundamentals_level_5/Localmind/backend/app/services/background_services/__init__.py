@@ -6,7 +6,9 @@ operations like async task execution, job queues, and thread pool management.
 
 Services:
 - task_service: Background task management using ThreadPoolExecutor
+- progress_service: Event bus for live processing progress (coalesced)
 """
 from app.services.background_services.task_service import task_service
+from app.services.background_services.progress_service import progress_service, ProgressTracker
 
-__all__ = ["task_service"]
+__all__ = ["task_service", "progress_service", "ProgressTracker"]
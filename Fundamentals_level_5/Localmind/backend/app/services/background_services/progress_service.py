@@ -0,0 +1,299 @@
+"""
+Progress Service - In-process event bus for live source processing progress.
+
+Educational Note: Source processing runs in background threads, and the
+frontend used to learn about it only by polling GET /sources for the
+"status" field - a large PDF showed "processing" for minutes with no
+detail. Services now publish progress events here (pages done, batches
+in flight, tokens used, ETA) and a bridge forwards them to SocketIO rooms,
+one room per project (see app/api/sources/progress_events.py).
+
+Coalescing:
+- A 300-page PDF with 20 workers finishes a batch every few hundred ms;
+  sending every event to every client would flood the socket
+- Progress events are keyed by (project_id, source_id) and only the
+  LATEST pending event per key is delivered, at most once per
+  COALESCE_SECONDS, by a single flusher thread
+- Final events (status changes, completed/failed) skip coalescing and are
+  delivered right away, after any pending progress for the same source
+
+The bus knows nothing about SocketIO - subscribers are plain callables,
+so services stay importable without a running server.
+
+Usage:
+    tracker = ProgressTracker(project_id, source_id, "extracting", total=120, unit="pages")
+    tracker.batch_started()
+    tracker.batch_finished(units=5, input_tokens=9000, output_tokens=4000)
+    tracker.finish()
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+
+# Minimum time between two deliveries of progress for the same source
+COALESCE_SECONDS = float(os.getenv("PROGRESS_COALESCE_SECONDS", "0.5"))
+
+Subscriber = Callable[[Dict[str, Any]], None]
+
+
+class ProgressService:
+    """
+    Publish/subscribe bus for processing events with per-source coalescing.
+
+    Educational Note: Subscribers run on the publisher's thread for final
+    events and on the flusher thread for coalesced progress, so they must
+    be quick and thread-safe (socketio.emit is both).
+    """
+
+    def __init__(self, coalesce_seconds: float = COALESCE_SECONDS):
+        """Initialize the bus (the flusher thread starts on first publish)."""
+        self.coalesce_seconds = coalesce_seconds
+        self._subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        # Held while delivering, so a final event can't overtake progress the
+        # flusher already picked up (lock order: _deliver_lock, then _lock)
+        self._deliver_lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # Latest event per source still in progress - sent to clients that join late
+        self._latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._flusher: Optional[threading.Thread] = None
+        self._stats = {"published": 0, "delivered": 0, "coalesced": 0}
+
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """
+        Register a subscriber for every delivered event.
+
+        Returns:
+            Function that unsubscribes the callback
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def publish(
+        self,
+        event_type: str,
+        project_id: str,
+        source_id: str,
+        final: bool = False,
+        **fields: Any
+    ) -> None:
+        """
+        Publish an event for a source.
+
+        Args:
+            event_type: Event name, e.g. "source_progress" or "source_updated"
+                        (the SocketIO bridge emits it under this name)
+            project_id: The project UUID (selects the SocketIO room)
+            source_id: The source UUID
+            final: Deliver immediately instead of coalescing
+            **fields: Event payload
+        """
+        event = {
+            "type": event_type,
+            "project_id": project_id,
+            "source_id": source_id,
+            "final": final,
+            "timestamp": datetime.now().isoformat(),
+            **fields
+        }
+        key = (project_id, source_id)
+
+        if not final:
+            with self._lock:
+                self._stats["published"] += 1
+                if not self._subscribers:
+                    return
+                if key in self._pending:
+                    self._stats["coalesced"] += 1
+                self._pending[key] = event
+                self._latest[key] = event
+                self._ensure_flusher()
+                self._wakeup.notify()
+            return
+
+        with self._deliver_lock:
+            with self._lock:
+                self._stats["published"] += 1
+                if event_type == "source_progress":
+                    self._latest.pop(key, None)
+                if not self._subscribers:
+                    return
+                # Flush this source's pending progress first so order is kept
+                to_deliver = [e for e in (self._pending.pop(key, None), event) if e]
+
+            for e in to_deliver:
+                self._deliver(e)
+
+    def _ensure_flusher(self) -> None:
+        """Start the flusher thread if needed. Caller holds lock."""
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, name="progress-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        """Deliver the latest pending event per source, once per interval."""
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._wakeup.wait()
+
+            with self._deliver_lock:
+                with self._lock:
+                    batch = list(self._pending.values())
+                    self._pending.clear()
+                for event in batch:
+                    self._deliver(event)
+            time.sleep(self.coalesce_seconds)
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        """Call every subscriber; a failing subscriber never breaks processing."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._stats["delivered"] += 1
+
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Progress subscriber failed: {e}")
+
+    def get_snapshot(self, project_id: str) -> List[Dict[str, Any]]:
+        """Latest progress event of every source still processing in a project."""
+        with self._lock:
+            return [event for (pid, _), event in self._latest.items() if pid == project_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get publish/delivery counters."""
+        with self._lock:
+            return {
+                **self._stats,
+                "subscribers": len(self._subscribers),
+                "in_progress": len(self._latest),
+                "coalesce_seconds": self.coalesce_seconds,
+            }
+
+
+class ProgressTracker:
+    """
+    Tracks one processing stage of a source and publishes its progress.
+
+    Educational Note: Services call batch_started()/batch_finished() around
+    their API calls; the tracker keeps the counters, sums token usage and
+    estimates the ETA from the throughput so far. Units already done when
+    the stage starts (text-layer pages, checkpointed pages) count toward
+    progress but not toward throughput, so a resumed run gets a fair ETA.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        source_id: str,
+        stage: str,
+        total: int,
+        unit: str = "pages",
+        batches_total: int = 0,
+        done: int = 0
+    ):
+        """
+        Start tracking a stage and publish its first event.
+
+        Args:
+            project_id: The project UUID
+            source_id: The source UUID
+            stage: Stage name ("extracting", "embedding", ...)
+            total: Total units (pages, slides, images, chunks)
+            unit: What a unit is, for display
+            batches_total: Number of API calls planned
+            done: Units already done before the stage started
+        """
+        self.project_id = project_id
+        self.source_id = source_id
+        self.stage = stage
+        self.unit = unit
+        self.total = total
+        self.done = done
+        self.batches_total = batches_total
+        self.batches_done = 0
+        self.batches_in_flight = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._initial_done = done
+        self._finished = False
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._publish()
+
+    def _eta_seconds(self) -> Optional[float]:
+        """Remaining time at the current rate (None until there is a rate)."""
+        processed = self.done - self._initial_done
+        if processed <= 0:
+            return None
+        elapsed = time.monotonic() - self._started
+        return round((self.total - self.done) * elapsed / processed, 1)
+
+    def _publish(self, final: bool = False, **extra: Any) -> None:
+        with self._lock:
+            # Workers still running after a cancel must not revive the stage
+            if self._finished and not final:
+                return
+            fields = {
+                "stage": self.stage,
+                "unit": self.unit,
+                "done": self.done,
+                "total": self.total,
+                "batches_done": self.batches_done,
+                "batches_total": self.batches_total,
+                "batches_in_flight": self.batches_in_flight,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "elapsed_seconds": round(time.monotonic() - self._started, 1),
+                "eta_seconds": self._eta_seconds(),
+                **extra
+            }
+        progress_service.publish("source_progress", self.project_id, self.source_id, final=final, **fields)
+
+    def batch_started(self) -> None:
+        """Record an API call going out."""
+        with self._lock:
+            self.batches_in_flight += 1
+        self._publish()
+
+    def batch_finished(self, units: int = 0, input_tokens: int = 0, output_tokens: int = 0) -> None:
+        """Record an API call coming back (units=0 for a failed batch)."""
+        with self._lock:
+            self.batches_in_flight = max(0, self.batches_in_flight - 1)
+            self.batches_done += 1
+            self.done = min(self.total, self.done + units)
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+        self._publish()
+
+    def advance(self, units: int = 1, **extra: Any) -> None:
+        """Record progress that isn't an API batch (e.g. a local step)."""
+        with self._lock:
+            self.done = min(self.total, self.done + units)
+        self._publish(**extra)
+
+    def finish(self, success: bool = True, error: Optional[str] = None) -> None:
+        """Publish the final event for this stage."""
+        with self._lock:
+            self._finished = True
+            self.batches_in_flight = 0
+            if success:
+                self.done = self.total
+        self._publish(final=True, status="completed" if success else "failed", error=error)
+
+
+# Singleton instance
+progress_service = ProgressService()
@@ -9,7 +9,11 @@ Services:
   - Builds dynamic system prompt with source and memory context
   - Manages tool use loop (search_sources, store_memory tools)
   - Logs all API calls for debugging
+- context_window_service: Token-budgeted message history for chat API calls
+  - Keeps recent turns verbatim, elides old tool results
+  - Folds older turns into a running summary (background task)
 """
 from app.services.chat_services.main_chat_service import main_chat_service
+from app.services.chat_services.context_window_service import context_window_service
 
-__all__ = ["main_chat_service"]
+__all__ = ["main_chat_service", "context_window_service"]
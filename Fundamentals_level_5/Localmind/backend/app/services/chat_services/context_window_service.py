@@ -0,0 +1,430 @@
+"""
+Context Window Service - Token-budgeted message history for chat API calls.
+
+Educational Note: Sending the whole chat history on every call means input
+tokens (cost + latency) grow without limit, and long chats eventually hit
+the model's context limit. Most of that weight is old tool_result blocks
+(search dumps) the model no longer needs verbatim.
+
+This service builds a bounded window instead:
+
+1. Split history into turns (a turn starts at each real user message)
+2. Keep the most recent turns verbatim (the current tool loop lives here)
+3. Elide the payload of tool_result blocks in older turns
+4. Replace turns already covered by the running summary with the summary
+5. If still over budget, drop the oldest turns
+6. When history approaches the budget, fold older turns into the running
+   summary in the background (chat_summary_service), so the next request
+   can drop them without losing their content
+
+Token counts are estimated locally with tiktoken (embedding_utils.count_tokens)
+- no API round trip per message.
+
+The running summary is cached in the chat file:
+    "context_summary": {
+        "summary": "...",
+        "through_message_id": "<id of last folded message>",
+        "folded_messages": 42,
+        "updated_at": "..."
+    }
+
+The per-chat budget is stored as "context_token_budget" in the chat file
+(set via PUT /projects/<id>/chats/<id>), falling back to DEFAULT_TOKEN_BUDGET.
+"""
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.services.data_services import message_service
+from app.services.ai_services.chat_summary_service import chat_summary_service
+from app.services.background_services import task_service
+from app.utils.embedding_utils import count_tokens
+
+
+class ContextWindowService:
+    """
+    Service for fitting chat history into a per-chat token budget.
+
+    Educational Note: Only the message array is budgeted here. The system
+    prompt and tool definitions are sent on top, so the default budget
+    leaves plenty of headroom below the model's context limit.
+    """
+
+    # Default message-history budget (tokens) when the chat doesn't set one
+    DEFAULT_TOKEN_BUDGET = 60000
+
+    # Smallest budget a chat may configure (below this, answers degrade)
+    MIN_TOKEN_BUDGET = 4000
+
+    # Number of most recent turns that are always sent verbatim
+    RECENT_TURNS = 2
+
+    # Characters kept from each tool_result in older turns
+    ELIDED_TOOL_RESULT_CHARS = 400
+
+    # Start folding older turns into the summary above this share of the budget
+    SUMMARY_TRIGGER_RATIO = 0.75
+
+    # After folding, aim for history to fill at most this share of the budget
+    SUMMARY_TARGET_RATIO = 0.5
+
+    # Rough per-message overhead (role, block framing)
+    MESSAGE_OVERHEAD_TOKENS = 4
+
+    # Max cached per-message token estimates
+    MAX_TOKEN_CACHE_ENTRIES = 5000
+
+    def __init__(self):
+        """Initialize the service."""
+        # Token estimates keyed by (message_id, elided)
+        self._token_cache: Dict[Tuple[str, bool], int] = {}
+        # Chats with a summary task queued or running ("project_id:chat_id")
+        self._pending_summaries: set = set()
+        self._lock = threading.Lock()
+
+    # =========================================================================
+    # Budget
+    # =========================================================================
+
+    def get_token_budget(self, chat_data: Dict[str, Any]) -> int:
+        """
+        Get the message-history token budget for a chat.
+
+        Args:
+            chat_data: Raw chat data from message_service.get_chat_data()
+
+        Returns:
+            Budget in tokens
+        """
+        budget = chat_data.get("context_token_budget")
+        if not isinstance(budget, int) or budget <= 0:
+            return self.DEFAULT_TOKEN_BUDGET
+        return max(budget, self.MIN_TOKEN_BUDGET)
+
+    # =========================================================================
+    # Token estimation
+    # =========================================================================
+
+    def estimate_content_tokens(self, content: Any) -> int:
+        """
+        Estimate tokens for message content (string or list of blocks).
+
+        Educational Note: Structured blocks are counted on their text or
+        JSON form - close enough for budgeting, and fully local.
+        """
+        if isinstance(content, str):
+            return count_tokens(content)
+
+        total = 0
+        for block in content or []:
+            block_type = block.get("type")
+            if block_type == "text":
+                total += count_tokens(block.get("text", ""))
+            elif block_type == "tool_use":
+                total += count_tokens(block.get("name", ""))
+                total += count_tokens(json.dumps(block.get("input", {}), ensure_ascii=False))
+            elif block_type == "tool_result":
+                result = block.get("content", "")
+                if not isinstance(result, str):
+                    result = json.dumps(result, ensure_ascii=False)
+                total += count_tokens(result)
+            else:
+                total += count_tokens(json.dumps(block, ensure_ascii=False))
+        return total
+
+    def _estimate_message_tokens(self, stored_msg: Dict[str, Any], api_msg: Dict[str, Any], elided: bool) -> int:
+        """Estimate tokens for one API message, cached by stored message id."""
+        msg_id = stored_msg.get("id")
+        key = (msg_id, elided)
+
+        if msg_id and key in self._token_cache:
+            return self._token_cache[key]
+
+        tokens = self.estimate_content_tokens(api_msg["content"]) + self.MESSAGE_OVERHEAD_TOKENS
+
+        if msg_id:
+            if len(self._token_cache) >= self.MAX_TOKEN_CACHE_ENTRIES:
+                self._token_cache.clear()
+            self._token_cache[key] = tokens
+
+        return tokens
+
+    # =========================================================================
+    # Turn handling
+    # =========================================================================
+
+    def _split_turns(self, messages: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        Split stored messages into turns, returned as lists of indices.
+
+        Educational Note: A turn starts at each user message with string
+        content (what the user typed). tool_result messages are also
+        role=user but have list content, so they stay inside the turn of
+        the tool_use they answer - cutting between a tool_use and its
+        tool_result would make the API reject the request.
+        """
+        turns: List[List[int]] = []
+
+        for i, msg in enumerate(messages):
+            starts_turn = msg.get("role") == "user" and isinstance(msg.get("content"), str)
+            if starts_turn or not turns:
+                turns.append([i])
+            else:
+                turns[-1].append(i)
+
+        return turns
+
+    def _elide_tool_results(self, content: Any) -> Any:
+        """
+        Shorten tool_result payloads in an older message.
+
+        Educational Note: The tool_result block itself must stay (the API
+        requires a result for every tool_use id), only its payload shrinks.
+        """
+        if not isinstance(content, list):
+            return content
+
+        elided = []
+        for block in content:
+            if block.get("type") == "tool_result":
+                result = block.get("content", "")
+                if not isinstance(result, str):
+                    result = json.dumps(result, ensure_ascii=False)
+                if len(result) > self.ELIDED_TOOL_RESULT_CHARS:
+                    block = dict(block)
+                    block["content"] = (
+                        result[:self.ELIDED_TOOL_RESULT_CHARS]
+                        + f"\n[... {len(result) - self.ELIDED_TOOL_RESULT_CHARS} chars of earlier tool result elided ...]"
+                    )
+            elided.append(block)
+        return elided
+
+    def _find_message_index(self, messages: List[Dict[str, Any]], message_id: Optional[str]) -> int:
+        """Find a message index by id (-1 if missing)."""
+        if not message_id:
+            return -1
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i].get("id") == message_id:
+                return i
+        return -1
+
+    def _prepend_summary(self, api_message: Dict[str, str], summary: str) -> Dict[str, Any]:
+        """Attach the running summary to the first message of the window."""
+        summary_block = {
+            "type": "text",
+            "text": (
+                "[Summary of the earlier part of this conversation]\n"
+                f"{summary}\n"
+                "[End of summary - the conversation continues below]"
+            )
+        }
+
+        content = api_message["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+
+        return {"role": api_message["role"], "content": [summary_block] + list(content)}
+
+    # =========================================================================
+    # Window building
+    # =========================================================================
+
+    def fit_messages(
+        self,
+        messages: List[Dict[str, Any]],
+        token_budget: int,
+        summary_info: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Fit stored messages into a token budget.
+
+        Args:
+            messages: Stored chat messages (with ids), oldest first
+            token_budget: Message-history budget in tokens
+            summary_info: Cached running summary ("context_summary" field)
+
+        Returns:
+            Tuple of (api_messages, stats). stats["fold_through_index"] is
+            the index up to which the summary should be extended (or -1).
+        """
+        summary_info = summary_info or {}
+        summary_text = summary_info.get("summary") or ""
+        covered_index = self._find_message_index(messages, summary_info.get("through_message_id"))
+        if covered_index < 0:
+            summary_text = ""
+
+        turns = self._split_turns(messages)
+        recent_start = max(0, len(turns) - self.RECENT_TURNS)
+
+        # Build API form + token estimate per turn
+        turn_api: List[List[Dict[str, Any]]] = []
+        turn_tokens: List[int] = []
+        for turn_pos, indices in enumerate(turns):
+            elided = turn_pos < recent_start
+            api_msgs = []
+            tokens = 0
+            for i in indices:
+                stored = messages[i]
+                content = self._elide_tool_results(stored["content"]) if elided else stored["content"]
+                api_msg = {"role": stored["role"], "content": content}
+                api_msgs.append(api_msg)
+                tokens += self._estimate_message_tokens(stored, api_msg, elided)
+            turn_api.append(api_msgs)
+            turn_tokens.append(tokens)
+
+        # Older turns fully covered by the summary are folded
+        first_kept = 0
+        while first_kept < recent_start and turns[first_kept][-1] <= covered_index:
+            first_kept += 1
+
+        summary_tokens = count_tokens(summary_text) if first_kept > 0 and summary_text else 0
+        total = summary_tokens + sum(turn_tokens[first_kept:])
+
+        # Hard limit: drop oldest older turns until we fit
+        while total > token_budget and first_kept < recent_start:
+            total -= turn_tokens[first_kept]
+            first_kept += 1
+
+        # Soft limit: schedule folding so the next requests stay under budget
+        fold_through_index = -1
+        if first_kept > 0 and turns[first_kept - 1][-1] > covered_index:
+            fold_through_index = turns[first_kept - 1][-1]
+        elif total > token_budget * self.SUMMARY_TRIGGER_RATIO:
+            target = token_budget * self.SUMMARY_TARGET_RATIO
+            projected = total
+            fold_pos = first_kept
+            while projected > target and fold_pos < recent_start:
+                projected -= turn_tokens[fold_pos]
+                fold_pos += 1
+            if fold_pos > first_kept:
+                fold_through_index = turns[fold_pos - 1][-1]
+
+        # Assemble window
+        api_messages = [msg for turn in turn_api[first_kept:] for msg in turn]
+        if first_kept > 0 and summary_text and api_messages:
+            api_messages[0] = self._prepend_summary(api_messages[0], summary_text)
+
+        stats = {
+            "total_messages": len(messages),
+            "window_messages": len(api_messages),
+            "dropped_turns": first_kept,
+            "estimated_tokens": total,
+            "token_budget": token_budget,
+            "summary_used": bool(first_kept > 0 and summary_text),
+            "fold_through_index": fold_through_index,
+        }
+
+        if total > token_budget:
+            print(f"WARNING: Recent turns alone exceed context budget (~{total}/{token_budget} tokens)")
+
+        return api_messages, stats
+
+    def build_api_messages(self, project_id: str, chat_id: str) -> List[Dict[str, Any]]:
+        """
+        Build the token-budgeted message array for a chat.
+
+        Educational Note: Drop-in replacement for
+        message_service.build_api_messages() in the chat loop. Also kicks
+        off a background summary update when the window starts to fill.
+
+        Args:
+            project_id: The project UUID
+            chat_id: The chat UUID
+
+        Returns:
+            List of message dicts ready for Claude API
+        """
+        chat_data = message_service.get_chat_data(project_id, chat_id)
+        if not chat_data:
+            return []
+
+        messages = chat_data.get("messages", [])
+        api_messages, stats = self.fit_messages(
+            messages,
+            self.get_token_budget(chat_data),
+            chat_data.get("context_summary")
+        )
+
+        if stats["dropped_turns"]:
+            print(
+                f"Context window: {stats['window_messages']}/{stats['total_messages']} messages, "
+                f"~{stats['estimated_tokens']} tokens (budget {stats['token_budget']}, "
+                f"summary={'yes' if stats['summary_used'] else 'no'})"
+            )
+
+        if stats["fold_through_index"] >= 0:
+            self._schedule_summary(project_id, chat_id, messages[stats["fold_through_index"]]["id"])
+
+        return api_messages
+
+    # =========================================================================
+    # Running summary (background)
+    # =========================================================================
+
+    def _schedule_summary(self, project_id: str, chat_id: str, through_message_id: str) -> None:
+        """Queue a background summary update unless one is already pending."""
+        key = f"{project_id}:{chat_id}"
+
+        with self._lock:
+            if key in self._pending_summaries:
+                return
+            self._pending_summaries.add(key)
+
+        task_service.submit_task(
+            "chat_summary",
+            chat_id,
+            self._update_summary,
+            project_id,
+            chat_id,
+            through_message_id
+        )
+
+    def _update_summary(self, project_id: str, chat_id: str, through_message_id: str) -> None:
+        """
+        Fold messages up to through_message_id into the running summary.
+
+        Educational Note: Runs in the background task pool. Re-reads the chat
+        so it always folds from the currently cached summary point.
+        """
+        key = f"{project_id}:{chat_id}"
+
+        try:
+            chat_data = message_service.get_chat_data(project_id, chat_id)
+            if not chat_data:
+                return
+
+            messages = chat_data.get("messages", [])
+            summary_info = chat_data.get("context_summary") or {}
+
+            start = self._find_message_index(messages, summary_info.get("through_message_id")) + 1
+            end = self._find_message_index(messages, through_message_id)
+            if end < start:
+                return
+
+            existing_summary = summary_info.get("summary") if start > 0 else None
+            summary = chat_summary_service.generate_summary(
+                messages[start:end + 1],
+                existing_summary=existing_summary,
+                project_id=project_id
+            )
+            if not summary:
+                return
+
+            message_service.update_chat_metadata(project_id, chat_id, {
+                "context_summary": {
+                    "summary": summary,
+                    "through_message_id": through_message_id,
+                    "folded_messages": end + 1,
+                    "updated_at": datetime.now().isoformat()
+                }
+            })
+            print(f"Chat {chat_id}: folded {end + 1} messages into running summary")
+
+        finally:
+            with self._lock:
+                self._pending_summaries.discard(key)
+
+
+# Singleton instance
+context_window_service = ContextWindowService()
@@ -12,12 +12,21 @@ Message Flow:
 4. Repeat 2-3 until Claude gives text response
 
 The service uses message_service for all message handling and tool parsing.
+
+Sync vs Async:
+- send_message(): threaded Flask path (run.py), one thread per chat request
+- send_message_async(): ASGI path (asgi.py), awaits Claude instead of
+  holding a thread for the whole tool loop; file I/O and sync tool
+  executors are pushed to worker threads with asyncio.to_thread
+Both share the same setup/teardown helpers so they store identical messages.
 """
+import asyncio
 from typing import Dict, Any, Tuple, List, Optional
 
 from app.services.data_services import chat_service
 from app.services.integrations.claude import claude_service
 from app.services.data_services import message_service
+from app.services.chat_services.context_window_service import context_window_service
 from app.config import prompt_loader, tool_loader, context_loader
 from app.services.tool_executors import source_search_executor
 from app.services.tool_executors import memory_executor
@@ -104,9 +113,10 @@ class MainChatService:
         """
         Build system prompt with memory and source context appended.
 
-        Educational Note: Context is rebuilt on every message to reflect
-        current state (memory updates, active/inactive sources).
-        Includes both memory context (personalization) and source context (tools).
+        Educational Note: context_loader serves the context from a per-project
+        cache that is invalidated when sources or memory change, so the prompt
+        is byte-identical across messages until something actually changes.
+        Includes both source context (tools) and memory context (personalization).
         """
         full_context = context_loader.build_full_context(project_id)
         if full_context:
@@ -136,10 +146,7 @@ class MainChatService:
                 keywords=tool_input.get("keywords"),
                 query=tool_input.get("query")
             )
-            if result.get("success"):
-                return result.get("content", "No content found")
-            else:
-                return f"Error: {result.get('error', 'Unknown error')}"
+            return self._format_search_result(result)
 
         elif tool_name == "store_memory":
             # Memory tool returns immediately, actual update happens in background
@@ -189,43 +196,82 @@ class MainChatService:
         else:
             return f"Unknown tool: {tool_name}"
 
-    def send_message(
+    def _format_search_result(self, result: Dict[str, Any]) -> str:
+        """Convert a search_sources executor result into tool_result text."""
+        if result.get("success"):
+            return result.get("content", "No content found")
+        return f"Error: {result.get('error', 'Unknown error')}"
+
+    async def _execute_tool_async(
         self,
         project_id: str,
         chat_id: str,
-        user_message_text: str
-    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        tool_name: str,
+        tool_input: Dict[str, Any]
+    ) -> str:
         """
-        Process a user message and get AI response.
+        Async version of _execute_tool().
 
-        Educational Note: This method handles the complete message flow:
-        1. Store user message
-        2. Build context and call Claude
-        3. If tool_use: execute tool, send result, call again
-        4. When text response: store and return
+        Educational Note: search_sources has a native async path (query
+        embedding on the async OpenAI client). The other executors are sync
+        and either return immediately (memory, studio_signal queue background
+        tasks) or run their own Claude loop (csv analyzer), so they run in a
+        worker thread.
+        """
+        if tool_name == "search_sources":
+            result = await source_search_executor.execute_async(
+                project_id=project_id,
+                source_id=tool_input.get("source_id", ""),
+                keywords=tool_input.get("keywords"),
+                query=tool_input.get("query")
+            )
+            return self._format_search_result(result)
 
-        Args:
-            project_id: The project UUID
-            chat_id: The chat UUID
-            user_message_text: The user's message text
+        return await asyncio.to_thread(
+            self._execute_tool, project_id, chat_id, tool_name, tool_input
+        )
+
+    def _start_turn(
+        self,
+        project_id: str,
+        chat_id: str,
+        user_message_text: str
+    ) -> Dict[str, Any]:
+        """
+        Store the user message and build the per-turn Claude configuration.
+
+        Educational Note: The chat is loaded once into an in-memory session
+        (message_service's session cache). The user message is only appended
+        in memory here - it is flushed with the first tool iteration.
+        Flushes go through message_service by chat ID rather than a session
+        object held for the whole turn: if the cache evicts the session
+        mid-turn (writing it out), later messages land in a fresh session
+        and a held reference would flush nothing.
 
         Returns:
-            Tuple of (user_message_dict, assistant_message_dict)
+            Dict with is_first_message, user_msg and claude_params
+            (everything except messages for claude_service.send_message)
+
+        Raises:
+            ValueError: If the chat doesn't exist
         """
-        # Verify chat exists
-        chat = chat_service.get_chat(project_id, chat_id)
-        if not chat:
+        # Verify chat exists (loads the chat session once for this request)
+        session = message_service.get_session(project_id, chat_id)
+        if not session:
             raise ValueError("Chat not found")
+        is_first_message = session.message_count == 0
 
-        # Step 1: Store user message
-        user_msg = message_service.add_user_message(project_id, chat_id, user_message_text)
+        # Store user message (flushed with the first tool iteration)
+        user_msg = message_service.add_user_message(
+            project_id, chat_id, user_message_text, flush=False
+        )
 
-        # Step 2: Get config and build system prompt
+        # Get config and build system prompt
         prompt_config = prompt_loader.get_project_prompt_config(project_id)
         base_prompt = prompt_config.get("system_prompt", "")
         system_prompt = self._build_system_prompt(project_id, base_prompt)
 
-        # Step 3: Get tools (memory always available, search for non-CSV, analyzer for CSV)
+        # Get tools (memory always available, search for non-CSV, analyzer for CSV)
         active_sources = context_loader.get_active_sources(project_id)
         # Separate CSV sources from other sources
         csv_sources = [s for s in active_sources if s.get("file_extension") == ".csv"]
@@ -235,25 +281,185 @@ class MainChatService:
             has_csv_sources=bool(csv_sources)
         )
 
-        try:
-            # Step 4: Build messages and call Claude
-            api_messages = message_service.build_api_messages(project_id, chat_id)
-
-            response = claude_service.send_message(
-                messages=api_messages,
-                system_prompt=system_prompt,
-                model=prompt_config.get("model"),
-                max_tokens=prompt_config.get("max_tokens"),
-                temperature=prompt_config.get("temperature"),
-                tools=tools,
-                project_id=project_id
+        return {
+            "is_first_message": is_first_message,
+            "user_msg": user_msg,
+            "claude_params": {
+                "system_prompt": system_prompt,
+                "model": prompt_config.get("model"),
+                "max_tokens": prompt_config.get("max_tokens"),
+                "temperature": prompt_config.get("temperature"),
+                "tools": tools,
+                "project_id": project_id,
+                "cache_system_prompt": True,
+                "interactive": True,
+            },
+        }
+
+    def _store_tool_use(
+        self,
+        project_id: str,
+        chat_id: str,
+        response: Dict[str, Any],
+        accumulated_text_parts: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Record an assistant tool_use response and return its tool_use blocks.
+
+        Educational Note: Claude can respond with text + tool_use together.
+        The text is the actual response to show the user, so it is collected
+        into accumulated_text_parts before the blocks are stored. The message
+        chain must be:
+        user -> assistant (tool_use[]) -> user (tool_result[]) -> assistant
+        so the tool_use response is stored before any tool_result.
+
+        Returns:
+            tool_use blocks (empty list if there is nothing to execute)
+        """
+        # Get tool_use blocks from response (can be multiple for parallel tool calls)
+        tool_use_blocks = claude_parsing_utils.extract_tool_use_blocks(response)
+
+        if not tool_use_blocks:
+            return []
+
+        response_text = claude_parsing_utils.extract_text(response)
+        if response_text.strip():
+            accumulated_text_parts.append(response_text)
+
+        serialized_content = claude_parsing_utils.serialize_content_blocks(
+            response.get("content_blocks", [])
+        )
+        message_service.add_message(
+            project_id=project_id,
+            chat_id=chat_id,
+            role="assistant",
+            content=serialized_content,
+            flush=False
+        )
+
+        return tool_use_blocks
+
+    def _log_follow_up(self, project_id: str, chat_id: str, api_messages: List[Dict[str, Any]]) -> None:
+        """Debug: Log message count before a follow-up API call."""
+        print(f"Follow-up API call: {len(api_messages)} messages")
+        if not api_messages:
+            print("ERROR: api_messages is empty!")
+            # Try reloading messages to debug
+            debug_messages = message_service.get_messages(project_id, chat_id)
+            print(f"  Raw messages in chat: {len(debug_messages)}")
+            for i, m in enumerate(debug_messages):
+                print(f"  [{i}] role={m.get('role')}, content_type={type(m.get('content')).__name__}")
+
+    def _store_final_response(
+        self,
+        project_id: str,
+        chat_id: str,
+        response: Dict[str, Any],
+        accumulated_text_parts: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Store the final assistant text response.
+
+        Educational Note: When Claude sends text + tool_use, the text comes first.
+        After tool execution, Claude may respond with more text OR empty (nothing to add).
+        We combine all text parts to show the complete response to the user.
+        """
+        # Get text from final response (may be empty if Claude sent text + tool_use earlier)
+        final_response_text = claude_parsing_utils.extract_text(response)
+        if final_response_text.strip():
+            accumulated_text_parts.append(final_response_text)
+
+        final_text = "\n\n".join(accumulated_text_parts) if accumulated_text_parts else ""
+
+        return message_service.add_assistant_message(
+            project_id=project_id,
+            chat_id=chat_id,
+            content=final_text if final_text.strip() else "I've processed your request.",
+            model=response.get("model"),
+            tokens=response.get("usage"),
+            flush=False
+        )
+
+    def _store_error_response(self, project_id: str, chat_id: str, api_error: Exception) -> Dict[str, Any]:
+        """Store an error message as the assistant response."""
+        return message_service.add_assistant_message(
+            project_id=project_id,
+            chat_id=chat_id,
+            content=f"Sorry, I encountered an error: {str(api_error)}",
+            error=True,
+            flush=False
+        )
+
+    def _finish_turn(
+        self,
+        project_id: str,
+        chat_id: str,
+        turn: Dict[str, Any],
+        user_message_text: str
+    ) -> None:
+        """
+        Flush the chat, sync the chat index and queue auto-naming.
+
+        Educational Note: We check if the chat had no messages before this one.
+        The naming runs in background so it doesn't block the response.
+        """
+        # Write the final messages to disk
+        message_service.flush_chat(project_id, chat_id)
+
+        # Sync chat index (served from the in-memory session)
+        chat_service.sync_chat_to_index(project_id, chat_id)
+
+        # Auto-rename chat on first message (background task)
+        if turn["is_first_message"]:
+            task_service.submit_task(
+                "chat_naming",
+                chat_id,
+                self._generate_and_update_chat_title,
+                project_id,
+                chat_id,
+                user_message_text
             )
 
-            # Step 5: Handle tool use loop
+    def send_message(
+        self,
+        project_id: str,
+        chat_id: str,
+        user_message_text: str
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Process a user message and get AI response.
+
+        Educational Note: This method handles the complete message flow:
+        1. Store user message
+        2. Build context and call Claude
+        3. If tool_use: execute tool, send result, call again
+        4. When text response: store and return
+
+        The chat is loaded once into an in-memory session (message_service's
+        session cache). Messages are appended in memory and written to disk
+        once per tool iteration instead of once per message.
+
+        Args:
+            project_id: The project UUID
+            chat_id: The chat UUID
+            user_message_text: The user's message text
+
+        Returns:
+            Tuple of (user_message_dict, assistant_message_dict)
+        """
+        turn = self._start_turn(project_id, chat_id, user_message_text)
+        claude_params = turn["claude_params"]
+
+        try:
+            # Build token-budgeted messages and call Claude
+            # Educational Note: context_window_service keeps recent turns verbatim,
+            # elides old tool results and folds old turns into a running summary.
+            api_messages = context_window_service.build_api_messages(project_id, chat_id)
+            response = claude_service.send_message(messages=api_messages, **claude_params)
+
+            # Handle tool use loop
             # Educational Note: When Claude wants to use tools, stop_reason is "tool_use".
             # We must execute tools and send back tool_result for each tool_use block.
-            # Important: Claude can respond with text + tool_use together. The text is
-            # the response to the user, the tool_use is for background processing.
             # We accumulate text from all responses so we don't lose it.
             iteration = 0
             accumulated_text_parts = []
@@ -261,122 +467,126 @@ class MainChatService:
             while claude_parsing_utils.is_tool_use(response) and iteration < self.MAX_TOOL_ITERATIONS:
                 iteration += 1
 
-                # Get tool_use blocks from response (can be multiple for parallel tool calls)
-                tool_use_blocks = claude_parsing_utils.extract_tool_use_blocks(response)
-
+                tool_use_blocks = self._store_tool_use(
+                    project_id, chat_id, response, accumulated_text_parts
+                )
                 if not tool_use_blocks:
                     break
 
-                # Extract text from this response BEFORE storing
-                # Educational Note: Claude can respond with text + tool_use together.
-                # The text is the actual response to show the user!
-                response_text = claude_parsing_utils.extract_text(response)
-                if response_text.strip():
-                    accumulated_text_parts.append(response_text)
-
-                # Store the assistant's tool_use response
-                # Educational Note: The message chain must be:
-                # user -> assistant (tool_use[]) -> user (tool_result[]) -> assistant
-                # We must store the tool_use response before the tool_result
-                serialized_content = claude_parsing_utils.serialize_content_blocks(
-                    response.get("content_blocks", [])
-                )
-                message_service.add_message(
-                    project_id=project_id,
-                    chat_id=chat_id,
-                    role="assistant",
-                    content=serialized_content
-                )
-
                 # Execute each tool and add results
                 for tool_block in tool_use_blocks:
-                    tool_id = tool_block.get("id")
-                    tool_name = tool_block.get("name")
                     tool_input = tool_block.get("input", {})
+                    print(f"Executing tool: {tool_block.get('name')} for source: {tool_input.get('source_id', 'unknown')}")
 
-                    print(f"Executing tool: {tool_name} for source: {tool_input.get('source_id', 'unknown')}")
-
-                    # Execute tool
-                    result = self._execute_tool(project_id, chat_id, tool_name, tool_input)
+                    result = self._execute_tool(project_id, chat_id, tool_block.get("name"), tool_input)
 
                     # Add tool result as user message
                     message_service.add_tool_result_message(
                         project_id=project_id,
                         chat_id=chat_id,
-                        tool_use_id=tool_id,
-                        result=result
+                        tool_use_id=tool_block.get("id"),
+                        result=result,
+                        flush=False
                     )
 
-                # Rebuild messages and call Claude again
-                api_messages = message_service.build_api_messages(project_id, chat_id)
-
-                # Debug: Log message count before follow-up API call
-                print(f"Follow-up API call: {len(api_messages)} messages")
-                if not api_messages:
-                    print("ERROR: api_messages is empty!")
-                    # Try reloading messages to debug
-                    debug_messages = message_service.get_messages(project_id, chat_id)
-                    print(f"  Raw messages in chat: {len(debug_messages)}")
-                    for i, m in enumerate(debug_messages):
-                        print(f"  [{i}] role={m.get('role')}, content_type={type(m.get('content')).__name__}")
-
-                response = claude_service.send_message(
-                    messages=api_messages,
-                    system_prompt=system_prompt,
-                    model=prompt_config.get("model"),
-                    max_tokens=prompt_config.get("max_tokens"),
-                    temperature=prompt_config.get("temperature"),
-                    tools=tools,
-                    project_id=project_id
-                )
+                # Write this iteration's messages to disk in one go
+                message_service.flush_chat(project_id, chat_id)
 
-            # Step 6: Store final text response
-            # Get text from final response (may be empty if Claude sent text + tool_use earlier)
-            final_response_text = claude_parsing_utils.extract_text(response)
-            if final_response_text.strip():
-                accumulated_text_parts.append(final_response_text)
-
-            # Combine all accumulated text
-            # Educational Note: When Claude sends text + tool_use, the text comes first.
-            # After tool execution, Claude may respond with more text OR empty (nothing to add).
-            # We combine all text parts to show the complete response to the user.
-            final_text = "\n\n".join(accumulated_text_parts) if accumulated_text_parts else ""
+                # Rebuild messages and call Claude again
+                api_messages = context_window_service.build_api_messages(project_id, chat_id)
+                self._log_follow_up(project_id, chat_id, api_messages)
+                response = claude_service.send_message(messages=api_messages, **claude_params)
 
-            assistant_msg = message_service.add_assistant_message(
-                project_id=project_id,
-                chat_id=chat_id,
-                content=final_text if final_text.strip() else "I've processed your request.",
-                model=response.get("model"),
-                tokens=response.get("usage")
+            assistant_msg = self._store_final_response(
+                project_id, chat_id, response, accumulated_text_parts
             )
 
         except Exception as api_error:
-            # Store error message
-            assistant_msg = message_service.add_assistant_message(
-                project_id=project_id,
-                chat_id=chat_id,
-                content=f"Sorry, I encountered an error: {str(api_error)}",
-                error=True
+            assistant_msg = self._store_error_response(project_id, chat_id, api_error)
+
+        self._finish_turn(project_id, chat_id, turn, user_message_text)
+
+        return turn["user_msg"], assistant_msg
+
+    async def send_message_async(
+        self,
+        project_id: str,
+        chat_id: str,
+        user_message_text: str
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Async version of send_message() used by the ASGI server (asgi.py).
+
+        Educational Note: The flow is identical to send_message(), but the
+        request never owns a thread while waiting on Claude:
+        - Claude calls are awaited on the shared async client
+        - search_sources awaits its query embedding on the async OpenAI client
+        - Session loads/flushes, context building and sync tool executors run
+          in worker threads (asyncio.to_thread) so they don't stall the loop
+
+        Args:
+            project_id: The project UUID
+            chat_id: The chat UUID
+            user_message_text: The user's message text
+
+        Returns:
+            Tuple of (user_message_dict, assistant_message_dict)
+        """
+        turn = await asyncio.to_thread(self._start_turn, project_id, chat_id, user_message_text)
+        claude_params = turn["claude_params"]
+
+        try:
+            api_messages = await asyncio.to_thread(
+                context_window_service.build_api_messages, project_id, chat_id
             )
+            response = await claude_service.send_message_async(messages=api_messages, **claude_params)
 
-        # Step 7: Sync chat index
-        chat_service.sync_chat_to_index(project_id, chat_id)
+            iteration = 0
+            accumulated_text_parts = []
 
-        # Step 8: Auto-rename chat on first message (background task)
-        # Educational Note: We check if the chat had no messages before this one.
-        # The naming runs in background so it doesn't block the response.
-        if chat.get("message_count", 0) == 0:
-            # Submit naming task to background
-            task_service.submit_task(
-                "chat_naming",
-                chat_id,
-                self._generate_and_update_chat_title,
-                project_id,
-                chat_id,
-                user_message_text
+            while claude_parsing_utils.is_tool_use(response) and iteration < self.MAX_TOOL_ITERATIONS:
+                iteration += 1
+
+                tool_use_blocks = self._store_tool_use(
+                    project_id, chat_id, response, accumulated_text_parts
+                )
+                if not tool_use_blocks:
+                    break
+
+                for tool_block in tool_use_blocks:
+                    tool_input = tool_block.get("input", {})
+                    print(f"Executing tool: {tool_block.get('name')} for source: {tool_input.get('source_id', 'unknown')}")
+
+                    result = await self._execute_tool_async(
+                        project_id, chat_id, tool_block.get("name"), tool_input
+                    )
+
+                    message_service.add_tool_result_message(
+                        project_id=project_id,
+                        chat_id=chat_id,
+                        tool_use_id=tool_block.get("id"),
+                        result=result,
+                        flush=False
+                    )
+
+                await asyncio.to_thread(message_service.flush_chat, project_id, chat_id)
+
+                api_messages = await asyncio.to_thread(
+                    context_window_service.build_api_messages, project_id, chat_id
+                )
+                self._log_follow_up(project_id, chat_id, api_messages)
+                response = await claude_service.send_message_async(messages=api_messages, **claude_params)
+
+            assistant_msg = self._store_final_response(
+                project_id, chat_id, response, accumulated_text_parts
             )
 
-        return user_msg, assistant_msg
+        except Exception as api_error:
+            assistant_msg = self._store_error_response(project_id, chat_id, api_error)
+
+        await asyncio.to_thread(self._finish_turn, project_id, chat_id, turn, user_message_text)
+
+        return turn["user_msg"], assistant_msg
 
     def _generate_and_update_chat_title(
         self,
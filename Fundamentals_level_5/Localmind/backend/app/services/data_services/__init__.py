@@ -9,6 +9,8 @@ Services:
 - chat_service: Chat CRUD operations (create, list, get, update, delete)
 - project_service: Project CRUD operations and settings management
 - message_service: Message persistence, context building, and tool response parsing
+  - Owns the chat session cache (chat_session.py): bounded LRU of in-memory
+    chats with dirty tracking, shared by all chat readers and writers
 
 These services typically:
 - Work with JSON files for persistence
@@ -0,0 +1,280 @@
+"""
+Chat Message Index - Byte offsets of every message inside a chat file.
+
+Educational Note: A chat file is one JSON document. To show the last 50
+messages of a 900-message chat, json.load() still has to parse all 900
+(including megabytes of tool_result text). The offsets index avoids that.
+
+How it works:
+- Chat files are written with "messages" as the last key and one message
+  per block, and we record the [start, end) byte range of each message
+- The ranges are saved next to the chat file as {chat_id}.offsets.json,
+  together with the chat file's (mtime_ns, size) at write time
+- Reading a page = read the small index, seek to the first message of the
+  page, read just that byte range and json.loads() each message
+
+If the index is missing or stale (legacy file, file written by something
+else), it is rebuilt by scanning the chat file once with raw_decode - the
+chat file itself is never rewritten by a reader.
+
+Index entry:
+    {"id", "role", "kind": "text" | "tool", "timestamp", "start", "end"}
+"kind" is "tool" for tool_use/tool_result messages (list content).
+"""
+import json
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+
+class ChatMessageIndex:
+    """
+    Writes chat files with a message offsets index and reads message ranges.
+
+    Educational Note: Files are written with json's default ensure_ascii=True,
+    so they are pure ASCII and character offsets equal byte offsets. The
+    scanner still converts properly for files containing raw UTF-8.
+    """
+
+    INDEX_VERSION = 1
+
+    def get_index_file(self, chat_file: Path) -> Path:
+        """Get the path of a chat file's offsets index."""
+        return chat_file.with_name(f"{chat_file.stem}.offsets.json")
+
+    def _get_file_version(self, path: Path) -> Optional[List[int]]:
+        """Get [mtime_ns, size] of a file, or None if missing."""
+        try:
+            stat = path.stat()
+            return [stat.st_mtime_ns, stat.st_size]
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _entry(message: Dict[str, Any], start: int, end: int) -> Dict[str, Any]:
+        """Build an index entry for a message stored at [start, end)."""
+        return {
+            "id": message.get("id"),
+            "role": message.get("role"),
+            "kind": "text" if isinstance(message.get("content"), str) else "tool",
+            "timestamp": message.get("timestamp"),
+            "start": start,
+            "end": end,
+        }
+
+    # =========================================================================
+    # Writing
+    # =========================================================================
+
+    def serialize_chat(self, data: Dict[str, Any]) -> Tuple[bytes, List[Dict[str, Any]]]:
+        """
+        Serialize chat data to JSON bytes and record each message's byte range.
+
+        Educational Note: The output is the same pretty-printed JSON as
+        json.dump(data, indent=2), except "messages" is moved to the end.
+
+        Returns:
+            Tuple of (file bytes, index entries)
+        """
+        header = {k: v for k, v in data.items() if k != "messages"}
+        messages = data.get("messages", [])
+
+        if header:
+            # Reopen the header object: drop its closing "\n}"
+            prefix = json.dumps(header, indent=2)[:-2] + ',\n  "messages": ['
+        else:
+            prefix = '{\n  "messages": ['
+
+        parts = [prefix.encode("utf-8")]
+        offset = len(parts[0])
+        entries = []
+
+        for i, message in enumerate(messages):
+            lead = ("," if i else "") + "\n    "
+            body = json.dumps(message, indent=2).replace("\n", "\n    ").encode("utf-8")
+            start = offset + len(lead)
+            entries.append(self._entry(message, start, start + len(body)))
+            parts.append(lead.encode("utf-8"))
+            parts.append(body)
+            offset = start + len(body)
+
+        parts.append(b"\n  ]\n}" if messages else b"]\n}")
+        return b"".join(parts), entries
+
+    def write_chat_file(self, chat_file: Path, data: Dict[str, Any]) -> None:
+        """
+        Write a chat file and its offsets index.
+
+        Raises:
+            IOError: If the chat file can't be written
+        """
+        content, entries = self.serialize_chat(data)
+
+        with open(chat_file, 'wb') as f:
+            f.write(content)
+
+        self._save_index(chat_file, entries, self._get_file_version(chat_file))
+
+    def _save_index(
+        self,
+        chat_file: Path,
+        entries: List[Dict[str, Any]],
+        file_version: Optional[List[int]]
+    ) -> None:
+        """Save the offsets index (failures only cost a rescan later)."""
+        if file_version is None:
+            return
+        try:
+            with open(self.get_index_file(chat_file), 'w') as f:
+                json.dump({
+                    "version": self.INDEX_VERSION,
+                    "file_version": file_version,
+                    "messages": entries,
+                }, f)
+        except IOError as e:
+            print(f"  DEBUG: Failed to save message index for {chat_file.name}: {e}")
+
+    def delete(self, chat_file: Path) -> None:
+        """Delete a chat file's offsets index (when the chat is deleted)."""
+        self.get_index_file(chat_file).unlink(missing_ok=True)
+
+    # =========================================================================
+    # Reading
+    # =========================================================================
+
+    def load_entries(self, chat_file: Path) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the index entries for a chat file, rebuilding a stale index.
+
+        Returns:
+            Entries in message order, or None if the chat file is missing
+            or unreadable
+        """
+        file_version = self._get_file_version(chat_file)
+        if file_version is None:
+            return None
+
+        index_file = self.get_index_file(chat_file)
+        try:
+            with open(index_file, 'r') as f:
+                index = json.load(f)
+            if (index.get("version") == self.INDEX_VERSION
+                    and index.get("file_version") == file_version):
+                return index["messages"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+
+        entries = self._scan_chat_file(chat_file)
+        if entries is None:
+            return None
+
+        # Only persist if the file didn't change while we were scanning
+        if self._get_file_version(chat_file) == file_version:
+            self._save_index(chat_file, entries, file_version)
+
+        return entries
+
+    def _scan_chat_file(self, chat_file: Path) -> Optional[List[Dict[str, Any]]]:
+        """
+        Build index entries by walking the chat file's top-level object.
+
+        Educational Note: JSONDecoder.raw_decode() parses one value starting
+        at a position and returns where it ended, which is exactly the
+        [start, end) range we need for each message.
+        """
+        try:
+            raw = chat_file.read_bytes()
+            text = raw.decode("utf-8")
+        except (IOError, UnicodeDecodeError):
+            return None
+
+        decoder = json.JSONDecoder()
+        is_ascii = len(text) == len(raw)
+
+        def skip_ws(pos: int) -> int:
+            while pos < len(text) and text[pos] in " \t\r\n":
+                pos += 1
+            return pos
+
+        # Character -> byte offset conversion (identity for ASCII files)
+        last_char, last_byte = 0, 0
+
+        def to_byte(pos: int) -> int:
+            nonlocal last_char, last_byte
+            if is_ascii:
+                return pos
+            last_byte += len(text[last_char:pos].encode("utf-8"))
+            last_char = pos
+            return last_byte
+
+        try:
+            pos = skip_ws(0)
+            if text[pos] != "{":
+                return None
+            pos = skip_ws(pos + 1)
+
+            while pos < len(text) and text[pos] != "}":
+                key, pos = decoder.raw_decode(text, pos)
+                pos = skip_ws(pos)
+                pos = skip_ws(pos + 1)  # ':'
+
+                if key != "messages":
+                    _, pos = decoder.raw_decode(text, pos)
+                else:
+                    entries = []
+                    pos = skip_ws(pos + 1)  # '['
+                    while text[pos] != "]":
+                        message, end = decoder.raw_decode(text, pos)
+                        entries.append(self._entry(message, to_byte(pos), to_byte(end)))
+                        pos = skip_ws(end)
+                        if text[pos] == ",":
+                            pos = skip_ws(pos + 1)
+                    return entries
+
+                pos = skip_ws(pos)
+                if text[pos] == ",":
+                    pos = skip_ws(pos + 1)
+
+            return []
+
+        except (ValueError, IndexError) as e:
+            print(f"  DEBUG: Could not scan chat file {chat_file.name}: {e}")
+            return None
+
+    def read_messages(
+        self,
+        chat_file: Path,
+        entries: List[Dict[str, Any]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Read and parse only the given messages from a chat file.
+
+        Educational Note: A page is usually a contiguous run of messages, so
+        we read one byte range from the first start to the last end and
+        slice it, instead of one seek per message.
+
+        Returns:
+            Parsed messages (same order as entries), or None if the file
+            changed underneath us (caller falls back to a full load)
+        """
+        if not entries:
+            return []
+
+        start = min(e["start"] for e in entries)
+        end = max(e["end"] for e in entries)
+
+        try:
+            with open(chat_file, 'rb') as f:
+                f.seek(start)
+                block = f.read(end - start)
+
+            messages = [
+                json.loads(block[e["start"] - start:e["end"] - start])
+                for e in entries
+            ]
+        except (IOError, ValueError):
+            return None
+
+        # Guard against a write landing between index load and this read
+        if any(m.get("id") != e["id"] for m, e in zip(messages, entries)):
+            return None
+        return messages
@@ -17,6 +17,7 @@ from pathlib import Path
 from typing import Optional, Dict, List, Any
 
 from config import Config
+from app.services.data_services.message_service import message_service
 
 
 class ChatService:
@@ -175,6 +176,9 @@ class ChatService:
         from the response. These are internal messages used in the tool
         chain and shouldn't be displayed to users. Studio signals are
         included as-is for frontend to render active studio items.
+        Reads through message_service's chat session cache, so a chat that
+        is mid-conversation is served from memory (including unflushed
+        messages) instead of being re-parsed from disk.
 
         Args:
             project_id: The project UUID
@@ -183,30 +187,23 @@ class ChatService:
         Returns:
             Full chat data or None if not found
         """
-        chat_file = self._get_chat_file(project_id, chat_id)
+        chat_data = message_service.get_chat_data(project_id, chat_id)
 
-        if not chat_file.exists():
+        if not chat_data:
             return None
 
-        try:
-            with open(chat_file, 'r') as f:
-                chat_data = json.load(f)
+        # Filter out tool_use and tool_result messages for display
+        # These have content as arrays instead of strings
+        chat_data["messages"] = [
+            msg for msg in chat_data.get("messages", [])
+            if isinstance(msg.get("content"), str)
+        ]
 
-            # Filter out tool_use and tool_result messages for display
-            # These have content as arrays instead of strings
-            chat_data["messages"] = [
-                msg for msg in chat_data.get("messages", [])
-                if isinstance(msg.get("content"), str)
-            ]
+        # Ensure studio_signals exists (even if empty)
+        if "studio_signals" not in chat_data:
+            chat_data["studio_signals"] = []
 
-            # Ensure studio_signals exists (even if empty)
-            if "studio_signals" not in chat_data:
-                chat_data["studio_signals"] = []
-
-            return chat_data
-        except json.JSONDecodeError:
-            print(f"Warning: Corrupted chat file: {chat_id}")
-            return None
+        return chat_data
 
     def get_chat_metadata(self, project_id: str, chat_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -238,50 +235,45 @@ class ChatService:
         """
         Update chat metadata.
 
-        Educational Note: Currently supports updating title.
+        Educational Note: Currently supports updating title and the
+        per-chat context token budget (used by context_window_service).
         Messages are updated via message_service.
 
         Args:
             project_id: The project UUID
             chat_id: The chat UUID
-            updates: Dict of fields to update (e.g., {"title": "New Title"})
+            updates: Dict of fields to update (e.g., {"title": "New Title"},
+                     {"context_token_budget": 40000})
 
         Returns:
             Updated chat metadata or None if not found
         """
-        chat_file = self._get_chat_file(project_id, chat_id)
+        # Only allowed fields are applied
+        allowed_updates = {
+            key: value for key, value in updates.items()
+            if key in ["title", "context_token_budget"]
+        }
 
-        if not chat_file.exists():
+        # Write through the session cache so an in-flight chat loop
+        # doesn't overwrite the change with its in-memory copy
+        if not message_service.update_chat_metadata(project_id, chat_id, allowed_updates):
             return None
 
-        try:
-            with open(chat_file, 'r') as f:
-                chat_data = json.load(f)
-
-            # Apply updates
-            for key, value in updates.items():
-                if key in ["title"]:  # Allowed updates
-                    chat_data[key] = value
-
-            chat_data["updated_at"] = datetime.now().isoformat()
-
-            # Save chat file
-            with open(chat_file, 'w') as f:
-                json.dump(chat_data, f, indent=2)
-
-            # Update index
-            self._update_index_entry(project_id, chat_id, chat_data)
+        chat_data = message_service.get_chat_data(project_id, chat_id)
+        if not chat_data:
+            return None
 
-            return {
-                "id": chat_data["id"],
-                "title": chat_data["title"],
-                "created_at": chat_data["created_at"],
-                "updated_at": chat_data["updated_at"],
-                "message_count": len(chat_data["messages"])
-            }
+        # Update index
+        self._update_index_entry(project_id, chat_id, chat_data)
 
-        except (json.JSONDecodeError, IOError):
-            return None
+        return {
+            "id": chat_data["id"],
+            "title": chat_data["title"],
+            "created_at": chat_data["created_at"],
+            "updated_at": chat_data["updated_at"],
+            "message_count": len(chat_data["messages"]),
+            "context_token_budget": chat_data.get("context_token_budget")
+        }
 
     def delete_chat(self, project_id: str, chat_id: str) -> bool:
         """
@@ -299,8 +291,10 @@ class ChatService:
         if not chat_file.exists():
             return False
 
-        # Delete chat file
+        # Drop cached session (unsaved changes are discarded) and delete file
+        message_service.evict_chat(project_id, chat_id)
         chat_file.unlink()
+        message_service.delete_message_index(project_id, chat_id)
 
         # Remove from index
         index = self._load_index(project_id)
@@ -0,0 +1,350 @@
+"""
+Chat Session - In-memory copy of a chat file with dirty tracking.
+
+Educational Note: A single send_message call used to re-read the chat JSON
+many times: to verify the chat exists, to append the user message, to build
+API messages on every tool iteration, on every tool result append, and again
+to sync the index. For long chats each read parses megabytes of JSON.
+
+A ChatSession loads the chat file once and keeps it in memory:
+- Reads are served from memory
+- Writes mark the session dirty instead of rewriting the file
+- flush() writes the file once (the chat loop flushes per tool iteration)
+
+ChatSessionCache keeps a bounded LRU of sessions for hot chats. Every
+reader and writer of chat files (message_service, chat_service) goes
+through the same cache, so a GET for a chat mid-conversation sees the
+same in-memory state as the chat loop that is writing it.
+
+If a chat file is changed outside the cache (or deleted), the next lookup
+notices the different mtime and reloads (or drops) the session.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, Tuple
+
+
+class ChatSession:
+    """
+    In-memory chat data with dirty tracking.
+
+    Educational Note: All mutation goes through methods that take the
+    session lock, so the chat loop and background tasks (chat naming,
+    running summaries) can safely touch the same chat.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        chat_id: str,
+        data: Dict[str, Any],
+        chat_file: Path,
+        save_func: Callable[[str, str, Dict[str, Any]], bool]
+    ):
+        """
+        Initialize a session from loaded chat data.
+
+        Args:
+            project_id: The project UUID
+            chat_id: The chat UUID
+            data: Chat data loaded from disk
+            chat_file: Path of the backing chat file
+            save_func: Function that persists chat data (project_id, chat_id, data)
+        """
+        self.project_id = project_id
+        self.chat_id = chat_id
+        self.chat_file = chat_file
+        self._data = data
+        self._save_func = save_func
+        self._dirty = False
+        self._lock = threading.RLock()
+        self.file_version = self._get_file_version()
+
+    def _get_file_version(self) -> Optional[Tuple[int, int]]:
+        """Get (mtime_ns, size) of the backing file, or None if missing."""
+        try:
+            stat = self.chat_file.stat()
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    @property
+    def is_dirty(self) -> bool:
+        """Whether the session has changes not yet written to disk."""
+        return self._dirty
+
+    @property
+    def message_count(self) -> int:
+        """Number of stored messages (including tool_use/tool_result)."""
+        with self._lock:
+            return len(self._data.get("messages", []))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a copy of the chat data that callers may modify.
+
+        Educational Note: Shallow copies only - the message list is copied
+        (cheap, just references) so callers can filter or append without
+        touching the cached state. Message dicts themselves are shared and
+        must be treated as read-only.
+        """
+        with self._lock:
+            data = dict(self._data)
+            data["messages"] = list(self._data.get("messages", []))
+            return data
+
+    def add_message(
+        self,
+        role: str,
+        content: Any,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Append a message in memory and mark the session dirty.
+
+        Args:
+            role: Message role ('user' or 'assistant')
+            content: Message content (string or list of content blocks)
+            metadata: Optional metadata (model, tokens, error, etc.)
+
+        Returns:
+            The created message dict
+        """
+        message = {
+            "id": str(uuid.uuid4()),
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+        if metadata:
+            message.update(metadata)
+
+        with self._lock:
+            self._data.setdefault("messages", []).append(message)
+            self._data["updated_at"] = datetime.now().isoformat()
+            self._data["message_count"] = len(self._data["messages"])
+            self._dirty = True
+
+        return message
+
+    def update_metadata(self, updates: Dict[str, Any]) -> None:
+        """
+        Update chat-level fields in memory (never messages).
+
+        Args:
+            updates: Dict of fields to update
+        """
+        with self._lock:
+            for key, value in updates.items():
+                if key != "messages":
+                    self._data[key] = value
+            self._data["updated_at"] = datetime.now().isoformat()
+            self._dirty = True
+
+    def flush(self) -> bool:
+        """
+        Write the session to disk if it has unsaved changes.
+
+        Returns:
+            True if the file is up to date (written now or nothing to write)
+        """
+        with self._lock:
+            if not self._dirty:
+                return True
+
+            if not self._save_func(self.project_id, self.chat_id, self._data):
+                return False
+
+            # Version first: a clean session must never carry the old version
+            self.file_version = self._get_file_version()
+            self._dirty = False
+            return True
+
+    def is_current(self) -> bool:
+        """
+        Whether this copy is still the chat's live state.
+
+        Educational Note: True if it has unsaved changes or the file on disk
+        is the version it last read or wrote. The check runs under the
+        session lock so it never sees a flush half-done; if another thread
+        holds the lock (an append or flush in progress), the session is in
+        use and therefore current - the cache doesn't wait on its disk I/O.
+        """
+        if not self._lock.acquire(blocking=False):
+            return True
+        try:
+            return self._dirty or self._get_file_version() == self.file_version
+        finally:
+            self._lock.release()
+
+
+class ChatSessionCache:
+    """
+    Bounded LRU cache of chat sessions.
+
+    Educational Note: OrderedDict gives O(1) LRU - move_to_end() on every
+    hit, popitem(last=False) to evict the least recently used session.
+    Dirty sessions are flushed when they are evicted, outside the cache
+    lock; until that flush is done a lookup gets the same session back
+    instead of a stale copy from disk, and a session whose flush fails
+    stays cached.
+    """
+
+    def __init__(
+        self,
+        load_func: Callable[[str, str], Optional[Dict[str, Any]]],
+        save_func: Callable[[str, str, Dict[str, Any]], bool],
+        path_func: Callable[[str, str], Path],
+        max_sessions: int = 32
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            load_func: Reads chat data from disk (project_id, chat_id)
+            save_func: Writes chat data to disk (project_id, chat_id, data)
+            path_func: Returns the chat file path (project_id, chat_id)
+            max_sessions: Maximum sessions kept in memory
+        """
+        self._load_func = load_func
+        self._save_func = save_func
+        self._path_func = path_func
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[Tuple[str, str], ChatSession]" = OrderedDict()
+        # Evicted sessions whose flush hasn't finished yet
+        self._evicting: Dict[Tuple[str, str], ChatSession] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "reloads": 0, "evictions": 0}
+
+    def get(self, project_id: str, chat_id: str) -> Optional[ChatSession]:
+        """
+        Get the session for a chat, loading it from disk on a miss.
+
+        Educational Note: Each hit costs one stat() to detect outside
+        changes - much cheaper than parsing the chat JSON.
+
+        Args:
+            project_id: The project UUID
+            chat_id: The chat UUID
+
+        Returns:
+            ChatSession, or None if the chat doesn't exist
+        """
+        key = (project_id, chat_id)
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None and key in self._evicting:
+                # Evicted but still flushing - keep using the live copy
+                session = self._sessions[key] = self._evicting[key]
+            if session is not None:
+                if session._get_file_version() is None:
+                    # File was deleted behind our back
+                    self._sessions.pop(key, None)
+                    return None
+                if session.is_current():
+                    self._sessions.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return session
+                # Changed on disk and nothing unsaved here - reload
+                self._sessions.pop(key, None)
+                self._stats["reloads"] += 1
+            else:
+                self._stats["misses"] += 1
+
+            data = self._load_func(project_id, chat_id)
+            if data is None:
+                return None
+
+            session = ChatSession(
+                project_id,
+                chat_id,
+                data,
+                self._path_func(project_id, chat_id),
+                self._save_func
+            )
+            self._sessions[key] = session
+            evicted = self._pop_evictions()
+
+        self._flush_evicted(evicted)
+        return session
+
+    def peek(self, project_id: str, chat_id: str) -> Optional[ChatSession]:
+        """
+        Get a cached, up-to-date session without loading anything from disk.
+
+        Educational Note: Used by readers that have a cheaper disk path than
+        a full load (e.g., paginated history via the offsets index) - they
+        want the in-memory copy only if it's already there.
+
+        Returns:
+            ChatSession, or None on a miss or if the file changed on disk
+        """
+        with self._lock:
+            session = self._sessions.get((project_id, chat_id))
+            if session is None:
+                return None
+            if session.is_current():
+                return session
+            return None
+
+    def _pop_evictions(self) -> Dict[Tuple[str, str], ChatSession]:
+        """Take least recently used sessions out of the LRU. Caller holds lock."""
+        evicted = {}
+        while len(self._sessions) > self.max_sessions:
+            key, session = self._sessions.popitem(last=False)
+            evicted[key] = self._evicting[key] = session
+            self._stats["evictions"] += 1
+        return evicted
+
+    def _flush_evicted(self, evicted: Dict[Tuple[str, str], ChatSession]) -> None:
+        """
+        Flush evicted sessions (without holding the cache lock).
+
+        Educational Note: A session that fails to flush goes back into the
+        cache with its unsaved changes - dropping it would lose messages.
+        """
+        for key, session in evicted.items():
+            flushed = session.flush()
+            if not flushed:
+                print(f"Chat session {key[1]} could not be saved on eviction; keeping it in memory")
+            with self._lock:
+                if self._evicting.get(key) is session:
+                    del self._evicting[key]
+                if not flushed and key not in self._sessions:
+                    self._sessions[key] = session
+
+    def evict(self, project_id: str, chat_id: str, flush: bool = False) -> None:
+        """
+        Drop a chat's session from the cache.
+
+        Args:
+            project_id: The project UUID
+            chat_id: The chat UUID
+            flush: Write unsaved changes before dropping (False for deletes)
+        """
+        with self._lock:
+            session = self._sessions.pop((project_id, chat_id), None)
+            self._evicting.pop((project_id, chat_id), None)
+        if session is not None and flush:
+            session.flush()
+
+    def flush_all(self) -> None:
+        """Write every dirty session to disk (e.g., on shutdown)."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            session.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics (hits, misses, reloads, evictions, size)."""
+        with self._lock:
+            return {
+                **self._stats,
+                "cached_sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+            }
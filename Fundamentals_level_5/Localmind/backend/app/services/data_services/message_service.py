@@ -5,17 +5,28 @@ Educational Note: This is a pure CRUD service for messages (chat and agent).
 It handles storing and retrieving messages, building message arrays for API calls.
 
 Key Responsibilities:
-- Store messages to chat JSON files
+- Store messages to chat JSON files (through the chat session cache)
 - Retrieve message history
 - Build message arrays for Claude API calls
 - Support different message types (user, assistant, tool_result)
 - Store and retrieve agent execution logs (web_agent, etc.)
 
+Chat Sessions:
+All chat reads and writes go through a bounded LRU of ChatSession objects
+(see chat_session.py). A chat is parsed from disk once, then served from
+memory. Writes are flushed immediately by default; the chat loop passes
+flush=False and flushes once per tool iteration instead.
+
+Paginated History:
+Chat files are written together with a message offsets index (see
+chat_message_index.py). get_message_page() serves a page of messages from
+the in-memory session when the chat is hot, otherwise by reading only the
+page's byte range from disk - the rest of the chat is never parsed.
+
 For parsing Claude API responses (tool_use blocks, content extraction),
 see utils/claude_parsing_utils.py
 """
 import json
-import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, List, Any
@@ -23,6 +34,8 @@ from typing import Optional, Dict, List, Any
 from config import Config
 from app.utils import claude_parsing_utils
 from app.utils.path_utils import get_web_agent_dir, get_agents_dir
+from app.services.data_services.chat_session import ChatSession, ChatSessionCache
+from app.services.data_services.chat_message_index import ChatMessageIndex
 
 
 class MessageService:
@@ -33,9 +46,23 @@ class MessageService:
     This service handles the format conversion between storage and API.
     """
 
+    # Maximum chats kept in memory by the session cache
+    MAX_CACHED_SESSIONS = 32
+
+    # Paginated history page sizes
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
     def __init__(self):
         """Initialize the message service."""
         self.projects_dir = Config.PROJECTS_DIR
+        self._message_index = ChatMessageIndex()
+        self._sessions = ChatSessionCache(
+            load_func=self._load_chat_data,
+            save_func=self._save_chat_data,
+            path_func=self._get_chat_file,
+            max_sessions=self.MAX_CACHED_SESSIONS
+        )
 
     def _get_chat_file(self, project_id: str, chat_id: str) -> Path:
         """Get the path to a chat's JSON file."""
@@ -76,7 +103,7 @@ class MessageService:
 
     def _save_chat_data(self, project_id: str, chat_id: str, data: Dict[str, Any]) -> bool:
         """
-        Save chat data to file.
+        Save chat data to file (plus its message offsets index).
 
         Args:
             project_id: The project UUID
@@ -89,8 +116,7 @@ class MessageService:
         chat_file = self._get_chat_file(project_id, chat_id)
 
         try:
-            with open(chat_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            self._message_index.write_chat_file(chat_file, data)
             return True
         except IOError as e:
             print(f"  DEBUG: Failed to save chat {chat_id}: {e}")
@@ -99,6 +125,83 @@ class MessageService:
             print(f"  DEBUG: Unexpected error saving chat {chat_id}: {e}")
             return False
 
+    # =========================================================================
+    # Chat Sessions - In-memory chat state shared by all readers and writers
+    # =========================================================================
+
+    def get_session(self, project_id: str, chat_id: str) -> Optional[ChatSession]:
+        """
+        Get the in-memory session for a chat (loaded from disk on first use).
+
+        Args:
+            project_id: The project UUID
+            chat_id: The chat UUID
+
+        Returns:
+            ChatSession or None if the chat doesn't exist
+        """
+        return self._sessions.get(project_id, chat_id)
+
+    def flush_chat(self, project_id: str, chat_id: str) -> bool:
+        """
+        Write a chat's pending in-memory changes to disk.
+
+        Educational Note: The chat loop calls this once per tool iteration
+        instead of rewriting the file for every single message.
+
+        Returns:
+            True if the file is up to date
+        """
+        session = self.get_session(project_id, chat_id)
+        if not session:
+            return False
+        return session.flush()
+
+    def evict_chat(self, project_id: str, chat_id: str, flush: bool = False) -> None:
+        """
+        Drop a chat from the session cache (e.g., when it is deleted).
+
+        Args:
+            project_id: The project UUID
+            chat_id: The chat UUID
+            flush: Write pending changes first
+        """
+        self._sessions.evict(project_id, chat_id, flush=flush)
+
+    def delete_message_index(self, project_id: str, chat_id: str) -> None:
+        """Delete a chat's message offsets index (when the chat is deleted)."""
+        self._message_index.delete(self._get_chat_file(project_id, chat_id))
+
+    def flush_all_sessions(self) -> None:
+        """Write every chat's pending changes to disk (server shutdown)."""
+        self._sessions.flush_all()
+
+    def get_session_stats(self) -> Dict[str, Any]:
+        """Get chat session cache statistics."""
+        return self._sessions.get_stats()
+
+    def get_chat_data(self, project_id: str, chat_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the raw chat data (messages plus chat-level metadata).
+
+        Educational Note: Unlike chat_service.get_chat(), nothing is filtered
+        out - tool_use/tool_result messages and fields like context_summary
+        are returned as stored. Used by the context window manager.
+        Served from the session cache; the returned dict and message list
+        are copies, the message dicts inside are shared (read-only).
+
+        Args:
+            project_id: The project UUID
+            chat_id: The chat UUID
+
+        Returns:
+            Chat data dict or None if not found
+        """
+        session = self.get_session(project_id, chat_id)
+        if not session:
+            return None
+        return session.snapshot()
+
     def get_messages(self, project_id: str, chat_id: str) -> List[Dict[str, Any]]:
         """
         Get all messages from a chat.
@@ -110,20 +213,134 @@ class MessageService:
         Returns:
             List of message dicts
         """
-        chat_data = self._load_chat_data(project_id, chat_id)
+        chat_data = self.get_chat_data(project_id, chat_id)
         if not chat_data:
             print(f"  DEBUG: get_messages - chat_data is None for chat {chat_id}")
             return []
         messages = chat_data.get("messages", [])
         return messages
 
+    def get_message_page(
+        self,
+        project_id: str,
+        chat_id: str,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        since: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        include_tool_messages: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get one page of a chat's message history.
+
+        Educational Note: Cursor-based pagination, cursors are message IDs:
+        - No cursor: the newest `limit` messages (opening a chat)
+        - before=<id>: the `limit` messages just older than <id> (scroll up)
+        - after=<id>: messages newer than <id>, oldest first (incremental refresh)
+        - since=<ISO timestamp>: messages stored after that time
+        Messages are always returned oldest first. tool_use/tool_result
+        messages are internal and skipped unless include_tool_messages.
+
+        Args:
+            project_id: The project UUID
+            chat_id: The chat UUID
+            before: Return messages older than this message ID
+            after: Return messages newer than this message ID
+            since: Return messages with a timestamp later than this
+            limit: Max messages in the page (capped at MAX_PAGE_SIZE)
+            include_tool_messages: Include tool_use/tool_result messages
+
+        Returns:
+            Dict with messages, has_more (more messages exist beyond this page
+            in the paging direction) and total (matching messages in the chat),
+            or None if chat not found
+
+        Raises:
+            ValueError: If a cursor message ID is not in the chat
+        """
+        limit = max(1, min(limit, self.MAX_PAGE_SIZE))
+        chat_file = self._get_chat_file(project_id, chat_id)
+
+        # Hot chat: serve from memory (includes unflushed messages)
+        session = self._sessions.peek(project_id, chat_id)
+        entries = None
+        if session is None:
+            entries = self._message_index.load_entries(chat_file)
+            if entries is None:
+                # Unreadable index/file - fall back to a full load
+                session = self.get_session(project_id, chat_id)
+                if session is None:
+                    return None
+
+        if session is not None:
+            entries = [
+                {
+                    "id": msg.get("id"),
+                    "kind": "text" if isinstance(msg.get("content"), str) else "tool",
+                    "timestamp": msg.get("timestamp"),
+                    "message": msg,
+                }
+                for msg in session.snapshot().get("messages", [])
+            ]
+
+        def cursor_position(message_id: str) -> int:
+            for i, entry in enumerate(entries):
+                if entry["id"] == message_id:
+                    return i
+            raise ValueError(f"Message not found: {message_id}")
+
+        # Select the candidate range (always in chronological order)
+        newest_first = False
+        if after:
+            candidates = entries[cursor_position(after) + 1:]
+        elif since:
+            candidates = [e for e in entries if (e.get("timestamp") or "") > since]
+        elif before:
+            candidates = entries[:cursor_position(before)]
+            newest_first = True
+        else:
+            candidates = entries
+            newest_first = True
+
+        if not include_tool_messages:
+            candidates = [e for e in candidates if e["kind"] == "text"]
+
+        if newest_first:
+            page = candidates[-limit:]
+        else:
+            page = candidates[:limit]
+        has_more = len(candidates) > len(page)
+
+        if session is not None:
+            messages = [e["message"] for e in page]
+        else:
+            messages = self._message_index.read_messages(chat_file, page)
+            if messages is None:
+                # File changed between index load and read - retry from memory
+                return self.get_message_page(
+                    project_id, chat_id, before, after, since,
+                    limit, include_tool_messages
+                ) if self.get_session(project_id, chat_id) else None
+
+        if include_tool_messages:
+            total = len(entries)
+        else:
+            total = sum(1 for e in entries if e["kind"] == "text")
+
+        return {
+            "messages": messages,
+            "has_more": has_more,
+            "total": total,
+        }
+
     def add_message(
         self,
         project_id: str,
         chat_id: str,
         role: str,
         content: Any,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        flush: bool = True
     ) -> Optional[Dict[str, Any]]:
         """
         Add a message to a chat.
@@ -138,33 +355,19 @@ class MessageService:
             role: Message role ('user' or 'assistant')
             content: Message content (string or list of content blocks)
             metadata: Optional metadata (model, tokens, error, etc.)
+            flush: Write to disk now (False = keep in memory until flush_chat)
 
         Returns:
             The created message dict, or None if chat not found
         """
-        chat_data = self._load_chat_data(project_id, chat_id)
-        if not chat_data:
+        session = self.get_session(project_id, chat_id)
+        if not session:
             return None
 
-        # Create message
-        message = {
-            "id": str(uuid.uuid4()),
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-        }
-
-        # Add optional metadata
-        if metadata:
-            message.update(metadata)
-
-        # Append to messages
-        chat_data["messages"].append(message)
-        chat_data["updated_at"] = datetime.now().isoformat()
-        chat_data["message_count"] = len(chat_data["messages"])
+        message = session.add_message(role, content, metadata)
 
-        # Save
-        self._save_chat_data(project_id, chat_id, chat_data)
+        if flush:
+            session.flush()
 
         return message
 
@@ -172,7 +375,8 @@ class MessageService:
         self,
         project_id: str,
         chat_id: str,
-        content: str
+        content: str,
+        flush: bool = True
     ) -> Optional[Dict[str, Any]]:
         """
         Add a user message to a chat.
@@ -184,11 +388,12 @@ class MessageService:
             project_id: The project UUID
             chat_id: The chat UUID
             content: The user's message text
+            flush: Write to disk now (False = keep in memory until flush_chat)
 
         Returns:
             The created message dict
         """
-        return self.add_message(project_id, chat_id, "user", content)
+        return self.add_message(project_id, chat_id, "user", content, flush=flush)
 
     def add_assistant_message(
         self,
@@ -197,7 +402,8 @@ class MessageService:
         content: str,
         model: Optional[str] = None,
         tokens: Optional[Dict[str, int]] = None,
-        error: bool = False
+        error: bool = False,
+        flush: bool = True
     ) -> Optional[Dict[str, Any]]:
         """
         Add an assistant message to a chat.
@@ -212,6 +418,7 @@ class MessageService:
             model: Model used to generate response
             tokens: Token usage dict with 'input' and 'output'
             error: Whether this is an error message
+            flush: Write to disk now (False = keep in memory until flush_chat)
 
         Returns:
             The created message dict
@@ -224,7 +431,7 @@ class MessageService:
         if error:
             metadata["error"] = True
 
-        return self.add_message(project_id, chat_id, "assistant", content, metadata)
+        return self.add_message(project_id, chat_id, "assistant", content, metadata, flush=flush)
 
     def add_tool_result_message(
         self,
@@ -232,7 +439,8 @@ class MessageService:
         chat_id: str,
         tool_use_id: str,
         result: Any,
-        is_error: bool = False
+        is_error: bool = False,
+        flush: bool = True
     ) -> Optional[Dict[str, Any]]:
         """
         Add a tool result message to a chat.
@@ -247,6 +455,7 @@ class MessageService:
             tool_use_id: The ID from the tool_use block
             result: The tool execution result
             is_error: Whether the tool execution failed
+            flush: Write to disk now (False = keep in memory until flush_chat)
 
         Returns:
             The created message dict
@@ -257,7 +466,7 @@ class MessageService:
             result=str(result) if not isinstance(result, str) else result,
             is_error=is_error
         )
-        return self.add_message(project_id, chat_id, "user", content)
+        return self.add_message(project_id, chat_id, "user", content, flush=flush)
 
     def build_api_messages(
         self,
@@ -340,18 +549,14 @@ class MessageService:
         Returns:
             True if successful
         """
-        chat_data = self._load_chat_data(project_id, chat_id)
-        if not chat_data:
+        session = self.get_session(project_id, chat_id)
+        if not session:
             return False
 
-        # Update fields
-        for key, value in updates.items():
-            if key != "messages":  # Don't allow message updates via this method
-                chat_data[key] = value
-
-        chat_data["updated_at"] = datetime.now().isoformat()
+        # Messages are never updated via this method
+        session.update_metadata(updates)
 
-        return self._save_chat_data(project_id, chat_id, chat_data)
+        return session.flush()
 
     # =========================================================================
     # Agent Execution Logs - For storing agent debug/execution data
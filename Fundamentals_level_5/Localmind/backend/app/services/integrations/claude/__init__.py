@@ -5,5 +5,6 @@ Educational Note: This module provides a clean interface to the Claude API.
 Used by chat, agents, and various processing services.
 """
 from app.services.integrations.claude.claude_service import claude_service
+from app.services.integrations.claude.claude_batch_service import claude_batch_service, BulkRequestError
 
-__all__ = ["claude_service"]
+__all__ = ["claude_service", "claude_batch_service", "BulkRequestError"]
@@ -0,0 +1,572 @@
+"""
+Claude Batch Service - Bulk (asynchronous) mode for non-interactive calls.
+
+Educational Note: PDF page extraction runs in background tasks - nobody is
+watching a spinner for it. Sent as normal requests its page batches still
+compete with chat for the same per-minute rate budget, so a 300-page PDF
+upload makes chat replies wait. (Source summaries and memory merges stay
+normal calls: they are single requests that hold a task worker or a memory
+file while they wait, so they can't sit in a batch for hours.)
+
+Bulk mode moves these calls off the interactive path:
+1. Callers use claude_batch_service.send_message() (same arguments and
+   return value as claude_service.send_message) from their worker thread
+2. Requests are queued and flushed as one batch every FLUSH_SECONDS or
+   when MAX_BATCH_REQUESTS (or MAX_BATCH_BYTES of encoded requests) are
+   waiting
+3. The batch is submitted to a backend, polled every POLL_SECONDS, and each
+   result is handed back to the waiting caller, which continues with its
+   existing parsing code
+4. Callers that want many requests in one batch without a thread per
+   request use submit_message(), which returns a Future right away
+
+Backends (CLAUDE_BULK_MODE):
+- "off" (default): calls go straight to claude_service.send_message()
+- "anthropic": the Message Batches API. Batches have their own rate limits
+  (chat keeps its whole budget) and are billed at 50%, but results can take
+  minutes (up to 24h in the worst case)
+- "local": a stand-in with the same interface that runs the batch one
+  request at a time through the normal API, only using budget above
+  CLAUDE_BULK_RESERVE (default 50%) of each rate bucket. Useful for testing
+  the pipeline without the batch API, and still keeps chat headroom
+
+Failed results are retried in a later batch when the error is transient
+(overloaded, api_error, expired); other errors are raised to the caller.
+Queued requests live in memory - after a restart the background task that
+was waiting is marked failed by task_service and can be retried.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Tuple
+
+from app.services.integrations.claude.claude_service import claude_service
+from app.utils.concurrency_utils import is_throttle_error
+from app.utils.call_metrics_utils import get_caller_site
+
+
+class BulkRequestError(Exception):
+    """Raised when a bulk request fails (after retries) or times out."""
+    pass
+
+
+@dataclass
+class _BulkRequest:
+    """One queued request and the slot its result is delivered to."""
+    custom_id: str
+    params: Dict[str, Any]
+    project_id: Optional[str]
+    call_site: str
+    max_attempts: int
+    size_bytes: int = 0
+    cache_key: Optional[str] = None
+    attempts: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    queued_at: float = field(default_factory=time.monotonic)
+    future: Future = field(default_factory=Future)
+
+
+class AnthropicBatchBackend:
+    """
+    Message Batches API backend.
+
+    Educational Note: A batch is created with a list of
+    {"custom_id", "params"} entries, where params are exactly what
+    messages.create() takes. Results come back in any order, matched by
+    custom_id.
+    """
+
+    name = "anthropic"
+    discounted = True
+
+    def create(self, requests: List[Dict[str, Any]]) -> str:
+        """Submit a batch and return its id."""
+        batch = claude_service._get_client().messages.batches.create(requests=requests)
+        return batch.id
+
+    def poll(self, batch_id: str) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Check a batch.
+
+        Returns:
+            None while processing, else [(custom_id, result)] where result is
+            {"type": "succeeded", "message": Message} or
+            {"type": "errored" | "expired" | "canceled", "error_type", "error"}
+        """
+        client = claude_service._get_client()
+        batch = client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return None
+
+        results = []
+        for entry in client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                results.append((entry.custom_id, {"type": "succeeded", "message": entry.result.message}))
+            elif entry.result.type == "errored":
+                error = entry.result.error.error
+                results.append((entry.custom_id, {
+                    "type": "errored",
+                    "error_type": error.type,
+                    "error": error.message,
+                }))
+            else:
+                results.append((entry.custom_id, {
+                    "type": entry.result.type,
+                    "error_type": entry.result.type,
+                    "error": f"Batch request {entry.result.type}",
+                }))
+        return results
+
+
+class LocalBatchBackend:
+    """
+    Stand-in for the Message Batches API that runs requests locally.
+
+    Educational Note: One worker thread works through submitted batches one
+    request at a time via the normal API, so bulk traffic never has more
+    than one call in flight. Each call waits until the shared limiter would
+    still have `reserve_ratio` of every bucket left afterwards.
+    """
+
+    name = "local"
+    discounted = False
+
+    def __init__(self):
+        """Initialize an idle backend (the worker starts on first batch)."""
+        self._lock = threading.Lock()
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        self._pending: List[str] = []
+        self._wake = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def _get_reserve_ratio(self) -> float:
+        return float(os.getenv('CLAUDE_BULK_RESERVE', '0.5'))
+
+    def create(self, requests: List[Dict[str, Any]]) -> str:
+        """Queue a batch for the worker and return its id."""
+        batch_id = f"local_{uuid.uuid4().hex}"
+        with self._lock:
+            self._batches[batch_id] = {"requests": requests, "results": [], "ended": False}
+            self._pending.append(batch_id)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="local-batch-worker", daemon=True)
+                self._worker.start()
+        self._wake.set()
+        return batch_id
+
+    def poll(self, batch_id: str) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+        """Return results once the whole batch has run (same contract as the API backend)."""
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None:
+                raise KeyError(f"Unknown local batch: {batch_id}")
+            if not batch["ended"]:
+                return None
+            del self._batches[batch_id]
+            return batch["results"]
+
+    def _run(self) -> None:
+        """Worker loop: process queued batches in order."""
+        while True:
+            self._wake.wait(timeout=5.0)
+            self._wake.clear()
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        break
+                    batch_id = self._pending.pop(0)
+                    batch = self._batches[batch_id]
+                results = [(r["custom_id"], self._run_request(r["params"])) for r in batch["requests"]]
+                with self._lock:
+                    batch["results"] = results
+                    batch["ended"] = True
+
+    def _run_request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one request through the shared limiter, leaving headroom for chat."""
+        limiter, input_estimate, output_estimate = claude_service._reserve_budget(params)
+        reservation = limiter.acquire(input_estimate, output_estimate, reserve_ratio=self._get_reserve_ratio())
+        try:
+            message = claude_service._create_message(claude_service._get_client(), params)
+        except Exception as e:
+            limiter.release(reservation)
+            if is_throttle_error(e):
+                error_type = "overloaded_error"
+            elif claude_service._is_retryable(e):
+                error_type = "api_error"
+            else:
+                error_type = "invalid_request_error"
+            return {"type": "errored", "error_type": error_type, "error": str(e)}
+
+        claude_service._reconcile_budget(limiter, reservation, message)
+        return {"type": "succeeded", "message": message}
+
+
+class ClaudeBatchService:
+    """
+    Queues bulk requests, submits them as batches and routes results back.
+
+    Educational Note: Each request carries a Future that the dispatcher
+    resolves. send_message() blocks on it while one dispatcher thread
+    does all the batching and polling, so existing
+    background code (thread pools, task_service tasks) keeps its simple
+    "call, then parse the response" shape.
+    """
+
+    # Flush the queue when this many requests are waiting...
+    MAX_BATCH_REQUESTS = 100
+
+    # ...or when their encoded size reaches this many bytes. A PDF page
+    # batch carries its pages as base64, so 100 of them can far exceed the
+    # batch API's 256MB request limit (CLAUDE_BULK_MAX_BATCH_MB, default 200)
+    MAX_BATCH_BYTES = int(os.getenv('CLAUDE_BULK_MAX_BATCH_MB', '200')) * 1024 * 1024
+
+    # ...or when the oldest has waited this long
+    FLUSH_SECONDS = 5.0
+
+    # How often to check in-flight batches
+    POLL_SECONDS = 15.0
+
+    # Give up waiting after the batch API's own expiry (24h) plus a margin
+    MAX_WAIT_SECONDS = 25 * 3600
+
+    # Batch result error types worth resubmitting
+    RETRYABLE_ERROR_TYPES = ("overloaded_error", "api_error", "rate_limit_error", "expired")
+
+    DEFAULT_MAX_ATTEMPTS = 3
+
+    def __init__(self):
+        """Initialize the service (the dispatcher starts on first use)."""
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._queue: List[_BulkRequest] = []
+        self._in_flight: Dict[str, Dict[str, Any]] = {}
+        self._dispatcher: Optional[threading.Thread] = None
+        self._backends = {
+            "anthropic": AnthropicBatchBackend(),
+            "local": LocalBatchBackend(),
+        }
+        self._stats = {
+            "requests": 0,
+            "batches_submitted": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "resubmitted": 0,
+        }
+
+    def get_mode(self) -> str:
+        """Current bulk mode from CLAUDE_BULK_MODE: "off", "anthropic" or "local"."""
+        mode = os.getenv('CLAUDE_BULK_MODE', 'off').strip().lower()
+        return mode if mode in self._backends else "off"
+
+    @property
+    def enabled(self) -> bool:
+        return self.get_mode() != "off"
+
+    def submit_message(
+        self,
+        messages: List[Dict[str, Any]],
+        system_prompt: Optional[str] = None,
+        model: str = "claude-sonnet-4-5-20250929",
+        max_tokens: int = 4096,
+        temperature: float = 0.2,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[Dict[str, Any]] = None,
+        project_id: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        call_site: Optional[str] = None,
+        use_response_cache: bool = False,
+    ) -> Future:
+        """
+        Queue a latency-insensitive request and return a Future for its result.
+
+        Educational Note: Queueing doesn't block, so one thread can keep many
+        requests in the same batch - a PDF with 200 page batches needs a
+        bounded queue of them, not 200 waiting threads. With bulk mode off
+        (or on a response cache hit) the call runs right away and the
+        Future is already done.
+
+        Returns:
+            Future resolving to the claude_service.send_message() result,
+            or raising BulkRequestError / anthropic.APIError
+        """
+        call_site = call_site or get_caller_site()
+
+        if not self.enabled:
+            future: Future = Future()
+            try:
+                future.set_result(claude_service.send_message(
+                    messages=messages,
+                    system_prompt=system_prompt,
+                    model=model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    tools=tools,
+                    tool_choice=tool_choice,
+                    project_id=project_id,
+                    max_attempts=max_attempts,
+                    call_site=call_site,
+                    use_response_cache=use_response_cache
+                ))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        params = claude_service._build_api_params(
+            messages, system_prompt, model, max_tokens, temperature,
+            tools, tool_choice, None, False
+        )
+
+        cache_key = None
+        if use_response_cache:
+            cache_key, cached = claude_service._lookup_cached(params, project_id)
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+                return future
+
+        custom_id = uuid.uuid4().hex
+        size_bytes = len(json.dumps({"custom_id": custom_id, "params": params}, default=str))
+        if size_bytes > self.MAX_BATCH_BYTES:
+            future = Future()
+            future.set_exception(BulkRequestError(
+                f"Bulk request from {call_site} is {size_bytes // (1024 * 1024)}MB, "
+                f"over the {self.MAX_BATCH_BYTES // (1024 * 1024)}MB batch limit"
+            ))
+            return future
+
+        request = _BulkRequest(
+            custom_id=custom_id,
+            params=params,
+            project_id=project_id,
+            call_site=call_site,
+            max_attempts=max_attempts or self.DEFAULT_MAX_ATTEMPTS,
+            size_bytes=size_bytes,
+            cache_key=cache_key
+        )
+        # Running from the start: a caller's cancel() can't pull it out of
+        # a batch, and the dispatcher can always deliver the result
+        request.future.set_running_or_notify_cancel()
+
+        with self._lock:
+            self._queue.append(request)
+            self._stats["requests"] += 1
+            self._ensure_dispatcher()
+        self._wake.set()
+        return request.future
+
+    def send_message(
+        self,
+        messages: List[Dict[str, Any]],
+        system_prompt: Optional[str] = None,
+        model: str = "claude-sonnet-4-5-20250929",
+        max_tokens: int = 4096,
+        temperature: float = 0.2,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[Dict[str, Any]] = None,
+        project_id: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        call_site: Optional[str] = None,
+        use_response_cache: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Send a latency-insensitive request, batched when bulk mode is on.
+
+        Educational Note: Blocks the calling (background) thread until the
+        result arrives. Arguments and return value match
+        claude_service.send_message(), so callers parse responses the same
+        way in both modes.
+
+        Raises:
+            BulkRequestError: If the request failed or timed out in bulk mode
+            anthropic.APIError: If the request failed with bulk mode off
+        """
+        call_site = call_site or get_caller_site()
+        future = self.submit_message(
+            messages=messages,
+            system_prompt=system_prompt,
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            tools=tools,
+            tool_choice=tool_choice,
+            project_id=project_id,
+            max_attempts=max_attempts,
+            call_site=call_site,
+            use_response_cache=use_response_cache
+        )
+        try:
+            return future.result(timeout=self.MAX_WAIT_SECONDS)
+        except FutureTimeoutError:
+            raise BulkRequestError(f"Bulk request from {call_site} timed out")
+
+    def _ensure_dispatcher(self) -> None:
+        """Start the dispatcher thread if needed. Caller holds lock."""
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._dispatcher = threading.Thread(target=self._run, name="claude-bulk-dispatcher", daemon=True)
+            self._dispatcher.start()
+
+    def _run(self) -> None:
+        """Dispatcher loop: flush the queue and poll in-flight batches."""
+        while True:
+            self._wake.wait(timeout=1.0)
+            self._wake.clear()
+            try:
+                self._flush_queue()
+                self._poll_batches()
+            except Exception as e:
+                # Never let the dispatcher die - callers would wait forever
+                print(f"Bulk dispatcher error: {e}")
+
+    def _flush_queue(self) -> None:
+        """Submit queued requests as one batch when the batch is full or old enough."""
+        with self._lock:
+            if not self._queue:
+                return
+            oldest_wait = time.monotonic() - self._queue[0].queued_at
+            queued_bytes = sum(r.size_bytes for r in self._queue)
+            if (len(self._queue) < self.MAX_BATCH_REQUESTS
+                    and queued_bytes < self.MAX_BATCH_BYTES
+                    and oldest_wait < self.FLUSH_SECONDS):
+                return
+
+            # Take requests from the front while both the count and the byte
+            # budget fit (always at least one; submit_message rejects any
+            # single request over the budget)
+            count, batch_bytes = 0, 0
+            for request in self._queue[:self.MAX_BATCH_REQUESTS]:
+                if count and batch_bytes + request.size_bytes > self.MAX_BATCH_BYTES:
+                    break
+                count += 1
+                batch_bytes += request.size_bytes
+            requests = self._queue[:count]
+            del self._queue[:count]
+
+        mode = self.get_mode()
+        backend = self._backends.get(mode, self._backends["local"])
+        for request in requests:
+            request.attempts += 1
+
+        try:
+            batch_id = backend.create([
+                {"custom_id": r.custom_id, "params": r.params} for r in requests
+            ])
+        except Exception as e:
+            print(f"Bulk batch submit failed ({type(e).__name__}): {e}")
+            self._retry_or_fail(requests, BulkRequestError(f"Batch submit failed: {e}"))
+            return
+
+        with self._lock:
+            self._in_flight[batch_id] = {
+                "backend": backend,
+                "requests": {r.custom_id: r for r in requests},
+                "last_poll": time.monotonic(),
+            }
+            self._stats["batches_submitted"] += 1
+        batch_mb = sum(r.size_bytes for r in requests) / (1024 * 1024)
+        print(f"Bulk batch {batch_id} submitted ({len(requests)} requests, {batch_mb:.1f}MB, {backend.name})")
+
+    def _poll_batches(self) -> None:
+        """Poll batches that are due and route finished results."""
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                (batch_id, batch) for batch_id, batch in self._in_flight.items()
+                if now - batch["last_poll"] >= self.POLL_SECONDS
+                or batch["backend"].name == "local"
+            ]
+
+        for batch_id, batch in due:
+            batch["last_poll"] = now
+            try:
+                results = batch["backend"].poll(batch_id)
+            except Exception as e:
+                print(f"Bulk batch {batch_id} poll failed ({type(e).__name__}): {e}")
+                continue
+            if results is None:
+                continue
+
+            with self._lock:
+                self._in_flight.pop(batch_id, None)
+
+            requests = batch["requests"]
+            for custom_id, result in results:
+                request = requests.pop(custom_id, None)
+                if request is not None:
+                    self._route_result(request, result, batch["backend"])
+
+            # Anything the batch didn't return is treated as expired
+            if requests:
+                self._retry_or_fail(list(requests.values()), BulkRequestError("Batch returned no result"))
+            print(f"Bulk batch {batch_id} finished ({len(results)} results)")
+
+    def _route_result(self, request: _BulkRequest, result: Dict[str, Any], backend: Any) -> None:
+        """Deliver one batch result to its waiting caller."""
+        if result["type"] == "succeeded":
+            response, error = None, None
+            try:
+                response = claude_service._build_result(
+                    result["message"], request.project_id, batch=backend.discounted
+                )
+                if request.cache_key:
+                    claude_service._store_cached(request.cache_key, response)
+            except Exception as e:
+                error = e
+
+            latency = time.monotonic() - request.started_at
+            claude_service.call_metrics.record_call(f"{request.call_site} (bulk)", latency, error)
+            with self._lock:
+                self._stats["succeeded" if error is None else "failed"] += 1
+            if error is None:
+                request.future.set_result(response)
+            else:
+                request.future.set_exception(error)
+            return
+
+        error = BulkRequestError(f"{result.get('error_type')}: {result.get('error')}")
+        if result.get("error_type") in self.RETRYABLE_ERROR_TYPES:
+            self._retry_or_fail([request], error)
+        else:
+            self._fail(request, error)
+
+    def _retry_or_fail(self, requests: List[_BulkRequest], error: Exception) -> None:
+        """Put requests back in the queue if they have attempts left, else fail them."""
+        retry = [r for r in requests if r.attempts < r.max_attempts]
+        for request in requests:
+            if request.attempts >= request.max_attempts:
+                self._fail(request, error)
+
+        if retry:
+            with self._lock:
+                for request in retry:
+                    request.queued_at = time.monotonic()
+                self._queue.extend(retry)
+                self._stats["resubmitted"] += len(retry)
+
+    def _fail(self, request: _BulkRequest, error: Exception) -> None:
+        """Deliver an error to a waiting caller."""
+        claude_service.call_metrics.record_call(
+            f"{request.call_site} (bulk)", time.monotonic() - request.started_at, error
+        )
+        with self._lock:
+            self._stats["failed"] += 1
+        request.future.set_exception(error)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue/batch counters and the current mode."""
+        with self._lock:
+            return {
+                **self._stats,
+                "mode": self.get_mode(),
+                "queued": len(self._queue),
+                "queued_bytes": sum(r.size_bytes for r in self._queue),
+                "batches_in_flight": len(self._in_flight),
+                "requests_in_flight": sum(len(b["requests"]) for b in self._in_flight.values()),
+            }
+
+
+# Singleton instance for easy import
+claude_batch_service = ClaudeBatchService()
@@ -9,12 +9,42 @@ Key Design Decisions:
 - Stateless: Each call is independent, caller provides all context
 - Flexible: Accepts variable parameters for different use cases
 - Reusable: Can be called from main chat, subagents, RAG pipeline, etc.
+- Sync + async: send_message() for threaded callers, send_message_async()
+  for the ASGI chat path (asgi.py). Both share parameter building and
+  response handling, so they behave identically.
+- Rate limited: every call reserves budget from the process-wide limiter
+  for its model (utils/rate_limit_utils.py) and reconciles it with the
+  actual usage afterwards - callers don't create their own limiters.
+- Adaptive concurrency: each call also takes an in-flight slot from the
+  model's AIMD controller (utils/concurrency_utils.py), which shrinks on
+  429/529 and grows back while rate-limit headers show headroom.
+- One retry policy: transient errors (connection, timeout, 408/409/429/5xx)
+  are retried here with jittered backoff within a per-call deadline. The
+  SDK's own retries are disabled so every attempt goes through the limiter
+  and concurrency controller, and callers don't write retry loops.
+- Tuned connection pool: one httpx pool (configurable size/timeouts) shared
+  by all threads, and per-call-site latency/error counters (call_metrics).
+- Response cache (opt-in): extraction calls pass use_response_cache=True so
+  an identical request (same prompt, tools, file bytes) is answered from
+  disk (utils/response_cache_utils.py) instead of paying for it again.
 """
+import asyncio
+import json
 import os
-from typing import Optional, List, Dict, Any
+import time
+from typing import Optional, List, Dict, Any, Tuple
 import anthropic
+import httpx
 
 from app.utils.cost_tracking import add_usage as add_cost_usage
+from app.utils.rate_limit_utils import rate_limiter_registry, ModelRateLimiter, Reservation
+from app.utils.concurrency_utils import (
+    concurrency_registry, is_throttle_error, get_error_headers, get_retry_after, backoff_delay
+)
+from app.utils.call_metrics_utils import CallMetrics, get_caller_site
+from app.utils.response_cache_utils import ResponseCache
+from app.utils.claude_parsing_utils import serialize_content_blocks
+from config import Config
 
 
 class ClaudeService:
@@ -26,9 +56,46 @@ class ClaudeService:
     for making API calls with various configurations.
     """
 
+    # Rough token estimates for binary content blocks (the real count is
+    # reconciled after the call, so these only need to be in the ballpark)
+    DOCUMENT_BLOCK_TOKENS = 2000  # One PDF page (text + page image)
+    IMAGE_BLOCK_TOKENS = 1600     # ~1.15 megapixel image
+    CHARS_PER_TOKEN = 4
+
+    # Retry policy defaults (overridable per call)
+    DEFAULT_MAX_ATTEMPTS = 4
+    DEFAULT_DEADLINE_SECONDS = 900.0
+    RETRYABLE_STATUS_CODES = (408, 409, 429)
+
     def __init__(self):
         """Initialize the Claude service."""
         self._client: Optional[anthropic.Anthropic] = None
+        self._async_client: Optional[anthropic.AsyncAnthropic] = None
+        self.call_metrics = CallMetrics()
+        self.response_cache = ResponseCache(
+            Config.DATA_DIR / "cache" / "claude_responses",
+            max_bytes=int(float(os.getenv('CLAUDE_RESPONSE_CACHE_MAX_MB', '500')) * 1024 * 1024)
+        )
+
+    def _get_http_settings(self) -> Tuple[httpx.Timeout, httpx.Limits]:
+        """
+        Read timeout and connection-pool settings from the environment.
+
+        Educational Note: The SDK default (10 minute read timeout, small pool)
+        is sized for one script, not a server with many extraction workers.
+        - CLAUDE_CONNECT_TIMEOUT: seconds to open a connection (default 10)
+        - CLAUDE_READ_TIMEOUT: seconds to wait for a response (default 300)
+        - CLAUDE_MAX_CONNECTIONS: pool size shared by all threads (default 64)
+        - CLAUDE_MAX_KEEPALIVE: idle connections kept open (default 32)
+        """
+        connect_timeout = float(os.getenv('CLAUDE_CONNECT_TIMEOUT', '10'))
+        read_timeout = float(os.getenv('CLAUDE_READ_TIMEOUT', '300'))
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        limits = httpx.Limits(
+            max_connections=int(os.getenv('CLAUDE_MAX_CONNECTIONS', '64')),
+            max_keepalive_connections=int(os.getenv('CLAUDE_MAX_KEEPALIVE', '32'))
+        )
+        return timeout, limits
 
     def _get_client(self) -> anthropic.Anthropic:
         """
@@ -44,9 +111,350 @@ class ClaudeService:
             api_key = os.getenv('ANTHROPIC_API_KEY')
             if not api_key:
                 raise ValueError("ANTHROPIC_API_KEY not found in environment")
-            self._client = anthropic.Anthropic(api_key=api_key)
+            timeout, limits = self._get_http_settings()
+            self._client = anthropic.Anthropic(
+                api_key=api_key,
+                max_retries=0,  # Retries are handled by send_message's policy
+                timeout=timeout,
+                http_client=anthropic.DefaultHttpxClient(limits=limits)
+            )
         return self._client
 
+    def _get_async_client(self) -> anthropic.AsyncAnthropic:
+        """
+        Get or create the async Anthropic client.
+
+        Educational Note: The async client owns an httpx.AsyncClient connection
+        pool. One client is created per process and reused by every request on
+        the ASGI event loop, so concurrent chats share keep-alive connections
+        instead of each opening their own.
+
+        Raises:
+            ValueError: If ANTHROPIC_API_KEY is not set
+        """
+        if self._async_client is None:
+            api_key = os.getenv('ANTHROPIC_API_KEY')
+            if not api_key:
+                raise ValueError("ANTHROPIC_API_KEY not found in environment")
+            timeout, limits = self._get_http_settings()
+            self._async_client = anthropic.AsyncAnthropic(
+                api_key=api_key,
+                max_retries=0,
+                timeout=timeout,
+                http_client=anthropic.DefaultAsyncHttpxClient(limits=limits)
+            )
+        return self._async_client
+
+    async def close_async_client(self) -> None:
+        """Close the async client's connection pool (ASGI shutdown)."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    def _build_api_params(
+        self,
+        messages: List[Dict[str, Any]],
+        system_prompt: Optional[str],
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        tools: Optional[List[Dict[str, Any]]],
+        tool_choice: Optional[Dict[str, Any]],
+        extra_headers: Optional[Dict[str, str]],
+        cache_system_prompt: bool,
+    ) -> Dict[str, Any]:
+        """Build the messages.create() parameters shared by sync and async calls."""
+        api_params = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": messages,
+        }
+
+        # Add optional parameters only if provided
+        if system_prompt:
+            if cache_system_prompt:
+                # Educational Note: cache_control turns the system block into a
+                # prompt-cache breakpoint (everything before it - tools + system -
+                # is cached for ~5 minutes on Anthropic's side).
+                api_params["system"] = [{
+                    "type": "text",
+                    "text": system_prompt,
+                    "cache_control": {"type": "ephemeral"}
+                }]
+            else:
+                api_params["system"] = system_prompt
+
+        if temperature != 0.2:  # Only set if not default
+            api_params["temperature"] = temperature
+
+        if tools:
+            api_params["tools"] = tools
+
+        if tool_choice:
+            api_params["tool_choice"] = tool_choice
+
+        # Add extra headers for beta features (e.g., web_fetch)
+        if extra_headers:
+            api_params["extra_headers"] = extra_headers
+
+        return api_params
+
+    def _estimate_input_tokens(self, api_params: Dict[str, Any]) -> int:
+        """
+        Estimate input tokens for a call before it is made.
+
+        Educational Note: Text is estimated at ~4 characters per token.
+        Base64 documents/images are NOT counted by their (huge) string
+        length - each block gets a fixed per-page/per-image estimate.
+        """
+        chars = 0
+        tokens = 0
+
+        system = api_params.get("system")
+        if isinstance(system, str):
+            chars += len(system)
+        elif system:
+            chars += sum(len(block.get("text", "")) for block in system)
+
+        if api_params.get("tools"):
+            chars += len(json.dumps(api_params["tools"]))
+
+        for message in api_params.get("messages", []):
+            content = message.get("content")
+            if isinstance(content, str):
+                chars += len(content)
+                continue
+            for block in content or []:
+                if not isinstance(block, dict):
+                    chars += len(str(block))
+                    continue
+                block_type = block.get("type")
+                if block_type == "document":
+                    tokens += self.DOCUMENT_BLOCK_TOKENS
+                elif block_type == "image":
+                    tokens += self.IMAGE_BLOCK_TOKENS
+                elif block_type == "text":
+                    chars += len(block.get("text", ""))
+                elif block_type == "tool_result":
+                    result = block.get("content", "")
+                    chars += len(result if isinstance(result, str) else json.dumps(result))
+                else:
+                    chars += len(json.dumps(block.get("input", {})))
+
+        return tokens + chars // self.CHARS_PER_TOKEN
+
+    def _reserve_budget(self, api_params: Dict[str, Any]) -> Tuple[ModelRateLimiter, int, int]:
+        """Get the model's shared limiter and the (input, output) estimate for a call."""
+        limiter = rate_limiter_registry.get_limiter("anthropic", api_params.get("model") or "default")
+        input_estimate = self._estimate_input_tokens(api_params)
+        output_estimate = limiter.estimate_output_tokens(api_params.get("max_tokens") or 4096)
+        return limiter, input_estimate, output_estimate
+
+    def _reconcile_budget(self, limiter: ModelRateLimiter, reservation: Reservation, response: Any) -> None:
+        """
+        Correct the reservation with the call's real usage.
+
+        Educational Note: Cache reads don't count toward Anthropic's input
+        TPM limit, cache writes do.
+        """
+        usage = response.usage
+        limiter.reconcile(
+            reservation,
+            usage.input_tokens + (getattr(usage, "cache_creation_input_tokens", None) or 0),
+            usage.output_tokens
+        )
+
+    def _create_message(
+        self,
+        client: anthropic.Anthropic,
+        api_params: Dict[str, Any],
+        interactive: bool = False
+    ) -> Any:
+        """
+        Make the API call inside an adaptive concurrency slot.
+
+        Educational Note: with_raw_response gives us the HTTP headers
+        (anthropic-ratelimit-*) alongside the parsed message, so the AIMD
+        controller can see how much headroom is left. Interactive calls use
+        the controller's reserved lane.
+        """
+        controller = concurrency_registry.get_controller("anthropic", api_params.get("model") or "default")
+        controller.acquire(interactive=interactive)
+        outcome, headers = "error", None
+        try:
+            raw_response = client.messages.with_raw_response.create(**api_params)
+            headers = raw_response.headers
+            response = raw_response.parse()
+            outcome = "success"
+            return response
+        except Exception as e:
+            outcome = "throttled" if is_throttle_error(e) else "error"
+            headers = get_error_headers(e)
+            raise
+        finally:
+            controller.release(outcome, headers, interactive=interactive)
+
+    async def _create_message_async(
+        self,
+        client: anthropic.AsyncAnthropic,
+        api_params: Dict[str, Any],
+        interactive: bool = False
+    ) -> Any:
+        """Async version of _create_message()."""
+        controller = concurrency_registry.get_controller("anthropic", api_params.get("model") or "default")
+        await controller.acquire_async(interactive=interactive)
+        outcome, headers = "error", None
+        try:
+            raw_response = await client.messages.with_raw_response.create(**api_params)
+            headers = raw_response.headers
+            response = await raw_response.parse()
+            outcome = "success"
+            return response
+        except Exception as e:
+            outcome = "throttled" if is_throttle_error(e) else "error"
+            headers = get_error_headers(e)
+            raise
+        finally:
+            controller.release(outcome, headers, interactive=interactive)
+
+    def _is_retryable(self, error: Exception) -> bool:
+        """
+        Check whether a failed attempt is worth retrying.
+
+        Educational Note: Connection problems and timeouts (APIConnectionError
+        covers APITimeoutError), request timeouts (408), conflicts (409),
+        rate limits (429) and server errors (5xx, including 529 overloaded)
+        are transient. 400/401/403/404/413 will fail the same way again.
+        """
+        if isinstance(error, anthropic.APIConnectionError):
+            return True
+        if isinstance(error, anthropic.APIStatusError):
+            return error.status_code in self.RETRYABLE_STATUS_CODES or error.status_code >= 500
+        return False
+
+    def _next_retry_delay(
+        self,
+        error: Exception,
+        attempt: int,
+        max_attempts: int,
+        deadline: float
+    ) -> Optional[float]:
+        """
+        Decide whether to retry and how long to wait first.
+
+        Returns:
+            Seconds to wait, or None if the error should be raised
+        """
+        if attempt + 1 >= max_attempts or not self._is_retryable(error):
+            return None
+
+        base = 5.0 if is_throttle_error(error) else 1.0
+        delay = backoff_delay(attempt, get_retry_after(get_error_headers(error)), base=base)
+
+        # Don't start a retry that can't finish before the deadline
+        if time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    def _attempt_params(self, api_params: Dict[str, Any], deadline: float, timeout: Optional[float]) -> Dict[str, Any]:
+        """
+        Per-attempt params: cap the request timeout at the time left before the deadline.
+
+        Educational Note: A per-request timeout replaces the client's
+        httpx.Timeout entirely, so it is rebuilt here from the configured
+        settings - the read timeout (or the caller's timeout) capped at the
+        remaining deadline, with the configured connect timeout kept.
+        """
+        configured, _ = self._get_http_settings()
+        remaining = max(1.0, deadline - time.monotonic())
+        read_timeout = min(timeout or configured.read, remaining)
+        params = dict(api_params)
+        params["timeout"] = httpx.Timeout(read_timeout, connect=min(configured.connect, read_timeout))
+        return params
+
+    def _build_result(self, response: Any, project_id: Optional[str], batch: bool = False) -> Dict[str, Any]:
+        """
+        Track costs and convert an API response into the service's result dict.
+
+        Args:
+            response: Anthropic Message (from messages.create or a batch result)
+            project_id: Project to charge, if any
+            batch: Response came from the Message Batches API (discounted)
+        """
+        # Prompt cache usage (None when caching wasn't involved)
+        cache_creation_tokens = getattr(response.usage, "cache_creation_input_tokens", None) or 0
+        cache_read_tokens = getattr(response.usage, "cache_read_input_tokens", None) or 0
+
+        # Track costs if project_id provided
+        if project_id:
+            add_cost_usage(
+                project_id=project_id,
+                model=response.model,
+                input_tokens=response.usage.input_tokens,
+                output_tokens=response.usage.output_tokens,
+                cache_creation_input_tokens=cache_creation_tokens,
+                cache_read_input_tokens=cache_read_tokens,
+                batch=batch
+            )
+
+        usage = {
+            "input_tokens": response.usage.input_tokens,
+            "output_tokens": response.usage.output_tokens,
+        }
+        if cache_creation_tokens or cache_read_tokens:
+            usage["cache_creation_input_tokens"] = cache_creation_tokens
+            usage["cache_read_input_tokens"] = cache_read_tokens
+
+        # Return raw response data - all parsing happens in claude_parsing_utils
+        return {
+            "content_blocks": response.content,  # Raw Anthropic content blocks
+            "model": response.model,
+            "usage": usage,
+            "stop_reason": response.stop_reason,
+        }
+
+    def _lookup_cached(self, api_params: Dict[str, Any], project_id: Optional[str]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Look up a request in the response cache.
+
+        Returns:
+            Tuple of (cache key, result dict or None on a miss)
+        """
+        key = self.response_cache.make_key(api_params)
+        entry = self.response_cache.get(key)
+        if entry is None:
+            return key, None
+
+        # Nothing was billed - record the call at zero cost
+        if project_id:
+            add_cost_usage(
+                project_id=project_id,
+                model=entry["model"],
+                input_tokens=0,
+                output_tokens=0,
+                cached_response=True
+            )
+
+        return key, {
+            "content_blocks": entry["content_blocks"],  # Plain dicts (parsing utils handle both)
+            "model": entry["model"],
+            "usage": {"input_tokens": 0, "output_tokens": 0},
+            "stop_reason": entry["stop_reason"],
+            "cached_response": True,
+        }
+
+    def _store_cached(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result in the response cache (truncated responses are skipped)."""
+        if result["stop_reason"] == "max_tokens":
+            return
+        self.response_cache.put(key, {
+            "model": result["model"],
+            "stop_reason": result["stop_reason"],
+            "usage": result["usage"],
+            "content_blocks": serialize_content_blocks(result["content_blocks"]),
+            "created_at": time.time(),
+        })
+
     def send_message(
         self,
         messages: List[Dict[str, Any]],
@@ -58,6 +466,13 @@ class ClaudeService:
         tool_choice: Optional[Dict[str, Any]] = None,
         extra_headers: Optional[Dict[str, str]] = None,
         project_id: Optional[str] = None,
+        cache_system_prompt: bool = False,
+        timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        deadline_seconds: Optional[float] = None,
+        call_site: Optional[str] = None,
+        use_response_cache: bool = False,
+        interactive: bool = False,
     ) -> Dict[str, Any]:
         """
         Send messages to Claude and get a response.
@@ -78,6 +493,20 @@ class ClaudeService:
             tool_choice: Optional tool choice configuration
             extra_headers: Optional headers for beta features (e.g., {"anthropic-beta": "web-fetch-2025-09-10"})
             project_id: Optional project ID for cost tracking (if provided, costs are tracked)
+            cache_system_prompt: Mark the system prompt as a prompt-cache breakpoint.
+                The cached prefix covers tools + system prompt, so repeated calls
+                with a byte-identical prefix are billed at the cache-read rate.
+            timeout: Optional per-attempt request timeout in seconds
+                (default: CLAUDE_READ_TIMEOUT)
+            max_attempts: Attempts for transient errors (default: 4)
+            deadline_seconds: Total time budget across all attempts (default: 900)
+            call_site: Name for call metrics (default: calling module.function)
+            use_response_cache: Serve an identical earlier request from the
+                on-disk response cache (for deterministic extraction calls
+                with forced tool use - not for chat)
+            interactive: A user is waiting on this call (chat turns) - it
+                uses the concurrency controller's reserved lane instead of
+                queueing behind background extraction
 
         Returns:
             Dict containing:
@@ -86,59 +515,132 @@ class ClaudeService:
                 - usage: Token usage stats
                 - stop_reason: Why the response ended
                 - raw_response: Full API response for advanced use cases
+                - cached_response: True if served from the response cache
+                  (content_blocks are then dicts and usage is zero)
 
         Raises:
             ValueError: If API key is not configured
-            anthropic.APIError: If API call fails
+            anthropic.APIError: If API call fails (after retries)
         """
         client = self._get_client()
+        call_site = call_site or get_caller_site()
+
+        api_params = self._build_api_params(
+            messages, system_prompt, model, max_tokens, temperature,
+            tools, tool_choice, extra_headers, cache_system_prompt
+        )
+
+        if use_response_cache:
+            cache_key, cached = self._lookup_cached(api_params, project_id)
+            if cached is not None:
+                return cached
+
+        max_attempts = max_attempts or self.DEFAULT_MAX_ATTEMPTS
+        started = time.monotonic()
+        deadline = started + (deadline_seconds or self.DEFAULT_DEADLINE_SECONDS)
+
+        attempt = 0
+        while True:
+            # Wait for shared rate-limit budget (not holding any lock while waiting)
+            limiter, input_estimate, output_estimate = self._reserve_budget(api_params)
+            reservation = limiter.acquire(input_estimate, output_estimate)
+
+            # Make API call (inside an adaptive concurrency slot)
+            try:
+                response = self._create_message(
+                    client, self._attempt_params(api_params, deadline, timeout), interactive
+                )
+                break
+            except Exception as e:
+                limiter.release(reservation)
+                delay = self._next_retry_delay(e, attempt, max_attempts, deadline)
+                if delay is None:
+                    self.call_metrics.record_call(call_site, time.monotonic() - started, e)
+                    raise
+                self.call_metrics.record_retry(call_site, e)
+                print(f"Claude call from {call_site} failed ({type(e).__name__}), retrying in {delay:.1f}s (attempt {attempt + 1}/{max_attempts})")
+                time.sleep(delay)
+                attempt += 1
+
+        self.call_metrics.record_call(call_site, time.monotonic() - started)
+        self._reconcile_budget(limiter, reservation, response)
+        result = self._build_result(response, project_id)
+        if use_response_cache:
+            self._store_cached(cache_key, result)
+        return result
+
+    async def send_message_async(
+        self,
+        messages: List[Dict[str, Any]],
+        system_prompt: Optional[str] = None,
+        model: str = "claude-sonnet-4-5-20250929",
+        max_tokens: int = 4096,
+        temperature: float = 0.2,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[Dict[str, Any]] = None,
+        extra_headers: Optional[Dict[str, str]] = None,
+        project_id: Optional[str] = None,
+        cache_system_prompt: bool = False,
+        timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        deadline_seconds: Optional[float] = None,
+        call_site: Optional[str] = None,
+        use_response_cache: bool = False,
+        interactive: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Async version of send_message() for the ASGI chat path.
 
-        # Build API call parameters
-        api_params = {
-            "model": model,
-            "max_tokens": max_tokens,
-            "messages": messages,
-        }
-
-        # Add optional parameters only if provided
-        if system_prompt:
-            api_params["system"] = system_prompt
-
-        if temperature != 0.2:  # Only set if not default
-            api_params["temperature"] = temperature
-
-        if tools:
-            api_params["tools"] = tools
-
-        if tool_choice:
-            api_params["tool_choice"] = tool_choice
-
-        # Add extra headers for beta features (e.g., web_fetch)
-        if extra_headers:
-            api_params["extra_headers"] = extra_headers
-
-        # Make API call
-        response = client.messages.create(**api_params)
-
-        # Track costs if project_id provided
-        if project_id:
-            add_cost_usage(
-                project_id=project_id,
-                model=response.model,
-                input_tokens=response.usage.input_tokens,
-                output_tokens=response.usage.output_tokens
-            )
-
-        # Return raw response data - all parsing happens in claude_parsing_utils
-        return {
-            "content_blocks": response.content,  # Raw Anthropic content blocks
-            "model": response.model,
-            "usage": {
-                "input_tokens": response.usage.input_tokens,
-                "output_tokens": response.usage.output_tokens,
-            },
-            "stop_reason": response.stop_reason,
-        }
+        Educational Note: While awaiting Claude, the event loop serves other
+        requests - a chat waiting on a 20 second tool loop costs a coroutine,
+        not a whole OS thread. Parameters, retry policy and return value are
+        identical to send_message().
+        """
+        client = self._get_async_client()
+        call_site = call_site or get_caller_site()
+
+        api_params = self._build_api_params(
+            messages, system_prompt, model, max_tokens, temperature,
+            tools, tool_choice, extra_headers, cache_system_prompt
+        )
+
+        if use_response_cache:
+            # Cache reads/writes are file I/O - keep them off the event loop
+            cache_key, cached = await asyncio.to_thread(self._lookup_cached, api_params, project_id)
+            if cached is not None:
+                return cached
+
+        max_attempts = max_attempts or self.DEFAULT_MAX_ATTEMPTS
+        started = time.monotonic()
+        deadline = started + (deadline_seconds or self.DEFAULT_DEADLINE_SECONDS)
+
+        attempt = 0
+        while True:
+            limiter, input_estimate, output_estimate = self._reserve_budget(api_params)
+            reservation = await limiter.acquire_async(input_estimate, output_estimate)
+
+            try:
+                response = await self._create_message_async(
+                    client, self._attempt_params(api_params, deadline, timeout), interactive
+                )
+                break
+            except Exception as e:
+                limiter.release(reservation)
+                delay = self._next_retry_delay(e, attempt, max_attempts, deadline)
+                if delay is None:
+                    self.call_metrics.record_call(call_site, time.monotonic() - started, e)
+                    raise
+                self.call_metrics.record_retry(call_site, e)
+                print(f"Claude call from {call_site} failed ({type(e).__name__}), retrying in {delay:.1f}s (attempt {attempt + 1}/{max_attempts})")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+        self.call_metrics.record_call(call_site, time.monotonic() - started)
+        self._reconcile_budget(limiter, reservation, response)
+        result = self._build_result(response, project_id)
+        if use_response_cache:
+            await asyncio.to_thread(self._store_cached, cache_key, result)
+        return result
 
     def count_tokens(
         self,
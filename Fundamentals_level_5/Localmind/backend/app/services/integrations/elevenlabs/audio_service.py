@@ -15,6 +15,13 @@ Key Features:
 Processing Flow:
     Audio file → ElevenLabs API → Transcript text → Split into pages → Save
 
+Long recordings (AUDIO_SEGMENT_THRESHOLD_SECONDS and up, when ffmpeg is
+installed) are split on pauses into overlapping ~10 minute segments
+(audio_segment_utils), transcribed in parallel within the ElevenLabs
+plan's concurrency limit, and retried segment by segment. Each segment
+becomes one AUDIO page with timestamped speaker turns; pages are written
+in order as segments finish.
+
 Supported Languages (sample):
     English (eng), Hindi (hin), Spanish (spa), French (fra), German (deu),
     Japanese (jpn), Korean (kor), Mandarin Chinese (zho), Arabic (ara), etc.
@@ -24,11 +31,32 @@ Note: This is separate from transcription_service.py which handles real-time
 WebSocket transcription for chat voice input.
 """
 import os
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from config import Config
+from app.config import get_elevenlabs_config
+from app.services.background_services import task_service, ProgressTracker
+from app.utils import audio_segment_utils
+from app.utils.audio_segment_utils import (
+    TranscriptStitcher,
+    format_timestamp,
+    format_transcript_words,
+    cut_audio_segment,
+)
+from app.utils.concurrency_utils import backoff_delay, get_retry_after, get_error_headers
+from app.utils.text import StreamingProcessedOutput
+from app.utils.embedding_utils import count_tokens
+
+
+class CancelledException(Exception):
+    """Raised when processing is cancelled by user."""
+    pass
 
 
 # Supported language codes for ElevenLabs Speech-to-Text
@@ -69,6 +97,12 @@ class AudioService:
     # Model for file-based transcription (not realtime)
     TRANSCRIPTION_MODEL = "scribe_v1"
 
+    # Attempts per segment before the transcription fails
+    MAX_SEGMENT_ATTEMPTS = 3
+
+    # How often the segment loop checks for cancellation while waiting
+    CANCEL_POLL_SECONDS = 1.0
+
     def __init__(self):
         """Initialize the audio service."""
         self.projects_dir = Config.PROJECTS_DIR
@@ -152,25 +186,31 @@ class AudioService:
             else:
                 print("Using auto language detection")
 
+            # Build API call kwargs conditionally
+            # Educational Note: We only pass language_code if explicitly set,
+            # otherwise ElevenLabs auto-detects the language
+            api_kwargs = {
+                "model_id": self.TRANSCRIPTION_MODEL,
+                "diarize": diarize,
+                "tag_audio_events": tag_audio_events,
+                "timestamps_granularity": "word"  # Get word-level timestamps
+            }
+
+            # Only add language_code if explicitly specified
+            if normalized_language:
+                api_kwargs["language_code"] = normalized_language
+
+            # Long recordings are split and transcribed in parallel
+            duration = audio_segment_utils.get_audio_duration(audio_path)
+            if duration and duration >= audio_segment_utils.SEGMENT_THRESHOLD_SECONDS:
+                return self._transcribe_segmented(
+                    client, project_id, source_id, audio_path, duration, api_kwargs, diarize
+                )
+
             # Read the audio file
             with open(audio_path, "rb") as audio_file:
-                # Build API call kwargs conditionally
-                # Educational Note: We only pass language_code if explicitly set,
-                # otherwise ElevenLabs auto-detects the language
-                api_kwargs = {
-                    "file": audio_file,
-                    "model_id": self.TRANSCRIPTION_MODEL,
-                    "diarize": diarize,
-                    "tag_audio_events": tag_audio_events,
-                    "timestamps_granularity": "word"  # Get word-level timestamps
-                }
-
-                # Only add language_code if explicitly specified
-                if normalized_language:
-                    api_kwargs["language_code"] = normalized_language
-
                 # Call ElevenLabs Speech-to-Text API
-                transcription = client.speech_to_text.convert(**api_kwargs)
+                transcription = client.speech_to_text.convert(file=audio_file, **api_kwargs)
 
             # Extract the transcript text
             transcript_text = self._build_transcript_text(transcription, diarize)
@@ -192,7 +232,8 @@ class AudioService:
                 transcription=transcription,
                 detected_language_code=detected_language_code,
                 detected_language_name=detected_language_name,
-                diarization_enabled=diarize
+                diarization_enabled=diarize,
+                duration=format_timestamp(duration) if duration else ""
             )
 
             # Save to processed directory
@@ -212,6 +253,8 @@ class AudioService:
                 "detected_language_name": detected_language_name,
                 "model_used": self.TRANSCRIPTION_MODEL,
                 "diarization_enabled": diarize,
+                "duration": format_timestamp(duration) if duration else None,
+                "segments": 1,
                 "extracted_at": datetime.now().isoformat()
             }
 
@@ -228,6 +271,243 @@ class AudioService:
                 "error": f"Transcription failed: {str(e)}"
             }
 
+    def _normalize_words(self, transcription, offset: float) -> List[Dict[str, Any]]:
+        """
+        Word-level data of a segment as plain dicts in file time.
+
+        Educational Note: Segment timestamps start at 0; adding the
+        segment's start offset puts every word on the recording's timeline.
+        """
+        words = []
+        for word in getattr(transcription, "words", None) or []:
+            start = getattr(word, "start", None)
+            if start is None:
+                continue
+            end = getattr(word, "end", None)
+            words.append({
+                "text": getattr(word, "text", "") or "",
+                "start": offset + start,
+                "end": offset + (end if end is not None else start),
+                "type": getattr(word, "type", "word") or "word",
+                "speaker": getattr(word, "speaker_id", None),
+            })
+        return words
+
+    def _transcribe_segment(
+        self,
+        client,
+        audio_path: Path,
+        segment: Dict[str, Any],
+        api_kwargs: Dict[str, Any],
+        work_dir: Path,
+        source_id: str,
+        progress: ProgressTracker
+    ) -> Dict[str, Any]:
+        """
+        Cut and transcribe one segment, retrying it on failure (worker thread).
+
+        Returns:
+            Dict with index, success, words/text/language_code or error
+        """
+        if task_service.is_target_cancelled(source_id):
+            raise CancelledException("Processing cancelled by user")
+
+        segment_path = work_dir / f"segment_{segment['index']:04d}.flac"
+        error = None
+        progress.batch_started()
+        try:
+            cut_audio_segment(audio_path, segment, segment_path)
+
+            for attempt in range(self.MAX_SEGMENT_ATTEMPTS):
+                try:
+                    with open(segment_path, "rb") as segment_file:
+                        transcription = client.speech_to_text.convert(file=segment_file, **api_kwargs)
+                    progress.batch_finished(units=1)
+                    return {
+                        "index": segment["index"],
+                        "success": True,
+                        "words": self._normalize_words(transcription, segment["start"]),
+                        "text": getattr(transcription, "text", "") or "",
+                        "language_code": getattr(transcription, "language_code", None),
+                    }
+                except Exception as e:
+                    error = e
+                    if attempt + 1 < self.MAX_SEGMENT_ATTEMPTS:
+                        delay = backoff_delay(attempt, get_retry_after(get_error_headers(e)))
+                        print(f"Segment {segment['index']} attempt {attempt + 1} failed: {e}. Retrying in {delay:.1f}s")
+                        time.sleep(delay)
+        except RuntimeError as e:
+            # ffmpeg couldn't cut the segment - retrying won't help
+            error = e
+        finally:
+            segment_path.unlink(missing_ok=True)
+
+        progress.batch_finished(units=0)
+        return {"index": segment["index"], "success": False, "error": str(error)}
+
+    def _format_segment_page(
+        self,
+        segment: Dict[str, Any],
+        result: Dict[str, Any],
+        stitcher: TranscriptStitcher,
+        diarize: bool
+    ) -> str:
+        """Page content for one segment: its time range and its own words."""
+        words = result["words"]
+        if not diarize:
+            words = [{**w, "speaker": None} for w in words]
+        owned = stitcher.add_segment(segment, words)
+
+        # No word timestamps: fall back to the segment text (overlap included)
+        text = format_transcript_words(owned) if words else result["text"].strip()
+        time_range = f"{format_timestamp(segment['core_start'])} - {format_timestamp(segment['core_end'])}"
+        return f"Time: {time_range}\n\n{text}"
+
+    def _transcribe_segmented(
+        self,
+        client,
+        project_id: str,
+        source_id: str,
+        audio_path: Path,
+        duration: float,
+        api_kwargs: Dict[str, Any],
+        diarize: bool
+    ) -> Dict[str, Any]:
+        """
+        Transcribe a long recording as parallel segments.
+
+        Educational Note: Segments run on a pool sized by the ElevenLabs
+        plan (ELEVENLABS_TIER). Results arrive in any order, but pages must
+        be stitched in order (speaker labels of a segment are resolved
+        against the one before), so finished segments wait until every
+        earlier segment is in, then go straight to the processed file.
+        One segment failing after its retries fails the transcription, and
+        the segments still queued are cancelled instead of transcribed.
+        """
+        segments = audio_segment_utils.plan_audio_segments(audio_path, duration)
+        max_workers = max(1, min(get_elevenlabs_config()["max_workers"], len(segments)))
+        print(
+            f"Transcribing {format_timestamp(duration)} of audio as {len(segments)} segments "
+            f"with {max_workers} workers ({sum(s['cut_in_silence'] for s in segments[:-1])} cuts in pauses)"
+        )
+
+        progress = ProgressTracker(
+            project_id, source_id, "transcribing",
+            total=len(segments), unit="segments", batches_total=len(segments)
+        )
+        writer = StreamingProcessedOutput(project_id, source_id, "AUDIO", total_pages=len(segments))
+        stitcher = TranscriptStitcher()
+        finished: Dict[int, Dict[str, Any]] = {}
+        failed: List[Dict[str, Any]] = []
+        skipped_segments = 0
+        languages: Counter = Counter()
+        character_count = 0
+        token_count = 0
+        next_index = 1
+
+        try:
+            with tempfile.TemporaryDirectory(prefix="audio_segments_", ignore_cleanup_errors=True) as temp_dir:
+                executor = ThreadPoolExecutor(max_workers=max_workers)
+                try:
+                    pending = {
+                        executor.submit(
+                            self._transcribe_segment,
+                            client, audio_path, segment, api_kwargs,
+                            Path(temp_dir), source_id, progress
+                        )
+                        for segment in segments
+                    }
+
+                    while pending:
+                        done, pending = wait(pending, timeout=self.CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+
+                        if task_service.is_target_cancelled(source_id):
+                            raise CancelledException("Processing cancelled by user")
+
+                        for future in done:
+                            result = future.result()
+                            if not result["success"]:
+                                print(f"Segment {result['index']}/{len(segments)} FAILED: {result['error']}")
+                                failed.append(result)
+                                continue
+                            finished[result["index"]] = result
+                            print(f"Segment {result['index']}/{len(segments)} transcribed")
+
+                        # Write every page that now has all earlier pages
+                        while not failed and next_index in finished:
+                            result = finished.pop(next_index)
+                            page = self._format_segment_page(segments[next_index - 1], result, stitcher, diarize)
+                            writer.add_page(next_index, page)
+                            character_count += len(page)
+                            token_count += count_tokens(page)
+                            if result["language_code"]:
+                                languages[result["language_code"]] += 1
+                            next_index += 1
+
+                        if failed:
+                            # The transcript fails as a whole - stop spending calls on the rest
+                            skipped_segments = len(pending)
+                            break
+                finally:
+                    # Don't wait for (or start) segments nobody will use
+                    executor.shutdown(wait=False, cancel_futures=True)
+
+            if failed:
+                indexes = sorted(r["index"] for r in failed)
+                message = f"Failed to transcribe {len(indexes)} segment(s): {indexes[:5]} ({failed[0]['error']})"
+                if skipped_segments:
+                    message += f"; {skipped_segments} remaining segment(s) cancelled"
+                raise Exception(message)
+
+            detected_language_code = languages.most_common(1)[0][0] if languages else None
+            detected_language_name = SUPPORTED_LANGUAGES.get(detected_language_code, detected_language_code)
+            language = ""
+            if detected_language_code:
+                language = f"{detected_language_name} ({detected_language_code})" if detected_language_name else detected_language_code
+
+            metadata = {
+                "model_used": self.TRANSCRIPTION_MODEL,
+                "language": language,
+                "duration": format_timestamp(duration),
+                "diarization_enabled": diarize,
+                "character_count": character_count,
+                "token_count": token_count
+            }
+            output_path = writer.finish(source_name=audio_path.name, metadata=metadata)
+            progress.finish()
+            print(f"Saved transcript to: {output_path}")
+
+            return {
+                "success": True,
+                "character_count": character_count,
+                "detected_language_code": detected_language_code,
+                "detected_language_name": detected_language_name,
+                "model_used": self.TRANSCRIPTION_MODEL,
+                "diarization_enabled": diarize,
+                "duration": format_timestamp(duration),
+                "segments": len(segments),
+                "parallel_workers": max_workers,
+                "extracted_at": datetime.now().isoformat()
+            }
+
+        except CancelledException as e:
+            print(f"Transcription cancelled: {e}")
+            writer.abort()
+            progress.finish(success=False, error=str(e))
+            return {
+                "success": False,
+                "status": "cancelled",
+                "error": str(e)
+            }
+        except Exception as e:
+            print(f"Error transcribing audio segments: {e}")
+            writer.abort()
+            progress.finish(success=False, error=str(e))
+            return {
+                "success": False,
+                "error": f"Transcription failed: {str(e)}"
+            }
+
     def _build_transcript_text(
         self,
         transcription,
@@ -325,7 +605,8 @@ class AudioService:
         transcription,
         detected_language_code: Optional[str] = None,
         detected_language_name: Optional[str] = None,
-        diarization_enabled: bool = True
+        diarization_enabled: bool = True,
+        duration: str = ""
     ) -> str:
         """
         Build processed content using centralized build_processed_output.
@@ -342,6 +623,7 @@ class AudioService:
             detected_language_code: Language code (e.g., "eng") from ElevenLabs
             detected_language_name: Human-readable language name (e.g., "English")
             diarization_enabled: Whether speaker diarization was enabled
+            duration: Recording length as HH:MM:SS (from ffprobe), if known
 
         Returns:
             Formatted content with standardized header and AUDIO PAGE markers
@@ -362,11 +644,12 @@ class AudioService:
         token_count = count_tokens(transcript_text)
 
         # Build metadata dict with all keys audio service can provide
-        # Educational Note: duration is not available from ElevenLabs transcription API
+        # Educational Note: duration is not in the ElevenLabs response; it
+        # comes from ffprobe when ffmpeg is installed
         metadata = {
             "model_used": self.TRANSCRIPTION_MODEL,
             "language": language,
-            "duration": "",  # Not available from ElevenLabs transcription response
+            "duration": duration,
             "diarization_enabled": diarization_enabled,
             "character_count": len(transcript_text),
             "token_count": token_count
@@ -9,6 +9,8 @@ Key Features:
 - Multiple output formats (mp3, wav)
 - Multilingual support via eleven_multilingual_v2 model
 - Streaming support for long content
+- Long scripts synthesized in parallel chunks, written to disk in order
+- Synthesized segments cached on disk, so unchanged text isn't re-sent
 
 Models:
 - eleven_multilingual_v2: High quality, supports 29 languages
@@ -20,10 +22,19 @@ Output Formats:
 - pcm_16000: Raw PCM for processing
 """
 import os
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, Generator, Union
+from typing import Optional, Generator, Union, Callable, List
 from datetime import datetime
 
+from app.config import get_elevenlabs_config
+from app.utils.concurrency_utils import backoff_delay, get_retry_after, get_error_headers
+from app.utils.tts_cache_utils import AudioSegmentCache
+from config import Config
+
 
 class TTSService:
     """
@@ -53,9 +64,24 @@ class TTSService:
     # We use 9,500 to leave buffer for edge cases
     MAX_CHARS_PER_REQUEST = 9500
 
+    # Attempts per chunk before generation fails
+    MAX_CHUNK_ATTEMPTS = 3
+
+    # Neighbouring text sent with each chunk for continuous intonation
+    CONTEXT_CHARS = 500
+
+    # Paragraphs are grouped into segments of up to this many characters -
+    # large enough that a script is a handful of requests, with room below
+    # MAX_CHARS_PER_REQUEST so a grown paragraph rarely forces a split
+    TARGET_SEGMENT_CHARS = MAX_CHARS_PER_REQUEST - 3000
+
     def __init__(self):
         """Initialize the TTS service."""
         self._client = None
+        self.segment_cache = AudioSegmentCache(
+            Config.DATA_DIR / "cache" / "tts_segments",
+            max_bytes=int(float(os.getenv('TTS_CACHE_MAX_MB', '500')) * 1024 * 1024)
+        )
 
     def _get_client(self):
         """
@@ -95,7 +121,6 @@ class TTSService:
         current_chunk = ""
 
         # Split by sentence endings
-        import re
         sentences = re.split(r'(?<=[.!?])\s+', text)
 
         for sentence in sentences:
@@ -126,20 +151,109 @@ class TTSService:
 
         return chunks
 
+    def _split_into_segments(self, text: str) -> List[str]:
+        """
+        Split text into paragraph-sized segments for synthesis and caching.
+
+        Educational Note: Segments are the unit of the TTS cache, so their
+        boundaries must be stable under edits. Paragraphs are natural
+        boundaries - editing one paragraph changes only its own segment.
+        Whole paragraphs are grouped up to TARGET_SEGMENT_CHARS, so every
+        segment boundary is a paragraph boundary and each request carries
+        thousands of characters, not one speaker line. Only a paragraph
+        over the API limit is split, at sentence boundaries.
+        """
+        paragraphs = [p.strip() for p in re.split(r'\n\s*\n', text) if p.strip()]
+
+        segments = []
+        pending = ""
+        for paragraph in paragraphs:
+            if pending and len(pending) + len(paragraph) + 2 > self.TARGET_SEGMENT_CHARS:
+                segments.extend(self._split_text_for_tts(pending))
+                pending = ""
+            pending = f"{pending}\n\n{paragraph}" if pending else paragraph
+
+        if pending:
+            segments.extend(self._split_text_for_tts(pending))
+
+        return segments
+
+    def _synthesize_chunk(
+        self,
+        client,
+        index: int,
+        text_chunks: List[str],
+        voice: str,
+        model: str,
+        fmt: str,
+        part_path: Path
+    ) -> int:
+        """
+        Synthesize one chunk into a part file, retrying on failure (worker thread).
+
+        Educational Note: Audio is streamed from the API straight to disk,
+        so a chunk never sits in memory. The neighbouring chunks' text is
+        sent as previous_text/next_text - chunks are synthesized in
+        parallel, and this keeps intonation continuous across the joins.
+
+        Returns:
+            Size of the part file in bytes
+
+        Raises:
+            Exception: The last error, once every attempt failed
+        """
+        context = {}
+        if index > 0:
+            context["previous_text"] = text_chunks[index - 1][-self.CONTEXT_CHARS:]
+        if index + 1 < len(text_chunks):
+            context["next_text"] = text_chunks[index + 1][:self.CONTEXT_CHARS]
+
+        for attempt in range(self.MAX_CHUNK_ATTEMPTS):
+            try:
+                audio_generator = client.text_to_speech.convert(
+                    text=text_chunks[index],
+                    voice_id=voice,
+                    model_id=model,
+                    output_format=fmt,
+                    **context
+                )
+                with open(part_path, "wb") as f:
+                    for piece in audio_generator:
+                        f.write(piece)
+                return part_path.stat().st_size
+            except Exception as e:
+                if attempt + 1 >= self.MAX_CHUNK_ATTEMPTS:
+                    raise
+                delay = backoff_delay(attempt, get_retry_after(get_error_headers(e)))
+                print(f"  Chunk {index + 1} attempt {attempt + 1} failed: {e}. Retrying in {delay:.1f}s")
+                time.sleep(delay)
+
     def generate_audio(
         self,
         text: str,
         output_path: Path,
         voice_id: Optional[str] = None,
         model_id: Optional[str] = None,
-        output_format: Optional[str] = None
+        output_format: Optional[str] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        use_cache: bool = True
     ) -> dict:
         """
         Generate audio from text and save to file.
 
-        Educational Note: This method converts text to speech and saves the
-        resulting audio to a file. It uses the ElevenLabs SDK's convert method
-        which returns audio bytes directly.
+        Educational Note: Scripts are split into paragraph-sized chunks
+        (segments) under the ElevenLabs character limit. Each segment is
+        looked up in the segment cache first - keyed by its text, voice,
+        model and format - so regenerating an edited script only sends the
+        changed paragraphs to the API. The misses are synthesized in
+        parallel, up to the plan's concurrency limit (ELEVENLABS_TIER), and
+        stored in the cache.
+
+        Each chunk lands in its own part file; as soon as the chunks before
+        it are done, it is appended to output_path and deleted. The output
+        file grows in order from the first chunk on - it can be played while
+        the rest is still being synthesized - and memory use doesn't grow
+        with script length.
 
         Args:
             text: The text to convert to speech
@@ -147,6 +261,9 @@ class TTSService:
             voice_id: ElevenLabs voice ID (uses default if not specified)
             model_id: TTS model to use (uses multilingual_v2 by default)
             output_format: Audio format (uses mp3_44100_128 by default)
+            on_progress: Called as on_progress(chunks_written, total_chunks)
+                         each time the playable prefix of the file grows
+            use_cache: Reuse and store cached segments (default True)
 
         Returns:
             Dict with success status, file path, and metadata
@@ -157,6 +274,7 @@ class TTSService:
                 "error": "No text provided for TTS conversion"
             }
 
+        part_paths: List[Path] = []
         try:
             client = self._get_client()
 
@@ -167,32 +285,70 @@ class TTSService:
             model = model_id or self.DEFAULT_MODEL
             fmt = output_format or self.DEFAULT_OUTPUT_FORMAT
 
-            # Split text if it exceeds ElevenLabs limit
-            text_chunks = self._split_text_for_tts(text)
-            print(f"Split into {len(text_chunks)} chunk(s) for TTS")
-
-            # Generate audio for each chunk
-            all_audio_bytes = []
-            for i, chunk in enumerate(text_chunks, 1):
-                print(f"  Generating chunk {i}/{len(text_chunks)} ({len(chunk)} chars)")
-                audio_generator = client.text_to_speech.convert(
-                    text=chunk,
-                    voice_id=voice,
-                    model_id=model,
-                    output_format=fmt
-                )
-                chunk_bytes = b"".join(audio_generator)
-                all_audio_bytes.append(chunk_bytes)
+            # Split into segments (each under the ElevenLabs limit)
+            text_chunks = self._split_into_segments(text)
 
             # Ensure output directory exists
             output_path.parent.mkdir(parents=True, exist_ok=True)
+            part_paths = [
+                output_path.with_name(f"{output_path.name}.part{i}")
+                for i in range(len(text_chunks))
+            ]
+
+            # Cached segments are copied straight into their part files
+            cache = self.segment_cache if use_cache else None
+            cache_keys = [cache.make_key(chunk, voice, model, fmt) for chunk in text_chunks] if cache else []
+            ready = set()
+            if cache:
+                for i, chunk in enumerate(text_chunks):
+                    if cache.copy_to(cache_keys[i], part_paths[i], characters=len(chunk)):
+                        ready.add(i)
+            to_synthesize = [i for i in range(len(text_chunks)) if i not in ready]
+            synthesized_chars = sum(len(text_chunks[i]) for i in to_synthesize)
+
+            max_workers = max(1, min(get_elevenlabs_config()["max_workers"], len(to_synthesize)))
+            print(f"Split into {len(text_chunks)} chunk(s) for TTS: {len(ready)} cached, "
+                  f"{len(to_synthesize)} to synthesize ({synthesized_chars} chars), {max_workers} in parallel")
+
+            file_size = 0
+            next_index = 0
+
+            def append_ready_chunks() -> None:
+                """Append every chunk that now has all earlier chunks."""
+                nonlocal file_size, next_index
+                while next_index in ready:
+                    with open(part_paths[next_index], "rb") as part_file:
+                        shutil.copyfileobj(part_file, output_file)
+                    output_file.flush()
+                    file_size += part_paths[next_index].stat().st_size
+                    part_paths[next_index].unlink()
+                    next_index += 1
+                    if on_progress:
+                        on_progress(next_index, len(text_chunks))
 
-            # Combine all audio chunks
             # Educational Note: MP3 files can be concatenated directly
-            audio_bytes = b"".join(all_audio_bytes)
-
-            with open(output_path, "wb") as f:
-                f.write(audio_bytes)
+            with open(output_path, "wb") as output_file, ThreadPoolExecutor(max_workers=max_workers) as executor:
+                append_ready_chunks()
+                futures = {
+                    executor.submit(
+                        self._synthesize_chunk,
+                        client, i, text_chunks, voice, model, fmt, part_paths[i]
+                    ): i
+                    for i in to_synthesize
+                }
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                        index = futures[future]
+                        if cache:
+                            cache.put(cache_keys[index], part_paths[index])
+                        ready.add(index)
+                        print(f"  Chunk {index + 1}/{len(text_chunks)} synthesized")
+                        append_ready_chunks()
+                except Exception:
+                    for f in futures:
+                        f.cancel()
+                    raise
 
             # Calculate duration estimate (rough: ~150 words/min, ~5 chars/word)
             # This is approximate - actual duration depends on voice and model
@@ -205,10 +361,14 @@ class TTSService:
             return {
                 "success": True,
                 "file_path": str(output_path),
-                "file_size_bytes": len(audio_bytes),
+                "file_size_bytes": file_size,
                 "character_count": len(text),
                 "word_count": word_count,
                 "estimated_duration_seconds": estimated_duration_seconds,
+                "chunk_count": len(text_chunks),
+                "cached_chunks": len(text_chunks) - len(to_synthesize),
+                "synthesized_characters": synthesized_chars,
+                "parallel_workers": max_workers,
                 "voice_id": voice,
                 "model_id": model,
                 "output_format": fmt,
@@ -223,6 +383,9 @@ class TTSService:
             }
         except Exception as e:
             print(f"Error generating audio: {e}")
+            for part_path in part_paths:
+                part_path.unlink(missing_ok=True)
+            output_path.unlink(missing_ok=True)
             return {
                 "success": False,
                 "error": f"TTS generation failed: {str(e)}"
@@ -18,18 +18,37 @@ MIME Type Mapping:
 - application/vnd.google-apps.spreadsheet → Google Sheet
 - application/vnd.google-apps.presentation → Google Slides
 - application/vnd.google-apps.folder → Folder
+
+Performance:
+- Folder listings are cached for DRIVE_LIST_CACHE_SECONDS (default 60),
+  so navigating back and forth doesn't re-query Drive
+- Downloads stream straight to disk through a per-thread authorized
+  session (the API client object isn't thread-safe), so several files
+  can download at once without holding them in memory
+- Partial downloads are kept in a staging directory, keyed by file ID and
+  version; a failed or interrupted download resumes from its offset with
+  an HTTP Range request instead of starting over. Partial files nobody
+  resumed within DRIVE_STAGING_MAX_AGE_HOURS (default 24) are deleted
+  (cleanup_staging, run when a batch import is submitted)
 """
 
+import hashlib
 import os
-import io
+import shutil
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+import requests
+from google.auth.transport.requests import AuthorizedSession
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
 
 from app.services.integrations.google.google_auth_service import google_auth_service
+from app.utils.concurrency_utils import backoff_delay, get_retry_after
+from config import Config
 
 
 class GoogleDriveService:
@@ -91,9 +110,46 @@ class GoogleDriveService:
         'application/vnd.google-apps.folder',
     ]
 
+    FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+    API_BASE_URL = "https://www.googleapis.com/drive/v3/files"
+
+    # Metadata needed to download, verify and resume a file
+    DOWNLOAD_FIELDS = "id, name, mimeType, size, md5Checksum, modifiedTime"
+
+    # How long a folder listing is served from memory
+    LIST_CACHE_SECONDS = float(os.getenv('DRIVE_LIST_CACHE_SECONDS', '60'))
+    MAX_LIST_CACHE_ENTRIES = 256
+
+    # Bytes read from the response stream per write
+    DOWNLOAD_CHUNK_BYTES = int(float(os.getenv('DRIVE_DOWNLOAD_CHUNK_MB', '8')) * 1024 * 1024)
+
+    # Attempts per file; each retry resumes from the bytes already on disk
+    MAX_DOWNLOAD_ATTEMPTS = 5
+    RETRYABLE_STATUS_CODES = (403, 408, 429, 500, 502, 503, 504)
+    DOWNLOAD_TIMEOUT = (10, 120)
+
+    # Partial downloads not written to for this long are abandoned
+    STAGING_MAX_AGE_SECONDS = float(os.getenv('DRIVE_STAGING_MAX_AGE_HOURS', '24')) * 3600
+
     def __init__(self):
         """Initialize the Google Drive service."""
         self._service = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._list_cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.staging_dir = Config.DATA_DIR / "cache" / "drive_downloads"
+        self._stats = {
+            "list_cache_hits": 0,
+            "list_cache_misses": 0,
+            "downloads": 0,
+            "exports": 0,
+            "failures": 0,
+            "retries": 0,
+            "bytes_downloaded": 0,
+            "bytes_resumed": 0,
+            "staging_cleaned": 0,
+        }
 
     def _get_service(self):
         """
@@ -115,15 +171,48 @@ class GoogleDriveService:
 
         return self._service
 
+    def _get_session(self) -> Optional[AuthorizedSession]:
+        """
+        Get this thread's authorized HTTP session for raw API requests.
+
+        Educational Note: The discovery-based API client shares one
+        httplib2 connection and is not safe to use from several threads.
+        Downloads run in worker threads, so each thread gets its own
+        requests session; it refreshes the access token by itself.
+
+        Returns:
+            AuthorizedSession or None if not connected
+        """
+        creds = google_auth_service.get_credentials()
+        if not creds:
+            return None
+
+        # Reuse the session while the same account is connected
+        cached = getattr(self._local, "session", None)
+        if cached is None or cached[0] != creds.refresh_token:
+            cached = (creds.refresh_token, AuthorizedSession(creds))
+            self._local.session = cached
+        return cached[1]
+
+    def _count(self, stat: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[stat] += amount
+
     def is_connected(self) -> bool:
         """Check if Google Drive is connected and accessible."""
         return self._get_service() is not None
 
+    def clear_listing_cache(self) -> None:
+        """Drop cached folder listings (e.g. after disconnecting the account)."""
+        with self._lock:
+            self._list_cache.clear()
+
     def list_files(
         self,
         folder_id: Optional[str] = None,
         page_size: int = 50,
-        page_token: Optional[str] = None
+        page_token: Optional[str] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         List files from Google Drive.
@@ -134,10 +223,15 @@ class GoogleDriveService:
         - trashed = false: Exclude deleted files
         - mimeType = '...': Filter by file type
 
+        Successful listings are cached for LIST_CACHE_SECONDS - short
+        enough that new uploads show up quickly, long enough that browsing
+        into a folder and back doesn't query Drive again.
+
         Args:
             folder_id: Optional folder ID to list (None = root/all)
             page_size: Number of files per page (max 1000)
             page_token: Token for pagination
+            use_cache: Serve a recent listing from memory (default True)
 
         Returns:
             Dict with files list and pagination info
@@ -149,6 +243,16 @@ class GoogleDriveService:
                 'error': 'Google Drive not connected'
             }
 
+        cache_key = (folder_id, page_size, page_token)
+        if use_cache and self.LIST_CACHE_SECONDS > 0:
+            with self._lock:
+                cached = self._list_cache.get(cache_key)
+                if cached and time.time() - cached[0] < self.LIST_CACHE_SECONDS:
+                    self._list_cache.move_to_end(cache_key)
+                    self._stats["list_cache_hits"] += 1
+                    return cached[1]
+        self._count("list_cache_misses")
+
         try:
             # Build query
             # Educational Note: We filter for supported file types and exclude trash
@@ -166,7 +270,7 @@ class GoogleDriveService:
                 q=query,
                 pageSize=page_size,
                 pageToken=page_token,
-                fields="nextPageToken, files(id, name, mimeType, size, modifiedTime, parents, iconLink, thumbnailLink)",
+                fields="nextPageToken, files(id, name, mimeType, size, md5Checksum, modifiedTime, parents, iconLink, thumbnailLink)",
                 orderBy="modifiedTime desc"
             ).execute()
 
@@ -194,6 +298,7 @@ class GoogleDriveService:
                     'mime_type': mime_type,
                     'size': int(file.get('size', 0)) if file.get('size') else None,
                     'modified_time': file.get('modifiedTime'),
+                    'md5_checksum': file.get('md5Checksum'),
                     'is_folder': is_folder,
                     'is_google_file': is_google_file and not is_folder,
                     'export_extension': export_info.get('extension'),
@@ -202,13 +307,21 @@ class GoogleDriveService:
                     'thumbnail_link': file.get('thumbnailLink'),
                 })
 
-            return {
+            result = {
                 'success': True,
                 'files': processed_files,
                 'next_page_token': results.get('nextPageToken'),
                 'folder_id': folder_id
             }
 
+            with self._lock:
+                self._list_cache[cache_key] = (time.time(), result)
+                self._list_cache.move_to_end(cache_key)
+                while len(self._list_cache) > self.MAX_LIST_CACHE_ENTRIES:
+                    self._list_cache.popitem(last=False)
+
+            return result
+
         except Exception as e:
             return {
                 'success': False,
@@ -235,7 +348,7 @@ class GoogleDriveService:
         try:
             file = service.files().get(
                 fileId=file_id,
-                fields="id, name, mimeType, size, modifiedTime, parents, webViewLink"
+                fields="id, name, mimeType, size, md5Checksum, modifiedTime, parents, webViewLink"
             ).execute()
 
             return {
@@ -249,7 +362,95 @@ class GoogleDriveService:
                 'error': f'Failed to get file info: {str(e)}'
             }
 
-    def download_file(self, file_id: str, destination_path: Path) -> Tuple[bool, str]:
+    def list_folder_files(
+        self,
+        folder_id: str,
+        recursive: bool = False,
+        max_files: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        List every importable file in a folder, following pagination.
+
+        Educational Note: Pages of up to 1000 entries go through
+        list_files(), so they share its listing cache. Subfolders are
+        walked breadth-first when recursive is set.
+
+        Args:
+            folder_id: The folder to list
+            recursive: Include files in subfolders
+            max_files: Stop after this many files
+
+        Returns:
+            Dict with success status and files (folders excluded)
+        """
+        files: List[Dict[str, Any]] = []
+        pending_folders = [folder_id]
+        seen_folders = set()
+
+        while pending_folders and len(files) < max_files:
+            current = pending_folders.pop(0)
+            if current in seen_folders:
+                continue
+            seen_folders.add(current)
+
+            page_token = None
+            while True:
+                result = self.list_files(folder_id=current, page_size=1000, page_token=page_token)
+                if not result['success']:
+                    return result
+                for file in result['files']:
+                    if file['is_folder']:
+                        if recursive:
+                            pending_folders.append(file['id'])
+                    else:
+                        files.append(file)
+                page_token = result.get('next_page_token')
+                if not page_token:
+                    break
+
+        return {
+            'success': True,
+            'files': files[:max_files],
+            'truncated': len(files) > max_files or bool(pending_folders)
+        }
+
+    def get_download_metadata(self, file_id: str) -> Dict[str, Any]:
+        """
+        Get the metadata needed to download a file (thread-safe).
+
+        Returns:
+            Dict with success status and file (Drive API field names)
+        """
+        session = self._get_session()
+        if not session:
+            return {
+                'success': False,
+                'error': 'Google Drive not connected'
+            }
+
+        try:
+            response = session.get(
+                f"{self.API_BASE_URL}/{file_id}",
+                params={"fields": self.DOWNLOAD_FIELDS, "supportsAllDrives": "true"},
+                timeout=self.DOWNLOAD_TIMEOUT
+            )
+            response.raise_for_status()
+            return {
+                'success': True,
+                'file': response.json()
+            }
+        except requests.RequestException as e:
+            return {
+                'success': False,
+                'error': f'Failed to get file info: {str(e)}'
+            }
+
+    def download_file(
+        self,
+        file_id: str,
+        destination_path: Path,
+        file_info: Optional[Dict[str, Any]] = None
+    ) -> Tuple[bool, str]:
         """
         Download a file from Google Drive.
 
@@ -257,25 +458,28 @@ class GoogleDriveService:
         1. Download: For regular files (PDFs, images, etc.)
         2. Export: For Google Workspace files (Docs, Sheets, Slides)
 
-        This method handles both automatically based on file type.
+        This method handles both automatically based on file type. It is
+        safe to call from several threads at once.
 
         Args:
             file_id: The Google Drive file ID
             destination_path: Path where to save the file
+            file_info: Drive metadata (id, name, mimeType, size, md5Checksum,
+                       modifiedTime) if already known - saves a request
 
         Returns:
             Tuple of (success, message or error)
         """
-        service = self._get_service()
-        if not service:
+        session = self._get_session()
+        if not session:
             return False, 'Google Drive not connected'
 
         try:
-            # First, get file metadata to determine type
-            file_info = service.files().get(
-                fileId=file_id,
-                fields="id, name, mimeType, size"
-            ).execute()
+            if file_info is None:
+                metadata = self.get_download_metadata(file_id)
+                if not metadata['success']:
+                    return False, metadata['error']
+                file_info = metadata['file']
 
             mime_type = file_info.get('mimeType', '')
             file_name = file_info.get('name', 'unknown')
@@ -283,66 +487,202 @@ class GoogleDriveService:
             # Check if it's a Google Workspace file that needs export
             if mime_type in self.EXPORT_MIME_TYPES:
                 return self._export_google_file(
-                    service, file_id, mime_type, destination_path, file_name
+                    session, file_id, mime_type, destination_path, file_name, file_info
                 )
             else:
                 return self._download_regular_file(
-                    service, file_id, destination_path, file_name
+                    session, file_id, destination_path, file_name, file_info
                 )
 
         except Exception as e:
+            self._count("failures")
             return False, f'Failed to download file: {str(e)}'
 
+    def _get_staging_path(self, file_id: str, file_info: Dict[str, Any], suffix: str) -> Path:
+        """
+        Partial-download path for this version of the file.
+
+        Educational Note: The name includes a hash of the file's version
+        (checksum or modified time + size), so a file changed on Drive
+        since the interrupted download starts fresh instead of resuming
+        into a mix of old and new bytes.
+        """
+        version = "|".join(str(file_info.get(k) or "") for k in ("md5Checksum", "modifiedTime", "size"))
+        version_hash = hashlib.sha256(version.encode("utf-8")).hexdigest()[:12]
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        return self.staging_dir / f"{file_id}_{version_hash}{suffix}"
+
+    def cleanup_staging(self, max_age_seconds: Optional[float] = None) -> int:
+        """
+        Delete partial downloads that haven't been written to in a while.
+
+        Educational Note: A staging file only helps if its download is
+        retried soon; files of imports that were abandoned (or of file
+        versions that changed on Drive) would otherwise pile up forever.
+        Age is the last write (mtime), so downloads in progress and recent
+        failures waiting for a retry are kept.
+
+        Args:
+            max_age_seconds: Age limit (default STAGING_MAX_AGE_SECONDS)
+
+        Returns:
+            Number of files deleted
+        """
+        max_age = self.STAGING_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+        if not self.staging_dir.exists():
+            return 0
+
+        cutoff = time.time() - max_age
+        removed = 0
+        for path in self.staging_dir.glob("*.part"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue  # Finished or cleaned up meanwhile
+            except OSError as e:
+                print(f"Could not remove stale download {path.name}: {e}")
+
+        if removed:
+            print(f"Removed {removed} stale partial Drive download(s)")
+            self._count("staging_cleaned", removed)
+        return removed
+
+    def _stream_to_file(
+        self,
+        session: AuthorizedSession,
+        url: str,
+        params: Dict[str, str],
+        part_path: Path,
+        expected_size: Optional[int],
+        resumable: bool
+    ) -> None:
+        """
+        Stream a response to part_path, retrying and resuming on failure.
+
+        Educational Note: One streaming GET per attempt, written to disk
+        in DOWNLOAD_CHUNK_BYTES pieces. After a dropped connection or a
+        rate limit, the next attempt asks for "Range: bytes=<offset>-" and
+        appends - only the missing bytes are transferred again. Exports
+        are generated on the fly and can't be ranged, so they restart.
+
+        Raises:
+            requests.RequestException / IOError: Once all attempts failed
+        """
+        for attempt in range(self.MAX_DOWNLOAD_ATTEMPTS):
+            offset = part_path.stat().st_size if (resumable and part_path.exists()) else 0
+            if expected_size is not None and offset >= expected_size:
+                if offset == expected_size:
+                    return
+                part_path.unlink()  # Larger than the file - start over
+                offset = 0
+
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            try:
+                with session.get(url, params=params, headers=headers, stream=True,
+                                 timeout=self.DOWNLOAD_TIMEOUT) as response:
+                    if response.status_code == 416:
+                        part_path.unlink(missing_ok=True)
+                        raise requests.HTTPError("Requested range not satisfiable", response=response)
+                    response.raise_for_status()
+
+                    # Server ignored the range - write from the start
+                    if offset and response.status_code != 206:
+                        offset = 0
+                    elif offset:
+                        print(f"  Resuming {part_path.name} at {offset} bytes")
+                        self._count("bytes_resumed", offset)
+
+                    with open(part_path, "ab" if offset else "wb") as f:
+                        for piece in response.iter_content(chunk_size=self.DOWNLOAD_CHUNK_BYTES):
+                            f.write(piece)
+                            self._count("bytes_downloaded", len(piece))
+                return
+
+            except (requests.RequestException, IOError) as e:
+                response = getattr(e, "response", None)
+                status_code = response.status_code if response is not None else None
+                retryable = status_code is None or status_code in self.RETRYABLE_STATUS_CODES or status_code == 416
+                if not retryable or attempt + 1 >= self.MAX_DOWNLOAD_ATTEMPTS:
+                    raise
+                delay = backoff_delay(attempt, get_retry_after(response.headers if response is not None else None))
+                print(f"  Download attempt {attempt + 1} failed: {e}. Retrying in {delay:.1f}s")
+                self._count("retries")
+                time.sleep(delay)
+
+    def _finish_download(self, part_path: Path, destination_path: Path) -> None:
+        """Move a completed download into place."""
+        destination_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(part_path), str(destination_path))
+
     def _download_regular_file(
         self,
-        service,
+        session: AuthorizedSession,
         file_id: str,
         destination_path: Path,
-        file_name: str
+        file_name: str,
+        file_info: Dict[str, Any]
     ) -> Tuple[bool, str]:
         """
         Download a regular (non-Google) file.
 
-        Educational Note: Regular files are downloaded as-is using
-        the media download API with chunked transfer.
+        Educational Note: Regular files are downloaded as-is with
+        alt=media, resumable via the staging file. The result is checked
+        against Drive's size and MD5 before it is moved into place.
 
         Args:
-            service: Drive API service
+            session: This thread's authorized session
             file_id: File ID
             destination_path: Where to save
             file_name: Original file name
+            file_info: Drive metadata (size and md5Checksum used if present)
 
         Returns:
             Tuple of (success, message)
         """
-        try:
-            request = service.files().get_media(fileId=file_id)
-
-            # Download to memory buffer first
-            buffer = io.BytesIO()
-            downloader = MediaIoBaseDownload(buffer, request)
-
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
+        part_path = self._get_staging_path(file_id, file_info, ".part")
+        expected_size = int(file_info['size']) if file_info.get('size') else None
 
-            # Write to file
-            destination_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(destination_path, 'wb') as f:
-                f.write(buffer.getvalue())
+        try:
+            self._stream_to_file(
+                session,
+                f"{self.API_BASE_URL}/{file_id}",
+                {"alt": "media", "supportsAllDrives": "true"},
+                part_path,
+                expected_size,
+                resumable=True
+            )
 
+            if expected_size is not None and part_path.stat().st_size != expected_size:
+                part_path.unlink(missing_ok=True)
+                raise IOError(f"size mismatch ({part_path.stat().st_size if part_path.exists() else 0} != {expected_size})")
+
+            if file_info.get('md5Checksum'):
+                digest = hashlib.md5()
+                with open(part_path, "rb") as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(block)
+                if digest.hexdigest() != file_info['md5Checksum']:
+                    part_path.unlink(missing_ok=True)
+                    raise IOError("checksum mismatch")
+
+            self._finish_download(part_path, destination_path)
+            self._count("downloads")
             return True, f'Downloaded {file_name}'
 
         except Exception as e:
+            self._count("failures")
             return False, f'Download failed: {str(e)}'
 
     def _export_google_file(
         self,
-        service,
+        session: AuthorizedSession,
         file_id: str,
         mime_type: str,
         destination_path: Path,
-        file_name: str
+        file_name: str,
+        file_info: Dict[str, Any]
     ) -> Tuple[bool, str]:
         """
         Export a Google Workspace file to a standard format.
@@ -352,11 +692,12 @@ class GoogleDriveService:
         to standard formats like DOCX, CSV, or PPTX.
 
         Args:
-            service: Drive API service
+            session: This thread's authorized session
             file_id: File ID
             mime_type: Google Workspace MIME type
             destination_path: Where to save
             file_name: Original file name
+            file_info: Drive metadata (modifiedTime identifies the version)
 
         Returns:
             Tuple of (success, message)
@@ -365,30 +706,32 @@ class GoogleDriveService:
         if not export_info:
             return False, f'Unsupported Google file type: {mime_type}'
 
+        part_path = self._get_staging_path(file_id, file_info, f"{export_info['extension']}.export.part")
+
         try:
-            request = service.files().export_media(
-                fileId=file_id,
-                mimeType=export_info['export_mime']
+            self._stream_to_file(
+                session,
+                f"{self.API_BASE_URL}/{file_id}/export",
+                {"mimeType": export_info['export_mime']},
+                part_path,
+                expected_size=None,
+                resumable=False
             )
 
-            # Download to memory buffer first
-            buffer = io.BytesIO()
-            downloader = MediaIoBaseDownload(buffer, request)
-
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-
-            # Write to file
-            destination_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(destination_path, 'wb') as f:
-                f.write(buffer.getvalue())
-
+            self._finish_download(part_path, destination_path)
+            self._count("exports")
             return True, f'Exported {file_name} as {export_info["extension"]}'
 
         except Exception as e:
+            part_path.unlink(missing_ok=True)
+            self._count("failures")
             return False, f'Export failed: {str(e)}'
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Get listing cache and download counters."""
+        with self._lock:
+            return {**self._stats, "cached_listings": len(self._list_cache)}
+
     def get_file_extension(self, file_id: str) -> Optional[str]:
         """
         Get the appropriate file extension for a Drive file.
@@ -412,21 +755,22 @@ class GoogleDriveService:
                 fields="name, mimeType"
             ).execute()
 
-            mime_type = file.get('mimeType', '')
+            return self.get_extension_for(file.get('mimeType', ''), file.get('name', ''))
 
-            # Check if Google Workspace file
-            if mime_type in self.EXPORT_MIME_TYPES:
-                return self.EXPORT_MIME_TYPES[mime_type]['extension']
+        except Exception:
+            return None
 
-            # Regular file - get extension from name
-            name = file.get('name', '')
-            if '.' in name:
-                return '.' + name.rsplit('.', 1)[-1].lower()
+    def get_extension_for(self, mime_type: str, name: str) -> Optional[str]:
+        """File extension for already-fetched metadata (see get_file_extension)."""
+        # Check if Google Workspace file
+        if mime_type in self.EXPORT_MIME_TYPES:
+            return self.EXPORT_MIME_TYPES[mime_type]['extension']
 
-            return None
+        # Regular file - get extension from name
+        if '.' in name:
+            return '.' + name.rsplit('.', 1)[-1].lower()
 
-        except Exception:
-            return None
+        return None
 
 
 # Singleton instance
@@ -10,10 +10,13 @@ OpenAI Embedding Models:
 - text-embedding-ada-002: Legacy model, 1536 dimensions
 
 We use text-embedding-3-small as the default for cost-effectiveness.
+
+The async client (create_embedding_async) is used by the ASGI chat path so
+query embeddings for source search don't block the event loop.
 """
 import os
 from typing import List, Optional
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from app.utils.text import clean_text_for_embedding
 
 
@@ -35,6 +38,7 @@ class OpenAIService:
     def __init__(self):
         """Initialize the embeddings service."""
         self._client: Optional[OpenAI] = None
+        self._async_client: Optional[AsyncOpenAI] = None
 
     def _get_client(self) -> OpenAI:
         """
@@ -53,6 +57,29 @@ class OpenAIService:
             self._client = OpenAI(api_key=api_key)
         return self._client
 
+    def _get_async_client(self) -> AsyncOpenAI:
+        """
+        Get or create the async OpenAI client.
+
+        Educational Note: Like the sync client, one instance per process -
+        its connection pool is shared by every request on the event loop.
+
+        Raises:
+            ValueError: If OPENAI_API_KEY is not set
+        """
+        if self._async_client is None:
+            api_key = os.getenv('OPENAI_API_KEY')
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY not found in environment")
+            self._async_client = AsyncOpenAI(api_key=api_key)
+        return self._async_client
+
+    async def close_async_client(self) -> None:
+        """Close the async client's connection pool (ASGI shutdown)."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
     def create_embedding(
         self,
         text: str,
@@ -92,6 +119,38 @@ class OpenAIService:
 
         return response.data[0].embedding
 
+    async def create_embedding_async(
+        self,
+        text: str,
+        model: str = DEFAULT_MODEL
+    ) -> List[float]:
+        """
+        Async version of create_embedding() for the ASGI chat path.
+
+        Args:
+            text: Text to embed (will be cleaned automatically)
+            model: OpenAI embedding model to use
+
+        Returns:
+            List of floats (the embedding vector)
+
+        Raises:
+            ValueError: If text is empty or API key not set
+        """
+        clean_text = clean_text_for_embedding(text)
+
+        if not clean_text:
+            raise ValueError("Cannot create embedding for empty text")
+
+        client = self._get_async_client()
+
+        response = await client.embeddings.create(
+            model=model,
+            input=clean_text
+        )
+
+        return response.data[0].embedding
+
     def create_embeddings_batch(
         self,
         texts: List[str],
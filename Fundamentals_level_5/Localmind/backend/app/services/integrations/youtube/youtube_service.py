@@ -5,6 +5,10 @@ Educational Note: This service uses the youtube-transcript-api library to fetch
 existing captions/transcripts from YouTube videos. It's much faster than downloading
 and transcribing audio since it uses YouTube's existing caption data.
 
+Successful transcripts are kept in the shared fetch cache (keyed by video
+ID, languages and format) for YOUTUBE_CACHE_TTL_DAYS, so adding the same
+video to another project or reprocessing it doesn't refetch.
+
 Install: pip install youtube-transcript-api
 """
 
@@ -12,6 +16,8 @@ import re
 from typing import Dict, Any, Optional, List
 from youtube_transcript_api import YouTubeTranscriptApi
 
+from app.utils.fetch_cache_utils import fetch_cache, YOUTUBE_TTL_SECONDS
+
 
 class YouTubeService:
     """
@@ -77,6 +83,7 @@ class YouTubeService:
                 - is_auto_generated: bool
                 - duration_seconds: float (total video duration)
                 - segment_count: int
+                - cached: bool (served from the fetch cache)
                 - error_message: str (if failed)
         """
         if preferred_languages is None:
@@ -90,6 +97,11 @@ class YouTubeService:
                 "error_message": f"Could not extract video ID from URL: {url}"
             }
 
+        cache_id = f"{video_id}|{','.join(preferred_languages)}|{'timestamps' if include_timestamps else 'plain'}"
+        cached = fetch_cache.get("youtube", cache_id, YOUTUBE_TTL_SECONDS)
+        if cached:
+            return {**cached, "cached": True}
+
         try:
             # Fetch transcript using the new API
             transcript = self._api.fetch(video_id, languages=preferred_languages)
@@ -116,7 +128,7 @@ class YouTubeService:
             last_snippet = snippets[-1]
             total_duration = last_snippet.start + last_snippet.duration
 
-            return {
+            result = {
                 "success": True,
                 "video_id": video_id,
                 "transcript": formatted_text,
@@ -125,6 +137,8 @@ class YouTubeService:
                 "duration_seconds": total_duration,
                 "segment_count": len(snippets)
             }
+            fetch_cache.put("youtube", cache_id, result)
+            return {**result, "cached": False}
 
         except Exception as e:
             error_msg = str(e)
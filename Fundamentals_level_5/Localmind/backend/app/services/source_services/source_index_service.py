@@ -17,14 +17,71 @@ The index structure:
     ],
     "last_updated": "ISO timestamp"
 }
+
+Concurrency: uploads, bulk imports and processing workers all update the
+same file. Every read-modify-write (add, update, remove) holds a
+per-project lock, and the file is written to a temp file and swapped in
+with os.replace - readers never see a half-written index, and a crash
+mid-write leaves the previous version in place.
 """
 import json
+import os
+import threading
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
 from app.utils.path_utils import get_sources_index_path
 
 
+# One lock per project (re-entrant, so a locked caller can nest updates)
+_project_locks: Dict[str, threading.RLock] = {}
+_project_locks_guard = threading.Lock()
+
+
+def get_index_lock(project_id: str) -> threading.RLock:
+    """
+    Get the lock that serializes changes to a project's sources index.
+
+    Args:
+        project_id: The project UUID
+
+    Returns:
+        The project's re-entrant lock
+    """
+    with _project_locks_guard:
+        lock = _project_locks.get(project_id)
+        if lock is None:
+            lock = _project_locks[project_id] = threading.RLock()
+        return lock
+
+
+def _empty_index() -> Dict[str, Any]:
+    return {
+        "sources": [],
+        "last_updated": datetime.now().isoformat()
+    }
+
+
+def _load_for_update(project_id: str) -> Dict[str, Any]:
+    """
+    Load the index before changing it. Caller holds the project lock.
+
+    Educational Note: Unlike load_index(), an unreadable file is an error
+    here - saving over it with an "empty" index would drop every source.
+
+    Raises:
+        ValueError: If the index file exists but isn't valid JSON
+    """
+    index_path = get_sources_index_path(project_id)
+    try:
+        with open(index_path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return _empty_index()
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Sources index for project {project_id} is corrupted: {e}")
+
+
 def load_index(project_id: str) -> Dict[str, Any]:
     """
     Load the sources index for a project.
@@ -41,19 +98,16 @@ def load_index(project_id: str) -> Dict[str, Any]:
     index_path = get_sources_index_path(project_id)
 
     if not index_path.exists():
-        return {
-            "sources": [],
-            "last_updated": datetime.now().isoformat()
-        }
+        return _empty_index()
 
     try:
         with open(index_path, 'r') as f:
             return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return {
-            "sources": [],
-            "last_updated": datetime.now().isoformat()
-        }
+    except json.JSONDecodeError as e:
+        print(f"Error reading sources index for project {project_id}: {e}")
+        return _empty_index()
+    except FileNotFoundError:
+        return _empty_index()
 
 
 def save_index(project_id: str, index_data: Dict[str, Any]) -> None:
@@ -62,16 +116,24 @@ def save_index(project_id: str, index_data: Dict[str, Any]) -> None:
 
     Educational Note: Updates last_updated timestamp automatically.
     The get_sources_index_path function ensures the parent directory exists.
+    The index is written to a temp file first and then atomically replaces
+    the old one. Read-modify-write callers must hold get_index_lock().
 
     Args:
         project_id: The project UUID
         index_data: The index data to save
     """
     index_path = get_sources_index_path(project_id)
+    tmp_path = index_path.with_name(f"{index_path.name}.{threading.get_ident()}.tmp")
 
     index_data["last_updated"] = datetime.now().isoformat()
-    with open(index_path, 'w') as f:
-        json.dump(index_data, f, indent=2)
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(index_data, f, indent=2)
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 
 def add_source_to_index(project_id: str, source_metadata: Dict[str, Any]) -> None:
@@ -82,9 +144,10 @@ def add_source_to_index(project_id: str, source_metadata: Dict[str, Any]) -> Non
         project_id: The project UUID
         source_metadata: Complete source metadata dict
     """
-    index = load_index(project_id)
-    index["sources"].append(source_metadata)
-    save_index(project_id, index)
+    with get_index_lock(project_id):
+        index = _load_for_update(project_id)
+        index["sources"].append(source_metadata)
+        save_index(project_id, index)
 
 
 def remove_source_from_index(project_id: str, source_id: str) -> bool:
@@ -98,14 +161,15 @@ def remove_source_from_index(project_id: str, source_id: str) -> bool:
     Returns:
         True if source was found and removed, False otherwise
     """
-    index = load_index(project_id)
-    original_count = len(index["sources"])
+    with get_index_lock(project_id):
+        index = _load_for_update(project_id)
+        original_count = len(index["sources"])
 
-    index["sources"] = [s for s in index["sources"] if s["id"] != source_id]
+        index["sources"] = [s for s in index["sources"] if s["id"] != source_id]
 
-    if len(index["sources"]) < original_count:
-        save_index(project_id, index)
-        return True
+        if len(index["sources"]) < original_count:
+            save_index(project_id, index)
+            return True
 
     return False
 
@@ -149,20 +213,21 @@ def update_source_in_index(
     Returns:
         Updated source metadata or None if not found
     """
-    index = load_index(project_id)
+    with get_index_lock(project_id):
+        index = _load_for_update(project_id)
 
-    for i, source in enumerate(index["sources"]):
-        if source["id"] == source_id:
-            # Apply updates
-            for key, value in updates.items():
-                if value is not None:
-                    source[key] = value
+        for i, source in enumerate(index["sources"]):
+            if source["id"] == source_id:
+                # Apply updates
+                for key, value in updates.items():
+                    if value is not None:
+                        source[key] = value
 
-            source["updated_at"] = datetime.now().isoformat()
-            index["sources"][i] = source
-            save_index(project_id, index)
+                source["updated_at"] = datetime.now().isoformat()
+                index["sources"][i] = source
+                save_index(project_id, index)
 
-            return source
+                return source
 
     return None
 
@@ -21,6 +21,7 @@ Files:
 - audio_processor.py: Audio transcription via ElevenLabs
 - link_processor.py: URL content extraction via web agent
 - youtube_processor.py: YouTube transcript extraction
+- bulk_link_service.py: Concurrent pipeline for bulk-imported links
 """
 from app.services.source_services.source_processing.source_processing_service import source_processing_service
 
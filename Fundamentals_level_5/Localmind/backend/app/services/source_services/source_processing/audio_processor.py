@@ -5,7 +5,8 @@ Educational Note: Audio files are transcribed using ElevenLabs' Scribe v1
 model, which provides high-accuracy transcription with optional speaker
 diarization and audio event detection.
 
-The transcript is split into pages using character-based splitting (6500 chars)
+Short recordings become a single page. Long recordings are transcribed
+as parallel segments, one page per segment (timestamped speaker turns),
 with markers like: === AUDIO PAGE 1 of 5 ===
 """
 from pathlib import Path
@@ -64,6 +65,8 @@ def process_audio(
             "detected_language_code": result.get("detected_language_code"),
             "detected_language_name": result.get("detected_language_name"),
             "diarization_enabled": result.get("diarization_enabled"),
+            "duration": result.get("duration"),
+            "segments": result.get("segments"),
             "extracted_at": result.get("extracted_at")
         }
 
@@ -0,0 +1,314 @@
+"""
+Bulk Link Service - Concurrent fetch pipeline for bulk-imported URLs.
+
+Educational Note: Bulk imports (bookmark lists, sitemaps) bring hundreds of
+links at once. Running each through the web agent in the shared task pool
+takes hours and blocks every other upload. This service gives them their
+own pipeline:
+
+1. Dedicated pool: BULK_LINK_WORKERS threads, separate from task_service,
+   so file uploads and chat-triggered tasks keep their workers
+2. Per-domain limit: at most BULK_LINK_PER_DOMAIN requests to the same
+   host at a time - a 300-page sitemap from one site is fetched politely
+   while links to other sites proceed in parallel
+3. Static first: the page is fetched once (through the fetch cache) and,
+   if it's HTML or plain text that extracts well, the text is extracted
+   locally (html_extract_utils) - no Claude calls at all
+4. Agent fallback: pages that don't extract well (JavaScript apps,
+   PDFs, blocked fetches) go through the web agent as usual
+
+The hand-off is the fetch cache: the locally extracted result is stored
+there, and the regular link processor then finds it as a fresh hit - so
+embedding, summaries and status updates are exactly the single-URL path.
+YouTube links skip step 3 (transcripts have their own fast path).
+
+Sitemaps are expanded in the pool too (the expand callable passed to
+submit_batch): downloading and parsing a sitemap index can take a while,
+so the upload request returns right away and the sitemap's pages join
+the batch as soon as they are found.
+
+Batch progress is kept in memory (GET .../sources/urls/bulk/<batch_id>);
+each source's own status is updated as usual.
+"""
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+from urllib.parse import urlsplit
+
+from app.utils.fetch_cache_utils import fetch_cache
+from app.utils.html_extract_utils import extract_page_text, is_substantial
+
+
+class BulkLinkService:
+    """
+    Bounded, per-domain limited pipeline for bulk link sources.
+
+    Educational Note: Workers block on a per-host semaphore only while
+    fetching; extraction, embedding and summaries run outside it, so one
+    slow site never holds up the rest of the batch.
+    """
+
+    MAX_WORKERS = int(os.getenv("BULK_LINK_WORKERS", "8"))
+    PER_DOMAIN = int(os.getenv("BULK_LINK_PER_DOMAIN", "2"))
+
+    # Finished batches kept for status lookups
+    MAX_BATCHES_KEPT = 50
+
+    # Final per-link status -> batch counter
+    FINAL_STATUS_COUNTERS = {"ready": "completed", "error": "failed", "skipped": "skipped"}
+
+    def __init__(self):
+        """Initialize the service (pool is created on first batch)."""
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._domain_slots: Dict[str, threading.Semaphore] = {}
+        self._batches: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._stats = {
+            "batches": 0,
+            "links": 0,
+            "static": 0,
+            "cached": 0,
+            "agent": 0,
+            "youtube": 0,
+            "failed": 0,
+            "skipped": 0,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.MAX_WORKERS,
+                    thread_name_prefix="bulk-link"
+                )
+            return self._executor
+
+    def _get_domain_slot(self, url: str) -> threading.Semaphore:
+        """Semaphore limiting concurrent fetches to the URL's host."""
+        host = (urlsplit(url).hostname or "").lower()
+        with self._lock:
+            if host not in self._domain_slots:
+                self._domain_slots[host] = threading.Semaphore(self.PER_DOMAIN)
+            return self._domain_slots[host]
+
+    # =========================================================================
+    # Batches
+    # =========================================================================
+
+    def submit_batch(
+        self,
+        project_id: str,
+        sources: List[Dict[str, Any]],
+        expand: Optional[Callable[[], Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue link sources for processing.
+
+        Args:
+            project_id: The project UUID
+            sources: Source metadata dicts from create_link_source()
+            expand: Optional callable run in the pool that finds more sources
+                    (sitemap expansion). Returns {"sources": [...], plus any
+                    counters to report, e.g. "duplicates", "rejected"}
+
+        Returns:
+            Batch status dict (see get_batch)
+        """
+        batch_id = str(uuid.uuid4())
+        running = bool(sources) or expand is not None
+        batch = {
+            "id": batch_id,
+            "project_id": project_id,
+            "status": "running" if running else "completed",
+            "total": len(sources),
+            "completed": 0,
+            "failed": 0,
+            "skipped": 0,
+            "methods": {"static": 0, "cached": 0, "agent": 0, "youtube": 0},
+            "sources": {
+                source["id"]: {"url": source["original_filename"], "status": "queued", "method": None}
+                for source in sources
+            },
+            "expansion": {"status": "running"} if expand is not None else None,
+            "created_at": datetime.now().isoformat(),
+            "completed_at": None if running else datetime.now().isoformat(),
+        }
+
+        with self._lock:
+            self._batches[batch_id] = batch
+            while len(self._batches) > self.MAX_BATCHES_KEPT:
+                oldest_id, oldest = next(iter(self._batches.items()))
+                if oldest["status"] == "running":
+                    break
+                del self._batches[oldest_id]
+            self._stats["batches"] += 1
+            self._stats["links"] += len(sources)
+
+        executor = self._get_executor()
+        if expand is not None:
+            # Ahead of the links, so the sitemap isn't queued behind them
+            executor.submit(self._expand_batch, batch_id, project_id, expand)
+        for source in sources:
+            executor.submit(self._process_link, batch_id, project_id, source)
+
+        return self.get_batch(batch_id)
+
+    def _expand_batch(self, batch_id: str, project_id: str, expand: Callable[[], Dict[str, Any]]) -> None:
+        """Run a batch's expansion (worker thread) and queue the sources it found."""
+        try:
+            found = expand()
+            sources = found.pop("sources", [])
+            expansion = {"status": "completed", "added": len(sources), **found}
+        except Exception as e:
+            print(f"Bulk batch {batch_id[:8]} expansion failed: {e}")
+            sources = []
+            expansion = {"status": "error", "added": 0, "error": str(e)}
+
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None:
+                return
+            batch["expansion"] = expansion
+            batch["total"] += len(sources)
+            for source in sources:
+                batch["sources"][source["id"]] = {
+                    "url": source["original_filename"], "status": "queued", "method": None
+                }
+            self._stats["links"] += len(sources)
+            self._complete_if_done(batch)
+
+        executor = self._get_executor()
+        for source in sources:
+            executor.submit(self._process_link, batch_id, project_id, source)
+
+    def get_batch(self, batch_id: str, project_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get a copy of a batch's progress (None if unknown or another project's)."""
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None or (project_id and batch["project_id"] != project_id):
+                return None
+            return {
+                **batch,
+                "methods": dict(batch["methods"]),
+                "sources": {sid: dict(state) for sid, state in batch["sources"].items()},
+                "expansion": dict(batch["expansion"]) if batch["expansion"] else None,
+            }
+
+    def _complete_if_done(self, batch: Dict[str, Any]) -> None:
+        """Close a batch once every link is final and no expansion is running. Caller holds lock."""
+        if batch["expansion"] and batch["expansion"]["status"] == "running":
+            return
+        if batch["completed"] + batch["failed"] + batch["skipped"] >= batch["total"]:
+            batch["status"] = "completed"
+            batch["completed_at"] = datetime.now().isoformat()
+
+    def _update_source_state(self, batch_id: str, source_id: str, **updates) -> None:
+        """Record one link's progress and close the batch when all are done."""
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None:
+                return
+            state = batch["sources"][source_id]
+            state.update(updates)
+
+            counter = self.FINAL_STATUS_COUNTERS.get(updates.get("status"))
+            if counter:
+                batch[counter] += 1
+                if counter != "completed":
+                    self._stats[counter] += 1
+                self._complete_if_done(batch)
+
+            method = updates.get("method")
+            if method:
+                batch["methods"][method] += 1
+                self._stats[method] += 1
+
+    # =========================================================================
+    # Pipeline
+    # =========================================================================
+
+    def _prefetch(self, url: str) -> str:
+        """
+        Fetch a page once and extract it locally if possible.
+
+        Returns:
+            "cached" (fetch cache hit), "static" (extracted locally and
+            stored in the fetch cache), or "agent" (needs the web agent)
+        """
+        with self._get_domain_slot(url):
+            check = fetch_cache.check_url(url)
+
+        if check["hit"]:
+            return "cached"
+
+        response = check["response"]
+        if not response or response["status_code"] != 200 or not response["body"]:
+            return "agent"
+
+        extracted = extract_page_text(response["body"], response["content_type"])
+        if not is_substantial(extracted):
+            return "agent"
+
+        fetch_cache.store_url(url, {
+            "success": True,
+            "title": extracted["title"] or url,
+            "url": url,
+            "content": extracted["content"],
+            "summary": extracted["description"],
+            "content_type": "other",
+            "source_urls": [response["final_url"] or url],
+            "error_message": None,
+            "extractor": "static_html",
+            "extracted_at": datetime.now().isoformat()
+        }, response)
+        return "static"
+
+    def _process_link(self, batch_id: str, project_id: str, source: Dict[str, Any]) -> None:
+        """Fetch (static first) and process one link source (worker thread)."""
+        from app.services.source_services import source_service
+        from app.services.source_services.source_processing import source_processing_service
+
+        source_id = source["id"]
+        url = source["original_filename"]
+
+        try:
+            # Deleted or already picked up (e.g. retried by hand) since queued
+            current = source_service.get_source(project_id, source_id)
+            if not current or current.get("status") != "uploaded":
+                self._update_source_state(batch_id, source_id, status="skipped")
+                return
+
+            self._update_source_state(batch_id, source_id, status="fetching")
+            is_youtube = source.get("processing_info", {}).get("link_type") == "youtube"
+            method = "youtube" if is_youtube else self._prefetch(url)
+            self._update_source_state(batch_id, source_id, status="processing")
+
+            result = source_processing_service.process_source(project_id, source_id)
+            self._update_source_state(
+                batch_id, source_id,
+                status="ready" if result.get("success") else "error",
+                method=method,
+                error=result.get("error")
+            )
+
+        except Exception as e:
+            print(f"Bulk link {url} failed: {e}")
+            self._update_source_state(batch_id, source_id, status="error", error=str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pipeline counters (for the metrics endpoint)."""
+        with self._lock:
+            return {
+                **self._stats,
+                "workers": self.MAX_WORKERS,
+                "per_domain": self.PER_DOMAIN,
+                "running_batches": sum(1 for b in self._batches.values() if b["status"] == "running"),
+            }
+
+
+# Singleton instance
+bulk_link_service = BulkLinkService()
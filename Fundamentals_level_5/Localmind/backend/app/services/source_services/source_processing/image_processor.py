@@ -49,6 +49,7 @@ def process_image(
             "content_type": result.get("content_type"),
             "character_count": result.get("character_count"),
             "token_usage": result.get("token_usage"),
+            "image_bytes": result.get("image_bytes"),
             "extracted_at": result.get("extracted_at")
         }
 
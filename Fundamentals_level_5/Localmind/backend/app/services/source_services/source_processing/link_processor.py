@@ -10,6 +10,13 @@ The web agent:
 2. Falls back to Tavily search if web_fetch fails
 3. Returns structured content via return_search_result tool
 
+Results are kept in the shared fetch cache (fetch_cache_utils), keyed by
+canonical URL. A URL already extracted - for this or any other project -
+is served from the cache once the server confirms it hasn't changed
+(ETag / Last-Modified / body hash), skipping the agent loop entirely.
+Bulk imports (bulk_link_service) put locally extracted static pages in
+the same cache, marked with extractor "static_html".
+
 Links don't have logical page boundaries, so we store the entire content
 as a single "page" and let token-based chunking handle the splitting
 for embeddings. This creates a single page marker: === LINK PAGE 1 of 1 ===
@@ -21,6 +28,7 @@ from typing import Dict, Any
 from app.utils.text import build_processed_output
 from app.utils.path_utils import get_processed_dir, get_chunks_dir
 from app.utils.embedding_utils import needs_embedding, count_tokens
+from app.utils.fetch_cache_utils import fetch_cache
 from app.services.ai_services.embedding_service import embedding_service
 from app.services.ai_services.summary_service import summary_service
 
@@ -72,12 +80,25 @@ def process_link(
 
     print(f"Processing link source: {url}")
 
-    # Use web agent to extract content
-    result = web_agent_service.run(
-        url=url,
-        project_id=project_id,
-        source_id=source_id
-    )
+    # Serve from the fetch cache if the page hasn't changed since it was extracted
+    cache_check = fetch_cache.check_url(url)
+    if cache_check["hit"]:
+        print(f"  Fetch cache {cache_check['status']}: skipping web agent")
+        result = {
+            **cache_check["result"],
+            "iterations": 0,
+            "usage": {"input_tokens": 0, "output_tokens": 0}
+        }
+    else:
+        # Use web agent to extract content
+        result = web_agent_service.run(
+            url=url,
+            project_id=project_id,
+            source_id=source_id
+        )
+        if result.get("success") and result.get("content"):
+            cached_result = {k: v for k, v in result.items() if k not in ("iterations", "usage")}
+            fetch_cache.store_url(url, cached_result, cache_check["response"])
 
     if not result.get("success"):
         error_msg = result.get("error_message", "Failed to extract content from URL")
@@ -150,7 +171,7 @@ def process_link(
         json.dump(link_data, f, indent=2)
 
     processing_info = {
-        "processor": "web_agent",
+        "processor": result.get("extractor", "web_agent"),
         "url": url,
         "title": title,
         "content_type": content_type,
@@ -159,7 +180,8 @@ def process_link(
         "source_urls": source_urls,
         "iterations": result.get("iterations"),
         "usage": result.get("usage"),
-        "extracted_at": result.get("extracted_at")
+        "extracted_at": result.get("extracted_at"),
+        "fetch_cache": cache_check["status"]
     }
 
     # Process embeddings if needed
@@ -179,7 +179,8 @@ class SourceProcessingService:
         cancelled_count = task_service.cancel_tasks_for_target(source_id)
         print(f"Cancelled {cancelled_count} tasks for source {source_id}")
 
-        # Delete processed file if it exists (keep raw file!)
+        # Delete processed file if it exists (keep raw file and the
+        # extraction checkpoint, so a retry resumes where this stopped)
         processed_path = get_processed_dir(project_id) / f"{source_id}.txt"
         if processed_path.exists():
             processed_path.unlink()
@@ -201,6 +202,9 @@ class SourceProcessingService:
 
         Educational Note: This submits a new processing task for the source.
         Only works for sources that have a raw file but are not currently processing.
+        A source left in "processing" by a server restart (its task was marked
+        failed on startup) can be retried too. PDF/PPTX extraction resumes from
+        its per-batch checkpoint, so only missing or failed pages are redone.
 
         Args:
             project_id: The project UUID
@@ -216,9 +220,15 @@ class SourceProcessingService:
         if not source:
             return {"success": False, "error": "Source not found"}
 
-        # Can only retry if status is uploaded or error (not processing/embedding)
+        # Can only retry if status is uploaded or error (not processing/embedding),
+        # unless the task doing the processing no longer exists (server restart)
         if source["status"] in ["processing", "embedding"]:
-            return {"success": False, "error": "Source is already processing"}
+            active_tasks = [
+                task for task in task_service.get_tasks_for_target(source_id)
+                if task["status"] in ["pending", "running"]
+            ]
+            if active_tasks:
+                return {"success": False, "error": "Source is already processing"}
 
         if source["status"] == "ready":
             return {"success": False, "error": "Source is already processed"}
@@ -228,7 +238,7 @@ class SourceProcessingService:
         if not raw_file_path.exists():
             return {"success": False, "error": "Raw file not found"}
 
-        # Delete any existing processed file
+        # Delete any existing processed file (the extraction checkpoint stays)
         processed_path = get_processed_dir(project_id) / f"{source_id}.txt"
         if processed_path.exists():
             processed_path.unlink()
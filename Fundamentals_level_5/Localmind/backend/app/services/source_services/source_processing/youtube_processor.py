@@ -145,7 +145,8 @@ def process_youtube(
         "segment_count": segment_count,
         "character_count": len(transcript),
         "token_count": token_count,
-        "total_pages": 1  # Always 1 - token-based chunking handles splits
+        "total_pages": 1,  # Always 1 - token-based chunking handles splits
+        "cached": result.get("cached", False)
     }
 
     # Process embeddings if needed
@@ -14,10 +14,12 @@ from typing import Optional, Dict, List, Any
 from werkzeug.datastructures import FileStorage
 
 from app.services.source_services import source_index_service
+from app.services.background_services.progress_service import progress_service
 from app.services.source_services.source_upload import (
     upload_file,
     create_from_existing_file,
     upload_url,
+    upload_urls,
     upload_text,
     upload_research
 )
@@ -27,6 +29,7 @@ from app.utils.path_utils import (
     get_chunks_dir
 )
 from app.utils.file_utils import ALLOWED_EXTENSIONS
+from app.utils.extraction_checkpoint_utils import get_checkpoint_path
 
 
 class SourceService:
@@ -142,6 +145,11 @@ class SourceService:
 
         if result:
             print(f"Updated source: {source_id}")
+            # Push status changes to the project's SocketIO room (no polling needed)
+            if status is not None:
+                progress_service.publish(
+                    "source_updated", project_id, source_id, final=True, status=status, source=result
+                )
 
         return result
 
@@ -189,6 +197,9 @@ class SourceService:
         if processed_path.exists():
             processed_path.unlink()
 
+        # Delete any leftover extraction checkpoint (PDF/PPTX)
+        get_checkpoint_path(get_processed_dir(project_id), source_id).unlink(missing_ok=True)
+
         # Remove from index
         source_index_service.remove_source_from_index(project_id, source_id)
 
@@ -288,6 +299,19 @@ class SourceService:
         """
         return upload_url(project_id, url, name, description)
 
+    def add_url_sources(
+        self,
+        project_id: str,
+        urls: Optional[List[str]] = None,
+        sitemap_url: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Add many URL sources at once (list and/or sitemap).
+
+        Delegates to source_upload.bulk_url_upload module.
+        """
+        return upload_urls(project_id, urls, sitemap_url)
+
     def add_text_source(
         self,
         project_id: str,
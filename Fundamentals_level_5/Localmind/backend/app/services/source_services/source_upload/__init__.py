@@ -4,6 +4,8 @@ Source Upload Module - Handles different types of source uploads.
 Educational Note: Upload logic is separated by type for cleaner code:
 - file_upload: File uploads (PDF, DOCX, images, audio, etc.)
 - url_upload: URL sources (websites, YouTube links)
+- bulk_url_upload: Many URLs at once (lists, sitemaps)
+- drive_import: Google Drive files and folders, downloaded in parallel
 - text_upload: Pasted text content
 - research_upload: Deep research sources (AI agent researched topics)
 """
@@ -12,6 +14,7 @@ from app.services.source_services.source_upload.file_upload import (
     create_from_existing_file
 )
 from app.services.source_services.source_upload.url_upload import upload_url
+from app.services.source_services.source_upload.bulk_url_upload import upload_urls
 from app.services.source_services.source_upload.text_upload import upload_text
 from app.services.source_services.source_upload.research_upload import upload_research
 
@@ -19,6 +22,7 @@ __all__ = [
     "upload_file",
     "create_from_existing_file",
     "upload_url",
+    "upload_urls",
     "upload_text",
     "upload_research"
 ]
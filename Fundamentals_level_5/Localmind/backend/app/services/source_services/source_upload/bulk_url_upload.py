@@ -0,0 +1,219 @@
+"""
+Bulk URL Upload Handler - Adds many URL sources at once.
+
+Educational Note: Importing a bookmark list or a whole sitemap through the
+single-URL endpoint creates one background task per link, each running
+the web agent in the shared 4-worker task pool - hours for a few hundred
+links, with every other upload stuck behind them.
+
+This handler:
+1. Validates each listed URL with the same rules as the single-URL upload
+2. Dedupes by canonical URL - within the request and against the link
+   sources the project already has
+3. Creates the link sources (status "uploaded") and hands them to the
+   bulk link pipeline, which fetches them in its own bounded pool
+4. A sitemap is expanded IN that pool, not in the request: its pages
+   (sitemap indexes followed, gzipped sitemaps supported) go through the
+   same validation and dedupe and join the batch when found
+
+Sitemap downloads are streamed and stopped at MAX_SITEMAP_BYTES, and
+gzipped sitemaps are inflated with the same cap (parse_sitemap).
+
+Limits:
+- BULK_URL_MAX: Most URLs accepted per request (default 500)
+- Sitemap indexes are followed MAX_SITEMAP_DEPTH levels deep
+"""
+import os
+from typing import Optional, Dict, Any, List, Set
+
+import requests
+
+from app.services.source_services import source_index_service
+from app.services.source_services.source_upload.url_upload import validate_url, create_link_source
+from app.utils.fetch_cache_utils import canonicalize_url, FETCH_TIMEOUT, USER_AGENT
+from app.utils.html_extract_utils import parse_sitemap, MAX_SITEMAP_BYTES
+
+
+MAX_URLS = int(os.getenv("BULK_URL_MAX", "500"))
+
+# Sitemap index -> sitemap -> pages
+MAX_SITEMAP_DEPTH = 2
+
+
+def _download_sitemap(url: str) -> bytes:
+    """
+    Download a sitemap, stopping at MAX_SITEMAP_BYTES.
+
+    Raises:
+        ValueError: If the sitemap is larger than MAX_SITEMAP_BYTES
+        requests.RequestException: On network or HTTP errors
+    """
+    with requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=FETCH_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        declared = response.headers.get("Content-Length")
+        if declared and declared.isdigit() and int(declared) > MAX_SITEMAP_BYTES:
+            raise ValueError(f"Sitemap too large ({declared} bytes)")
+
+        body = bytearray()
+        for piece in response.iter_content(chunk_size=64 * 1024):
+            body.extend(piece)
+            if len(body) > MAX_SITEMAP_BYTES:
+                raise ValueError(f"Sitemap too large (> {MAX_SITEMAP_BYTES} bytes)")
+        return bytes(body)
+
+
+def _expand_sitemap(sitemap_url: str, limit: int) -> List[str]:
+    """
+    Collect page URLs from a sitemap, following sitemap indexes.
+
+    Raises:
+        ValueError: If the top-level sitemap can't be fetched or parsed
+    """
+    page_urls: List[str] = []
+    pending = [(sitemap_url, 0)]
+    seen = set()
+
+    while pending and len(page_urls) < limit:
+        url, depth = pending.pop(0)
+        if url in seen:
+            continue
+        seen.add(url)
+
+        try:
+            pages, children = parse_sitemap(_download_sitemap(url))
+        except (requests.RequestException, ValueError, OSError) as e:
+            if url == sitemap_url:
+                raise ValueError(f"Could not read sitemap {sitemap_url}: {e}")
+            print(f"Skipping child sitemap {url}: {e}")
+            continue
+
+        page_urls.extend(pages)
+        if depth < MAX_SITEMAP_DEPTH:
+            pending.extend((child, depth + 1) for child in children)
+
+    return page_urls[:limit]
+
+
+def _existing_links(project_id: str) -> Set[str]:
+    """Canonical URLs of the link sources the project already has."""
+    return {
+        canonicalize_url(source["original_filename"])
+        for source in source_index_service.list_sources_from_index(project_id)
+        if source.get("category") == "link" and source.get("original_filename")
+    }
+
+
+def _accept_urls(candidates: List[str], seen: Set[str], limit: int) -> Dict[str, Any]:
+    """
+    Validate and dedupe candidate URLs (adds accepted ones to seen).
+
+    Returns:
+        {"accepted": [...], "duplicates": [...], "rejected": [{"url", "error"}],
+         "truncated": True if more than limit URLs were new}
+    """
+    accepted: List[str] = []
+    duplicates: List[str] = []
+    rejected: List[Dict[str, str]] = []
+    truncated = False
+
+    for candidate in candidates:
+        try:
+            url = validate_url(candidate)
+        except ValueError as e:
+            rejected.append({"url": candidate, "error": str(e)})
+            continue
+
+        canonical = canonicalize_url(url)
+        if canonical in seen:
+            duplicates.append(url)
+            continue
+        if len(accepted) >= limit:
+            truncated = True
+            break
+
+        seen.add(canonical)
+        accepted.append(url)
+
+    return {"accepted": accepted, "duplicates": duplicates, "rejected": rejected, "truncated": truncated}
+
+
+def _sitemap_expander(project_id: str, sitemap_url: str, limit: int):
+    """
+    Build the expansion job for a sitemap (runs in the bulk link pool).
+
+    Educational Note: Dedupe runs against the project's links at expansion
+    time, which already include the URLs listed in the same request.
+    """
+    def expand() -> Dict[str, Any]:
+        page_urls = _expand_sitemap(sitemap_url, MAX_URLS * 2)
+        checked = _accept_urls(page_urls, _existing_links(project_id), limit)
+        sources = [create_link_source(project_id, url) for url in checked["accepted"]]
+        print(f"Sitemap {sitemap_url}: {len(page_urls)} pages, {len(sources)} added, "
+              f"{len(checked['duplicates'])} duplicates, {len(checked['rejected'])} rejected")
+        return {
+            "sources": sources,
+            "sitemap_url": sitemap_url,
+            "pages": len(page_urls),
+            "duplicates": len(checked["duplicates"]),
+            "rejected": len(checked["rejected"]),
+            "truncated": checked["truncated"],
+        }
+    return expand
+
+
+def upload_urls(
+    project_id: str,
+    urls: Optional[List[str]] = None,
+    sitemap_url: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Add many URL sources to a project and start bulk processing.
+
+    Educational Note: Listed URLs become sources right away. A sitemap is
+    only validated here; it is downloaded and expanded by the bulk
+    pipeline, and its sources show up in the batch ("expansion" tells
+    whether it is still running, and what it found).
+
+    Args:
+        project_id: The project UUID
+        urls: URLs to add (websites and YouTube links)
+        sitemap_url: Sitemap whose pages should be added
+
+    Returns:
+        {"batch": bulk batch status (see bulk_link_service.get_batch),
+         "sources": created source metadata (listed URLs),
+         "duplicates": URLs skipped as already present,
+         "rejected": [{"url", "error"}] for invalid URLs,
+         "truncated": True if more than BULK_URL_MAX URLs were given}
+
+    Raises:
+        ValueError: If no URLs were given or the sitemap URL is invalid
+    """
+    from app.services.source_services.source_processing.bulk_link_service import bulk_link_service
+
+    candidates = [u for u in (urls or []) if isinstance(u, str) and u.strip()]
+    if sitemap_url:
+        sitemap_url = validate_url(sitemap_url)
+    elif not candidates:
+        raise ValueError("No URLs provided")
+
+    checked = _accept_urls(candidates, _existing_links(project_id), MAX_URLS)
+    sources = [create_link_source(project_id, url) for url in checked["accepted"]]
+
+    expand = None
+    remaining = MAX_URLS - len(sources)
+    if sitemap_url and remaining > 0:
+        expand = _sitemap_expander(project_id, sitemap_url, remaining)
+    batch = bulk_link_service.submit_batch(project_id, sources, expand)
+
+    print(f"Bulk URL upload: {len(sources)} added, {len(checked['duplicates'])} duplicates, "
+          f"{len(checked['rejected'])} rejected"
+          + (", sitemap queued" if expand else "") + f" (batch {batch['id'][:8]})")
+
+    return {
+        "batch": batch,
+        "sources": sources,
+        "duplicates": checked["duplicates"],
+        "rejected": checked["rejected"],
+        "truncated": checked["truncated"] or bool(sitemap_url and remaining <= 0)
+    }
@@ -0,0 +1,381 @@
+"""
+Drive Import - Concurrent batch import of Google Drive files.
+
+Educational Note: Importing a folder through the single-file endpoint means
+one request per file, each waiting for the whole download before the next
+starts - and processing only begins once the user has clicked through all
+of them. This module imports a list of files (or a whole folder) as one
+batch:
+
+1. Bounded pool: DRIVE_IMPORT_WORKERS files download at once, each
+   streamed to disk in large chunks and resumable (google_drive_service)
+2. Workspace files (Docs, Sheets, Slides) are exported in the same pool,
+   so they no longer queue behind each other
+3. Each file becomes a source as soon as it lands - its processing task
+   starts while the rest of the batch is still downloading
+4. Already imported files are skipped: drive_imports.json in the project
+   maps Drive file IDs to source IDs and the version that was imported
+
+Batch progress is kept in memory (GET .../google-import/batch/<batch_id>);
+failed files can be retried without re-downloading the rest.
+"""
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from app.services.integrations.google import google_drive_service
+from app.utils.path_utils import get_project_dir, get_raw_dir
+
+
+def get_category_from_mime_type(mime_type: str, extension: str) -> str:
+    """
+    Determine source category from MIME type.
+
+    Educational Note: Categories help the UI display appropriate icons
+    and help the processing pipeline choose the right extractor.
+    """
+    if mime_type.startswith('image/'):
+        return 'image'
+    elif mime_type.startswith('audio/'):
+        return 'audio'
+    elif extension == '.csv':
+        return 'data'
+    else:
+        return 'document'
+
+
+def map_google_mime_type(mime_type: str) -> str:
+    """
+    Map Google Workspace MIME types to standard MIME types.
+
+    Educational Note: Google Workspace files (Docs, Sheets, Slides)
+    have special MIME types that we need to map to their exported formats.
+    """
+    mime_type_mapping = {
+        'application/vnd.google-apps.document':
+            'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        'application/vnd.google-apps.spreadsheet':
+            'text/csv',
+        'application/vnd.google-apps.presentation':
+            'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+    }
+    return mime_type_mapping.get(mime_type, mime_type)
+
+
+def build_file_name(name: str, extension: str) -> str:
+    """Ensure a Drive file name ends with the extension it is stored with."""
+    if name.lower().endswith(extension):
+        return name
+    base_name = name.rsplit('.', 1)[0] if '.' in name else name
+    return base_name + extension
+
+
+class DriveImportService:
+    """
+    Bounded pool that downloads Drive files and hands them to processing.
+
+    Educational Note: Same batch bookkeeping as BulkLinkService. Downloads
+    run in parallel, and so does creating the source entries - the sources
+    index serializes its own writes (source_index_service).
+    """
+
+    MAX_WORKERS = int(os.getenv("DRIVE_IMPORT_WORKERS", "4"))
+
+    # Most files accepted per batch (folder imports are cut off here)
+    MAX_FILES = int(os.getenv("DRIVE_IMPORT_MAX_FILES", "500"))
+
+    # Finished batches kept for status lookups
+    MAX_BATCHES_KEPT = 50
+
+    # Final per-file status -> batch counter
+    FINAL_STATUS_COUNTERS = {"imported": "completed", "error": "failed", "skipped": "skipped"}
+
+    REGISTRY_FILENAME = "drive_imports.json"
+
+    def __init__(self):
+        """Initialize the service (pool is created on first batch)."""
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._register_lock = threading.Lock()
+        self._batches: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._stats = {
+            "batches": 0,
+            "files": 0,
+            "imported": 0,
+            "failed": 0,
+            "skipped": 0,
+            "retried": 0,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.MAX_WORKERS,
+                    thread_name_prefix="drive-import"
+                )
+            return self._executor
+
+    # =========================================================================
+    # Import registry
+    # =========================================================================
+
+    def _load_registry(self, project_id: str) -> Dict[str, Any]:
+        path = get_project_dir(project_id) / self.REGISTRY_FILENAME
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {}
+
+    def record_import(self, project_id: str, file_id: str, source_id: str, file_info: Dict[str, Any]) -> None:
+        """
+        Remember which source a Drive file was imported as.
+
+        Args:
+            project_id: The project UUID
+            file_id: The Google Drive file ID
+            source_id: The created source's ID
+            file_info: Drive metadata (modifiedTime and md5Checksum identify the version)
+        """
+        with self._register_lock:
+            registry = self._load_registry(project_id)
+            registry[file_id] = {
+                "source_id": source_id,
+                "modified_time": file_info.get('modifiedTime'),
+                "md5_checksum": file_info.get('md5Checksum'),
+                "imported_at": datetime.now().isoformat()
+            }
+            path = get_project_dir(project_id) / self.REGISTRY_FILENAME
+            with open(path, 'w') as f:
+                json.dump(registry, f, indent=2)
+
+    def _find_existing_import(self, project_id: str, file_id: str, file_info: Dict[str, Any]) -> Optional[str]:
+        """Source ID if this version of the file is already in the project."""
+        from app.services.source_services import source_service
+
+        with self._register_lock:
+            entry = self._load_registry(project_id).get(file_id)
+        if not entry or entry.get("modified_time") != file_info.get('modifiedTime'):
+            return None
+        if not source_service.get_source(project_id, entry["source_id"]):
+            return None  # Source was deleted - import again
+        return entry["source_id"]
+
+    # =========================================================================
+    # Batches
+    # =========================================================================
+
+    def submit_batch(
+        self,
+        project_id: str,
+        file_ids: Optional[List[str]] = None,
+        folder_id: Optional[str] = None,
+        recursive: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Queue Drive files for import.
+
+        Args:
+            project_id: The project UUID
+            file_ids: Drive file IDs to import
+            folder_id: Drive folder whose files should be imported
+            recursive: Include files in subfolders of folder_id
+
+        Returns:
+            Batch status dict (see get_batch)
+
+        Raises:
+            ValueError: If nothing was selected, Drive isn't connected or
+                        the folder can't be listed
+        """
+        files: Dict[str, str] = {}
+        for file_id in file_ids or []:
+            if isinstance(file_id, str) and file_id.strip():
+                files.setdefault(file_id.strip(), "")
+
+        truncated = False
+        if folder_id:
+            listing = google_drive_service.list_folder_files(folder_id, recursive, self.MAX_FILES)
+            if not listing['success']:
+                raise ValueError(listing['error'])
+            truncated = listing['truncated']
+            for file in listing['files']:
+                files.setdefault(file['id'], file['name'])
+
+        if not files:
+            raise ValueError("No files selected")
+
+        # Drop partial downloads of imports nobody retried
+        google_drive_service.cleanup_staging()
+        if len(files) > self.MAX_FILES:
+            files = dict(list(files.items())[:self.MAX_FILES])
+            truncated = True
+
+        batch_id = str(uuid.uuid4())
+        batch = {
+            "id": batch_id,
+            "project_id": project_id,
+            "status": "running",
+            "total": len(files),
+            "completed": 0,
+            "failed": 0,
+            "skipped": 0,
+            "truncated": truncated,
+            "files": {
+                file_id: {"name": name, "status": "queued", "source_id": None, "error": None}
+                for file_id, name in files.items()
+            },
+            "created_at": datetime.now().isoformat(),
+            "completed_at": None,
+        }
+
+        with self._lock:
+            self._batches[batch_id] = batch
+            while len(self._batches) > self.MAX_BATCHES_KEPT:
+                oldest_id, oldest = next(iter(self._batches.items()))
+                if oldest["status"] == "running":
+                    break
+                del self._batches[oldest_id]
+            self._stats["batches"] += 1
+            self._stats["files"] += len(files)
+
+        executor = self._get_executor()
+        for file_id in files:
+            executor.submit(self._import_file, batch_id, project_id, file_id)
+
+        print(f"Drive import: {len(files)} files queued (batch {batch_id[:8]})")
+        return self.get_batch(batch_id)
+
+    def retry_batch(self, batch_id: str, project_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Re-queue the files of a batch that failed.
+
+        Educational Note: Partial downloads stay in the staging directory,
+        so retried files resume where they stopped.
+
+        Returns:
+            Batch status dict, or None if the batch is unknown
+        """
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None or batch["project_id"] != project_id:
+                return None
+            failed_ids = [fid for fid, state in batch["files"].items() if state["status"] == "error"]
+            for file_id in failed_ids:
+                batch["files"][file_id].update(status="queued", error=None)
+            if failed_ids:
+                batch["failed"] -= len(failed_ids)
+                batch["status"] = "running"
+                batch["completed_at"] = None
+                self._stats["retried"] += len(failed_ids)
+
+        executor = self._get_executor()
+        for file_id in failed_ids:
+            executor.submit(self._import_file, batch_id, project_id, file_id)
+
+        return self.get_batch(batch_id)
+
+    def get_batch(self, batch_id: str, project_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get a copy of a batch's progress (None if unknown or another project's)."""
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None or (project_id and batch["project_id"] != project_id):
+                return None
+            return {
+                **batch,
+                "files": {fid: dict(state) for fid, state in batch["files"].items()},
+            }
+
+    def _update_file_state(self, batch_id: str, file_id: str, **updates) -> None:
+        """Record one file's progress and close the batch when all are done."""
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None:
+                return
+            batch["files"][file_id].update(updates)
+
+            counter = self.FINAL_STATUS_COUNTERS.get(updates.get("status"))
+            if counter:
+                batch[counter] += 1
+                self._stats[updates["status"] if counter == "completed" else counter] += 1
+                if batch["completed"] + batch["failed"] + batch["skipped"] >= batch["total"]:
+                    batch["status"] = "completed"
+                    batch["completed_at"] = datetime.now().isoformat()
+
+    # =========================================================================
+    # Pipeline
+    # =========================================================================
+
+    def _import_file(self, batch_id: str, project_id: str, file_id: str) -> None:
+        """Download one Drive file and create its source (worker thread)."""
+        from app.services.source_services import source_service
+
+        try:
+            metadata = google_drive_service.get_download_metadata(file_id)
+            if not metadata['success']:
+                self._update_file_state(batch_id, file_id, status="error", error=metadata['error'])
+                return
+
+            file = metadata['file']
+            mime_type = file.get('mimeType', '')
+            self._update_file_state(batch_id, file_id, name=file.get('name'), status="downloading")
+
+            if mime_type == google_drive_service.FOLDER_MIME_TYPE:
+                self._update_file_state(batch_id, file_id, status="skipped", error="Folder")
+                return
+
+            existing_id = self._find_existing_import(project_id, file_id, file)
+            if existing_id:
+                self._update_file_state(batch_id, file_id, status="skipped", source_id=existing_id,
+                                        error="Already imported")
+                return
+
+            extension = google_drive_service.get_extension_for(mime_type, file.get('name', ''))
+            if not extension:
+                self._update_file_state(batch_id, file_id, status="error", error="Could not determine file type")
+                return
+
+            file_name = build_file_name(file.get('name', 'unknown'), extension)
+            destination_path = get_raw_dir(project_id) / f"{uuid.uuid4()}{extension}"
+
+            success, message = google_drive_service.download_file(file_id, destination_path, file_info=file)
+            if not success:
+                self._update_file_state(batch_id, file_id, status="error", error=message)
+                return
+
+            # Create source entry (also starts its processing task)
+            created_source = source_service.create_source_from_file(
+                project_id=project_id,
+                file_path=destination_path,
+                name=file_name,
+                original_filename=file_name,
+                category=get_category_from_mime_type(mime_type, extension),
+                mime_type=map_google_mime_type(mime_type),
+                description='Imported from Google Drive'
+            )
+            self.record_import(project_id, file_id, created_source['id'], file)
+
+            self._update_file_state(batch_id, file_id, status="imported", source_id=created_source['id'])
+
+        except Exception as e:
+            print(f"Drive import of {file_id} failed: {e}")
+            self._update_file_state(batch_id, file_id, status="error", error=str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pipeline counters (for the metrics endpoint)."""
+        with self._lock:
+            return {
+                **self._stats,
+                "workers": self.MAX_WORKERS,
+                "running_batches": sum(1 for b in self._batches.values() if b["status"] == "running"),
+            }
+
+
+# Singleton instance
+drive_import_service = DriveImportService()
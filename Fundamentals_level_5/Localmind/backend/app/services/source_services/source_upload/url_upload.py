@@ -8,6 +8,10 @@ via the web_agent_service (for websites) or youtube_service (for YouTube).
 Supports:
 - Website URLs (processed by web_agent)
 - YouTube URLs (processed by youtube_service)
+
+validate_url() and create_link_source() are shared with bulk_url_upload,
+which creates many link sources and hands them to the bulk link pipeline
+instead of one background task each.
 """
 import json
 import re
@@ -20,6 +24,40 @@ from app.services.background_services import task_service
 from app.utils.path_utils import get_raw_dir
 
 
+# Basic URL shape check (scheme, host or IP, optional port and path)
+URL_PATTERN = re.compile(
+    r'^https?://'
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'
+    r'localhost|'
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
+    r'(?::\d+)?'
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+
+
+def validate_url(url: str) -> str:
+    """
+    Validate a URL and return it stripped.
+
+    Raises:
+        ValueError: If URL is empty or invalid format
+    """
+    if not url or not url.strip():
+        raise ValueError("URL cannot be empty")
+
+    url = url.strip()
+
+    if not URL_PATTERN.match(url):
+        raise ValueError("Invalid URL format. Must start with http:// or https://")
+
+    return url
+
+
+def get_link_type(url: str) -> str:
+    """Detect whether a URL is a YouTube video or a regular website."""
+    is_youtube = 'youtube.com' in url.lower() or 'youtu.be' in url.lower()
+    return 'youtube' if is_youtube else 'website'
+
+
 def upload_url(
     project_id: str,
     url: str,
@@ -45,27 +83,37 @@ def upload_url(
     Raises:
         ValueError: If URL is empty or invalid format
     """
-    # Basic URL validation
-    if not url or not url.strip():
-        raise ValueError("URL cannot be empty")
+    url = validate_url(url)
+    source_metadata = create_link_source(project_id, url, name, description)
 
-    url = url.strip()
+    # Submit background processing task
+    _submit_processing_task(project_id, source_metadata["id"])
 
-    # Check if it looks like a URL
-    url_pattern = re.compile(
-        r'^https?://'
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'
-        r'localhost|'
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
-        r'(?::\d+)?'
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+    return source_metadata
 
-    if not url_pattern.match(url):
-        raise ValueError("Invalid URL format. Must start with http:// or https://")
 
-    # Detect if it's a YouTube URL
-    is_youtube = 'youtube.com' in url.lower() or 'youtu.be' in url.lower()
-    link_type = 'youtube' if is_youtube else 'website'
+def create_link_source(
+    project_id: str,
+    url: str,
+    name: Optional[str] = None,
+    description: str = ""
+) -> Dict[str, Any]:
+    """
+    Store a validated URL as a .link file and add it to the index.
+
+    Educational Note: Only creates the source (status "uploaded") -
+    the caller decides how it gets processed.
+
+    Args:
+        project_id: The project UUID
+        url: The URL to store (already validated)
+        name: Optional display name (defaults to URL)
+        description: Optional description
+
+    Returns:
+        Source metadata dictionary
+    """
+    link_type = get_link_type(url)
 
     # Generate source ID and paths
     source_id = str(uuid.uuid4())
@@ -111,9 +159,6 @@ def upload_url(
 
     print(f"Added URL source: {url} ({source_id})")
 
-    # Submit background processing task
-    _submit_processing_task(project_id, source_id)
-
     return source_metadata
 
 
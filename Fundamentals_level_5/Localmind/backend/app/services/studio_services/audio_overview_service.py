@@ -163,10 +163,25 @@ class AudioOverviewService:
         )
 
         # Step 4: Convert script to audio
+        # Educational Note: The file grows in order while chunks are synthesized,
+        # so audio_url is published with the first chunk and can be played early
+        # Paragraphs already synthesized with the same voice come from the TTS
+        # segment cache, so only new or edited ones are sent to ElevenLabs
+        audio_url = f"/api/v1/projects/{project_id}/studio/audio/{audio_filename}"
+
+        def on_tts_progress(chunks_written: int, total_chunks: int) -> None:
+            studio_index_service.update_audio_job(
+                project_id, job_id,
+                progress=f"Converting to audio... ({chunks_written}/{total_chunks} parts ready)",
+                audio_filename=audio_filename,
+                audio_url=audio_url
+            )
+
         script_text = script_path.read_text(encoding='utf-8')
         audio_result = tts_service.generate_audio(
             text=script_text,
-            output_path=audio_path
+            output_path=audio_path,
+            on_progress=on_tts_progress
         )
 
         if not audio_result.get("success"):
@@ -186,7 +201,6 @@ class AudioOverviewService:
 
         # Step 5: Update job as complete
         duration = (datetime.now() - started_at).total_seconds()
-        audio_url = f"/api/v1/projects/{project_id}/studio/audio/{audio_filename}"
 
         studio_index_service.update_audio_job(
             project_id, job_id,
@@ -200,7 +214,10 @@ class AudioOverviewService:
                 "estimated_duration_seconds": audio_result.get("estimated_duration_seconds"),
                 "word_count": len(script_text.split()),
                 "voice_id": audio_result.get("voice_id"),
-                "model_id": audio_result.get("model_id")
+                "model_id": audio_result.get("model_id"),
+                "chunk_count": audio_result.get("chunk_count"),
+                "cached_chunks": audio_result.get("cached_chunks"),
+                "synthesized_characters": audio_result.get("synthesized_characters")
             },
             completed_at=datetime.now().isoformat()
         )
@@ -10,7 +10,12 @@ Educational Note: This service implements a smart search strategy:
 
 The executor returns chunk_ids that Claude uses for citations.
 Citation format: [[cite:CHUNK_ID]] where CHUNK_ID = {source_id}_page_{page}_chunk_{n}
+
+execute_async() is the ASGI chat path's entry point: the query embedding is
+awaited on the async OpenAI client, the rest (file reads, Pinecone) runs in
+a worker thread.
 """
+import asyncio
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from difflib import SequenceMatcher
@@ -52,7 +57,8 @@ class SourceSearchExecutor:
         project_id: str,
         source_id: str,
         keywords: Optional[List[str]] = None,
-        query: Optional[str] = None
+        query: Optional[str] = None,
+        query_vector: Optional[List[float]] = None
     ) -> Dict[str, Any]:
         """
         Execute a source search with smart strategy based on source size.
@@ -66,6 +72,7 @@ class SourceSearchExecutor:
             source_id: The source UUID to search
             keywords: Optional list of keywords for text matching (1-2 words each)
             query: Optional semantic search query phrase
+            query_vector: Optional precomputed embedding of query
 
         Returns:
             Dict with search results including chunk_ids for citations
@@ -101,9 +108,38 @@ class SourceSearchExecutor:
             return self._get_all_chunks(project_id, source_id, source)
         else:
             return self._search_large_source(
-                project_id, source_id, source, keywords, query
+                project_id, source_id, source, keywords, query, query_vector
             )
 
+    async def execute_async(
+        self,
+        project_id: str,
+        source_id: str,
+        keywords: Optional[List[str]] = None,
+        query: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Async version of execute() for the ASGI chat path.
+
+        Educational Note: Only large sources are searched semantically, so
+        the query is embedded (awaited, no thread held) only for those. If
+        the async embedding fails, execute() falls back to the sync client.
+        """
+        query_vector = None
+
+        if query and pinecone_service.is_configured():
+            source = await asyncio.to_thread(source_service.get_source, project_id, source_id)
+            token_count = (source or {}).get("embedding_info", {}).get("token_count", 0)
+            if token_count >= self.SMALL_SOURCE_THRESHOLD:
+                try:
+                    query_vector = await openai_service.create_embedding_async(query)
+                except Exception as e:
+                    print(f"Async query embedding failed, falling back to sync: {e}")
+
+        return await asyncio.to_thread(
+            self.execute, project_id, source_id, keywords, query, query_vector
+        )
+
     def _get_all_chunks(
         self,
         project_id: str,
@@ -152,7 +188,8 @@ class SourceSearchExecutor:
         source_id: str,
         source: Dict[str, Any],
         keywords: Optional[List[str]],
-        query: Optional[str]
+        query: Optional[str],
+        query_vector: Optional[List[float]] = None
     ) -> Dict[str, Any]:
         """
         Search a large source using hybrid search (keywords + semantic).
@@ -168,6 +205,7 @@ class SourceSearchExecutor:
             source: Source metadata dict
             keywords: Optional keywords for text matching
             query: Optional semantic search query
+            query_vector: Optional precomputed embedding of query
 
         Returns:
             Dict with matching chunks and their chunk_ids
@@ -192,7 +230,7 @@ class SourceSearchExecutor:
         # Semantic search via Pinecone
         if query:
             semantic_results = self._semantic_search(
-                project_id, source_id, query
+                project_id, source_id, query, query_vector
             )
             results.extend(semantic_results)
 
@@ -289,7 +327,8 @@ class SourceSearchExecutor:
         self,
         project_id: str,
         source_id: str,
-        query: str
+        query: str,
+        query_vector: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Perform semantic search via Pinecone.
@@ -304,6 +343,7 @@ class SourceSearchExecutor:
             project_id: The project UUID
             source_id: The source UUID
             query: Search query phrase
+            query_vector: Optional precomputed embedding of query
 
         Returns:
             List of matching chunks from Pinecone
@@ -314,8 +354,9 @@ class SourceSearchExecutor:
                 print("Pinecone not configured, skipping semantic search")
                 return []
 
-            # Create query embedding
-            query_vector = openai_service.create_embedding(query)
+            # Create query embedding (unless the async path already did)
+            if query_vector is None:
+                query_vector = openai_service.create_embedding(query)
 
             # Search Pinecone with source_id filter
             results = pinecone_service.search(
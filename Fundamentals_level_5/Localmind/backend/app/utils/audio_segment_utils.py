@@ -0,0 +1,366 @@
+"""
+Audio Segment Utils - Split long recordings on silence for parallel transcription.
+
+Educational Note: Sending a 3-hour recording as one transcription request
+means waiting for the whole thing, and a single network error near the end
+throws the entire transcript away. Splitting it into ~10 minute segments
+lets segments be transcribed in parallel and retried one at a time.
+
+Where to cut:
+- Cutting mid-word garbles the word on both sides, so each cut is moved to
+  the nearest pause: ffmpeg's silencedetect filter runs on a window of
+  +-SILENCE_SEARCH_SECONDS around each target cut (seeking there first, so
+  only a fraction of the file is decoded) and the cut goes in the middle
+  of the silence closest to the target
+- No pause in the window (music, crosstalk)? Cut at the target anyway
+
+Overlap:
+- Each segment extends OVERLAP_SECONDS past its cuts on both sides, so a
+  word at a cut is heard in full by at least one segment, and the words
+  both segments heard let the caller line up their speaker labels
+- Every segment also has a "core" range (cut to cut); when stitching, a
+  word is kept only by the segment whose core contains its start time, so
+  nothing is duplicated
+
+ffmpeg is used directly (not pydub's AudioSegment) so a multi-hour file is
+never decoded into memory - segments are cut straight from the original
+into small mono 16 kHz FLAC files, just before each one is uploaded.
+
+Config (environment):
+- AUDIO_SEGMENT_THRESHOLD_SECONDS: Recordings shorter than this are sent
+  whole (default 1200)
+- AUDIO_SEGMENT_SECONDS: Target segment length (default 600)
+
+Stitching (TranscriptStitcher):
+- Diarization labels are per request - "speaker_0" in one segment can be
+  "speaker_1" in the next. Words heard by both segments in their overlap
+  (same text, nearly the same time) vote on which labels are the same
+  person; labels nobody matches become new speakers
+- Words outside the segment's core are dropped after matching
+
+Usage:
+    duration = get_audio_duration(audio_path)
+    segments = plan_audio_segments(audio_path, duration)
+    cut_audio_segment(audio_path, segments[0], output_path)
+
+    stitcher = TranscriptStitcher()
+    for segment, words in ordered_results:
+        page_text = format_transcript_words(stitcher.add_segment(segment, words))
+"""
+import os
+import re
+import shutil
+import subprocess
+from collections import Counter
+from pathlib import Path
+from typing import Union, List, Dict, Any, Optional, Tuple
+
+
+SEGMENT_THRESHOLD_SECONDS = float(os.getenv("AUDIO_SEGMENT_THRESHOLD_SECONDS", "1200"))
+TARGET_SEGMENT_SECONDS = float(os.getenv("AUDIO_SEGMENT_SECONDS", "600"))
+
+# Audio shared by neighbouring segments, on each side of a cut
+OVERLAP_SECONDS = 15.0
+
+# How far from the target a cut may move to land in a pause
+SILENCE_SEARCH_SECONDS = 60.0
+
+# silencedetect settings: below this level for at least this long is a pause
+SILENCE_NOISE_DB = -35
+MIN_SILENCE_SECONDS = 0.5
+
+# Timeouts for ffmpeg/ffprobe calls
+PROBE_TIMEOUT = 60
+CUT_TIMEOUT = 300
+
+# Overlap words this close in time (and with the same text) are the same word
+WORD_MATCH_TOLERANCE = 0.5
+
+# Matching words needed before two speaker labels are treated as one person
+MIN_SPEAKER_VOTES = 2
+
+SILENCE_START_PATTERN = re.compile(r"silence_start:\s*(-?[\d.]+)")
+SILENCE_END_PATTERN = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+def is_available() -> bool:
+    """Check if ffmpeg and ffprobe are installed."""
+    return bool(shutil.which("ffmpeg") and shutil.which("ffprobe"))
+
+
+def format_timestamp(seconds: float) -> str:
+    """Seconds as HH:MM:SS."""
+    seconds = max(0, int(seconds))
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def get_audio_duration(audio_path: Union[str, Path]) -> Optional[float]:
+    """
+    Get the duration of an audio file with ffprobe.
+
+    Returns:
+        Duration in seconds, or None if ffprobe is missing or fails
+    """
+    if not is_available():
+        return None
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "error",
+                "-show_entries", "format=duration",
+                "-of", "default=noprint_wrappers=1:nokey=1",
+                str(audio_path)
+            ],
+            capture_output=True, text=True, timeout=PROBE_TIMEOUT
+        )
+        return float(result.stdout.strip())
+    except (subprocess.TimeoutExpired, ValueError, OSError) as e:
+        print(f"Could not read audio duration of {Path(audio_path).name}: {e}")
+        return None
+
+
+def detect_silences(
+    audio_path: Union[str, Path],
+    start: float,
+    length: float
+) -> List[Tuple[float, float]]:
+    """
+    Find pauses in one window of an audio file.
+
+    Args:
+        audio_path: Path to the audio file
+        start: Window start in seconds
+        length: Window length in seconds
+
+    Returns:
+        List of (silence_start, silence_end) in file time, possibly empty
+    """
+    try:
+        result = subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-nostats",
+                "-ss", f"{start:.3f}", "-t", f"{length:.3f}",
+                "-i", str(audio_path),
+                "-vn", "-af", f"silencedetect=noise={SILENCE_NOISE_DB}dB:d={MIN_SILENCE_SECONDS}",
+                "-f", "null", "-"
+            ],
+            capture_output=True, text=True, timeout=PROBE_TIMEOUT
+        )
+    except (subprocess.TimeoutExpired, OSError) as e:
+        print(f"Silence detection failed at {format_timestamp(start)}: {e}")
+        return []
+
+    # Timestamps are relative to the window (input seeking resets them)
+    silences = []
+    silence_start = None
+    for line in result.stderr.splitlines():
+        start_match = SILENCE_START_PATTERN.search(line)
+        if start_match:
+            silence_start = max(0.0, float(start_match.group(1)))
+            continue
+        end_match = SILENCE_END_PATTERN.search(line)
+        if end_match and silence_start is not None:
+            silences.append((start + silence_start, start + float(end_match.group(1))))
+            silence_start = None
+    if silence_start is not None:
+        silences.append((start + silence_start, start + length))
+    return silences
+
+
+def choose_cut(target: float, silences: List[Tuple[float, float]]) -> Tuple[float, bool]:
+    """
+    Pick where to cut near a target time.
+
+    Returns:
+        Tuple of (cut time, True if it falls in a pause)
+    """
+    if not silences:
+        return target, False
+    silence_start, silence_end = min(
+        silences, key=lambda s: abs((s[0] + s[1]) / 2 - target)
+    )
+    return (silence_start + silence_end) / 2, True
+
+
+def plan_audio_segments(
+    audio_path: Union[str, Path],
+    duration: float,
+    target_seconds: float = TARGET_SEGMENT_SECONDS,
+    overlap_seconds: float = OVERLAP_SECONDS
+) -> List[Dict[str, Any]]:
+    """
+    Plan overlapping segments with cuts placed in pauses.
+
+    Args:
+        audio_path: Path to the audio file
+        duration: Duration in seconds (from get_audio_duration)
+        target_seconds: Target segment length
+        overlap_seconds: Audio shared with each neighbour
+
+    Returns:
+        Segments in order: {"index": 1-based, "start"/"end": audio to
+        transcribe, "core_start"/"core_end": range this segment owns,
+        "cut_in_silence": whether its end cut is in a pause, "last"}
+    """
+    cuts = [0.0]
+    in_silence = []
+    target = target_seconds
+    # Don't leave a final segment shorter than half the target
+    while target < duration - target_seconds / 2:
+        window_start = max(cuts[-1] + overlap_seconds, target - SILENCE_SEARCH_SECONDS)
+        window_end = min(duration - overlap_seconds, target + SILENCE_SEARCH_SECONDS)
+        silences = detect_silences(audio_path, window_start, window_end - window_start) if window_end > window_start else []
+        cut, found = choose_cut(target, silences)
+        cuts.append(cut)
+        in_silence.append(found)
+        target = cut + target_seconds
+    cuts.append(duration)
+    in_silence.append(True)
+
+    return [
+        {
+            "index": i + 1,
+            "start": max(0.0, cuts[i] - overlap_seconds),
+            "end": min(duration, cuts[i + 1] + overlap_seconds),
+            "core_start": cuts[i],
+            "core_end": cuts[i + 1],
+            "cut_in_silence": in_silence[i],
+            "last": i == len(cuts) - 2,
+        }
+        for i in range(len(cuts) - 1)
+    ]
+
+
+def cut_audio_segment(
+    audio_path: Union[str, Path],
+    segment: Dict[str, Any],
+    output_path: Union[str, Path]
+) -> Path:
+    """
+    Cut one segment into a mono 16 kHz FLAC file.
+
+    Educational Note: Speech models work at 16 kHz; mono FLAC keeps the
+    upload small (~0.4 MB/minute) without lossy re-encoding artifacts.
+
+    Raises:
+        RuntimeError: If ffmpeg fails
+    """
+    output_path = Path(output_path)
+    try:
+        result = subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-nostats", "-y",
+                "-ss", f"{segment['start']:.3f}", "-t", f"{segment['end'] - segment['start']:.3f}",
+                "-i", str(audio_path),
+                "-vn", "-ac", "1", "-ar", "16000", "-c:a", "flac",
+                str(output_path)
+            ],
+            capture_output=True, text=True, timeout=CUT_TIMEOUT
+        )
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"ffmpeg timed out cutting segment {segment['index']}")
+    if result.returncode != 0 or not output_path.exists():
+        raise RuntimeError(f"ffmpeg failed cutting segment {segment['index']}: {result.stderr[-500:]}")
+    return output_path
+
+
+def _normalize_word(text: str) -> str:
+    return re.sub(r"[^\w]", "", text.lower())
+
+
+class TranscriptStitcher:
+    """
+    Joins segment transcripts in order into one consistent transcript.
+
+    Educational Note: Segments must be added in order - speaker labels of
+    segment N are resolved against segment N-1. Words are dicts with
+    "text", "start", "end" (file time, seconds), "type" ("word",
+    "spacing", "audio_event") and "speaker" (the segment's own label or None).
+    """
+
+    def __init__(self):
+        """Start with no speakers."""
+        self._previous: Optional[List[Dict[str, Any]]] = None
+        self._speaker_count = 0
+
+    def _match_speakers(self, segment: Dict[str, Any], words: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Map this segment's speaker labels to labels already in use."""
+        if not self._previous:
+            return {}
+
+        previous = [
+            w for w in self._previous
+            if w["type"] == "word" and w["speaker"] and w["start"] >= segment["start"]
+        ]
+        overlap_end = max((w["end"] for w in self._previous), default=segment["start"])
+        votes: Counter = Counter()
+        for word in words:
+            if word["type"] != "word" or not word["speaker"] or word["start"] > overlap_end:
+                continue
+            text = _normalize_word(word["text"])
+            for other in previous:
+                if abs(other["start"] - word["start"]) <= WORD_MATCH_TOLERANCE and _normalize_word(other["text"]) == text:
+                    votes[(word["speaker"], other["speaker"])] += 1
+                    break
+
+        mapping: Dict[str, str] = {}
+        used = set()
+        for (local, known), count in votes.most_common():
+            if count < MIN_SPEAKER_VOTES:
+                break
+            if local not in mapping and known not in used:
+                mapping[local] = known
+                used.add(known)
+        return mapping
+
+    def add_segment(self, segment: Dict[str, Any], words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Add the next segment's words.
+
+        Args:
+            segment: The segment (from plan_audio_segments)
+            words: Its words in file time, with the segment's own speaker labels
+
+        Returns:
+            The words this segment owns (its core), with stitched speaker labels
+        """
+        mapping = self._match_speakers(segment, words)
+        for word in words:
+            local = word["speaker"]
+            if local and local not in mapping:
+                mapping[local] = f"speaker_{self._speaker_count}"
+                self._speaker_count += 1
+
+        labeled = [{**w, "speaker": mapping.get(w["speaker"]) if w["speaker"] else None} for w in words]
+        self._previous = labeled
+        return [
+            w for w in labeled
+            if segment["core_start"] <= w["start"] and (w["start"] < segment["core_end"] or segment["last"])
+        ]
+
+
+def format_transcript_words(words: List[Dict[str, Any]]) -> str:
+    """
+    Format words as speaker turns, each with its start time.
+
+    Returns:
+        Lines like "[00:10:05] Speaker speaker_1: text", separated by blank
+        lines; without speaker labels, one timestamped paragraph
+    """
+    turns: List[Tuple[Optional[str], float, List[str]]] = []
+    for word in words:
+        if turns and turns[-1][0] == word["speaker"]:
+            turns[-1][2].append(word["text"])
+        elif word["type"] == "spacing" and turns:
+            turns[-1][2].append(word["text"])
+        else:
+            turns.append((word["speaker"], word["start"], [word["text"]]))
+
+    lines = []
+    for speaker, start, texts in turns:
+        text = " ".join("".join(texts).split())
+        if not text:
+            continue
+        label = f"Speaker {speaker}: " if speaker else ""
+        lines.append(f"[{format_timestamp(start)}] {label}{text}")
+    return "\n\n".join(lines)
@@ -8,14 +8,15 @@ with APIs that have:
 - Cost optimization (fewer API calls = lower cost)
 
 This utility provides a simple, reusable way to split any list into
-fixed-size chunks for batch processing.
+fixed-size chunks for batch processing, plus a planner that packs pages
+into variable-size batches by their estimated cost (plan_page_batches).
 
 Used by:
 - pdf_service (batch PDF pages for vision extraction)
 - pptx_service (batch slides for vision extraction)
 - Any future service that needs to process items in batches
 """
-from typing import List, TypeVar
+from typing import List, TypeVar, Tuple, Dict, Any, Optional
 
 # Generic type for batch items
 T = TypeVar('T')
@@ -25,6 +26,29 @@ T = TypeVar('T')
 # understanding) vs API limits (too many pages = token overflow).
 DEFAULT_BATCH_SIZE = 5
 
+# Adaptive batch planning limits (plan_page_batches)
+# Educational Note: Anthropic caps a request at 32 MB and a PDF document at
+# 100 pages. Base64 inflates bytes by 4/3, so the raw page budget is smaller.
+MAX_REQUEST_BYTES = 32 * 1024 * 1024
+BASE64_OVERHEAD = 4 / 3
+MAX_PAGES_PER_BATCH = 20
+MAX_INPUT_TOKENS_PER_BATCH = 100_000
+
+# Use only this share of each limit - estimates are rough, and a batch that
+# overflows max_tokens comes back truncated and has to be retried
+BATCH_LIMIT_HEADROOM = 0.75
+
+# Token estimates per page
+# Each PDF page is sent both as extracted text and as a rendered image
+PAGE_IMAGE_TOKENS = 1600
+CHARS_PER_TOKEN = 4
+# Used when a page's text isn't known (scanned pages, slides)
+DEFAULT_PAGE_TEXT_TOKENS = 1000
+DEFAULT_OUTPUT_TOKENS_PER_PAGE = 1200
+MIN_OUTPUT_TOKENS_PER_PAGE = 300
+# Extraction output is the page text plus markdown and carried-over context
+OUTPUT_TOKENS_PER_TEXT_TOKEN = 1.2
+
 
 def create_batches(items: List[T], batch_size: int) -> List[List[T]]:
     """
@@ -94,3 +118,115 @@ def get_batch_info(items: List[T], batch_size: int) -> dict:
         "total_batches": total_batches,
         "last_batch_size": last_batch_size
     }
+
+
+def estimate_page_cost(
+    byte_size: int,
+    text_chars: Optional[int] = None,
+    default_output_tokens: int = DEFAULT_OUTPUT_TOKENS_PER_PAGE
+) -> Dict[str, int]:
+    """
+    Estimate what one page costs inside an extraction request.
+
+    Educational Note: Input is the page image plus its text; output is
+    roughly the page text re-written. When the text isn't known (a scanned
+    page has no text layer) we fall back to per-page defaults.
+
+    Args:
+        byte_size: Size of the page's PDF data in bytes
+        text_chars: Characters in the page's text layer, if known
+        default_output_tokens: Output estimate when text_chars is unknown
+
+    Returns:
+        Dict with bytes, input_tokens, output_tokens
+    """
+    if text_chars is None:
+        text_tokens = DEFAULT_PAGE_TEXT_TOKENS
+        output_tokens = default_output_tokens
+    else:
+        text_tokens = text_chars // CHARS_PER_TOKEN
+        output_tokens = max(MIN_OUTPUT_TOKENS_PER_PAGE, int(text_tokens * OUTPUT_TOKENS_PER_TEXT_TOKEN))
+
+    return {
+        "bytes": byte_size,
+        "input_tokens": PAGE_IMAGE_TOKENS + text_tokens,
+        "output_tokens": output_tokens
+    }
+
+
+def plan_page_batches(
+    page_costs: List[Tuple[int, Dict[str, int]]],
+    max_output_tokens: int,
+    max_pages: int = MAX_PAGES_PER_BATCH,
+    max_request_bytes: int = MAX_REQUEST_BYTES,
+    max_input_tokens: int = MAX_INPUT_TOKENS_PER_BATCH
+) -> List[List[int]]:
+    """
+    Pack pages into batches that stay under request size and token limits.
+
+    Educational Note: A fixed batch of 5 is wrong both ways - five image-heavy
+    pages can overflow the request size or max_tokens (truncated response,
+    retry), while five sparse text pages waste a whole request's overhead.
+    This greedy planner walks the pages in order and closes a batch as soon
+    as the next page would push any budget over its limit, so consecutive
+    pages stay together (Claude keeps cross-page context) and each request
+    carries as many pages as fits.
+
+    A page that is over a limit on its own still gets a batch by itself.
+
+    Args:
+        page_costs: (page_number, estimate_page_cost(...)) in document order
+        max_output_tokens: The request's max_tokens
+        max_pages: Upper bound on pages per batch
+        max_request_bytes: Request size limit (before base64)
+        max_input_tokens: Input token budget per batch
+
+    Returns:
+        List of batches, each a list of page numbers
+    """
+    byte_budget = max_request_bytes / BASE64_OVERHEAD * BATCH_LIMIT_HEADROOM
+    input_budget = max_input_tokens * BATCH_LIMIT_HEADROOM
+    output_budget = max_output_tokens * BATCH_LIMIT_HEADROOM
+
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = {"bytes": 0, "input_tokens": 0, "output_tokens": 0}
+
+    for page_number, cost in page_costs:
+        fits = (
+            len(current) < max_pages
+            and used["bytes"] + cost["bytes"] <= byte_budget
+            and used["input_tokens"] + cost["input_tokens"] <= input_budget
+            and used["output_tokens"] + cost["output_tokens"] <= output_budget
+        )
+        if current and not fits:
+            batches.append(current)
+            current = []
+            used = {"bytes": 0, "input_tokens": 0, "output_tokens": 0}
+
+        current.append(page_number)
+        for key in used:
+            used[key] += cost[key]
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+def get_batch_plan_stats(batches: List[List[Any]]) -> Dict[str, Any]:
+    """
+    Summarize a batch plan for logging and processing_info.
+
+    Returns:
+        Dict with total_batches, total_pages, pages_per_request,
+        min_batch_size, max_batch_size
+    """
+    sizes = [len(batch) for batch in batches]
+    return {
+        "total_batches": len(sizes),
+        "total_pages": sum(sizes),
+        "pages_per_request": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+        "min_batch_size": min(sizes) if sizes else 0,
+        "max_batch_size": max(sizes) if sizes else 0
+    }
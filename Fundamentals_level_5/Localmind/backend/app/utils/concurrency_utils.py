@@ -0,0 +1,377 @@
+"""
+Concurrency Utils - Adaptive (AIMD) concurrency control for API calls.
+
+Educational Note: The token buckets in rate_limit_utils.py enforce the
+limits we *know about* (tier config). The API's real headroom varies:
+other apps share the key, the service gets overloaded (529), or the tier
+config is simply wrong. A fixed worker count is then either too slow or
+keeps hammering the API into more 429s.
+
+AIMD (Additive Increase, Multiplicative Decrease - the same idea TCP uses
+for congestion control) adapts the number of in-flight calls:
+- Every call takes a slot; at most `window` calls run at once
+- Success: window += 1 / window (about +1 per window of successful calls)
+- 429 / 529: window = window * 0.5 (once per cooldown, so a burst of
+  failures from the same moment halves it only once)
+- Rate-limit response headers, when present, stop growth while the
+  remaining budget is low
+
+Interactive calls (chat turns) have a reserved lane: background work
+(extraction, summaries, agents) may only fill the window up to
+INTERACTIVE_RESERVED_SLOTS below its size, and a waiting interactive call
+gets the next free slot before any waiting background call. A chat turn
+never queues behind a folder of PDF batches.
+
+Backoff between retries uses "full jitter" (random 0..exponential cap), so
+workers that failed together don't all retry at the same instant. A
+server-provided retry-after is honored (plus a little jitter).
+
+Usage:
+    from app.utils.concurrency_utils import concurrency_registry
+
+    controller = concurrency_registry.get_controller("anthropic", model)
+    controller.acquire(interactive=False)
+    outcome, headers = "error", None
+    try:
+        ...
+        outcome = "success"
+    finally:
+        controller.release(outcome, headers, interactive=False)
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Optional, Dict, Any, Tuple, Mapping
+
+from app.config.tier_loader import get_tier, get_max_workers
+
+try:
+    import anthropic
+    ANTHROPIC_AVAILABLE = True
+except ImportError:
+    ANTHROPIC_AVAILABLE = False
+
+
+# HTTP statuses that mean "slow down"
+THROTTLE_STATUS_CODES = (429, 529)
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """
+    Check whether an API error is a rate-limit (429) or overloaded (529) error.
+
+    Educational Note: Classified by type and status code only. SDK errors
+    carry status_code (529 overloaded arrives as an InternalServerError
+    with status_code 529). Loose message matching ("rate" also matches
+    "generate" or "accurate") would shrink the window on unrelated errors;
+    the only text fallback is an explicit 429 in a wrapped error.
+    """
+    if ANTHROPIC_AVAILABLE and isinstance(error, anthropic.RateLimitError):
+        return True
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        return status_code in THROTTLE_STATUS_CODES
+    return "429" in str(error)
+
+
+def get_error_headers(error: Exception) -> Optional[Mapping[str, str]]:
+    """Get the HTTP response headers attached to an SDK error, if any."""
+    response = getattr(error, "response", None)
+    return getattr(response, "headers", None)
+
+
+def get_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Parse the retry-after header (seconds), if present."""
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(
+    attempt: int,
+    retry_after: Optional[float] = None,
+    base: float = 2.0,
+    cap: float = 60.0
+) -> float:
+    """
+    Compute a jittered backoff delay before retry number `attempt` (0-based).
+
+    Args:
+        attempt: How many attempts have failed so far, minus one
+        retry_after: Server-provided wait in seconds (honored if present)
+        base: Base delay in seconds
+        cap: Maximum delay in seconds
+
+    Returns:
+        Seconds to sleep
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, 1.0)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AIMDController:
+    """
+    Adaptive in-flight window for one provider/model.
+
+    Educational Note: The window is a float so additive increase can grow
+    it in fractions; the number of allowed in-flight calls is int(window).
+    Waiting for a slot uses a Condition, which releases the lock while
+    waiting.
+    """
+
+    # Multiplicative decrease factor on 429/529
+    DECREASE_FACTOR = 0.5
+
+    # Minimum seconds between two decreases
+    DECREASE_COOLDOWN_SECONDS = 2.0
+
+    # Don't grow while the server reports less than this fraction left
+    LOW_HEADROOM_RATIO = 0.1
+
+    # Slots background calls leave free for interactive ones
+    INTERACTIVE_RESERVED_SLOTS = int(os.getenv("CLAUDE_INTERACTIVE_RESERVED_SLOTS", "1"))
+
+    # Header pairs (remaining, limit) Anthropic sends on every response
+    HEADROOM_HEADERS = (
+        ("anthropic-ratelimit-requests-remaining", "anthropic-ratelimit-requests-limit"),
+        ("anthropic-ratelimit-input-tokens-remaining", "anthropic-ratelimit-input-tokens-limit"),
+        ("anthropic-ratelimit-output-tokens-remaining", "anthropic-ratelimit-output-tokens-limit"),
+    )
+
+    def __init__(self, name: str, initial_window: int, max_window: int, min_window: int = 1):
+        """
+        Initialize the controller.
+
+        Args:
+            name: Display name for logs/metrics ("provider/model")
+            initial_window: Starting in-flight limit
+            max_window: Upper bound for the window
+            min_window: Lower bound for the window
+        """
+        self.name = name
+        self.min_window = min_window
+        self.max_window = max_window
+        self._window = float(min(max(initial_window, min_window), max_window))
+        self._in_flight = 0
+        self._background_in_flight = 0
+        self._interactive_waiting = 0
+        self._last_decrease = 0.0
+        self._headroom: Optional[float] = None
+        self._condition = threading.Condition()
+        self._stats = {
+            "successes": 0,
+            "errors": 0,
+            "throttle_events": 0,
+            "window_decreases": 0,
+            "interactive_calls": 0,
+        }
+
+    def set_max_window(self, max_window: int) -> None:
+        """Change the upper bound (e.g., tier changed in settings)."""
+        with self._condition:
+            self.max_window = max_window
+            self._window = min(self._window, float(max_window))
+            self._condition.notify_all()
+
+    def _get_limit(self) -> int:
+        return max(self.min_window, int(self._window))
+
+    def _get_background_limit(self) -> int:
+        """Slots background calls may use (always at least one)."""
+        return max(1, self._get_limit() - self.INTERACTIVE_RESERVED_SLOTS)
+
+    def _has_slot(self, interactive: bool) -> bool:
+        if self._in_flight >= self._get_limit():
+            return False
+        if interactive:
+            return True
+        # Waiting interactive calls go first; the reserved slots stay free
+        return (
+            self._interactive_waiting == 0
+            and self._background_in_flight < self._get_background_limit()
+        )
+
+    def _take_slot(self, interactive: bool) -> None:
+        """Caller holds the condition."""
+        self._in_flight += 1
+        if interactive:
+            self._stats["interactive_calls"] += 1
+        else:
+            self._background_in_flight += 1
+
+    def acquire(self, interactive: bool = False) -> None:
+        """
+        Block until an in-flight slot is free, then take it.
+
+        Args:
+            interactive: A user is waiting on this call (chat) - may use
+                the reserved slots and is served before background calls
+        """
+        with self._condition:
+            if interactive:
+                self._interactive_waiting += 1
+            try:
+                while not self._has_slot(interactive):
+                    self._condition.wait()
+            finally:
+                if interactive:
+                    self._interactive_waiting -= 1
+                    self._condition.notify_all()
+            self._take_slot(interactive)
+
+    async def acquire_async(self, interactive: bool = False) -> None:
+        """Async version of acquire() - polls without blocking the event loop."""
+        if interactive:
+            with self._condition:
+                self._interactive_waiting += 1
+        try:
+            while True:
+                with self._condition:
+                    if self._has_slot(interactive):
+                        self._take_slot(interactive)
+                        return
+                await asyncio.sleep(0.05)
+        finally:
+            if interactive:
+                with self._condition:
+                    self._interactive_waiting -= 1
+                    self._condition.notify_all()
+
+    def _read_headroom(self, headers: Optional[Mapping[str, str]]) -> Optional[float]:
+        """Lowest remaining/limit ratio reported by rate-limit headers."""
+        if not headers:
+            return None
+        ratios = []
+        for remaining_key, limit_key in self.HEADROOM_HEADERS:
+            try:
+                remaining = float(headers.get(remaining_key))
+                limit = float(headers.get(limit_key))
+            except (TypeError, ValueError):
+                continue
+            if limit > 0:
+                ratios.append(remaining / limit)
+        return min(ratios) if ratios else None
+
+    def release(
+        self,
+        outcome: str,
+        headers: Optional[Mapping[str, str]] = None,
+        interactive: bool = False
+    ) -> None:
+        """
+        Free the slot and adapt the window to the call's outcome.
+
+        Args:
+            outcome: "success", "throttled" (429/529) or "error" (anything else)
+            headers: Response headers (success) or error response headers
+            interactive: Same value that was passed to acquire()
+        """
+        headroom = self._read_headroom(headers)
+
+        with self._condition:
+            self._in_flight -= 1
+            if not interactive:
+                self._background_in_flight -= 1
+            if headroom is not None:
+                self._headroom = headroom
+
+            if outcome == "success":
+                self._stats["successes"] += 1
+                if headroom is None or headroom >= self.LOW_HEADROOM_RATIO:
+                    self._window = min(float(self.max_window), self._window + 1.0 / self._window)
+
+            elif outcome == "throttled":
+                self._stats["throttle_events"] += 1
+                now = time.monotonic()
+                if now - self._last_decrease >= self.DECREASE_COOLDOWN_SECONDS:
+                    self._window = max(float(self.min_window), self._window * self.DECREASE_FACTOR)
+                    self._last_decrease = now
+                    self._stats["window_decreases"] += 1
+                    print(f"Throttled ({self.name}): concurrency window -> {int(self._window)}")
+
+            else:
+                self._stats["errors"] += 1
+
+            self._condition.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get current window, in-flight count and throttle counters."""
+        with self._condition:
+            return {
+                **self._stats,
+                "window": round(self._window, 2),
+                "in_flight": self._in_flight,
+                "background_in_flight": self._background_in_flight,
+                "background_limit": self._get_background_limit(),
+                "max_window": self.max_window,
+                "headroom": round(self._headroom, 3) if self._headroom is not None else None,
+            }
+
+
+class ConcurrencyControllerRegistry:
+    """
+    Process-wide registry of AIMD controllers keyed by (provider, model).
+
+    Educational Note: The window starts at the tier's max_workers (the old
+    fixed value) and may grow up to twice that when the API has headroom.
+    Chat, agents and extraction share a model's window; the interactive
+    lane inside each controller keeps chat responsive.
+    """
+
+    # Max window = tier max_workers * this
+    MAX_WINDOW_MULTIPLIER = 2
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._controllers: Dict[Tuple[str, str], AIMDController] = {}
+        self._tiers: Dict[str, int] = {}
+
+    def get_controller(self, provider: str, model: str) -> AIMDController:
+        """
+        Get (or create) the shared controller for a provider/model.
+
+        Args:
+            provider: API provider name (anthropic, openai)
+            model: Model name
+
+        Returns:
+            The process-wide AIMDController for this key
+        """
+        tier = get_tier(provider)
+        max_workers = get_max_workers(provider, tier)
+
+        with self._lock:
+            if self._tiers.get(provider, tier) != tier:
+                for (controller_provider, _), controller in self._controllers.items():
+                    if controller_provider == provider:
+                        controller.set_max_window(max_workers * self.MAX_WINDOW_MULTIPLIER)
+            self._tiers[provider] = tier
+
+            key = (provider, model)
+            controller = self._controllers.get(key)
+            if controller is None:
+                controller = AIMDController(
+                    f"{provider}/{model}",
+                    initial_window=max_workers,
+                    max_window=max_workers * self.MAX_WINDOW_MULTIPLIER
+                )
+                self._controllers[key] = controller
+            return controller
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get stats for every controller, keyed by "provider/model"."""
+        with self._lock:
+            controllers = list(self._controllers.items())
+        return {f"{provider}/{model}": c.get_stats() for (provider, model), c in controllers}
+
+
+# Singleton registry shared by the whole process
+concurrency_registry = ConcurrencyControllerRegistry()
@@ -7,6 +7,15 @@ Costs are stored cumulatively in project.json and updated after each API call.
 Pricing (per 1M tokens):
 - Sonnet: $3 input, $15 output
 - Haiku: $1 input, $5 output
+
+Prompt caching (multipliers on the input price):
+- Cache write: 1.25x
+- Cache read: 0.1x
+
+Calls answered from claude_service's response cache cost nothing; they
+are counted per model as "cached_responses".
+
+Message Batches API (bulk mode): 0.5x on everything.
 """
 import json
 from typing import Dict, Any, Optional
@@ -21,6 +30,13 @@ PRICING = {
     "haiku": {"input": 1.0, "output": 5.0},
 }
 
+# Prompt cache multipliers (relative to input price)
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+# Message Batches API discount (relative to the normal price)
+BATCH_MULTIPLIER = 0.5
+
 # Lock for thread-safe file operations
 _lock = Lock()
 
@@ -45,14 +61,24 @@ def _get_model_key(model_string: str) -> str:
         return "sonnet"
 
 
-def _calculate_cost(model_key: str, input_tokens: int, output_tokens: int) -> float:
+def _calculate_cost(
+    model_key: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_creation_input_tokens: int = 0,
+    cache_read_input_tokens: int = 0,
+    batch: bool = False
+) -> float:
     """
     Calculate cost for a single API call.
 
     Args:
         model_key: "sonnet" or "haiku"
-        input_tokens: Number of input tokens
+        input_tokens: Number of (uncached) input tokens
         output_tokens: Number of output tokens
+        cache_creation_input_tokens: Input tokens written to the prompt cache
+        cache_read_input_tokens: Input tokens served from the prompt cache
+        batch: Call went through the Message Batches API
 
     Returns:
         Cost in USD
@@ -60,7 +86,10 @@ def _calculate_cost(model_key: str, input_tokens: int, output_tokens: int) -> fl
     pricing = PRICING.get(model_key, PRICING["sonnet"])
     input_cost = (input_tokens / 1_000_000) * pricing["input"]
     output_cost = (output_tokens / 1_000_000) * pricing["output"]
-    return input_cost + output_cost
+    cache_write_cost = (cache_creation_input_tokens / 1_000_000) * pricing["input"] * CACHE_WRITE_MULTIPLIER
+    cache_read_cost = (cache_read_input_tokens / 1_000_000) * pricing["input"] * CACHE_READ_MULTIPLIER
+    total = input_cost + output_cost + cache_write_cost + cache_read_cost
+    return total * BATCH_MULTIPLIER if batch else total
 
 
 def _load_project(project_id: str) -> Optional[Dict[str, Any]]:
@@ -118,7 +147,11 @@ def add_usage(
     project_id: str,
     model: str,
     input_tokens: int,
-    output_tokens: int
+    output_tokens: int,
+    cache_creation_input_tokens: int = 0,
+    cache_read_input_tokens: int = 0,
+    cached_response: bool = False,
+    batch: bool = False
 ) -> Optional[Dict[str, Any]]:
     """
     Add API usage to project cost tracking.
@@ -131,6 +164,11 @@ def add_usage(
         model: Full model string (e.g., "claude-sonnet-4-5-20250929")
         input_tokens: Number of input tokens used
         output_tokens: Number of output tokens used
+        cache_creation_input_tokens: Input tokens written to the prompt cache
+        cache_read_input_tokens: Input tokens read from the prompt cache
+        cached_response: Call was served from the local response cache
+            (zero tokens, counted as a cached response)
+        batch: Call went through the Message Batches API (discounted)
 
     Returns:
         Updated cost tracking data or None if failed
@@ -146,7 +184,14 @@ def add_usage(
 
         # Get model key and calculate cost
         model_key = _get_model_key(model)
-        call_cost = _calculate_cost(model_key, input_tokens, output_tokens)
+        call_cost = _calculate_cost(
+            model_key,
+            input_tokens,
+            output_tokens,
+            cache_creation_input_tokens,
+            cache_read_input_tokens,
+            batch
+        )
 
         # Update model-specific tracking
         model_tracking = project_data["cost_tracking"]["by_model"][model_key]
@@ -154,6 +199,18 @@ def add_usage(
         model_tracking["output_tokens"] += output_tokens
         model_tracking["cost"] += call_cost
 
+        # Cache token counters are only added once caching is actually used
+        if cache_creation_input_tokens or cache_read_input_tokens:
+            model_tracking["cache_creation_input_tokens"] = (
+                model_tracking.get("cache_creation_input_tokens", 0) + cache_creation_input_tokens
+            )
+            model_tracking["cache_read_input_tokens"] = (
+                model_tracking.get("cache_read_input_tokens", 0) + cache_read_input_tokens
+            )
+
+        if cached_response:
+            model_tracking["cached_responses"] = model_tracking.get("cached_responses", 0) + 1
+
         # Update total cost
         project_data["cost_tracking"]["total_cost"] += call_cost
 
@@ -0,0 +1,172 @@
+"""
+Extraction Checkpoint Utils - Per-batch checkpoints for resumable extraction.
+
+Educational Note: PDF and PPTX extraction sends a document to Claude in
+batches of pages. Without checkpoints, one batch failing after its retries
+(or the server restarting mid-extraction) throws away every batch that
+already succeeded, and the retry starts again from page 1.
+
+With checkpoints, each completed batch's page results are appended to a
+JSON Lines file next to the processed output:
+
+    {processed_dir}/{source_id}.checkpoint.jsonl
+
+    {"fingerprint": {...}}                       <- header (first line)
+    {"page": 6, "result": {"text": "..."}}        <- one line per page
+    {"page": 7, "result": {"text": "..."}}
+
+Why JSON Lines?
+- Appending a line is cheap and never rewrites earlier batches
+- A crash mid-write leaves at most one partial last line, which load()
+  simply ignores - that page is re-extracted
+
+The header fingerprint (raw file size + mtime, prompt version, model) makes
+sure results are only reused for the same file extracted the same way; if
+anything changed, the checkpoint is discarded and extraction starts fresh.
+
+Failed pages are never checkpointed, so a retry re-extracts exactly the
+pages that are missing or failed. The checkpoint is deleted once the final
+processed file has been written from it.
+
+Usage:
+    checkpoint = ExtractionCheckpoint(processed_dir, source_id, pdf_path, prompt_config)
+    done = checkpoint.load()              # {page_number: result}
+    ...extract the other pages...
+    checkpoint.save_pages(batch_results)  # after each successful batch
+    checkpoint.delete()                   # after the processed file is written
+"""
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+CHECKPOINT_SUFFIX = ".checkpoint.jsonl"
+
+
+def get_checkpoint_path(processed_dir: Path, source_id: str) -> Path:
+    """Path of a source's extraction checkpoint."""
+    return processed_dir / f"{source_id}{CHECKPOINT_SUFFIX}"
+
+
+class ExtractionCheckpoint:
+    """
+    Append-only checkpoint of per-page extraction results for one source.
+
+    Educational Note: Batches complete on worker threads in any order, so
+    writes are serialized with a lock; each save is one append + flush.
+    """
+
+    def __init__(
+        self,
+        processed_dir: Path,
+        source_id: str,
+        source_file: Path,
+        prompt_config: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize the checkpoint.
+
+        Args:
+            processed_dir: The project's processed directory
+            source_id: The source UUID
+            source_file: The original uploaded file (PDF/PPTX) - its size and
+                         mtime identify the content being extracted
+            prompt_config: Extraction prompt config (version/model are part
+                           of the fingerprint)
+        """
+        self.path = get_checkpoint_path(processed_dir, source_id)
+        self._lock = threading.Lock()
+        self._fingerprint = self._make_fingerprint(source_file, prompt_config or {})
+        self._header_written = False
+        self._needs_newline = False
+
+    @staticmethod
+    def _make_fingerprint(source_file: Path, prompt_config: Dict[str, Any]) -> Dict[str, Any]:
+        stat = source_file.stat()
+        return {
+            "file_size": stat.st_size,
+            "file_mtime_ns": stat.st_mtime_ns,
+            "prompt_version": prompt_config.get("version"),
+            "model": prompt_config.get("model"),
+        }
+
+    def load(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Load the pages completed by earlier attempts.
+
+        Returns:
+            Dict mapping page number -> result, empty if there is no usable
+            checkpoint (missing, or written for a different file/prompt)
+        """
+        if not self.path.exists():
+            return {}
+
+        results: Dict[int, Dict[str, Any]] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except IOError as e:
+            print(f"Checkpoint: failed to read {self.path.name}: {e}")
+            return {}
+
+        lines = content.splitlines()
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except json.JSONDecodeError:
+            header = {}
+        if header.get("fingerprint") != self._fingerprint:
+            print(f"Checkpoint: {self.path.name} is stale, starting fresh")
+            self.delete()
+            return {}
+
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Partial last line from an interrupted write
+                continue
+            results[int(entry["page"])] = entry["result"]
+
+        with self._lock:
+            self._header_written = True
+            # Start appends on a fresh line after a partial last line
+            self._needs_newline = not content.endswith("\n")
+        return results
+
+    def save_pages(self, page_results: Dict[int, Dict[str, Any]]) -> None:
+        """
+        Append successfully extracted pages to the checkpoint.
+
+        Educational Note: Pages with an "error" key are skipped, so they are
+        re-extracted on retry. Write failures are logged and ignored - the
+        checkpoint is a safety net, never a reason for extraction to fail.
+        """
+        lines = [
+            json.dumps({"page": page_num, "result": result})
+            for page_num, result in sorted(page_results.items())
+            if not result.get("error")
+        ]
+        if not lines:
+            return
+
+        with self._lock:
+            try:
+                mode = "a" if self._header_written else "w"
+                with open(self.path, mode, encoding="utf-8") as f:
+                    if not self._header_written:
+                        f.write(json.dumps({"fingerprint": self._fingerprint}) + "\n")
+                    elif self._needs_newline:
+                        f.write("\n")
+                    f.write("\n".join(lines) + "\n")
+                    f.flush()
+                self._header_written = True
+                self._needs_newline = False
+            except IOError as e:
+                print(f"Checkpoint: failed to write {self.path.name}: {e}")
+
+    def delete(self) -> None:
+        """Remove the checkpoint (after the processed file is written)."""
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self._header_written = False
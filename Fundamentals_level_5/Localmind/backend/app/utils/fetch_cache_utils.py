@@ -0,0 +1,424 @@
+"""
+Fetch Cache Utils - Shared on-disk cache for web pages and YouTube transcripts.
+
+Educational Note: Adding a website source runs the web agent - several
+Claude calls with web_fetch, maybe a Tavily search - and a YouTube source
+downloads the whole transcript. Adding the same URL to a second project,
+or reprocessing it, used to repeat all of that for content that hasn't
+changed. This cache is shared by all projects and keyed by canonical URL.
+
+Each entry stores:
+- The extracted result (title, content, summary... or the transcript)
+- The HTTP validators of the page: ETag and Last-Modified
+- The response body (gzipped) and its SHA-256
+
+Lookups for web pages follow HTTP caching:
+1. Fresh (validated less than TTL ago): served from disk, no network
+2. Stale: one conditional GET (If-None-Match / If-Modified-Since)
+   - 304 Not Modified -> still valid, served from disk
+   - 200 with the same body hash -> unchanged (servers without validators)
+   - 200 with a different body -> changed, the caller re-extracts
+3. Revalidation fails (timeout, DNS) -> the stale entry is served if it
+   was validated within MAX_STALE; otherwise it's a miss
+
+Pages over MAX_BODY_BYTES are not downloaded past the cap (the response
+is closed there), so they have no body hash: they revalidate with ETag /
+Last-Modified only. Without those their entries are TTL-only, and a stale
+one is a miss without any request.
+
+Either way, a hit skips the agent loop entirely. The response of a miss
+is remembered (without its body, but with its validators and body hash)
+for RECENT_MISS_SECONDS, so a pipeline that checks a URL and then hands it
+to the link processor fetches it once, and the entry stored from it still
+revalidates. YouTube transcripts have no validators, so they only use the
+TTL (captions rarely change).
+
+Canonical URLs: lowercase scheme and host, no default port, no fragment,
+tracking parameters (utm_*, fbclid, gclid...) removed, query sorted - so
+https://Example.com:443/a?utm_source=x&b=1#top and
+https://example.com/a?b=1 share an entry.
+
+Config (environment):
+- FETCH_CACHE_MAX_MB: Size limit (default 200; 0 disables the cache)
+- FETCH_CACHE_TTL_HOURS: Freshness window for web pages (default 24)
+- FETCH_CACHE_MAX_STALE_DAYS: Serve stale entries on network errors (default 7)
+- YOUTUBE_CACHE_TTL_DAYS: Freshness window for transcripts (default 30)
+
+Usage:
+    check = fetch_cache.check_url(url)
+    if check["hit"]:
+        result = check["result"]
+    else:
+        result = ...run the web agent...
+        fetch_cache.store_url(url, result, check["response"])
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+
+from app.utils.response_cache_utils import DiskLRUCache
+from config import Config
+
+
+MAX_BYTES = int(float(os.getenv("FETCH_CACHE_MAX_MB", "200")) * 1024 * 1024)
+TTL_SECONDS = float(os.getenv("FETCH_CACHE_TTL_HOURS", "24")) * 3600
+MAX_STALE_SECONDS = float(os.getenv("FETCH_CACHE_MAX_STALE_DAYS", "7")) * 86400
+YOUTUBE_TTL_SECONDS = float(os.getenv("YOUTUBE_CACHE_TTL_DAYS", "30")) * 86400
+
+# Timeout for revalidation requests (connect, read)
+FETCH_TIMEOUT = (5, 15)
+
+# Bodies larger than this are neither read to the end, hashed nor stored
+MAX_BODY_BYTES = 5 * 1024 * 1024
+
+# A miss's response is reused by checks of the same URL this soon after
+RECENT_MISS_SECONDS = 300
+MAX_RECENT_MISSES = 1024
+
+USER_AGENT = "Mozilla/5.0 (compatible; LocalMind/1.0)"
+
+# Query parameters that only track the visitor
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "ref_src"}
+TRACKING_PREFIXES = ("utm_",)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different spellings share a cache entry.
+
+    Args:
+        url: Absolute http(s) URL
+
+    Returns:
+        Canonical URL string
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+
+    query = [
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    ]
+
+    return urlunsplit((scheme, netloc, parts.path or "/", urlencode(sorted(query)), ""))
+
+
+class FetchCache(DiskLRUCache):
+    """
+    Size-bounded LRU cache of fetched content with HTTP revalidation.
+
+    Educational Note: Layout, index and eviction come from DiskLRUCache
+    (response_cache_utils.py): {cache_dir}/{key[:2]}/{key}.json for the
+    entry, plus {key}.body.gz for the response body. Both count toward
+    the size limit and are evicted together.
+    """
+
+    # Bump when the key material or entry format changes
+    CACHE_VERSION = 1
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cache entries (created on first write)
+            max_bytes: Size limit for all cached files; 0 disables the cache
+        """
+        super().__init__(cache_dir, max_bytes)
+        self._recent_misses: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._stats.update({
+            "revalidated": 0,
+            "unchanged": 0,
+            "stale_served": 0,
+            "changed": 0,
+            "fetch_errors": 0,
+        })
+
+    # =========================================================================
+    # Storage
+    # =========================================================================
+
+    def make_key(self, namespace: str, identifier: str) -> str:
+        """Hash the namespace ("link", "youtube") and identifier."""
+        payload = f"{self.CACHE_VERSION}\n{namespace}\n{identifier}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_body_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.body.gz"
+
+    def _get_extra_paths(self, key: str) -> Tuple[Path, ...]:
+        return (self._get_body_path(key),)
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read an entry, or None if missing or unreadable."""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._get_path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, IOError):
+            return None
+        if entry.get("version") != self.CACHE_VERSION:
+            return None
+        return entry
+
+    def _write(self, key: str, entry: Dict[str, Any], body: Optional[bytes] = None) -> None:
+        """
+        Write an entry (and body) atomically and evict if over the limit.
+
+        Educational Note: Failures are logged and ignored - the cache is an
+        optimization, never a reason for a source to fail.
+        """
+        def write_body(tmp_path: Path) -> None:
+            with gzip.open(tmp_path, "wb") as f:
+                f.write(body)
+
+        def write_entry(tmp_path: Path) -> None:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+
+        try:
+            if body is not None:
+                self._replace_file(self._get_body_path(key), write_body)
+            self._replace_file(self._get_path(key), write_entry)
+        except (IOError, OSError, TypeError, ValueError) as e:
+            print(f"Fetch cache: failed to store {key[:12]}: {e}")
+            return
+
+        self._record_write(key)
+
+    # =========================================================================
+    # TTL-only entries (YouTube transcripts)
+    # =========================================================================
+
+    def get(self, namespace: str, identifier: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached result if it was stored less than ttl_seconds ago.
+
+        Returns:
+            The stored result dict, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        key = self.make_key(namespace, identifier)
+        entry = self._load(key)
+        if entry is None or time.time() - entry.get("validated_at", 0) >= ttl_seconds:
+            self._count("misses")
+            return None
+        self._touch(key)
+        self._count("hits")
+        return entry["result"]
+
+    def put(self, namespace: str, identifier: str, result: Dict[str, Any]) -> None:
+        """Store a result that is only refreshed by TTL."""
+        if not self.enabled:
+            return
+        now = time.time()
+        self._write(self.make_key(namespace, identifier), {
+            "version": self.CACHE_VERSION,
+            "namespace": namespace,
+            "identifier": identifier,
+            "stored_at": now,
+            "validated_at": now,
+            "result": result,
+        })
+        self._count("stores")
+
+    # =========================================================================
+    # Web pages (HTTP revalidation)
+    # =========================================================================
+
+    def fetch(self, url: str, entry: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        GET a URL, conditionally if an entry with validators is given.
+
+        Educational Note: The download stops (and the connection is closed)
+        as soon as the body passes MAX_BODY_BYTES - a huge page is never
+        read to the end just to hash it.
+
+        Returns:
+            {"status_code", "etag", "last_modified", "content_type", "encoding",
+             "final_url", "body" (bytes), "body_sha256"} - body and hash are
+            None if the body is over MAX_BODY_BYTES - or None on a network error
+        """
+        headers = {"User-Agent": USER_AGENT}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            with requests.get(url, headers=headers, timeout=FETCH_TIMEOUT, stream=True) as response:
+                body = bytearray()
+                for piece in response.iter_content(chunk_size=64 * 1024):
+                    body.extend(piece)
+                    if len(body) > MAX_BODY_BYTES:
+                        body = None
+                        break
+                return {
+                    "status_code": response.status_code,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "content_type": response.headers.get("Content-Type", ""),
+                    "encoding": response.encoding,
+                    "final_url": response.url,
+                    "body": bytes(body) if body is not None else None,
+                    "body_sha256": hashlib.sha256(body).hexdigest() if body is not None else None,
+                }
+        except requests.RequestException as e:
+            print(f"Fetch cache: request failed for {url}: {e}")
+            self._count("fetch_errors")
+            return None
+
+    def check_url(self, url: str, ttl_seconds: float = TTL_SECONDS) -> Dict[str, Any]:
+        """
+        Look up a web page, revalidating with the server once it is stale.
+
+        Args:
+            url: The page URL (canonicalized for the key)
+            ttl_seconds: How long an entry is fresh without revalidation
+
+        Returns:
+            {"hit": bool,
+             "status": "fresh" | "revalidated" | "unchanged" | "stale" | "changed"
+                       | "expired" | "miss" | "disabled",
+             "result": cached result on a hit, else None,
+             "response": the fetch made while checking (pass to store_url), or None,
+             "stored_at": timestamp of the cached entry, or None}
+        """
+        if not self.enabled:
+            return {"hit": False, "status": "disabled", "result": None, "response": None, "stored_at": None}
+
+        key = self.make_key("link", canonicalize_url(url))
+        entry = self._load(key)
+        now = time.time()
+
+        def miss(status: str, response: Optional[Dict[str, Any]], fetched_at: float = now) -> Dict[str, Any]:
+            self._count("changed" if status == "changed" else "misses")
+            if response is not None:
+                with self._lock:
+                    self._recent_misses[key] = (fetched_at, {**response, "body": None})
+                    self._recent_misses.move_to_end(key)
+                    while len(self._recent_misses) > MAX_RECENT_MISSES:
+                        self._recent_misses.popitem(last=False)
+            return {"hit": False, "status": status, "result": None, "response": response,
+                    "stored_at": entry.get("stored_at") if entry else None}
+
+        def hit(status: str, stat: str) -> Dict[str, Any]:
+            self._count(stat)
+            return {"hit": True, "status": status, "result": entry["result"],
+                    "response": None, "stored_at": entry.get("stored_at")}
+
+        if entry and now - entry.get("validated_at", 0) < ttl_seconds:
+            self._touch(key)
+            return hit("fresh", "hits")
+
+        if entry and not (entry.get("etag") or entry.get("last_modified") or entry.get("body_sha256")):
+            # TTL-only entry (no validators, no body hash) - nothing to revalidate against
+            return miss("expired", None)
+
+        with self._lock:
+            recent = self._recent_misses.pop(key, None)
+        if recent and now - recent[0] < RECENT_MISS_SECONDS:
+            return miss("changed" if entry else "miss", recent[1], recent[0])
+
+        response = self.fetch(url, entry)
+
+        if response is None:
+            if entry and now - entry.get("validated_at", 0) < MAX_STALE_SECONDS:
+                self._touch(key)
+                return hit("stale", "stale_served")
+            return miss("miss", None)
+
+        if entry:
+            not_modified = response["status_code"] == 304
+            same_body = (response["status_code"] == 200
+                         and response["body_sha256"] is not None
+                         and response["body_sha256"] == entry.get("body_sha256"))
+            if not_modified or same_body:
+                entry["validated_at"] = now
+                entry["etag"] = response["etag"] or entry.get("etag")
+                entry["last_modified"] = response["last_modified"] or entry.get("last_modified")
+                self._write(key, entry)
+                return hit("revalidated" if not_modified else "unchanged",
+                           "revalidated" if not_modified else "unchanged")
+            return miss("changed", response)
+
+        return miss("miss", response)
+
+    def store_url(
+        self,
+        url: str,
+        result: Dict[str, Any],
+        response: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Store the extracted result for a web page.
+
+        Args:
+            url: The page URL
+            result: Extracted result to serve on later hits
+            response: The fetch from check_url() - its validators and body
+                      hash make the entry revalidatable; the body is kept
+                      when the response still has it. Without a 200
+                      response, or one with no validators and no body hash
+                      (no ETag/Last-Modified and a body over
+                      MAX_BODY_BYTES), the entry is TTL-only.
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+        entry = {
+            "version": self.CACHE_VERSION,
+            "namespace": "link",
+            "identifier": canonicalize_url(url),
+            "url": url,
+            "stored_at": now,
+            "validated_at": now,
+            "result": result,
+        }
+        body = None
+        if response and response.get("status_code") == 200:
+            entry.update({
+                "etag": response.get("etag"),
+                "last_modified": response.get("last_modified"),
+                "content_type": response.get("content_type"),
+                "encoding": response.get("encoding"),
+                "final_url": response.get("final_url"),
+                "body_sha256": response.get("body_sha256"),
+            })
+            body = response.get("body")
+
+        key = self.make_key("link", entry["identifier"])
+        with self._lock:
+            self._recent_misses.pop(key, None)
+        if body is None:
+            self._get_body_path(key).unlink(missing_ok=True)
+        self._write(key, entry, body)
+        self._count("stores")
+
+    def _hit_counts(self) -> Tuple[int, int]:
+        """Revalidated, unchanged and stale-served lookups count as hits. Caller holds lock."""
+        served = (self._stats["hits"] + self._stats["revalidated"]
+                  + self._stats["unchanged"] + self._stats["stale_served"])
+        return served, served + self._stats["changed"] + self._stats["misses"]
+
+
+# Singleton instance
+fetch_cache = FetchCache(Config.DATA_DIR / "cache" / "fetch", MAX_BYTES)
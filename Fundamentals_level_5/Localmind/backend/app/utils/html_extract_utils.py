@@ -0,0 +1,285 @@
+"""
+HTML Extract Utils - Local text extraction for static web pages and sitemaps.
+
+Educational Note: Most articles, docs pages and blog posts are static HTML -
+the text is in the response body, no JavaScript needed. Reading it locally
+takes milliseconds, while the web agent spends several Claude calls (and
+the tokens of the whole page) to get the same text. The bulk link pipeline
+tries this first and only falls back to the agent when the page doesn't
+look like it extracted well (JavaScript apps, paywalls, PDFs, errors).
+
+Extraction:
+1. Parse with lxml (tolerates broken markup, honors <meta charset>)
+2. Drop non-content elements: scripts, styles, nav, header, footer,
+   aside, forms, hidden elements
+3. Prefer <article> / <main> if they hold most of the text
+4. Render blocks as paragraphs: headings as "# ...", list items as
+   "- ...", table rows as "| a | b |", preformatted text kept as is
+
+A page "extracted well" if the result has at least MIN_CONTENT_CHARS of
+text and MIN_CONTENT_WORDS words.
+
+Sitemaps: <urlset> and <sitemapindex> XML (optionally gzipped), or plain
+text with one URL per line. Gzipped sitemaps are inflated with a cap
+(MAX_SITEMAP_BYTES), so a small "zip bomb" can't expand into gigabytes.
+
+Usage:
+    extracted = extract_page_text(body, content_type)
+    if extracted and is_substantial(extracted):
+        content = extracted["content"]
+"""
+import os
+import zlib
+from typing import Optional, Dict, Any, List, Tuple
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+    print("Warning: lxml not installed. Static HTML extraction unavailable.")
+
+try:
+    from defusedxml.ElementTree import fromstring as parse_xml
+except ImportError:
+    from xml.etree.ElementTree import fromstring as parse_xml
+
+
+MIN_CONTENT_CHARS = int(os.getenv("STATIC_HTML_MIN_CHARS", "500"))
+MIN_CONTENT_WORDS = 80
+
+# <article>/<main> is used if it holds at least this share of the page text
+MAIN_CONTENT_SHARE = 0.5
+
+REMOVE_XPATH = (
+    "//script | //style | //noscript | //template | //svg | //canvas | //iframe"
+    " | //nav | //header | //footer | //aside | //form | //button | //select"
+    " | //*[@hidden] | //*[@aria-hidden='true']"
+    " | //*[@role='navigation' or @role='banner' or @role='contentinfo' or @role='complementary']"
+)
+
+# Largest sitemap accepted, compressed or not (the sitemap protocol's own limit)
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+HEADING_LEVELS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+BLOCK_TAGS = {
+    "address", "article", "blockquote", "body", "dd", "details", "div", "dl", "dt",
+    "figcaption", "figure", "hr", "html", "li", "main", "ol", "p", "pre", "section",
+    "summary", "table", "tbody", "td", "tfoot", "th", "thead", "tr", "ul",
+}
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+TEXT_CONTENT_TYPES = ("text/plain", "text/markdown")
+
+
+def is_available() -> bool:
+    """Check if lxml is available."""
+    return LXML_AVAILABLE
+
+
+def _clean(text: Optional[str]) -> str:
+    """Collapse whitespace."""
+    return " ".join(text.split()) if text else ""
+
+
+class _TextRenderer:
+    """Walks an element tree and collects paragraphs."""
+
+    def __init__(self):
+        self.blocks: List[str] = []
+        self._inline: List[str] = []
+
+    def _flush(self) -> None:
+        text = _clean(" ".join(self._inline))
+        if text:
+            self.blocks.append(text)
+        self._inline = []
+
+    def _block(self, text: str) -> None:
+        self._flush()
+        if text and (not self.blocks or self.blocks[-1] != text):
+            self.blocks.append(text)
+
+    def walk(self, element) -> None:
+        if not isinstance(element.tag, str):
+            return  # Comments, processing instructions
+        tag = element.tag.lower()
+
+        if tag in HEADING_LEVELS:
+            text = _clean(element.text_content())
+            if text:
+                self._block(f"{'#' * HEADING_LEVELS[tag]} {text}")
+            return
+        if tag == "li":
+            text = _clean(element.text_content())
+            if text:
+                self._block(f"- {text}")
+            return
+        if tag == "pre":
+            self._block(element.text_content().strip("\n"))
+            return
+        if tag == "tr":
+            cells = [_clean(cell.text_content()) for cell in element.xpath("./td | ./th")]
+            if any(cells):
+                self._block("| " + " | ".join(cells) + " |")
+            return
+        if tag == "br":
+            self._flush()
+            return
+
+        is_block = tag in BLOCK_TAGS
+        if is_block:
+            self._flush()
+        if element.text:
+            self._inline.append(element.text)
+        for child in element:
+            self.walk(child)
+            if child.tail:
+                self._inline.append(child.tail)
+        if is_block:
+            self._flush()
+
+
+def _get_meta(document, *names: str) -> str:
+    """First non-empty <meta name|property=...> content."""
+    for name in names:
+        values = document.xpath(f"//meta[@name='{name}' or @property='{name}']/@content")
+        for value in values:
+            if _clean(value):
+                return _clean(value)
+    return ""
+
+
+def extract_html_text(body: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Extract the readable text of an HTML page.
+
+    Args:
+        body: Raw response body (encoding detected by lxml)
+
+    Returns:
+        {"title", "description", "content", "character_count", "word_count"}
+        or None if lxml is missing or the page can't be parsed
+    """
+    if not LXML_AVAILABLE or not body:
+        return None
+
+    try:
+        document = lxml.html.document_fromstring(body)
+    except (ValueError, lxml.etree.LxmlError) as e:
+        print(f"HTML extraction: could not parse page: {e}")
+        return None
+
+    title = _get_meta(document, "og:title") or _clean(document.findtext(".//title"))
+    description = _get_meta(document, "description", "og:description")
+
+    for element in document.xpath(REMOVE_XPATH):
+        if element.getparent() is not None:
+            element.drop_tree()
+
+    # Prefer the main content container if it holds most of the page text
+    root = document.find("body")
+    if root is None:
+        root = document
+    page_chars = len(_clean(root.text_content()))
+    candidates = document.xpath("//article | //main | //*[@role='main']")
+    if candidates and page_chars:
+        best = max(candidates, key=lambda el: len(_clean(el.text_content())))
+        if len(_clean(best.text_content())) >= page_chars * MAIN_CONTENT_SHARE:
+            root = best
+
+    renderer = _TextRenderer()
+    renderer.walk(root)
+    content = "\n\n".join(renderer.blocks)
+
+    return {
+        "title": title,
+        "description": description,
+        "content": content,
+        "character_count": len(content),
+        "word_count": len(content.split()),
+    }
+
+
+def extract_page_text(body: bytes, content_type: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract text from a fetched page based on its Content-Type.
+
+    Returns:
+        Same dict as extract_html_text(), or None for types we don't
+        extract locally (PDF, images, JSON...)
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+
+    if media_type in HTML_CONTENT_TYPES:
+        return extract_html_text(body)
+
+    if media_type in TEXT_CONTENT_TYPES:
+        content = body.decode("utf-8", errors="replace").strip()
+        return {
+            "title": "",
+            "description": "",
+            "content": content,
+            "character_count": len(content),
+            "word_count": len(content.split()),
+        }
+
+    return None
+
+
+def is_substantial(extracted: Optional[Dict[str, Any]]) -> bool:
+    """Whether local extraction got enough text to skip the web agent."""
+    return bool(
+        extracted
+        and extracted["character_count"] >= MIN_CONTENT_CHARS
+        and extracted["word_count"] >= MIN_CONTENT_WORDS
+    )
+
+
+def parse_sitemap(body: bytes, max_bytes: int = MAX_SITEMAP_BYTES) -> Tuple[List[str], List[str]]:
+    """
+    Parse a sitemap or sitemap index.
+
+    Args:
+        body: Raw sitemap bytes (XML, gzipped XML, or plain text)
+        max_bytes: Largest decompressed size accepted for gzipped sitemaps
+
+    Returns:
+        Tuple of (page_urls, child_sitemap_urls), in document order
+
+    Raises:
+        ValueError: If a gzipped sitemap inflates past max_bytes or is corrupt
+    """
+    if body[:2] == b"\x1f\x8b":
+        # 16 + MAX_WBITS: expect a gzip header; max_length stops the inflate early
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            inflated = inflater.decompress(body, max_bytes + 1)
+        except zlib.error as e:
+            raise ValueError(f"Invalid gzipped sitemap: {e}")
+        if len(inflated) > max_bytes:
+            raise ValueError(f"Sitemap too large when decompressed (> {max_bytes} bytes)")
+        body = inflated
+
+    try:
+        root = parse_xml(body)
+    except Exception:
+        # Plain text sitemap: one URL per line
+        lines = body.decode("utf-8", errors="replace").splitlines()
+        return [line.strip() for line in lines if line.strip().startswith(("http://", "https://"))], []
+
+    def local_name(element) -> str:
+        return element.tag.rsplit("}", 1)[-1] if isinstance(element.tag, str) else ""
+
+    page_urls, sitemap_urls = [], []
+    for entry in root:
+        locations = [_clean(child.text) for child in entry if local_name(child) == "loc" and child.text]
+        if not locations:
+            continue
+        if local_name(entry) == "sitemap":
+            sitemap_urls.append(locations[0])
+        elif local_name(entry) == "url":
+            page_urls.append(locations[0])
+
+    return page_urls, sitemap_urls
@@ -0,0 +1,411 @@
+"""
+Image Prep Utils - Normalize images before sending them to Claude vision.
+
+Educational Note: Uploaded images are usually far bigger than what the
+model can use. A 12 MP phone photo (4000x3000, 4-8 MB) is downscaled by
+the API to about 1568 px on the long edge anyway - we paid to upload the
+extra pixels for nothing, and anything over 5 MB is rejected outright.
+
+Each image goes through:
+1. EXIF orientation applied (phone photos are often stored sideways)
+2. Transparency flattened onto white, converted to RGB
+3. Long edge capped at MAX_LONG_EDGE (the model's effective resolution)
+4. Re-encoded without metadata (EXIF, GPS, ICC, comments):
+   - Few colors (screenshots, diagrams, slides) -> optimized PNG, lossless
+     so text stays crisp (unless JPEG is much smaller, e.g. grayscale scans)
+   - Everything else (photos) -> JPEG at JPEG_QUALITY
+   - Quality, then size, is stepped down until it fits MAX_IMAGE_BYTES
+5. Hashed (SHA-256 of the normalized pixels) so repeats are found even
+   when the files differ (re-saved, different metadata, other format)
+
+If re-encoding doesn't help (an already small, optimized image that
+needed no resize or rotation), the original bytes are kept - but only
+when the file carries no metadata (EXIF, GPS, XMP, ICC, text chunks), so
+location and camera data never leave the machine.
+
+Why a thread pool?
+- Decoding and resizing a 12 MP photo takes 100-300 ms of CPU; a batch
+  of 20 photos would stall the request thread for seconds
+- Pillow releases the GIL while decoding, resizing and encoding, so
+  threads run in parallel on the heavy parts
+- No forked processes: forking a multi-threaded server (HTTP clients,
+  Socket.IO, executors) can copy held locks into the child and deadlock.
+  Decompression bombs are rejected by Pillow's own pixel limit
+
+Normalization is deterministic, so the same upload always produces the
+same bytes - which is what lets the on-disk response cache recognize an
+image extracted before, even from another source. Recent results are
+also kept in memory (keyed by file hash) so repeats skip the pool.
+
+Config (environment):
+- IMAGE_MAX_LONG_EDGE: Long edge cap in pixels (default 1568)
+- IMAGE_JPEG_QUALITY: JPEG quality for photos (default 85)
+- IMAGE_PREP_WORKERS: Pool size (default min(4, CPUs); 0 = no pool)
+- IMAGE_PREP_CACHE_MB: In-memory cache of prepared images (default 64)
+
+Usage:
+    from app.utils.image_prep_utils import image_preprocessor
+    prepared = image_preprocessor.prepare(image_paths)
+    data, media_type = prepared[0]["data"], prepared[0]["media_type"]
+"""
+import atexit
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Union, List, Dict, Any, Optional
+
+from app.utils.encoding_utils import get_media_type
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    print("Warning: Pillow not installed. Images will be sent without normalization.")
+
+
+MAX_LONG_EDGE = int(os.getenv("IMAGE_MAX_LONG_EDGE", "1568"))
+JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "85"))
+PREP_WORKERS = int(os.getenv("IMAGE_PREP_WORKERS", str(min(4, os.cpu_count() or 1))))
+CACHE_BYTES = int(os.getenv("IMAGE_PREP_CACHE_MB", "64")) * 1024 * 1024
+
+# The API limit is 5 MB per image, base64-encoded (4/3 of the raw size)
+MAX_IMAGE_BYTES = 5 * 1024 * 1024 * 3 // 4
+
+# Lowest JPEG quality tried before shrinking the image instead
+MIN_JPEG_QUALITY = 60
+
+# Images with at most this many colors are encoded as PNG...
+PNG_MAX_COLORS = 256
+# ...unless the PNG is more than this many times the size of the JPEG
+PNG_SIZE_TOLERANCE = 2
+
+# Formats Claude accepts as-is (when the original is kept)
+SUPPORTED_FORMATS = {"JPEG": "image/jpeg", "PNG": "image/png", "GIF": "image/gif", "WEBP": "image/webp"}
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+# Image.info keys that carry metadata (EXIF/GPS, XMP, ICC, comments)
+METADATA_INFO_KEYS = {"exif", "xmp", "XML:com.adobe.xmp", "icc_profile", "photoshop", "comment"}
+
+
+def is_available() -> bool:
+    """Check if Pillow is available."""
+    return PIL_AVAILABLE
+
+
+def _encode(image, use_png: bool, quality: int) -> bytes:
+    """Encode an RGB image without metadata."""
+    buffer = io.BytesIO()
+    if use_png:
+        image.save(buffer, format="PNG", optimize=True)
+    else:
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def _has_metadata(image) -> bool:
+    """Check whether an opened image file carries any metadata."""
+    if len(image.getexif()) > 0:
+        return True
+    if METADATA_INFO_KEYS & set(image.info):
+        return True
+    # PNG tEXt/iTXt/zTXt chunks
+    return bool(getattr(image, "text", None))
+
+
+def _normalize_image(
+    path: str,
+    max_long_edge: int,
+    jpeg_quality: int,
+    max_bytes: int
+) -> Dict[str, Any]:
+    """
+    Normalize one image (runs in a pool worker - no printing, no app state).
+
+    Returns:
+        Dict with data, media_type, content_hash, original/prepared sizes
+        and dimensions, and what was done (resized, reencoded)
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    with Image.open(io.BytesIO(raw)) as opened:
+        original_format = opened.format
+        original_size = opened.size
+        rotated = opened.getexif().get(EXIF_ORIENTATION_TAG, 1) != 1
+        has_metadata = _has_metadata(opened)
+        image = ImageOps.exif_transpose(opened)
+
+        if image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info):
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel("A"))
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+    resized = max(image.size) > max_long_edge
+    if resized:
+        image.thumbnail((max_long_edge, max_long_edge), Image.Resampling.LANCZOS)
+
+    quality = jpeg_quality
+    use_png = image.getcolors(PNG_MAX_COLORS) is not None
+    data = _encode(image, use_png, quality)
+    if use_png:
+        # Few colors but noisy (grayscale scans, dithered images): PNG loses
+        jpeg_data = _encode(image, False, quality)
+        if len(jpeg_data) * PNG_SIZE_TOLERANCE < len(data):
+            use_png, data = False, jpeg_data
+    while len(data) > max_bytes:
+        if not use_png and quality > MIN_JPEG_QUALITY:
+            quality -= 10
+        else:
+            image = image.resize((max(1, image.width * 3 // 4), max(1, image.height * 3 // 4)), Image.Resampling.LANCZOS)
+            resized = True
+        data = _encode(image, use_png, quality)
+
+    content_hash = hashlib.sha256(f"{image.width}x{image.height}:".encode() + image.tobytes()).hexdigest()
+    media_type = "image/png" if use_png else "image/jpeg"
+
+    # Nothing gained: keep the original (same pixels, already small, nothing to strip)
+    keep_original = (
+        not resized and not rotated and not has_metadata
+        and original_format in SUPPORTED_FORMATS
+        and len(raw) <= len(data)
+    )
+    if keep_original:
+        data = raw
+        media_type = SUPPORTED_FORMATS[original_format]
+
+    return {
+        "data": data,
+        "media_type": media_type,
+        "content_hash": content_hash,
+        "original_bytes": len(raw),
+        "bytes": len(data),
+        "original_size": list(original_size),
+        "size": [image.width, image.height],
+        "resized": resized,
+        "reencoded": not keep_original,
+    }
+
+
+def _hash_file(path: Path) -> str:
+    """SHA-256 of a file's bytes (cache key for prepared images)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ImagePreprocessor:
+    """
+    Normalizes images on a worker pool, with an in-memory LRU of results.
+
+    Educational Note: The pool is created on first use and shared by all
+    requests. If Pillow is missing or an image can't be decoded, the
+    original file is used unchanged - preprocessing is an optimization,
+    never a reason for extraction to fail.
+    """
+
+    def __init__(
+        self,
+        max_long_edge: int = MAX_LONG_EDGE,
+        jpeg_quality: int = JPEG_QUALITY,
+        workers: int = PREP_WORKERS,
+        cache_bytes: int = CACHE_BYTES
+    ):
+        """Initialize the preprocessor (no pool until first use)."""
+        self.max_long_edge = max_long_edge
+        self.jpeg_quality = jpeg_quality
+        self.workers = workers
+        self.cache_bytes = cache_bytes
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._mode = "inline" if workers <= 0 else None
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_size = 0
+        self._stats = {
+            "images": 0,
+            "cache_hits": 0,
+            "duplicates": 0,
+            "resized": 0,
+            "reencoded": 0,
+            "failures": 0,
+            "original_bytes": 0,
+            "prepared_bytes": 0,
+        }
+
+    def _get_executor(self) -> Optional[ThreadPoolExecutor]:
+        """Create the pool on first use. Caller holds lock."""
+        if self.workers <= 0:
+            return None
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="image-prep")
+            self._mode = "thread"
+        return self._executor
+
+    def _cache_get(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._cache.get(file_hash)
+            if entry is not None:
+                self._cache.move_to_end(file_hash)
+            return entry
+
+    def _cache_put(self, file_hash: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            if file_hash in self._cache or entry["bytes"] > self.cache_bytes:
+                return
+            self._cache[file_hash] = entry
+            self._cache_size += entry["bytes"]
+            while self._cache_size > self.cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_size -= evicted["bytes"]
+
+    def _original(self, path: Path) -> Dict[str, Any]:
+        """Fallback record: the file as uploaded."""
+        data = path.read_bytes()
+        return {
+            "data": data,
+            "media_type": get_media_type(path),
+            "content_hash": hashlib.sha256(data).hexdigest(),
+            "original_bytes": len(data),
+            "bytes": len(data),
+            "original_size": None,
+            "size": None,
+            "resized": False,
+            "reencoded": False,
+        }
+
+    def prepare(self, image_paths: List[Union[str, Path]]) -> List[Dict[str, Any]]:
+        """
+        Normalize images in parallel.
+
+        Args:
+            image_paths: Image files to prepare
+
+        Returns:
+            One dict per path, in order:
+            {"data": bytes to send, "media_type", "content_hash" (equal
+             for repeated images), "original_bytes", "bytes",
+             "original_size"/"size" ([w, h] or None), "resized",
+             "reencoded", "duplicate_of" (index of the first image with
+             the same content, or None)}
+
+        Raises:
+            FileNotFoundError: If an image doesn't exist
+        """
+        paths = [Path(p) for p in image_paths]
+        for path in paths:
+            if not path.exists():
+                raise FileNotFoundError(f"File not found: {path}")
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(paths)
+        file_hashes = [_hash_file(path) for path in paths]
+        cache_hits = 0
+        futures = {}
+
+        with self._lock:
+            executor = self._get_executor() if PIL_AVAILABLE else None
+
+        for index, (path, file_hash) in enumerate(zip(paths, file_hashes)):
+            cached = self._cache_get(file_hash)
+            if cached is not None:
+                results[index] = cached
+                cache_hits += 1
+            elif not PIL_AVAILABLE:
+                results[index] = self._original(path)
+            elif executor is None:
+                try:
+                    results[index] = _normalize_image(str(path), self.max_long_edge, self.jpeg_quality, MAX_IMAGE_BYTES)
+                except Exception as e:
+                    print(f"Image prep failed for {path.name}, sending original: {e}")
+                    results[index] = self._original(path)
+            else:
+                futures[index] = executor.submit(
+                    _normalize_image, str(path), self.max_long_edge, self.jpeg_quality, MAX_IMAGE_BYTES
+                )
+
+        failures = 0
+        for index, future in futures.items():
+            path = paths[index]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                print(f"Image prep failed for {path.name}, sending original: {e}")
+                results[index] = self._original(path)
+                failures += 1
+
+        first_index: Dict[str, int] = {}
+        prepared = []
+        for index, (file_hash, result) in enumerate(zip(file_hashes, results)):
+            if result["reencoded"]:
+                self._cache_put(file_hash, result)
+            duplicate_of = first_index.setdefault(result["content_hash"], index)
+            prepared.append({**result, "duplicate_of": duplicate_of if duplicate_of != index else None})
+
+        with self._lock:
+            self._stats["images"] += len(prepared)
+            self._stats["cache_hits"] += cache_hits
+            self._stats["failures"] += failures
+            self._stats["duplicates"] += sum(1 for p in prepared if p["duplicate_of"] is not None)
+            self._stats["resized"] += sum(1 for p in prepared if p["resized"])
+            self._stats["reencoded"] += sum(1 for p in prepared if p["reencoded"])
+            self._stats["original_bytes"] += sum(p["original_bytes"] for p in prepared)
+            self._stats["prepared_bytes"] += sum(p["bytes"] for p in prepared)
+
+        return prepared
+
+    def prepare_one(self, image_path: Union[str, Path]) -> Dict[str, Any]:
+        """Normalize a single image (see prepare())."""
+        return self.prepare([image_path])[0]
+
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get preprocessing counters, including bytes saved."""
+        with self._lock:
+            saved = self._stats["original_bytes"] - self._stats["prepared_bytes"]
+            return {
+                **self._stats,
+                "bytes_saved": saved,
+                "saved_ratio": round(saved / self._stats["original_bytes"], 3) if self._stats["original_bytes"] else 0.0,
+                "mode": self._mode or "not started",
+                "workers": self.workers,
+                "max_long_edge": self.max_long_edge,
+                "cached_images": len(self._cache),
+                "cache_bytes": self._cache_size,
+            }
+
+
+def summarize_savings(prepared: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Bytes saved for a set of prepared images (for processing_info).
+
+    Returns:
+        {"original_bytes", "sent_bytes", "bytes_saved", "resized", "duplicates"}
+    """
+    original = sum(p["original_bytes"] for p in prepared)
+    sent = sum(p["bytes"] for p in prepared if p.get("duplicate_of") is None)
+    return {
+        "original_bytes": original,
+        "sent_bytes": sent,
+        "bytes_saved": original - sent,
+        "resized": sum(1 for p in prepared if p["resized"]),
+        "duplicates": sum(1 for p in prepared if p.get("duplicate_of") is not None),
+    }
+
+
+# Singleton instance
+image_preprocessor = ImagePreprocessor()
+atexit.register(image_preprocessor.shutdown)
@@ -0,0 +1,110 @@
+"""
+LibreOffice Convert Client - Convert one file on a listening LibreOffice worker.
+
+Educational Note: The `uno` bridge only imports in the Python that ships
+with LibreOffice (program/python on Windows and macOS, the system python3
+with python3-uno on Debian/Ubuntu) - not in the app's pip virtualenv. So
+the pool (libreoffice_pool_utils) never imports `uno` itself: it runs THIS
+script under LibreOffice's Python for each conversion. The script connects
+to an already running worker over its socket, loads the document hidden,
+stores it as PDF and exits. Starting a small Python client costs a fraction
+of a second; the office suite itself stays warm in the worker.
+
+This file must stay standalone (standard library + uno only) - it doesn't
+run inside the app.
+
+Usage:
+    <libreoffice python> libreoffice_convert_client.py --port 2002 in.pptx out.pdf
+
+Exit codes:
+    0 - converted
+    1 - conversion failed
+    2 - could not connect to the worker
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import uno
+from com.sun.star.beans import PropertyValue
+from com.sun.star.connection import NoConnectException
+
+
+# Seconds to keep retrying the connection (a worker that just started)
+CONNECT_TIMEOUT = 10
+
+
+def _props(**values) -> tuple:
+    """Build a tuple of UNO PropertyValues from keyword arguments."""
+    props = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        props.append(prop)
+    return tuple(props)
+
+
+def _connect(host: str, port: int):
+    """Resolve the worker's component context and return its Desktop."""
+    local_ctx = uno.getComponentContext()
+    resolver = local_ctx.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local_ctx
+    )
+    url = f"uno:socket,host={host},port={port};urp;StarOffice.ComponentContext"
+
+    deadline = time.monotonic() + CONNECT_TIMEOUT
+    while True:
+        try:
+            ctx = resolver.resolve(url)
+            break
+        except NoConnectException:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.25)
+    return ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+
+
+def convert(desktop, input_path: Path, output_path: Path, filter_name: str) -> None:
+    """Load the input hidden, store it with the export filter, close it."""
+    document = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(str(input_path.resolve())), "_blank", 0,
+        _props(Hidden=True, ReadOnly=True)
+    )
+    if document is None:
+        raise RuntimeError(f"LibreOffice could not open {input_path.name}")
+    try:
+        document.storeToURL(
+            uno.systemPathToFileUrl(str(output_path.resolve())),
+            _props(FilterName=filter_name)
+        )
+    finally:
+        document.close(True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Convert a file on a listening LibreOffice worker")
+    parser.add_argument("input", type=Path)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--filter", default="impress_pdf_Export")
+    args = parser.parse_args()
+
+    try:
+        desktop = _connect(args.host, args.port)
+    except Exception as e:
+        print(f"Could not connect to LibreOffice on port {args.port}: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        convert(desktop, args.input, args.output, args.filter)
+    except Exception as e:
+        print(f"Conversion failed: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,403 @@
+"""
+LibreOffice Pool Utils - Warm, parallel PPTX to PDF conversion.
+
+Educational Note: Spawning `soffice --headless --convert-to pdf` per upload
+costs seconds of cold start (loading the office suite, initializing the
+user profile) every time. Worse, every one-shot process uses the SAME
+default user profile, and LibreOffice locks it - two conversions at once
+either queue behind each other or one fails outright.
+
+This module keeps a small pool of long-lived headless LibreOffice workers:
+- Each worker has its OWN profile directory (-env:UserInstallation), so
+  workers never collide and can convert in parallel
+- Each worker listens on a local socket (--accept=socket,...;urp) and
+  conversions are driven over UNO (LibreOffice's component API): load the
+  PPTX hidden, store it with the impress_pdf_Export filter, close it - no
+  office start per file
+- Health check before each use: process alive and port accepting
+  connections; a dead worker is restarted
+- Recycling: a worker is restarted after MAX_CONVERSIONS conversions, so
+  slow leaks in a long-lived office process don't build up
+- Queueing: callers wait for a free worker up to QUEUE_TIMEOUT seconds;
+  each conversion has its own timeout, after which the worker is killed
+
+The `uno` bridge can't be imported from the app's pip virtualenv - it only
+exists in LibreOffice's own Python (program/python on Windows and macOS,
+the system python3 with python3-uno on Debian/Ubuntu). So the UNO calls
+run out of process: for each conversion the pool starts a tiny client
+(libreoffice_convert_client.py) under that Python, which connects to the
+worker's socket, converts and exits. Without a UNO-capable Python, each
+worker runs one-shot conversions with its isolated profile instead - still
+parallel and collision-free, and the profile stays initialized between
+runs, but without the long-lived process.
+
+Config (environment):
+- LIBREOFFICE_PYTHON: Python that can `import uno` (default: auto-detect
+  next to soffice, then python3 on PATH)
+- LIBREOFFICE_POOL_SIZE: Number of workers (default 2)
+- LIBREOFFICE_MAX_CONVERSIONS: Conversions before a worker is recycled (default 50)
+- LIBREOFFICE_QUEUE_TIMEOUT: Seconds to wait for a free worker (default 300)
+
+Usage:
+    from app.utils.libreoffice_pool_utils import libreoffice_pool
+    pdf_path = libreoffice_pool.convert(pptx_path, output_dir)
+"""
+import atexit
+import os
+import platform
+import queue
+import shutil
+import signal
+import socket
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from config import Config
+
+
+POOL_SIZE = int(os.getenv("LIBREOFFICE_POOL_SIZE", "2"))
+MAX_CONVERSIONS = int(os.getenv("LIBREOFFICE_MAX_CONVERSIONS", "50"))
+QUEUE_TIMEOUT = float(os.getenv("LIBREOFFICE_QUEUE_TIMEOUT", "300"))
+
+# Seconds for a new worker to start accepting connections
+STARTUP_TIMEOUT = 60
+
+# Default per-conversion timeout (large presentations)
+CONVERSION_TIMEOUT = 120
+
+PROFILES_DIR = Config.DATA_DIR / "libreoffice_profiles"
+
+# Standalone UNO client, run under LibreOffice's Python (not imported here)
+CONVERT_CLIENT = Path(__file__).with_name("libreoffice_convert_client.py")
+
+
+def _find_free_port() -> int:
+    """Ask the OS for an unused local port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def find_uno_python(soffice_path: str) -> Optional[str]:
+    """
+    Find a Python interpreter that can `import uno`.
+
+    Educational Note: LibreOffice bundles its Python next to soffice on
+    Windows (program/python.exe) and in Contents/Resources on macOS. Linux
+    distributions use the system python3 with the python3-uno package.
+    Each candidate is checked by actually importing uno in it.
+
+    Args:
+        soffice_path: The soffice/libreoffice command or path
+
+    Returns:
+        Interpreter path, or None if no candidate can import uno
+    """
+    candidates: List[str] = []
+    override = os.getenv("LIBREOFFICE_PYTHON")
+    if override:
+        candidates.append(override)
+
+    resolved = shutil.which(soffice_path) or soffice_path
+    program_dir = Path(os.path.realpath(resolved)).parent
+    candidates += [
+        str(program_dir / "python.exe"),
+        str(program_dir / "python"),
+        str(program_dir.parent / "Resources" / "python"),
+    ]
+    system_python = shutil.which("python3")
+    if system_python:
+        candidates.append(system_python)
+
+    for candidate in candidates:
+        if not os.path.exists(candidate):
+            continue
+        try:
+            result = subprocess.run(
+                [candidate, "-c", "import uno"],
+                capture_output=True, timeout=30
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        if result.returncode == 0:
+            return candidate
+    return None
+
+
+class LibreOfficeWorker:
+    """
+    One headless LibreOffice instance with an isolated user profile.
+
+    Educational Note: The process is started in its own process group, so
+    killing it also kills the soffice.bin child that the launcher script
+    (libreoffice/soffice) spawns on Linux and macOS.
+    """
+
+    def __init__(self, worker_id: int, soffice_path: str):
+        self.worker_id = worker_id
+        self.soffice_path = soffice_path
+        self.profile_dir = PROFILES_DIR / f"worker_{worker_id}"
+        self.port: Optional[int] = None
+        self.process: Optional[subprocess.Popen] = None
+        self.conversions = 0
+
+    @property
+    def profile_url(self) -> str:
+        return self.profile_dir.resolve().as_uri()
+
+    def _popen_kwargs(self) -> Dict[str, Any]:
+        if platform.system() == "Windows":
+            return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        return {"start_new_session": True}
+
+    def start(self) -> None:
+        """Start the listener process and wait until its socket accepts connections."""
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self.port = _find_free_port()
+        cmd = [
+            self.soffice_path,
+            "--headless", "--invisible", "--nologo", "--norestore",
+            "--nodefault", "--nolockcheck",
+            f"-env:UserInstallation={self.profile_url}",
+            f"--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext",
+        ]
+        self.process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **self._popen_kwargs()
+        )
+        self.conversions = 0
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.is_healthy():
+                print(f"LibreOffice worker {self.worker_id} listening on port {self.port}")
+                return
+            time.sleep(0.25)
+
+        self.stop()
+        raise RuntimeError(f"LibreOffice worker {self.worker_id} did not start within {STARTUP_TIMEOUT}s")
+
+    def is_healthy(self) -> bool:
+        """Process alive and accepting connections on its port."""
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                return True
+        except OSError:
+            return False
+
+    def stop(self) -> None:
+        """Terminate the process (and its children)."""
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            try:
+                if platform.system() == "Windows":
+                    self.process.kill()
+                else:
+                    os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError, OSError):
+                pass
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            pass
+        self.process = None
+
+    def convert_uno(self, uno_python: str, pptx_path: Path, pdf_path: Path, timeout: float) -> None:
+        """
+        Convert in the running instance via the out-of-process UNO client.
+
+        Educational Note: If the client runs past the timeout, the office
+        process is likely stuck on the document, so the worker is killed
+        along with the client; the pool restarts it before its next use.
+        """
+        cmd = [
+            uno_python, str(CONVERT_CLIENT),
+            "--port", str(self.port),
+            str(pptx_path.resolve()), str(pdf_path.resolve())
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.stop()
+            raise RuntimeError(f"LibreOffice conversion timed out (>{timeout:.0f}s)")
+        if result.returncode != 0:
+            raise RuntimeError(f"LibreOffice conversion failed: {result.stderr.strip()}")
+
+    def convert_subprocess(self, pptx_path: Path, output_dir: Path, timeout: float) -> None:
+        """One-shot conversion using this worker's isolated profile (no UNO)."""
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        cmd = [
+            self.soffice_path,
+            "--headless", "--norestore", "--nolockcheck",
+            f"-env:UserInstallation={self.profile_url}",
+            "--convert-to", "pdf",
+            "--outdir", str(output_dir),
+            str(pptx_path)
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"LibreOffice conversion timed out (>{timeout:.0f}s)")
+        if result.returncode != 0:
+            raise RuntimeError(f"LibreOffice conversion failed: {result.stderr}")
+
+
+class LibreOfficePool:
+    """
+    Fixed-size pool of LibreOffice workers with a wait queue.
+
+    Educational Note: Workers are created lazily on the first conversion,
+    so the app starts fast and machines that never see a PPTX never start
+    LibreOffice. Idle workers sit in a queue; convert() takes one, checks
+    its health, converts, and puts it back.
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        max_conversions: int = MAX_CONVERSIONS,
+        queue_timeout: float = QUEUE_TIMEOUT
+    ):
+        self.size = max(1, size)
+        self.max_conversions = max_conversions
+        self.queue_timeout = queue_timeout
+        # Decided on first use: "uno" if a UNO-capable Python exists, else "subprocess"
+        self.mode: Optional[str] = None
+        self.uno_python: Optional[str] = None
+        self._idle: "queue.Queue[LibreOfficeWorker]" = queue.Queue()
+        self._workers: List[LibreOfficeWorker] = []
+        self._lock = threading.Lock()
+        self._stats = {
+            "conversions": 0,
+            "failures": 0,
+            "starts": 0,
+            "recycled": 0,
+            "queue_timeouts": 0,
+            "total_wait_seconds": 0.0,
+        }
+
+    def _ensure_workers(self) -> None:
+        """Create the worker objects on first use (processes start on demand)."""
+        with self._lock:
+            if self._workers:
+                return
+            # Imported here to avoid a circular import with pptx_utils
+            from app.utils.pptx_utils import get_libreoffice_path
+            soffice_path = get_libreoffice_path()
+            self.uno_python = find_uno_python(soffice_path)
+            self.mode = "uno" if self.uno_python else "subprocess"
+            print(f"LibreOffice pool: {self.size} workers, mode={self.mode}"
+                  + (f" (UNO client: {self.uno_python})" if self.uno_python else ""))
+            for worker_id in range(self.size):
+                worker = LibreOfficeWorker(worker_id, soffice_path)
+                self._workers.append(worker)
+                self._idle.put(worker)
+
+    def _prepare(self, worker: LibreOfficeWorker) -> None:
+        """Health check, recycle or (re)start a worker before use. UNO mode only."""
+        if worker.process is not None and worker.conversions >= self.max_conversions:
+            print(f"Recycling LibreOffice worker {worker.worker_id} after {worker.conversions} conversions")
+            worker.stop()
+            with self._lock:
+                self._stats["recycled"] += 1
+
+        if not worker.is_healthy():
+            worker.stop()
+            worker.start()
+            with self._lock:
+                self._stats["starts"] += 1
+
+    def convert(
+        self,
+        pptx_path: Path,
+        output_dir: Path,
+        timeout: float = CONVERSION_TIMEOUT
+    ) -> Path:
+        """
+        Convert a PPTX to PDF on a pooled worker.
+
+        Args:
+            pptx_path: Path to the PPTX file
+            output_dir: Directory to save the PDF
+            timeout: Seconds allowed for the conversion itself
+
+        Returns:
+            Path to the generated PDF ({output_dir}/{pptx stem}.pdf)
+
+        Raises:
+            RuntimeError: If no worker frees up in time, or conversion fails
+        """
+        self._ensure_workers()
+
+        wait_start = time.monotonic()
+        try:
+            worker = self._idle.get(timeout=self.queue_timeout)
+        except queue.Empty:
+            with self._lock:
+                self._stats["queue_timeouts"] += 1
+            raise RuntimeError(f"No LibreOffice worker free after {self.queue_timeout:.0f}s")
+
+        with self._lock:
+            self._stats["total_wait_seconds"] += time.monotonic() - wait_start
+
+        pdf_path = output_dir / f"{pptx_path.stem}.pdf"
+        try:
+            if self.mode == "uno":
+                self._prepare(worker)
+                worker.convert_uno(self.uno_python, pptx_path, pdf_path, timeout)
+            else:
+                worker.convert_subprocess(pptx_path, output_dir, timeout)
+            worker.conversions += 1
+
+            if not pdf_path.exists():
+                raise RuntimeError(f"PDF not created at expected path: {pdf_path}")
+
+            with self._lock:
+                self._stats["conversions"] += 1
+            return pdf_path
+
+        except Exception:
+            with self._lock:
+                self._stats["failures"] += 1
+            # A failed worker is restarted before its next conversion
+            if self.mode == "uno" and not worker.is_healthy():
+                worker.stop()
+            raise
+
+        finally:
+            self._idle.put(worker)
+
+    def shutdown(self) -> None:
+        """Stop every worker process (registered with atexit)."""
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool counters and worker state."""
+        with self._lock:
+            stats = dict(self._stats)
+            conversions = stats["conversions"]
+            stats["avg_wait_seconds"] = round(stats.pop("total_wait_seconds") / conversions, 3) if conversions else 0.0
+            return {
+                **stats,
+                "mode": self.mode or "not started",
+                "size": self.size,
+                "idle": self._idle.qsize(),
+                "running": sum(1 for w in self._workers if w.process is not None and w.process.poll() is None),
+                "max_conversions": self.max_conversions,
+            }
+
+
+# Singleton instance
+libreoffice_pool = LibreOfficePool()
+atexit.register(libreoffice_pool.shutdown)
@@ -0,0 +1,158 @@
+"""
+PDF Text Layer Utils - Decide which PDF pages can skip vision extraction.
+
+Educational Note: A "born-digital" PDF (exported from Word, LaTeX, a
+reporting tool) carries a text layer: the actual characters and fonts.
+pypdf reads it locally in milliseconds, while sending the same page to
+Claude vision costs a few seconds and ~2000 input tokens. A scanned page
+has no text layer (just an image), and some pages have a text layer that
+isn't good enough on its own.
+
+Each page is classified with cheap local checks:
+- Text density: too few characters means scanned, a cover, or a chart page
+- Glyph coverage: fonts without a Unicode map come out as replacement
+  characters or private-use code points - the text is garbage
+- Images: a large embedded image may hold text or a figure we'd lose
+- Tables: many short, number-heavy lines mean a table whose layout the
+  plain text layer flattens
+
+Only pages that pass every check are extracted locally ("text_layer");
+everything else goes to the vision tool flow. The checks are tuned to be
+conservative: when in doubt, a page goes to vision.
+
+Usage:
+    pages = analyze_pdf_text_layer(pdf_path)
+    vision_pages = [p["page_number"] for p in pages if p["needs_vision"]]
+"""
+import re
+from pathlib import Path
+from typing import Union, List, Dict, Any, Optional, Tuple
+
+from pypdf import PdfReader, PageObject
+
+
+# Fewer extracted characters than this → page goes to vision
+MIN_TEXT_CHARS = 200
+
+# Fraction of characters that must be real, printable text
+MIN_GLYPH_COVERAGE = 0.97
+
+# An embedded image at least this many pixels counts as content (not a logo)
+LARGE_IMAGE_PIXELS = 250_000
+
+# Table heuristic: share of lines that are short and mostly numbers
+MIN_TABLE_LINES = 5
+MAX_TABLE_LINE_RATIO = 0.3
+
+_NUMBER_TOKEN = re.compile(r"^[\(\-+$€£%]*\d[\d.,:/%)]*$")
+
+
+def _glyph_coverage(text: str) -> float:
+    """
+    Fraction of non-whitespace characters that decoded to real text.
+
+    Educational Note: Unmapped glyphs show up as U+FFFD (replacement char),
+    private-use code points (U+E000-U+F8FF) or control characters.
+    """
+    visible = [c for c in text if not c.isspace()]
+    if not visible:
+        return 0.0
+    bad = sum(
+        1 for c in visible
+        if c == "\ufffd" or "\ue000" <= c <= "\uf8ff" or not c.isprintable()
+    )
+    return 1.0 - bad / len(visible)
+
+
+def _looks_like_table(text: str) -> bool:
+    """Check whether many lines are short rows of numbers (a flattened table)."""
+    lines = [line.split() for line in text.splitlines() if line.strip()]
+    if len(lines) < MIN_TABLE_LINES:
+        return False
+
+    numeric_lines = 0
+    for tokens in lines:
+        numbers = sum(1 for t in tokens if _NUMBER_TOKEN.match(t))
+        if len(tokens) >= 3 and numbers / len(tokens) >= 0.5:
+            numeric_lines += 1
+    return numeric_lines / len(lines) > MAX_TABLE_LINE_RATIO
+
+
+def _largest_image_pixels(page: PageObject) -> int:
+    """Pixel count of the largest image XObject drawn on the page (0 if none)."""
+    try:
+        resources = page.get("/Resources")
+        resources = resources.get_object() if resources is not None else None
+        xobjects = resources.get("/XObject") if resources else None
+        if xobjects is None:
+            return 0
+        largest = 0
+        for ref in xobjects.get_object().values():
+            xobject = ref.get_object()
+            if xobject.get("/Subtype") == "/Image":
+                largest = max(largest, int(xobject.get("/Width", 0)) * int(xobject.get("/Height", 0)))
+        return largest
+    except Exception:
+        # Unusual resource trees - be conservative and assume an image
+        return LARGE_IMAGE_PIXELS
+
+
+def classify_page(page: PageObject) -> Tuple[str, Optional[str]]:
+    """
+    Extract a page's text layer and decide whether it's good enough.
+
+    Args:
+        page: pypdf page object
+
+    Returns:
+        Tuple of (text, reason) where reason is None if the text layer can
+        be used as-is, else why the page needs vision
+        ("low_text", "bad_glyphs", "image", "table", "unreadable")
+    """
+    try:
+        text = page.extract_text() or ""
+    except Exception:
+        return "", "unreadable"
+
+    text = text.strip()
+    if len(text) < MIN_TEXT_CHARS:
+        return text, "low_text"
+    if _glyph_coverage(text) < MIN_GLYPH_COVERAGE:
+        return text, "bad_glyphs"
+    if _largest_image_pixels(page) >= LARGE_IMAGE_PIXELS:
+        return text, "image"
+    if _looks_like_table(text):
+        return text, "table"
+    return text, None
+
+
+def analyze_pdf_text_layer(pdf_path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """
+    Classify every page of a PDF (one parse of the file).
+
+    Args:
+        pdf_path: Path to the PDF file
+
+    Returns:
+        One dict per page, in order:
+        {"page_number": 1-indexed, "text": text layer, "needs_vision": bool,
+         "reason": why vision is needed, or None}
+
+    Raises:
+        FileNotFoundError: If PDF doesn't exist
+    """
+    pdf_path = Path(pdf_path)
+    if not pdf_path.exists():
+        raise FileNotFoundError(f"PDF not found: {pdf_path}")
+
+    reader = PdfReader(str(pdf_path))
+    pages = []
+    for index, page in enumerate(reader.pages):
+        text, reason = classify_page(page)
+        pages.append({
+            "page_number": index + 1,
+            "text": text,
+            "needs_vision": reason is not None,
+            "reason": reason,
+        })
+    return pages
@@ -4,7 +4,13 @@ PDF Utilities - Helper functions for PDF manipulation.
 Educational Note: This module handles PDF operations like:
 - Getting page count
 - Extracting single pages as separate PDFs
-- Creating temporary single-page PDFs for API calls
+- Splitting a PDF into multi-page batch PDFs for API calls
+- Estimating each page's size (for adaptive batch planning)
+
+Parsing a PDF is the expensive part (pypdf reads the cross-reference table
+and object tree), so the iterators below open the file ONCE and write each
+page/batch from the same reader. Opening it per page made splitting an
+N-page PDF parse it N times.
 
 Why split PDFs into pages?
 - Claude API has a 100-page limit per request
@@ -15,11 +21,16 @@ Why split PDFs into pages?
 import io
 import tempfile
 from pathlib import Path
-from typing import Union, Generator, Tuple, List
+from typing import Union, Generator, Tuple, List, Iterable, Optional, Dict
 
 from pypdf import PdfReader, PdfWriter
 
 
+# Bytes a page adds beyond its content streams and XObjects (page
+# dictionary, resource dictionaries, cross-reference entries)
+PAGE_OVERHEAD_BYTES = 2048
+
+
 def get_page_count(pdf_path: Union[str, Path]) -> int:
     """
     Get the total number of pages in a PDF file.
@@ -43,13 +54,35 @@ def get_page_count(pdf_path: Union[str, Path]) -> int:
     return len(reader.pages)
 
 
+def _open_reader(pdf_path: Union[str, Path]) -> PdfReader:
+    """Open a PDF for reading, raising FileNotFoundError if it doesn't exist."""
+    pdf_path = Path(pdf_path)
+
+    if not pdf_path.exists():
+        raise FileNotFoundError(f"PDF not found: {pdf_path}")
+
+    return PdfReader(str(pdf_path))
+
+
+def _write_pages(reader: PdfReader, page_indices: Iterable[int]) -> bytes:
+    """Write the given 0-indexed pages of an open reader to a new PDF's bytes."""
+    writer = PdfWriter()
+    for page_index in page_indices:
+        writer.add_page(reader.pages[page_index])
+
+    output_buffer = io.BytesIO()
+    writer.write(output_buffer)
+    return output_buffer.getvalue()
+
+
 def extract_single_page_bytes(pdf_path: Union[str, Path], page_number: int) -> bytes:
     """
     Extract a single page from a PDF and return it as bytes.
 
     Educational Note: We create a new PDF with just the one page,
     then return it as bytes for base64 encoding. This allows
-    sending individual pages to Claude API.
+    sending individual pages to Claude API. It parses the whole file, so
+    use iterate_pages()/iterate_page_batches() to split a whole document.
 
     Args:
         pdf_path: Path to the source PDF file
@@ -62,12 +95,7 @@ def extract_single_page_bytes(pdf_path: Union[str, Path], page_number: int) -> b
         ValueError: If page_number is out of range
         FileNotFoundError: If PDF doesn't exist
     """
-    pdf_path = Path(pdf_path)
-
-    if not pdf_path.exists():
-        raise FileNotFoundError(f"PDF not found: {pdf_path}")
-
-    reader = PdfReader(str(pdf_path))
+    reader = _open_reader(pdf_path)
     total_pages = len(reader.pages)
 
     # Convert to 0-indexed for pypdf
@@ -77,15 +105,7 @@ def extract_single_page_bytes(pdf_path: Union[str, Path], page_number: int) -> b
         raise ValueError(f"Page {page_number} out of range. PDF has {total_pages} pages.")
 
     # Create a new PDF with just this page
-    writer = PdfWriter()
-    writer.add_page(reader.pages[page_index])
-
-    # Write to bytes buffer
-    output_buffer = io.BytesIO()
-    writer.write(output_buffer)
-    output_buffer.seek(0)
-
-    return output_buffer.read()
+    return _write_pages(reader, [page_index])
 
 
 def iterate_pages(pdf_path: Union[str, Path]) -> Generator[Tuple[int, bytes], None, None]:
@@ -94,7 +114,7 @@ def iterate_pages(pdf_path: Union[str, Path]) -> Generator[Tuple[int, bytes], No
 
     Educational Note: Using a generator allows processing very large PDFs
     without loading all pages into memory at once. Each page is extracted
-    and yielded one at a time.
+    and yielded one at a time, all from one parse of the file.
 
     Args:
         pdf_path: Path to the PDF file
@@ -103,12 +123,132 @@ def iterate_pages(pdf_path: Union[str, Path]) -> Generator[Tuple[int, bytes], No
         Tuple of (page_number, page_bytes) where page_number is 1-indexed
         and page_bytes is the PDF bytes for that single page
     """
-    pdf_path = Path(pdf_path)
-    total_pages = get_page_count(pdf_path)
+    reader = _open_reader(pdf_path)
+
+    for page_index in range(len(reader.pages)):
+        yield (page_index + 1, _write_pages(reader, [page_index]))
+
+
+def iterate_page_batches(
+    pdf_path: Union[str, Path],
+    batch_size: int,
+    page_numbers: Optional[List[int]] = None
+) -> Generator[Tuple[List[int], bytes], None, None]:
+    """
+    Generator that yields consecutive page batches as multi-page PDFs.
+
+    Educational Note: Each batch is written as ONE PDF containing
+    `batch_size` pages, so it is sent as one document block (one base64
+    string) instead of one per page. The file is parsed once and batches are
+    produced lazily - the caller decides how many are held in memory at a
+    time (pdf_service keeps only the in-flight ones).
 
-    for page_num in range(1, total_pages + 1):
-        page_bytes = extract_single_page_bytes(pdf_path, page_num)
-        yield (page_num, page_bytes)
+    Args:
+        pdf_path: Path to the PDF file
+        batch_size: Pages per batch (last batch may be smaller)
+        page_numbers: Only batch these 1-indexed pages, in the given order
+            (default: every page)
+
+    Yields:
+        Tuple of (page_numbers, batch_bytes) where page_numbers are the
+        1-indexed pages contained in batch_bytes, in order
+
+    Raises:
+        ValueError: If batch_size is less than 1
+        FileNotFoundError: If PDF doesn't exist
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    if page_numbers is None:
+        page_numbers = list(range(1, get_page_count(pdf_path) + 1))
+
+    batches = [page_numbers[i:i + batch_size] for i in range(0, len(page_numbers), batch_size)]
+    yield from iterate_planned_batches(pdf_path, batches)
+
+
+def iterate_planned_batches(
+    pdf_path: Union[str, Path],
+    batches: List[List[int]]
+) -> Generator[Tuple[List[int], bytes], None, None]:
+    """
+    Generator that yields pre-planned page batches as multi-page PDFs.
+
+    Educational Note: Same single-parse, lazy splitting as
+    iterate_page_batches(), but batch boundaries come from the caller -
+    e.g. batching_utils.plan_page_batches(), which sizes each batch by its
+    pages' weight instead of a fixed count.
+
+    Args:
+        pdf_path: Path to the PDF file
+        batches: Lists of 1-indexed page numbers, one list per batch
+
+    Yields:
+        Tuple of (page_numbers, batch_bytes) for each batch, in order
+
+    Raises:
+        FileNotFoundError: If PDF doesn't exist
+    """
+    reader = _open_reader(pdf_path)
+
+    for batch_numbers in batches:
+        yield (batch_numbers, _write_pages(reader, [n - 1 for n in batch_numbers]))
+
+
+def _stream_length(obj) -> int:
+    """Encoded length of a stream object (its /Length), without decoding it."""
+    try:
+        return int(obj.get_object().get("/Length", 0))
+    except (TypeError, ValueError, AttributeError):
+        return 0
+
+
+def estimate_page_sizes(
+    pdf_path: Union[str, Path],
+    page_numbers: Optional[List[int]] = None
+) -> Dict[int, int]:
+    """
+    Estimate how many bytes each page adds to a split-out PDF.
+
+    Educational Note: Writing every page out just to measure it would cost
+    as much as splitting the file. Instead we add up the encoded lengths of
+    the page's content streams and the XObjects (images, forms) it draws -
+    those dominate a page's size. Shared resources like fonts are ignored;
+    PAGE_OVERHEAD_BYTES covers the page's own dictionaries.
+
+    Args:
+        pdf_path: Path to the PDF file
+        page_numbers: Only estimate these 1-indexed pages (default: every page)
+
+    Returns:
+        Dict mapping page_number -> estimated bytes
+    """
+    reader = _open_reader(pdf_path)
+    if page_numbers is None:
+        page_numbers = list(range(1, len(reader.pages) + 1))
+
+    sizes = {}
+    for page_number in page_numbers:
+        page = reader.pages[page_number - 1]
+        size = PAGE_OVERHEAD_BYTES
+        try:
+            contents = page.get("/Contents")
+            if contents is not None:
+                contents = contents.get_object()
+                streams = contents if isinstance(contents, list) else [contents]
+                size += sum(_stream_length(stream) for stream in streams)
+
+            resources = page.get("/Resources")
+            resources = resources.get_object() if resources is not None else None
+            xobjects = resources.get("/XObject") if resources else None
+            if xobjects is not None:
+                size += sum(_stream_length(ref) for ref in xobjects.get_object().values())
+        except Exception as e:
+            # Unusual page trees - fall back to the overhead estimate
+            print(f"Could not estimate size of page {page_number}: {e}")
+        sizes[page_number] = size
+
+    return sizes
 
 
 def get_all_page_bytes(pdf_path: Union[str, Path]) -> List[Tuple[int, bytes]]:
@@ -0,0 +1,212 @@
+"""
+PPTX Text Utils - Read slides natively and decide which ones need vision.
+
+Educational Note: Most slides are titles, bullets and tables - all stored
+as text in the PPTX XML, which python-pptx reads in milliseconds. Sending
+those slides through LibreOffice (PPTX → PDF) and Claude vision costs
+seconds of conversion plus an API call per batch, for text we already have.
+
+Each (visible) slide is read natively - title, text frames (including
+grouped shapes), tables and speaker notes - and scored for visual
+complexity:
+- Large pictures (not logos/icons): content we can only see, not read
+- Charts, SmartArt diagrams, embedded media
+- Diagrams drawn from connectors and text-less shapes
+
+Slides at or above VISION_SCORE_THRESHOLD go through conversion + vision;
+the rest use the native text. Hidden slides are skipped, matching the PDF
+export (LibreOffice leaves them out), so slide N here is page N of the PDF.
+
+Usage:
+    slides = analyze_pptx_slides(pptx_path)
+    vision_slides = [s["slide_number"] for s in slides if s["needs_vision"]]
+"""
+from pathlib import Path
+from typing import Union, List, Dict, Any, Tuple
+
+try:
+    from pptx import Presentation
+    from pptx.enum.shapes import MSO_SHAPE_TYPE
+    PPTX_AVAILABLE = True
+except ImportError:
+    PPTX_AVAILABLE = False
+    print("Warning: python-pptx not installed. Native PPTX text extraction unavailable.")
+
+
+# A picture covering at least this share of the slide counts as content
+LARGE_PICTURE_AREA = 0.05
+
+# Visual complexity scores
+PICTURE_SCORE = 3
+CHART_SCORE = 3
+SMARTART_SCORE = 3
+MEDIA_SCORE = 3
+CONNECTOR_SCORE = 1
+SHAPE_WITHOUT_TEXT_SCORE = 0.5
+
+# Slides scoring at least this go to vision
+VISION_SCORE_THRESHOLD = 3
+
+SMARTART_URI = "http://schemas.openxmlformats.org/drawingml/2006/diagram"
+
+
+def is_available() -> bool:
+    """Check if python-pptx library is available."""
+    return PPTX_AVAILABLE
+
+
+def _iter_shapes(shapes):
+    """Yield every shape, descending into groups."""
+    for shape in shapes:
+        if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+            yield from _iter_shapes(shape.shapes)
+        else:
+            yield shape
+
+
+def _format_text_frame(text_frame) -> List[str]:
+    """Paragraphs as lines, indented bullets for nested levels."""
+    lines = []
+    for paragraph in text_frame.paragraphs:
+        text = "".join(run.text for run in paragraph.runs).strip()
+        if text:
+            indent = "  " * paragraph.level
+            lines.append(f"{indent}- {text}" if paragraph.level else text)
+    return lines
+
+
+def _format_table(table) -> List[str]:
+    """Table as markdown-style rows."""
+    rows = []
+    for row_index, row in enumerate(table.rows):
+        cells = [cell.text.replace("\n", " ").strip() for cell in row.cells]
+        rows.append("| " + " | ".join(cells) + " |")
+        if row_index == 0:
+            rows.append("|" + " --- |" * len(cells))
+    return rows
+
+
+def _score_shape(shape, slide_area: int) -> Tuple[float, str]:
+    """
+    Visual complexity of one shape.
+
+    Returns:
+        Tuple of (score, description) - description is "" for plain text
+    """
+    element = shape._element
+    graphic_uris = element.xpath(".//a:graphicData/@uri")
+    if getattr(shape, "has_chart", False):
+        return CHART_SCORE, "chart"
+    if any(uri == SMARTART_URI for uri in graphic_uris):
+        return SMARTART_SCORE, "SmartArt diagram"
+    if shape.shape_type == MSO_SHAPE_TYPE.MEDIA:
+        return MEDIA_SCORE, "embedded media"
+    if shape.shape_type in (MSO_SHAPE_TYPE.EMBEDDED_OLE_OBJECT, MSO_SHAPE_TYPE.LINKED_OLE_OBJECT):
+        return MEDIA_SCORE, "embedded object"
+    if shape.shape_type == MSO_SHAPE_TYPE.PICTURE or element.tag.endswith("}pic"):
+        width, height = shape.width, shape.height
+        if width is None or height is None or not slide_area:
+            return PICTURE_SCORE, "image"
+        if width * height / slide_area >= LARGE_PICTURE_AREA:
+            return PICTURE_SCORE, "image"
+        return 0, "small image (logo/icon)"
+    if element.tag.endswith("}cxnSp"):
+        return CONNECTOR_SCORE, "connector"
+    has_text = getattr(shape, "has_text_frame", False) and shape.text_frame.text.strip()
+    if not has_text and not getattr(shape, "is_placeholder", False) and not getattr(shape, "has_table", False):
+        return SHAPE_WITHOUT_TEXT_SCORE, "shape"
+    return 0, ""
+
+
+def _read_slide(slide, slide_area: int) -> Dict[str, Any]:
+    """Read one slide's text and score its visual complexity."""
+    title_shape = slide.shapes.title
+    title = title_shape.text.strip() if title_shape is not None and title_shape.has_text_frame else ""
+
+    text_lines: List[str] = []
+    visuals: List[str] = []
+    score = 0.0
+
+    for shape in _iter_shapes(slide.shapes):
+        if title_shape is not None and shape.shape_id == title_shape.shape_id:
+            continue
+
+        shape_score, description = _score_shape(shape, slide_area)
+        score += shape_score
+        if description and description not in ("shape", "connector"):
+            visuals.append(description)
+
+        if getattr(shape, "has_table", False):
+            text_lines.append("")
+            text_lines.extend(_format_table(shape.table))
+            text_lines.append("")
+        elif getattr(shape, "has_text_frame", False):
+            text_lines.extend(_format_text_frame(shape.text_frame))
+
+    notes = ""
+    if slide.has_notes_slide and slide.notes_slide.notes_text_frame is not None:
+        notes = slide.notes_slide.notes_text_frame.text.strip()
+
+    return {
+        "title": title,
+        "text": "\n".join(text_lines).strip(),
+        "notes": notes,
+        "visuals": visuals,
+        "visual_score": score,
+    }
+
+
+def analyze_pptx_slides(pptx_path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """
+    Read every visible slide natively and classify it.
+
+    Args:
+        pptx_path: Path to the PPTX file
+
+    Returns:
+        One dict per visible slide, in order:
+        {"slide_number": 1-indexed (hidden slides not counted),
+         "needs_vision": bool, "visual_score": float,
+         "reason": e.g. "image, chart" or None,
+         "extraction": result in the same shape as a vision extraction
+                       (slide_title, text_content, visual_elements,
+                        layout_notes, speaker_notes)}
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        RuntimeError: If python-pptx is not installed
+    """
+    if not PPTX_AVAILABLE:
+        raise RuntimeError("python-pptx is not installed")
+
+    pptx_path = Path(pptx_path)
+    if not pptx_path.exists():
+        raise FileNotFoundError(f"PPTX not found: {pptx_path}")
+
+    presentation = Presentation(str(pptx_path))
+    slide_area = (presentation.slide_width or 0) * (presentation.slide_height or 0)
+
+    slides = []
+    for slide in presentation.slides:
+        if slide._element.get("show") == "0":
+            continue
+
+        content = _read_slide(slide, slide_area)
+        needs_vision = content["visual_score"] >= VISION_SCORE_THRESHOLD
+        visual_kinds = sorted(set(v for v in content["visuals"] if v != "small image (logo/icon)"))
+
+        slides.append({
+            "slide_number": len(slides) + 1,
+            "needs_vision": needs_vision,
+            "visual_score": content["visual_score"],
+            "reason": (", ".join(visual_kinds) or "drawn diagram") if needs_vision else None,
+            "extraction": {
+                "slide_title": content["title"] or "[NO TITLE]",
+                "text_content": content["text"] or "[NO TEXT CONTENT]",
+                "visual_elements": "; ".join(content["visuals"]) or "[NO VISUAL ELEMENTS]",
+                "layout_notes": "",
+                "speaker_notes": content["notes"],
+            },
+        })
+
+    return slides
@@ -3,7 +3,8 @@ PPTX Utilities - LibreOffice path detection and PPTX to PDF conversion.
 
 Educational Note: These utilities handle the non-AI parts of PPTX processing:
 - Detecting LibreOffice installation path across different operating systems
-- Converting PPTX files to PDF using LibreOffice headless mode
+- Converting PPTX files to PDF using LibreOffice headless mode (on the
+  warm worker pool in libreoffice_pool_utils)
 
 Why LibreOffice?
 - Free, open-source, cross-platform (macOS, Windows, Linux)
@@ -11,7 +12,6 @@ Why LibreOffice?
 - Accurate rendering of PowerPoint presentations
 """
 import os
-import subprocess
 import platform
 from pathlib import Path
 
@@ -65,9 +65,10 @@ def convert_pptx_to_pdf(pptx_path: Path, output_dir: Path) -> Path:
     """
     Convert PPTX to PDF using LibreOffice headless mode.
 
-    Educational Note: LibreOffice's headless mode allows conversion
-    without launching a GUI. The --convert-to flag specifies the
-    output format, and --outdir specifies where to save it.
+    Educational Note: Conversions run on a pool of warm LibreOffice workers
+    (libreoffice_pool_utils), each with its own user profile, so uploads
+    don't pay a cold start and concurrent conversions don't collide on
+    the shared profile.
 
     Args:
         pptx_path: Path to the PPTX file
@@ -79,42 +80,15 @@ def convert_pptx_to_pdf(pptx_path: Path, output_dir: Path) -> Path:
     Raises:
         RuntimeError: If conversion fails
     """
-    libreoffice_path = get_libreoffice_path()
-
-    # Build the conversion command
-    cmd = [
-        libreoffice_path,
-        "--headless",
-        "--convert-to", "pdf",
-        "--outdir", str(output_dir),
-        str(pptx_path)
-    ]
+    from app.utils.libreoffice_pool_utils import libreoffice_pool
 
     print(f"Converting PPTX to PDF: {pptx_path.name}")
 
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=120  # 2 minute timeout for large presentations
-        )
-
-        if result.returncode != 0:
-            raise RuntimeError(f"LibreOffice conversion failed: {result.stderr}")
-
-        # The output PDF will have the same name as input but with .pdf extension
-        pdf_name = pptx_path.stem + ".pdf"
-        pdf_path = output_dir / pdf_name
-
-        if not pdf_path.exists():
-            raise RuntimeError(f"PDF not created at expected path: {pdf_path}")
-
+        pdf_path = libreoffice_pool.convert(pptx_path, output_dir, timeout=120)
         print(f"PDF created: {pdf_path}")
         return pdf_path
 
-    except subprocess.TimeoutExpired:
-        raise RuntimeError("LibreOffice conversion timed out (>2 minutes)")
     except FileNotFoundError:
         raise RuntimeError(
             "LibreOffice not found. Please install it:\n"
@@ -1,136 +1,390 @@
 """
-Rate Limit Utils - Thread-safe rate limiting for API calls.
+Rate Limit Utils - Process-wide token-bucket rate limiting for API calls.
 
-Educational Note: Rate limiting prevents hitting API limits by:
-- Tracking requests within a time window (typically 1 minute)
-- Blocking/waiting when the limit is reached
-- Resetting the counter when the window expires
+Educational Note: Anthropic enforces three limits per model at the same time:
+- Requests per minute (RPM)
+- Input tokens per minute (ITPM)
+- Output tokens per minute (OTPM)
 
-This utility is designed to work with tier_loader.py which provides
-rate limit configurations based on API tier (free, paid, enterprise).
+A limiter that only counts requests (and that each extraction creates for
+itself) can't respect those: two PDF uploads in parallel each think they
+own the full budget, and one request with 5 PDF pages uses far more input
+tokens than a one-line chat message.
 
-Usage:
-    from app.utils.rate_limit_utils import RateLimiter
-    from app.config import get_anthropic_config
+This module keeps ONE limiter per (provider, model) for the whole process,
+each with three token buckets:
+- A bucket holds up to one minute of budget and refills continuously
+  (limit / 60 per second), so bursts are allowed but the average is capped
+- Before a call we reserve the request plus *estimated* tokens
+- After the call we reconcile the estimate against the actual usage
+  (refunding or charging the difference)
+- Waiting happens OUTSIDE the lock - a waiting thread never blocks others
+  from checking or reconciling
+
+Limits come from tier_loader.py (ANTHROPIC_TIERS / OPENAI_TIERS) and follow
+tier changes made in settings without a restart.
 
-    # Create limiter with tier config
-    tier_config = get_anthropic_config()
-    limiter = RateLimiter(requests_per_minute=tier_config["pages_per_minute"])
+Usage:
+    from app.utils.rate_limit_utils import rate_limiter_registry
 
-    # Before each API call
-    limiter.wait_if_needed()
-    response = api.call(...)
+    limiter = rate_limiter_registry.get_limiter("anthropic", model)
+    reservation = limiter.acquire(input_tokens=3000, output_tokens=800)
+    try:
+        response = api.call(...)
+        limiter.reconcile(reservation, actual_input, actual_output)
+    except Exception:
+        limiter.release(reservation)
+        raise
 
 Used by:
-- pdf_service (PDF page extraction)
-- pptx_service (slide extraction)
-- image_service (image analysis)
-- Any service that needs to respect API rate limits
+- claude_service (every Claude call - chat, extraction, agents, studio)
 """
-import time
+import asyncio
 import threading
-from typing import Optional
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Tuple
+
+from app.config.tier_loader import get_tier, get_tier_config
+
+
+class TokenBucket:
+    """
+    Continuously refilling token bucket. Not thread-safe on its own -
+    ModelRateLimiter guards its buckets with one lock.
+
+    Educational Note: The level may go negative when a call used more
+    tokens than reserved; the debt is paid back by refill before the next
+    reservation fits.
+    """
+
+    def __init__(self, per_minute: int):
+        """
+        Initialize a full bucket.
+
+        Args:
+            per_minute: Budget per minute (bucket capacity)
+        """
+        self.capacity = float(per_minute)
+        self.refill_per_second = per_minute / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def set_rate(self, per_minute: int) -> None:
+        """Change the budget (e.g., tier changed), keeping the current level."""
+        self._refill()
+        self.capacity = float(per_minute)
+        self.refill_per_second = per_minute / 60.0
+        self.level = min(self.level, self.capacity)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.refill_per_second)
+        self._updated = now
 
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if available now)."""
+        self._refill()
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.refill_per_second
 
-class RateLimiter:
+    def adjust(self, amount: float) -> None:
+        """Take (positive) or give back (negative) tokens."""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+@dataclass
+class Reservation:
+    """Budget reserved for one API call (returned by acquire)."""
+    input_tokens: int
+    output_tokens: int
+    waited: float = 0.0
+
+
+class ModelRateLimiter:
     """
-    Thread-safe rate limiter for API calls.
+    RPM + input TPM + output TPM limiter for one provider/model.
 
-    Educational Note: This uses a sliding window approach:
-    - Tracks how many requests were made in the current minute
-    - When limit is reached, calculates wait time until window resets
-    - Thread-safe via threading.Lock for concurrent batch processing
+    Educational Note: acquire() checks all buckets under the lock. If any
+    is short, it computes how long until all fit, RELEASES the lock and
+    sleeps, then checks again. Nothing is taken until everything fits, so
+    a big request can't starve the buckets for small ones by holding a
+    partial reservation.
     """
 
-    def __init__(self, requests_per_minute: int):
+    # Longest single sleep - re-check regularly so tier changes and
+    # refunds from other threads are picked up
+    MAX_SLEEP_SECONDS = 5.0
+
+    # Starting guess for output tokens until real usage has been observed
+    DEFAULT_OUTPUT_ESTIMATE = 1024
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        requests_per_minute: int,
+        input_tokens_per_minute: Optional[int] = None,
+        output_tokens_per_minute: Optional[int] = None
+    ):
         """
-        Initialize the rate limiter.
+        Initialize the limiter.
 
         Args:
-            requests_per_minute: Maximum requests allowed per minute
+            provider: API provider name (anthropic, openai)
+            model: Model name
+            requests_per_minute: RPM limit
+            input_tokens_per_minute: Input TPM limit (None = unlimited)
+            output_tokens_per_minute: Output TPM limit (None = unlimited)
         """
-        self.requests_per_minute = requests_per_minute
+        self.provider = provider
+        self.model = model
         self._lock = threading.Lock()
-        self._requests_this_minute = 0
-        self._minute_start_time = 0.0
+        self._requests = TokenBucket(requests_per_minute)
+        self._input = TokenBucket(input_tokens_per_minute) if input_tokens_per_minute else None
+        self._output = TokenBucket(output_tokens_per_minute) if output_tokens_per_minute else None
+        self._avg_output: Optional[float] = None
+        self._stats = {
+            "requests": 0,
+            "throttled": 0,
+            "wait_seconds": 0.0,
+            "input_tokens_reconciled": 0,
+            "output_tokens_reconciled": 0,
+        }
+
+    def set_limits(
+        self,
+        requests_per_minute: int,
+        input_tokens_per_minute: Optional[int] = None,
+        output_tokens_per_minute: Optional[int] = None
+    ) -> None:
+        """Apply new limits (tier change) without losing in-flight accounting."""
+        with self._lock:
+            self._requests.set_rate(requests_per_minute)
+            if input_tokens_per_minute:
+                if self._input:
+                    self._input.set_rate(input_tokens_per_minute)
+                else:
+                    self._input = TokenBucket(input_tokens_per_minute)
+            if output_tokens_per_minute:
+                if self._output:
+                    self._output.set_rate(output_tokens_per_minute)
+                else:
+                    self._output = TokenBucket(output_tokens_per_minute)
+
+    def estimate_output_tokens(self, max_tokens: int) -> int:
+        """
+        Estimate output tokens for a call.
 
-    def wait_if_needed(self) -> float:
+        Educational Note: Reserving max_tokens would be far too pessimistic
+        (extraction prompts allow 16K but typically use a few thousand), so
+        we use a running average of actual output, capped at max_tokens.
         """
-        Wait if rate limit is reached, then increment counter.
+        with self._lock:
+            estimate = self._avg_output or self.DEFAULT_OUTPUT_ESTIMATE
+        return int(min(max_tokens, estimate))
 
-        Educational Note: This method is called before each API request.
-        It blocks if we've hit the limit, then increments the request count.
+    def _try_take(self, input_tokens: int, output_tokens: int, reserve_ratio: float = 0.0) -> float:
+        """
+        Take the reservation if everything fits. Caller holds the lock.
+
+        Educational Note: With reserve_ratio > 0 a reservation only fits if
+        that fraction of every bucket would still be left afterwards - low
+        priority (bulk) traffic waits while interactive calls keep the rest.
 
         Returns:
-            Time waited in seconds (0 if no wait needed)
+            0 if taken, otherwise seconds to wait before trying again
         """
-        with self._lock:
-            current_time = time.time()
-            waited = 0.0
-
-            # Reset counter if we're in a new minute
-            if current_time - self._minute_start_time >= 60:
-                self._requests_this_minute = 0
-                self._minute_start_time = current_time
-
-            # Check if we need to wait
-            if self._requests_this_minute >= self.requests_per_minute:
-                wait_time = 60 - (current_time - self._minute_start_time)
-                if wait_time > 0:
-                    print(f"Rate limit reached ({self.requests_per_minute}/min). Waiting {wait_time:.1f}s...")
-                    time.sleep(wait_time)
-                    waited = wait_time
-                    # Reset after waiting
-                    self._requests_this_minute = 0
-                    self._minute_start_time = time.time()
-
-            # Increment counter for this request
-            self._requests_this_minute += 1
-
-            return waited
-
-    def reset(self) -> None:
-        """Reset the rate limiter counters."""
-        with self._lock:
-            self._requests_this_minute = 0
-            self._minute_start_time = 0.0
+        checks = [(self._requests, 1)]
+        if self._input:
+            # A single request larger than the whole bucket could never fit;
+            # clamp it so it waits for a full bucket instead of forever
+            checks.append((self._input, min(input_tokens, self._input.capacity)))
+        if self._output:
+            checks.append((self._output, min(output_tokens, self._output.capacity)))
+
+        wait = max(
+            bucket.wait_time(min(amount + reserve_ratio * bucket.capacity, bucket.capacity))
+            for bucket, amount in checks
+        )
+        if wait > 0:
+            return wait
+
+        for bucket, amount in checks:
+            bucket.adjust(amount)
+        self._stats["requests"] += 1
+        return 0.0
+
+    def _record_wait(self, waited: float) -> None:
+        if waited > 0:
+            with self._lock:
+                self._stats["throttled"] += 1
+                self._stats["wait_seconds"] += waited
+
+    def acquire(self, input_tokens: int, output_tokens: int, reserve_ratio: float = 0.0) -> Reservation:
+        """
+        Block until the request and estimated tokens fit, then reserve them.
+
+        Args:
+            input_tokens: Estimated input tokens
+            output_tokens: Estimated output tokens
+            reserve_ratio: Fraction of each bucket to leave for other callers
+                (0 for interactive calls)
+
+        Returns:
+            Reservation to pass to reconcile() or release()
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                wait = self._try_take(input_tokens, output_tokens, reserve_ratio)
+            if wait == 0:
+                break
+            # Sleep without holding the lock
+            sleep_for = min(wait, self.MAX_SLEEP_SECONDS)
+            if waited == 0:
+                print(f"Rate limit ({self.provider}/{self.model}): waiting ~{wait:.1f}s for budget")
+            time.sleep(sleep_for)
+            waited += sleep_for
+
+        self._record_wait(waited)
+        return Reservation(input_tokens, output_tokens, waited)
+
+    async def acquire_async(self, input_tokens: int, output_tokens: int) -> Reservation:
+        """Async version of acquire() - awaits instead of blocking the event loop."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                wait = self._try_take(input_tokens, output_tokens)
+            if wait == 0:
+                break
+            sleep_for = min(wait, self.MAX_SLEEP_SECONDS)
+            await asyncio.sleep(sleep_for)
+            waited += sleep_for
+
+        self._record_wait(waited)
+        return Reservation(input_tokens, output_tokens, waited)
+
+    def reconcile(self, reservation: Reservation, input_tokens: int, output_tokens: int) -> None:
+        """
+        Correct the reservation with the actual usage of the call.
+
+        Args:
+            reservation: What acquire() reserved
+            input_tokens: Actual input tokens counted against the limit
+            output_tokens: Actual output tokens
+        """
+        input_delta = input_tokens - reservation.input_tokens
+        output_delta = output_tokens - reservation.output_tokens
 
-    @property
-    def remaining_requests(self) -> int:
-        """Get remaining requests in current window."""
         with self._lock:
-            current_time = time.time()
+            if self._input:
+                self._input.adjust(input_delta)
+            if self._output:
+                self._output.adjust(output_delta)
+
+            # Exponential moving average of real output size
+            if self._avg_output is None:
+                self._avg_output = float(output_tokens)
+            else:
+                self._avg_output = 0.8 * self._avg_output + 0.2 * output_tokens
 
-            # If window expired, full limit is available
-            if current_time - self._minute_start_time >= 60:
-                return self.requests_per_minute
+            self._stats["input_tokens_reconciled"] += input_delta
+            self._stats["output_tokens_reconciled"] += output_delta
 
-            return max(0, self.requests_per_minute - self._requests_this_minute)
+    def release(self, reservation: Reservation) -> None:
+        """
+        Refund the token part of a reservation for a call that failed.
 
-    @property
-    def seconds_until_reset(self) -> float:
-        """Get seconds until the rate limit window resets."""
+        Educational Note: The request itself still counts toward RPM (the
+        API saw it), but a rejected call consumed no tokens.
+        """
         with self._lock:
-            current_time = time.time()
-            elapsed = current_time - self._minute_start_time
+            if self._input:
+                self._input.adjust(-reservation.input_tokens)
+            if self._output:
+                self._output.adjust(-reservation.output_tokens)
 
-            if elapsed >= 60:
-                return 0.0
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter statistics and current bucket levels."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["wait_seconds"] = round(stats["wait_seconds"], 2)
+            stats["requests_per_minute"] = int(self._requests.capacity)
+            stats["available_requests"] = int(self._requests.level)
+            if self._input:
+                stats["input_tokens_per_minute"] = int(self._input.capacity)
+                stats["available_input_tokens"] = int(self._input.level)
+            if self._output:
+                stats["output_tokens_per_minute"] = int(self._output.capacity)
+                stats["available_output_tokens"] = int(self._output.level)
+            stats["avg_output_tokens"] = int(self._avg_output or 0)
+            return stats
 
-            return 60 - elapsed
 
+class RateLimiterRegistry:
+    """
+    Process-wide registry of limiters keyed by (provider, model).
 
-def create_rate_limiter(requests_per_minute: int) -> RateLimiter:
+    Educational Note: Every caller asks the registry for a limiter instead
+    of creating its own, so all threads (chat, PDF/PPTX/image extraction,
+    agents, studio) draw from the same budget.
     """
-    Factory function to create a rate limiter.
 
-    Educational Note: This is a convenience function that makes it
-    clear we're creating a new limiter instance.
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._limiters: Dict[Tuple[str, str], ModelRateLimiter] = {}
+        self._tiers: Dict[str, int] = {}
 
-    Args:
-        requests_per_minute: Maximum requests allowed per minute
+    def _get_limits(self, provider: str) -> Tuple[int, Optional[int], Optional[int]]:
+        """Read (RPM, input TPM, output TPM) for a provider's current tier."""
+        config = get_tier_config(provider)
+        rpm = config.get("requests_per_minute", 50)
+        input_tpm = config.get("input_tokens_per_minute", config.get("tokens_per_minute"))
+        output_tpm = config.get("output_tokens_per_minute")
+        return rpm, input_tpm, output_tpm
 
-    Returns:
-        New RateLimiter instance
-    """
-    return RateLimiter(requests_per_minute)
+    def get_limiter(self, provider: str, model: str) -> ModelRateLimiter:
+        """
+        Get (or create) the shared limiter for a provider/model.
+
+        Educational Note: If the tier was changed in settings since the
+        limiters were created, all of the provider's limiters are updated
+        in place.
+
+        Args:
+            provider: API provider name (anthropic, openai)
+            model: Model name
+
+        Returns:
+            The process-wide ModelRateLimiter for this key
+        """
+        tier = get_tier(provider)
+
+        with self._lock:
+            if self._tiers.get(provider, tier) != tier:
+                limits = self._get_limits(provider)
+                for (limiter_provider, _), limiter in self._limiters.items():
+                    if limiter_provider == provider:
+                        limiter.set_limits(*limits)
+            self._tiers[provider] = tier
+
+            key = (provider, model)
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = ModelRateLimiter(provider, model, *self._get_limits(provider))
+                self._limiters[key] = limiter
+            return limiter
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get stats for every limiter, keyed by "provider/model"."""
+        with self._lock:
+            limiters = list(self._limiters.items())
+        return {f"{provider}/{model}": limiter.get_stats() for (provider, model), limiter in limiters}
+
+
+# Singleton registry shared by the whole process
+rate_limiter_registry = RateLimiterRegistry()
@@ -0,0 +1,264 @@
+"""
+Response Cache Utils - On-disk cache for deterministic Claude responses.
+
+Educational Note: Extraction calls (PDF pages, PPTX slides, images) send
+the same system prompt, the same forced tool and the same file bytes
+every time a source is re-processed. Re-uploading a PDF or retrying a
+failed source shouldn't pay for the pages that already came back fine.
+
+How it works:
+- The key is a SHA-256 of everything that determines the answer: model,
+  system prompt, tools, tool_choice, messages, max_tokens, temperature
+- Each response is one JSON file: {cache_dir}/{key[:2]}/{key}.json
+  (two-level layout so no directory grows to hundreds of thousands of files)
+- Hits touch the file's mtime, so mtime is "last used"
+- When the total size goes over the limit, the least recently used
+  files are deleted until it is back under 90% of the limit
+
+The file layout, index and LRU eviction live in DiskLRUCache, which the
+TTS segment cache (tts_cache_utils) and the fetch cache (fetch_cache_utils)
+share - they only differ in what a file holds and how it is keyed.
+
+Only callers that opt in use the cache - it is meant for extraction with
+forced tool use, not for chat, where the same question deserves a fresh
+answer. Truncated responses (stop_reason "max_tokens") are never stored.
+
+Usage:
+    cache = ResponseCache(Config.DATA_DIR / "cache" / "claude_responses", max_bytes)
+    key = cache.make_key(api_params)
+    entry = cache.get(key)
+    if entry is None:
+        ...call the API...
+        cache.put(key, entry)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, Callable
+
+
+class DiskLRUCache:
+    """
+    Size-bounded LRU cache of files: {cache_dir}/{key[:2]}/{key}{FILE_SUFFIX}.
+
+    Educational Note: The in-memory index (key -> size, last used) is built
+    lazily by scanning the cache directory once, so startup stays fast and
+    files left by a previous run count toward the size limit. Subclasses
+    decide what a file holds; an entry can own extra files next to its main
+    one (_get_extra_paths), which count toward its size and are evicted
+    with it.
+    """
+
+    # Bump when the key material or entry format changes
+    CACHE_VERSION = 1
+
+    # Evict down to this fraction of max_bytes, so we don't evict on every put
+    EVICT_TO_RATIO = 0.9
+
+    # Extension of an entry's main file (the one the index is built from)
+    FILE_SUFFIX = ".json"
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cache files (created on first write)
+            max_bytes: Size limit for all cached files; 0 disables the cache
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None
+        self._total_bytes = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _get_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{self.FILE_SUFFIX}"
+
+    def _get_extra_paths(self, key: str) -> Tuple[Path, ...]:
+        """Files an entry owns besides its main file (none by default)."""
+        return ()
+
+    def _entry_size(self, key: str) -> int:
+        size = 0
+        for path in (self._get_path(key), *self._get_extra_paths(key)):
+            try:
+                size += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return size
+
+    def _ensure_index(self) -> None:
+        """Build the in-memory index from the cache directory. Caller holds lock."""
+        if self._index is not None:
+            return
+        self._index = {}
+        self._total_bytes = 0
+        if not self.cache_dir.exists():
+            return
+        for path in self.cache_dir.glob(f"*/*{self.FILE_SUFFIX}"):
+            try:
+                mtime = path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            key = path.name[:-len(self.FILE_SUFFIX)]
+            size = self._entry_size(key)
+            self._index[key] = (size, mtime)
+            self._total_bytes += size
+
+    def _replace_file(self, path: Path, write: Callable[[Path], None]) -> None:
+        """
+        Write a file through write(tmp_path), then rename it into place.
+
+        Educational Note: The rename is atomic, so a reader never sees a
+        half-written file. The temp file is removed if writing fails, and
+        the error is raised to the caller.
+        """
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def _record_write(self, key: str) -> None:
+        """Index an entry that was just written and evict if over the limit."""
+        size = self._entry_size(key)
+        with self._lock:
+            self._ensure_index()
+            previous = self._index.get(key)
+            if previous:
+                self._total_bytes -= previous[0]
+            self._index[key] = (size, time.time())
+            self._total_bytes += size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _touch(self, key: str) -> None:
+        """Mark an entry as recently used (mtime is "last used")."""
+        now = time.time()
+        try:
+            os.utime(self._get_path(key), (now, now))
+        except OSError:
+            return
+        with self._lock:
+            if self._index is not None and key in self._index:
+                self._index[key] = (self._index[key][0], now)
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under the limit. Caller holds lock."""
+        target = self.max_bytes * self.EVICT_TO_RATIO
+        for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= target:
+                break
+            for path in (self._get_path(key), *self._get_extra_paths(key)):
+                path.unlink(missing_ok=True)
+            del self._index[key]
+            self._total_bytes -= size
+            self._stats["evictions"] += 1
+
+    def _count(self, stat: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[stat] += amount
+
+    def _hit_counts(self) -> Tuple[int, int]:
+        """(lookups served from the cache, all lookups). Caller holds lock."""
+        return self._stats["hits"], self._stats["hits"] + self._stats["misses"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current size."""
+        with self._lock:
+            self._ensure_index()
+            served, lookups = self._hit_counts()
+            return {
+                **self._stats,
+                "hit_rate": round(served / lookups, 3) if lookups else 0.0,
+                "entries": len(self._index),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class ResponseCache(DiskLRUCache):
+    """
+    Size-bounded LRU cache of API responses stored as JSON files.
+
+    Educational Note: Layout, index and eviction come from DiskLRUCache;
+    this class adds the request-param key and JSON entries.
+    """
+
+    # Request params that determine the response (extra_headers/timeout don't)
+    KEY_PARAMS = ("model", "system", "tools", "tool_choice", "messages", "max_tokens", "temperature")
+
+    def make_key(self, api_params: Dict[str, Any]) -> str:
+        """
+        Hash the request params that determine the response.
+
+        Educational Note: sort_keys + fixed separators make the JSON
+        canonical, so dict ordering never changes the key.
+        """
+        material = {k: api_params.get(k) for k in self.KEY_PARAMS}
+        material["version"] = self.CACHE_VERSION
+        payload = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Returns:
+            The stored entry dict, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        path = self._get_path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, IOError):
+            self._count("misses")
+            return None
+
+        self._touch(key)
+        self._count("hits")
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """
+        Store a response and evict old entries if over the size limit.
+
+        Educational Note: Written to a temp file and renamed, so a reader
+        never sees a half-written entry. Failures are logged and ignored -
+        the cache is an optimization, never a reason for a call to fail.
+        """
+        if not self.enabled:
+            return
+
+        def write(tmp_path: Path) -> None:
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f)
+
+        try:
+            self._replace_file(self._get_path(key), write)
+        except (IOError, OSError, TypeError, ValueError) as e:
+            print(f"Response cache: failed to store {key[:12]}: {e}")
+            return
+
+        self._record_write(key)
+        self._count("stores")
@@ -44,9 +44,12 @@ from app.utils.text.page_markers import (
 # Processed output utilities
 from app.utils.text.processed_output import (
     SOURCE_METADATA_KEYS,
+    build_processed_header,
+    build_processed_page,
     build_processed_output,
     save_processed_text,
-    build_and_save_processed_output
+    build_and_save_processed_output,
+    StreamingProcessedOutput
 )
 
 # Chunking utilities
@@ -77,9 +80,12 @@ __all__ = [
     "get_total_pages",
     # Processed output
     "SOURCE_METADATA_KEYS",
+    "build_processed_header",
+    "build_processed_page",
     "build_processed_output",
     "save_processed_text",
     "build_and_save_processed_output",
+    "StreamingProcessedOutput",
     # Chunking
     "Chunk",
     "parse_processed_text",
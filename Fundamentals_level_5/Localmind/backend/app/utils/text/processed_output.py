@@ -36,6 +36,8 @@ The page markers (=== TYPE PAGE N of M ===) are recognized by:
 - text/chunking.py for creating embedding chunks
 - citation_utils.py for extracting page content for citations
 """
+import os
+import shutil
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -84,41 +86,25 @@ def _format_token_count(token_count: Any) -> str:
         return "200k+"
 
 
-def build_processed_output(
-    pages: List[str],
+def build_processed_header(
     source_type: str,
-    source_name: str = "unknown",
+    source_name: str,
+    total_pages: int,
     metadata: Optional[Dict[str, Any]] = None
 ) -> str:
     """
-    Build standardized processed text output with page markers.
-
-    Educational Note: This function creates a consistent format for all
-    processed sources. The output includes:
-    1. Header with source info and ALL metadata keys for this type
-    2. Header ends with "# ---" separator
-    3. Page markers that chunking/citation utils recognize
-    4. Clean page content
+    Build the header block of a processed file (ends with "# ---").
 
     Args:
-        pages: List of page content strings (already extracted/split)
         source_type: Type of source (PDF, TEXT, DOCX, PPTX, IMAGE, AUDIO, LINK, YOUTUBE)
         source_name: Display name of the source
+        total_pages: Number of pages that follow the header
         metadata: Metadata dict - all keys for this source type will be included
 
     Returns:
-        Formatted text string ready to save to processed/ folder
-
-    Example:
-        pages = ["Page 1 content", "Page 2 content"]
-        metadata = {"model_used": "claude-sonnet", "character_count": 1500, "token_count": 375}
-        output = build_processed_output(pages, "PDF", "report.pdf", metadata)
+        Header text including the trailing blank line
     """
-    if not pages:
-        return ""
-
     source_type = source_type.upper()
-    total_pages = len(pages)
     metadata = metadata or {}
 
     # Build header using shared display names
@@ -142,13 +128,68 @@ def build_processed_output(
 
     # End header with separator (like chunk files)
     content += "# ---\n\n"
+    return content
+
+
+def build_processed_page(
+    source_type: str,
+    page_number: int,
+    total_pages: int,
+    page_text: str
+) -> str:
+    """
+    Build one page block: the page marker followed by the page content.
 
-    # Add each page with marker (using shared marker format)
+    Args:
+        source_type: Type of source (PDF, IMAGE, ...)
+        page_number: 1-indexed page number
+        total_pages: Total number of pages in the file
+        page_text: Page content
+
+    Returns:
+        Page block text including the trailing blank line
+    """
+    marker = build_page_marker(source_type.upper(), page_number, total_pages)
+    return f"{marker}\n\n{page_text.strip()}\n\n"
+
+
+def build_processed_output(
+    pages: List[str],
+    source_type: str,
+    source_name: str = "unknown",
+    metadata: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build standardized processed text output with page markers.
+
+    Educational Note: This function creates a consistent format for all
+    processed sources. The output includes:
+    1. Header with source info and ALL metadata keys for this type
+    2. Header ends with "# ---" separator
+    3. Page markers that chunking/citation utils recognize
+    4. Clean page content
+
+    Args:
+        pages: List of page content strings (already extracted/split)
+        source_type: Type of source (PDF, TEXT, DOCX, PPTX, IMAGE, AUDIO, LINK, YOUTUBE)
+        source_name: Display name of the source
+        metadata: Metadata dict - all keys for this source type will be included
+
+    Returns:
+        Formatted text string ready to save to processed/ folder
+
+    Example:
+        pages = ["Page 1 content", "Page 2 content"]
+        metadata = {"model_used": "claude-sonnet", "character_count": 1500, "token_count": 375}
+        output = build_processed_output(pages, "PDF", "report.pdf", metadata)
+    """
+    if not pages:
+        return ""
+
+    total_pages = len(pages)
+    content = build_processed_header(source_type, source_name, total_pages, metadata)
     for i, page_text in enumerate(pages, start=1):
-        marker = build_page_marker(source_type, i, total_pages)
-        content += f"{marker}\n\n"
-        content += page_text.strip()
-        content += "\n\n"
+        content += build_processed_page(source_type, i, total_pages, page_text)
 
     return content
 
@@ -229,3 +270,86 @@ def build_and_save_processed_output(
         "total_pages": len(pages),
         "character_count": len(content)
     }
+
+
+class StreamingProcessedOutput:
+    """
+    Write a processed file page by page as results arrive, in any order.
+
+    Educational Note: Concurrent extractors finish pages out of order, and
+    the header needs totals (character/token counts) known only at the end.
+    Pages are added as they complete; the contiguous prefix (1, 2, 3...) is
+    appended to a spool file right away, later pages wait in memory until
+    the gap before them is filled. finish() writes the header, copies the
+    spool after it and renames the result into place, so readers never see
+    a half-written processed file.
+
+    Usage:
+        writer = StreamingProcessedOutput(project_id, source_id, "IMAGE", total_pages=3)
+        writer.add_page(2, text_b)   # held until page 1 arrives
+        writer.add_page(1, text_a)   # pages 1 and 2 are spooled
+        writer.add_page(3, text_c)
+        path = writer.finish(source_name, metadata)
+    """
+
+    def __init__(self, project_id: str, source_id: str, source_type: str, total_pages: int):
+        """
+        Start a spool file for a source's processed output.
+
+        Args:
+            project_id: The project UUID
+            source_id: The source UUID
+            source_type: Type of source (PDF, IMAGE, ...)
+            total_pages: Number of pages that will be added
+        """
+        self.source_type = source_type.upper()
+        self.total_pages = total_pages
+        self.path = get_processed_dir(project_id) / f"{source_id}.txt"
+        self.spool_path = self.path.with_name(f"{self.path.name}.partial")
+        self._held: Dict[int, str] = {}
+        self._next_page = 1
+        self._spool = open(self.spool_path, "w", encoding="utf-8")
+
+    @property
+    def pages_written(self) -> int:
+        """Pages already spooled (the contiguous prefix)."""
+        return self._next_page - 1
+
+    def add_page(self, page_number: int, page_text: str) -> None:
+        """
+        Add a completed page (1-indexed); spools every page now in order.
+
+        Not thread-safe - call from the thread collecting results.
+        """
+        self._held[page_number] = page_text
+        while self._next_page in self._held:
+            page = self._held.pop(self._next_page)
+            self._spool.write(build_processed_page(self.source_type, self._next_page, self.total_pages, page))
+            self._next_page += 1
+        self._spool.flush()
+
+    def finish(self, source_name: str, metadata: Optional[Dict[str, Any]] = None) -> Path:
+        """
+        Write the header + spooled pages to the processed file.
+
+        Raises:
+            ValueError: If pages are missing
+        """
+        if self.pages_written != self.total_pages:
+            self.abort()
+            raise ValueError(f"Processed output incomplete: {self.pages_written} of {self.total_pages} pages")
+
+        self._spool.close()
+        final_tmp = self.path.with_name(f"{self.path.name}.tmp")
+        with open(final_tmp, "w", encoding="utf-8") as out, open(self.spool_path, "r", encoding="utf-8") as spool:
+            out.write(build_processed_header(self.source_type, source_name, self.total_pages, metadata))
+            shutil.copyfileobj(spool, out)
+        os.replace(final_tmp, self.path)
+        self.spool_path.unlink(missing_ok=True)
+        return self.path
+
+    def abort(self) -> None:
+        """Discard the spool file (extraction failed or was cancelled)."""
+        self._spool.close()
+        self._held.clear()
+        self.spool_path.unlink(missing_ok=True)
@@ -0,0 +1,122 @@
+"""
+TTS Cache Utils - On-disk cache of synthesized audio segments.
+
+Educational Note: Text-to-speech is billed per character, and the same
+text keeps coming back: the intro and outro lines of audio overviews, and
+every untouched paragraph when a script is edited and regenerated. The
+TTS service splits scripts into segments (paragraph-sized sentence
+groups); each segment's audio is stored here, keyed by what determines
+it, so only new or changed segments go to the API.
+
+How it works:
+- The key is a SHA-256 of the whitespace-normalized segment text, voice_id,
+  model_id and output_format
+- Each segment is one file: {cache_dir}/{key[:2]}/{key}.audio
+- Size limit and LRU eviction are DiskLRUCache's (response_cache_utils)
+
+The text of the neighbouring segments (sent as previous_text/next_text for
+smooth joins) is deliberately not part of the key - it nudges intonation
+slightly, and including it would turn every edit into a miss for the
+segments around it.
+
+Usage:
+    cache = AudioSegmentCache(Config.DATA_DIR / "cache" / "tts_segments", max_bytes)
+    key = cache.make_key(text, voice_id, model_id, output_format)
+    if not cache.copy_to(key, part_path):
+        ...synthesize into part_path...
+        cache.put(key, part_path)
+"""
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+from app.utils.response_cache_utils import DiskLRUCache
+
+
+class AudioSegmentCache(DiskLRUCache):
+    """
+    Size-bounded LRU cache of audio segments stored as files.
+
+    Educational Note: Layout, index and eviction come from DiskLRUCache,
+    like ResponseCache, but entries are raw audio bytes.
+    """
+
+    # Bump when the key material or audio handling changes
+    CACHE_VERSION = 1
+
+    FILE_SUFFIX = ".audio"
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cached segments (created on first write)
+            max_bytes: Size limit for all cached files; 0 disables the cache
+        """
+        super().__init__(cache_dir, max_bytes)
+        self._stats["characters_saved"] = 0
+
+    def make_key(self, text: str, voice_id: str, model_id: str, output_format: str) -> str:
+        """Hash the segment text (whitespace-normalized) and synthesis settings."""
+        material = {
+            "text": " ".join(text.split()),
+            "voice_id": voice_id,
+            "model_id": model_id,
+            "output_format": output_format,
+            "version": self.CACHE_VERSION,
+        }
+        payload = json.dumps(material, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def copy_to(self, key: str, destination: Path, characters: int = 0) -> bool:
+        """
+        Copy a cached segment to destination.
+
+        Educational Note: Copying (instead of handing out the cache path)
+        means a concurrent eviction can't pull the file away mid-read.
+
+        Args:
+            key: Key from make_key()
+            destination: Where to write the audio
+            characters: Length of the segment text, counted as saved on a hit
+
+        Returns:
+            True on a hit, False on a miss
+        """
+        if not self.enabled:
+            return False
+
+        path = self._get_path(key)
+        try:
+            shutil.copyfile(path, destination)
+        except (FileNotFoundError, IOError, OSError):
+            self._count("misses")
+            return False
+
+        self._touch(key)
+        with self._lock:
+            self._stats["hits"] += 1
+            self._stats["characters_saved"] += characters
+        return True
+
+    def put(self, key: str, source: Path) -> None:
+        """
+        Store a synthesized segment and evict old entries if over the limit.
+
+        Educational Note: Copied to a temp file and renamed, so a reader
+        never sees a half-written segment. Failures are logged and ignored -
+        the cache is an optimization, never a reason for TTS to fail.
+        """
+        if not self.enabled:
+            return
+
+        try:
+            self._replace_file(self._get_path(key), lambda tmp_path: shutil.copyfile(source, tmp_path))
+        except (IOError, OSError) as e:
+            print(f"TTS cache: failed to store {key[:12]}: {e}")
+            return
+
+        self._record_write(key)
+        self._count("stores")
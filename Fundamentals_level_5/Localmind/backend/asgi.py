@@ -0,0 +1,158 @@
+"""
+ASGI entry point for NoobBook backend.
+
+Educational Note: run.py serves Flask with Flask-SocketIO's threading mode,
+so every chat request holds an OS thread for its whole Claude tool loop
+(often tens of seconds). With a few dozen concurrent chats the server runs
+out of threads and latency climbs.
+
+This module serves the same app under an ASGI server (uvicorn):
+- POST /api/v1/projects/<id>/chats/<id>/messages is handled natively as a
+  coroutine (main_chat_service.send_message_async). Waiting on Claude costs
+  a coroutine, not a thread, and all chats share the async Anthropic/OpenAI
+  clients' connection pools (one event loop per worker process).
+- Every other route is passed to the Flask app through asgiref's WsgiToAsgi
+  adapter (runs in a thread pool, same behavior as before). Studio, source
+  and other long jobs already run in task_service background threads, so
+  their endpoints return immediately either way.
+
+Run with ONE worker - chat sessions, context caches and background tasks are
+in-process state:
+    uvicorn asgi:application --host 0.0.0.0 --port 5000 --workers 1
+
+WebSocket (Flask-SocketIO) events are only served by run.py.
+"""
+import json
+import os
+import re
+
+from dotenv import load_dotenv
+
+# Load environment variables before the app reads them
+load_dotenv()
+
+from asgiref.wsgi import WsgiToAsgi  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.services.chat_services import main_chat_service  # noqa: E402
+from app.services.data_services import message_service  # noqa: E402
+from app.services.integrations.claude import claude_service  # noqa: E402
+from app.services.integrations.openai import openai_service  # noqa: E402
+
+# Get configuration name from environment or use default
+config_name = os.getenv('FLASK_ENV', 'development')
+
+# Create the Flask application (serves every non-async route)
+flask_app = create_app(config_name)
+wsgi_application = WsgiToAsgi(flask_app)
+
+# Routes served natively on the event loop
+SEND_MESSAGE_PATH = re.compile(
+    rf"^{re.escape(flask_app.config['API_PREFIX'])}/projects/([^/]+)/chats/([^/]+)/messages/?$"
+)
+
+
+async def _read_body(receive) -> bytes:
+    """Read the full HTTP request body from the ASGI receive channel."""
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+    return body
+
+
+async def _send_json(send, scope, payload, status: int) -> None:
+    """
+    Send a JSON response (with the same CORS header Flask-CORS would add).
+
+    Educational Note: Preflight OPTIONS requests still go to Flask, which
+    answers them for the matching Flask route.
+    """
+    body = json.dumps(payload).encode("utf-8")
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+
+    request_headers = dict(scope.get("headers") or [])
+    origin = request_headers.get(b"origin", b"").decode("latin-1")
+    allowed_origins = flask_app.config.get('CORS_ALLOWED_ORIGINS', [])
+    if origin and (allowed_origins == "*" or origin in allowed_origins):
+        headers.append((b"access-control-allow-origin", origin.encode("latin-1")))
+        headers.append((b"vary", b"Origin"))
+
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_message_endpoint(scope, receive, send, project_id: str, chat_id: str) -> None:
+    """
+    Async twin of api/messages/routes.py send_message (same request/response).
+
+    Request Body:
+        { "message": "Your question about the sources..." }
+    """
+    try:
+        raw_body = await _read_body(receive)
+        data = json.loads(raw_body) if raw_body else None
+    except ValueError:
+        data = None
+
+    if not isinstance(data, dict) or 'message' not in data:
+        await _send_json(send, scope, {'success': False, 'error': 'Message is required'}, 400)
+        return
+
+    try:
+        user_msg, assistant_msg = await main_chat_service.send_message_async(
+            project_id=project_id,
+            chat_id=chat_id,
+            user_message_text=data['message']
+        )
+        await _send_json(send, scope, {
+            'success': True,
+            'user_message': user_msg,
+            'assistant_message': assistant_msg
+        }, 200)
+
+    except ValueError as e:
+        # Chat or project not found
+        await _send_json(send, scope, {'success': False, 'error': str(e)}, 404)
+    except Exception as e:
+        print(f"Error sending message (async): {e}")
+        await _send_json(send, scope, {'success': False, 'error': str(e)}, 500)
+
+
+async def _lifespan(receive, send) -> None:
+    """
+    Handle ASGI lifespan events.
+
+    Educational Note: On shutdown, pending chat sessions are written to disk
+    and the async clients' connection pools are closed.
+    """
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            message_service.flush_all_sessions()
+            await claude_service.close_async_client()
+            await openai_service.close_async_client()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send) -> None:
+    """ASGI application: async chat route natively, everything else via Flask."""
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+
+    if scope["type"] == "http" and scope["method"] == "POST":
+        match = SEND_MESSAGE_PATH.match(scope["path"])
+        if match:
+            await send_message_endpoint(scope, receive, send, match.group(1), match.group(2))
+            return
+
+    await wsgi_application(scope, receive, send)
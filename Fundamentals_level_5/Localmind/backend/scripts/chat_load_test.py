@@ -0,0 +1,144 @@
+"""
+Chat Load Test - Compare the threaded server (run.py) with the ASGI server (asgi.py).
+
+Educational Note: A chat request is mostly waiting on Claude, so what limits
+a server is how many requests it can keep in flight at once, not CPU. This
+script fires the same chat message at increasing concurrency levels and
+reports latency percentiles, throughput and errors for each level.
+
+Each in-flight request uses its own chat (created up front) so requests
+don't queue behind each other on one chat session.
+
+Usage (start one server, run, then repeat against the other):
+    python run.py                                         # threaded, port 5000
+    uvicorn asgi:application --port 5001 --workers 1      # ASGI, port 5001
+
+    python scripts/chat_load_test.py --base-url http://localhost:5000 --project-id <id>
+    python scripts/chat_load_test.py --base-url http://localhost:5001 --project-id <id>
+
+Note: every request is a real chat turn and is billed to the project.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, Any, List
+
+import httpx
+
+
+async def create_chats(client: httpx.AsyncClient, api: str, project_id: str, count: int) -> List[str]:
+    """Create the chats used by the test and return their IDs."""
+    chat_ids = []
+    for i in range(count):
+        response = await client.post(
+            f"{api}/projects/{project_id}/chats",
+            json={"title": f"Load test {i + 1}"}
+        )
+        response.raise_for_status()
+        chat_ids.append(response.json()["chat"]["id"])
+    return chat_ids
+
+
+async def send_one(
+    client: httpx.AsyncClient,
+    api: str,
+    project_id: str,
+    chat_id: str,
+    message: str
+) -> Dict[str, Any]:
+    """Send one chat message and time it."""
+    start = time.perf_counter()
+    try:
+        response = await client.post(
+            f"{api}/projects/{project_id}/chats/{chat_id}/messages",
+            json={"message": message}
+        )
+        ok = response.status_code == 200 and response.json().get("success", False)
+    except httpx.HTTPError:
+        ok = False
+    return {"ok": ok, "latency": time.perf_counter() - start}
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    api: str,
+    project_id: str,
+    chat_ids: List[str],
+    concurrency: int,
+    requests_per_level: int,
+    message: str
+) -> Dict[str, Any]:
+    """
+    Run one concurrency level.
+
+    Educational Note: A semaphore keeps exactly `concurrency` requests in
+    flight; request i always uses chat i % concurrency, so no two in-flight
+    requests share a chat.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker(i: int) -> Dict[str, Any]:
+        async with semaphore:
+            return await send_one(client, api, project_id, chat_ids[i % concurrency], message)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(worker(i) for i in range(requests_per_level)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(r["latency"] for r in results if r["ok"])
+    errors = sum(1 for r in results if not r["ok"])
+
+    def percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests_per_level,
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": percentile(0.95),
+        "max": latencies[-1] if latencies else 0.0,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    api = args.base_url.rstrip("/") + "/api/v1"
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=max(levels) + 10)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        chat_ids = await create_chats(client, api, args.project_id, max(levels))
+        print(f"Created {len(chat_ids)} chats on {args.base_url}\n")
+
+        print(f"{'conc':>5} {'reqs':>5} {'errs':>5} {'req/s':>7} {'p50 s':>7} {'p95 s':>7} {'max s':>7}")
+        for level in levels:
+            result = await run_level(
+                client, api, args.project_id, chat_ids, level,
+                args.requests or level * 2, args.message
+            )
+            print(
+                f"{result['concurrency']:>5} {result['requests']:>5} {result['errors']:>5} "
+                f"{result['throughput']:>7.2f} {result['p50']:>7.2f} {result['p95']:>7.2f} {result['max']:>7.2f}"
+            )
+
+        if not args.keep_chats:
+            for chat_id in chat_ids:
+                await client.delete(f"{api}/projects/{args.project_id}/chats/{chat_id}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chat endpoint load test")
+    parser.add_argument("--base-url", default="http://localhost:5000", help="Server base URL")
+    parser.add_argument("--project-id", required=True, help="Project to create test chats in")
+    parser.add_argument("--concurrency", default="1,5,10,25,50", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=0, help="Requests per level (default: 2x concurrency)")
+    parser.add_argument("--message", default="Give me a one-sentence summary of my sources.")
+    parser.add_argument("--timeout", type=float, default=180.0, help="Per-request timeout in seconds")
+    parser.add_argument("--keep-chats", action="store_true", help="Don't delete the test chats afterwards")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,150 @@
+"""
+PDF Split Benchmark - Compare per-page reparsing with the single-parse splitters.
+
+Educational Note: Before extraction, a PDF is cut into small PDFs that are
+sent to Claude. The old splitter built a new PdfReader for every page, so
+an N-page file was parsed N times (O(N^2)). This script times three ways
+of splitting the same file:
+- reparse_per_page: extract_single_page_bytes() for each page (old path)
+- iterate_pages: one parse, one single-page PDF per page
+- iterate_page_batches: one parse, one multi-page PDF per batch (new path)
+
+For each it reports wall time, peak Python memory (tracemalloc) and the
+total bytes produced (what gets base64-encoded and uploaded).
+
+--classify also times the text-layer classifier (pdf_text_layer_utils) and
+shows how many pages would skip vision extraction, and why the rest don't.
+
+--plan shows how the adaptive batch planner (batching_utils.plan_page_batches)
+would pack the pages, and the pages per request it achieves.
+
+Usage:
+    python scripts/pdf_split_benchmark.py                       # synthetic 600-page PDF
+    python scripts/pdf_split_benchmark.py --pages 1000
+    python scripts/pdf_split_benchmark.py --pdf path/to/file.pdf
+    python scripts/pdf_split_benchmark.py --skip-reparse        # skip the slow old path
+    python scripts/pdf_split_benchmark.py --pdf report.pdf --classify --skip-reparse
+    python scripts/pdf_split_benchmark.py --pdf report.pdf --plan --skip-reparse
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Any, Iterable
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+# Make "app" importable when run from the backend directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils.pdf_utils import (  # noqa: E402
+    get_page_count, extract_single_page_bytes, iterate_pages, iterate_page_batches, estimate_page_sizes
+)
+from app.utils.batching_utils import (  # noqa: E402
+    DEFAULT_BATCH_SIZE, estimate_page_cost, plan_page_batches, get_batch_plan_stats
+)
+from app.utils.pdf_text_layer_utils import analyze_pdf_text_layer  # noqa: E402
+
+
+def make_synthetic_pdf(path: Path, pages: int) -> None:
+    """Write a PDF with `pages` pages of Helvetica text (no external tools needed)."""
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+
+    writer = PdfWriter()
+    for page_num in range(1, pages + 1):
+        page = writer.add_blank_page(width=612, height=792)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})
+        })
+        lines = [f"Page {page_num} - synthetic benchmark text line {i}" for i in range(40)]
+        text = " Tj T* ".join(f"({line})" for line in lines)
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 11 Tf 14 TL 72 740 Td {text} Tj ET".encode("latin-1"))
+        page.replace_contents(content)
+
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def measure(name: str, produce: Callable[[], Iterable[bytes]]) -> Dict[str, Any]:
+    """Run one splitter to completion and measure it."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    total_bytes = 0
+    blobs = 0
+    for blob in produce():
+        total_bytes += len(blob)
+        blobs += 1
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"name": name, "seconds": elapsed, "peak_mb": peak / 1024 / 1024, "blobs": blobs, "mb": total_bytes / 1024 / 1024}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark PDF page splitting strategies")
+    parser.add_argument("--pdf", type=Path, help="PDF to split (default: generate a synthetic one)")
+    parser.add_argument("--pages", type=int, default=600, help="Pages in the synthetic PDF")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--skip-reparse", action="store_true", help="Skip the old O(N^2) splitter")
+    parser.add_argument("--classify", action="store_true", help="Also time the text-layer classifier")
+    parser.add_argument("--plan", action="store_true", help="Also show the adaptive batch plan")
+    parser.add_argument("--max-tokens", type=int, default=16000, help="max_tokens for --plan")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = Path(tmp) / "synthetic.pdf"
+            print(f"Generating synthetic {args.pages}-page PDF...")
+            make_synthetic_pdf(pdf_path, args.pages)
+
+        total_pages = get_page_count(pdf_path)
+        print(f"{pdf_path.name}: {total_pages} pages, {pdf_path.stat().st_size / 1024 / 1024:.1f} MB\n")
+
+        runs = []
+        if not args.skip_reparse:
+            runs.append(measure(
+                "reparse_per_page",
+                lambda: (extract_single_page_bytes(pdf_path, n) for n in range(1, total_pages + 1))
+            ))
+        runs.append(measure("iterate_pages", lambda: (b for _, b in iterate_pages(pdf_path))))
+        runs.append(measure(
+            f"iterate_page_batches({args.batch_size})",
+            lambda: (b for _, b in iterate_page_batches(pdf_path, args.batch_size))
+        ))
+
+        if args.classify:
+            start = time.perf_counter()
+            pages = analyze_pdf_text_layer(pdf_path)
+            elapsed = time.perf_counter() - start
+            reasons = Counter(p["reason"] for p in pages if p["needs_vision"])
+            local = sum(1 for p in pages if not p["needs_vision"])
+            print(f"Text layer: {local}/{len(pages)} pages extracted locally in {elapsed:.2f}s")
+            print(f"Vision needed: {dict(reasons) or 'none'}\n")
+
+        if args.plan:
+            start = time.perf_counter()
+            sizes = estimate_page_sizes(pdf_path)
+            costs = [(n, estimate_page_cost(size)) for n, size in sizes.items()]
+            stats = get_batch_plan_stats(plan_page_batches(costs, args.max_tokens))
+            elapsed = time.perf_counter() - start
+            print(f"Batch plan ({elapsed:.2f}s): {stats['total_batches']} requests, "
+                  f"{stats['min_batch_size']}-{stats['max_batch_size']} pages each, "
+                  f"{stats['pages_per_request']} pages/request (fixed: {DEFAULT_BATCH_SIZE})\n")
+
+    print(f"{'splitter':<28}{'seconds':>10}{'peak MB':>10}{'blobs':>8}{'out MB':>9}")
+    for run in runs:
+        print(f"{run['name']:<28}{run['seconds']:>10.2f}{run['peak_mb']:>10.1f}{run['blobs']:>8}{run['mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
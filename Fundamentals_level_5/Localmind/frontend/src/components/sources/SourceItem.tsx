@@ -33,6 +33,7 @@ import {
 } from '../ui/dropdown-menu';
 import { Checkbox } from '../ui/checkbox';
 import { formatFileSize, isSourceViewable, type Source } from '../../lib/api/sources';
+import { type SourceProgressEvent } from '../../lib/api/progressSocket';
 
 interface SourceItemProps {
   source: Source;
@@ -43,6 +44,7 @@ interface SourceItemProps {
   onCancelProcessing: (sourceId: string) => void;
   onRetryProcessing: (sourceId: string) => void;
   onViewProcessed: (sourceId: string) => void;
+  progress?: SourceProgressEvent;
 }
 
 /**
@@ -118,6 +120,19 @@ const getStatusDisplay = (status: Source['status']) => {
   }
 };
 
+/**
+ * Format live progress, e.g. "12/40 pages · ~30s left"
+ * Educational Note: Comes from source_progress events over the socket;
+ * null when there is nothing countable yet (text falls back to the status).
+ */
+const formatProgress = (progress?: SourceProgressEvent): string | null => {
+  if (!progress || progress.final || !progress.total) return null;
+  const eta = progress.eta_seconds != null
+    ? ` · ~${Math.max(1, Math.round(progress.eta_seconds))}s left`
+    : '';
+  return `${progress.done}/${progress.total} ${progress.unit}${eta}`;
+};
+
 export const SourceItem: React.FC<SourceItemProps> = ({
   source,
   onDownload,
@@ -127,12 +142,14 @@ export const SourceItem: React.FC<SourceItemProps> = ({
   onCancelProcessing,
   onRetryProcessing,
   onViewProcessed,
+  progress,
 }) => {
   const Icon = getCategoryIconComponent(source.category);
   const statusDisplay = getStatusDisplay(source.status);
   // "processing" or "embedding" are actively working - show spinner and allow cancel
   const isProcessing = source.status === 'processing';
   const isEmbedding = source.status === 'embedding';
+  const progressText = isProcessing || isEmbedding ? formatProgress(progress) : null;
   const isActivelyWorking = isProcessing || isEmbedding;
   // "uploaded" status means source is waiting for processing (fresh upload or cancelled)
   const isWaitingToProcess = source.status === 'uploaded';
@@ -244,7 +261,7 @@ export const SourceItem: React.FC<SourceItemProps> = ({
           {/* Status indicator text for non-ready states */}
           {source.status !== 'ready' && statusDisplay && (
             <span className={`text-xs ${statusDisplay.color}`}>
-              {statusDisplay.tooltip}
+              {progressText || statusDisplay.tooltip}
             </span>
           )}
         </div>
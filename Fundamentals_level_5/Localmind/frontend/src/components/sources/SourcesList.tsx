@@ -8,6 +8,7 @@ import React from 'react';
 import { ScrollArea } from '../ui/scroll-area';
 import { CircleNotch, FolderOpen } from '@phosphor-icons/react';
 import { type Source } from '../../lib/api/sources';
+import { type SourceProgressEvent } from '../../lib/api/progressSocket';
 import { SourceItem } from './SourceItem';
 
 interface SourcesListProps {
@@ -21,6 +22,7 @@ interface SourcesListProps {
   onCancelProcessing: (sourceId: string) => void;
   onRetryProcessing: (sourceId: string) => void;
   onViewProcessed: (sourceId: string) => void;
+  progressBySource?: Record<string, SourceProgressEvent>;
 }
 
 export const SourcesList: React.FC<SourcesListProps> = ({
@@ -34,6 +36,7 @@ export const SourcesList: React.FC<SourcesListProps> = ({
   onCancelProcessing,
   onRetryProcessing,
   onViewProcessed,
+  progressBySource,
 }) => {
   // Filter sources based on search
   const filteredSources = sources.filter((source) =>
@@ -73,6 +76,7 @@ export const SourcesList: React.FC<SourcesListProps> = ({
                 onCancelProcessing={onCancelProcessing}
                 onRetryProcessing={onRetryProcessing}
                 onViewProcessed={onViewProcessed}
+                progress={progressBySource?.[source.id]}
               />
             ))}
           </div>
@@ -10,6 +10,10 @@ import {
   MAX_SOURCES,
   type Source,
 } from '../../lib/api/sources';
+import {
+  subscribeToProjectProgress,
+  type SourceProgressEvent,
+} from '../../lib/api/progressSocket';
 import { useToast, ToastContainer } from '../ui/toast';
 import { SourcesHeader } from './SourcesHeader';
 import { SourcesList } from './SourcesList';
@@ -89,6 +93,10 @@ export const SourcesPanel: React.FC<SourcesPanelProps> = ({ projectId, isCollaps
   const [searchQuery, setSearchQuery] = useState('');
   const [uploading, setUploading] = useState(false);
 
+  // Live updates (Socket.IO) - polling is only the fallback when disconnected
+  const [liveUpdates, setLiveUpdates] = useState(false);
+  const [progressBySource, setProgressBySource] = useState<Record<string, SourceProgressEvent>>({});
+
   // Rename dialog state
   const [renameDialogOpen, setRenameDialogOpen] = useState(false);
   const [renameSourceId, setRenameSourceId] = useState<string | null>(null);
@@ -177,9 +185,48 @@ export const SourcesPanel: React.FC<SourcesPanelProps> = ({ projectId, isCollaps
   }, [sources]);
 
   /**
-   * Polling for source status updates
-   * Educational Note: When sources are actively processing or embedding, we poll
-   * every 3 seconds to update the UI. Polling stops when no sources are working.
+   * Live source updates over Socket.IO
+   * Educational Note: The backend pushes status changes (source_updated, with
+   * the full source object) and processing progress (source_progress) to the
+   * project's room. Status changes replace the source in place - no refetch.
+   * On (re)connect we refresh once to catch anything missed while offline.
+   */
+  useEffect(() => {
+    setProgressBySource({});
+    return subscribeToProjectProgress(projectId, {
+      onProgress: (event) => {
+        setProgressBySource((prev) => ({ ...prev, [event.source_id]: event }));
+      },
+      onSourceUpdated: (event) => {
+        const updated = event.source;
+        // Unknown source (e.g. added from another tab) - fetch the list instead
+        if (!updated || !prevSourcesRef.current.some((s) => s.id === updated.id)) {
+          refreshSources();
+          return;
+        }
+        setSources((prev) => prev.map((s) => (s.id === updated.id ? updated : s)));
+        if (updated.status !== 'processing' && updated.status !== 'embedding') {
+          setProgressBySource((prev) => {
+            const next = { ...prev };
+            delete next[updated.id];
+            return next;
+          });
+        }
+      },
+      onConnectionChange: (connected) => {
+        setLiveUpdates(connected);
+        if (connected) {
+          refreshSources();
+        }
+      },
+    });
+  }, [projectId, refreshSources]);
+
+  /**
+   * Polling for source status updates (fallback)
+   * Educational Note: Only used while the live socket is disconnected. When
+   * sources are actively processing or embedding, we poll every 3 seconds to
+   * update the UI. Polling stops when no sources are working.
    * Note: We check for "processing" and "embedding", not "uploaded" because
    * "uploaded" is also the state after cancellation (waiting for user to retry).
    */
@@ -189,7 +236,7 @@ export const SourcesPanel: React.FC<SourcesPanelProps> = ({ projectId, isCollaps
       s => s.status === 'processing' || s.status === 'embedding'
     );
 
-    if (!hasActiveSources) {
+    if (!hasActiveSources || liveUpdates) {
       return; // No polling needed
     }
 
@@ -199,7 +246,7 @@ export const SourcesPanel: React.FC<SourcesPanelProps> = ({ projectId, isCollaps
     }, 3000); // Poll every 3 seconds
 
     return () => clearInterval(pollInterval);
-  }, [sources, refreshSources]);
+  }, [sources, refreshSources, liveUpdates]);
 
   /**
    * Handle file upload
@@ -528,6 +575,7 @@ export const SourcesPanel: React.FC<SourcesPanelProps> = ({ projectId, isCollaps
           onCancelProcessing={handleCancelProcessing}
           onRetryProcessing={handleRetryProcessing}
           onViewProcessed={handleViewProcessed}
+          progressBySource={progressBySource}
         />
 
         <SourcesFooter sourcesCount={sourcesCount} totalSize={totalSize} />
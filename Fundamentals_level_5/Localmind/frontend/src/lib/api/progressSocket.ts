@@ -0,0 +1,179 @@
+/**
+ * Source Progress Socket
+ * Educational Note: The backend pushes source processing progress over
+ * Socket.IO (backend/app/api/sources/progress_events.py). Instead of polling
+ * GET /sources every few seconds, the sources panel joins the project's room
+ * and receives:
+ * - source_progress: pages/batches done, tokens, ETA (coalesced server-side)
+ * - source_updated: the full source object on every status change
+ *
+ * This is a small client for the Socket.IO v5 protocol over a plain
+ * WebSocket (no extra npm dependency). Packets are text frames:
+ * - "0{...}"  Engine.IO open        - "2" / "3"   ping / pong
+ * - "40"      connect namespace     - "42[...]"   event ["name", data]
+ *
+ * If the socket can't connect, callers fall back to polling (onConnectionChange).
+ */
+
+import { API_BASE_URL } from './client';
+import type { Source } from './sources';
+
+/**
+ * Live progress of one processing stage of a source
+ */
+export interface SourceProgressEvent {
+  project_id: string;
+  source_id: string;
+  stage: string;
+  unit: string;
+  done: number;
+  total: number | null;
+  batches_done: number;
+  batches_total: number | null;
+  batches_in_flight: number;
+  input_tokens: number;
+  output_tokens: number;
+  elapsed_seconds: number;
+  eta_seconds: number | null;
+  final: boolean;
+  status?: 'completed' | 'failed';
+  error?: string | null;
+}
+
+/**
+ * Status change of a source (carries the updated source metadata)
+ */
+export interface SourceUpdatedEvent {
+  project_id: string;
+  source_id: string;
+  status: Source['status'];
+  source: Source | null;
+}
+
+export interface ProjectProgressHandlers {
+  onProgress?: (event: SourceProgressEvent) => void;
+  onSourceUpdated?: (event: SourceUpdatedEvent) => void;
+  onConnectionChange?: (connected: boolean) => void;
+}
+
+// Reconnect delays grow up to this cap (ms)
+const MAX_RECONNECT_DELAY = 30000;
+
+/**
+ * Build the Socket.IO WebSocket URL from the API base URL
+ * Educational Note: The API lives at http://host:5000/api/v1, Socket.IO at
+ * ws://host:5000/socket.io/ on the same server.
+ */
+const getSocketUrl = (): string => {
+  const apiUrl = new URL(API_BASE_URL, window.location.href);
+  const protocol = apiUrl.protocol === 'https:' ? 'wss:' : 'ws:';
+  return `${protocol}//${apiUrl.host}/socket.io/?EIO=4&transport=websocket`;
+};
+
+/**
+ * Subscribe to a project's live source events
+ * Educational Note: Reconnects with exponential backoff and re-joins the
+ * project room after every reconnect (the server sends the current progress
+ * of every source still processing on join).
+ *
+ * @returns Function that unsubscribes and closes the socket
+ */
+export const subscribeToProjectProgress = (
+  projectId: string,
+  handlers: ProjectProgressHandlers
+): (() => void) => {
+  let socket: WebSocket | null = null;
+  let closed = false;
+  let connected = false;
+  let attempts = 0;
+  let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+
+  const setConnected = (value: boolean) => {
+    if (connected !== value) {
+      connected = value;
+      handlers.onConnectionChange?.(value);
+    }
+  };
+
+  const emit = (event: string, data: unknown) => {
+    if (socket?.readyState === WebSocket.OPEN) {
+      socket.send(`42${JSON.stringify([event, data])}`);
+    }
+  };
+
+  const handleEvent = (name: string, data: unknown) => {
+    if (name === 'source_progress') {
+      handlers.onProgress?.(data as SourceProgressEvent);
+    } else if (name === 'source_updated') {
+      handlers.onSourceUpdated?.(data as SourceUpdatedEvent);
+    }
+  };
+
+  const handleMessage = (message: string) => {
+    if (message.startsWith('0')) {
+      // Engine.IO open - connect to the default namespace
+      socket?.send('40');
+    } else if (message === '2') {
+      socket?.send('3');
+    } else if (message.startsWith('40')) {
+      attempts = 0;
+      setConnected(true);
+      emit('join_project', { project_id: projectId });
+    } else if (message.startsWith('42')) {
+      try {
+        const [name, data] = JSON.parse(message.slice(2));
+        handleEvent(name, data);
+      } catch (err) {
+        console.error('Invalid progress event:', err);
+      }
+    } else if (message.startsWith('41') || message === '1') {
+      // Server closed the namespace or the connection
+      socket?.close();
+    }
+  };
+
+  const scheduleReconnect = () => {
+    if (closed) return;
+    const delay = Math.min(MAX_RECONNECT_DELAY, 1000 * 2 ** attempts);
+    attempts += 1;
+    reconnectTimer = setTimeout(connect, delay);
+  };
+
+  function connect() {
+    if (closed) return;
+    let ws: WebSocket;
+    try {
+      ws = new WebSocket(getSocketUrl());
+    } catch (err) {
+      console.error('Progress socket failed to open:', err);
+      scheduleReconnect();
+      return;
+    }
+    socket = ws;
+    ws.onmessage = (event) => {
+      if (typeof event.data === 'string') handleMessage(event.data);
+    };
+    ws.onclose = () => {
+      socket = null;
+      setConnected(false);
+      scheduleReconnect();
+    };
+    ws.onerror = () => {
+      ws.close();
+    };
+  }
+
+  connect();
+
+  return () => {
+    closed = true;
+    if (reconnectTimer) clearTimeout(reconnectTimer);
+    if (socket) {
+      emit('leave_project', { project_id: projectId });
+      socket.onclose = null;
+      socket.close();
+      socket = null;
+    }
+    setConnected(false);
+  };
+};